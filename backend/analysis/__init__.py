@@ -1,8 +1,20 @@
 # Analysis modülü
+from common.session_calendar import label_timestamps, SCHEDULE
 from .ict_concepts import get_all_kill_zones_status, get_ict_analysis
 from .strategy_analyzer import generate_trade_signal
-from .backtester import backtest_strategy, get_real_confidence
+from .backtester import backtest_strategy, get_real_confidence, get_confidence_interval
+from .bootstrap import bootstrap_trade_statistics
+from .trade_stats import TradeStatsAccumulator
 from .supply_demand import find_all_zones
 from .killzone_strategy import get_full_killzone_analysis, get_active_killzone_strategy, KILLZONE_BEHAVIORS
+from .session_ranges import session_range_table, killzone_analytics
+from .playbook_backtester import backtest_playbooks
+from .indicators import compute_indicators
 from .trade_journal import record_signal, verify_past_signals, get_journal_stats, get_signal_history, clear_journal
-
+from .walk_forward import walk_forward_backtest
+from .portfolio_backtester import portfolio_backtest
+from .replay import SignalReplay, replay_backtest
+from .optimizer import successive_halving, optimize_symbols
+from .exit_resolver import IntrabarExitResolver
+from .incremental_backtest import IncrementalBacktest, get_live_backtest
+from .analysis_cache import cached_ict_analysis, cached_ict_structure, cached_zones, cached_trade_signal, cached_backtest, cached_killzone_analysis, cached_asian_range, cached_playbook_backtest, get_cache_stats
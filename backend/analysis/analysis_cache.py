@@ -0,0 +1,241 @@
+# ============================================
+# ANALYSIS CACHE - Mum Parmak İzi ile Memoization
+# ============================================
+# get_ict_analysis, find_all_zones, generate_trade_signal, backtest_strategy
+# ve get_full_killzone_analysis aynı mumlar için aynı sonucu verir.
+# Bu modül sonuçları mum parmak izi + parametreler ile saklar.
+#
+# Saate bağlı kısımlar (kill zone durumu, aktif strateji) CACHE'LENMEZ,
+# her çağrıda yeniden hesaplanır.
+
+import copy
+import threading
+import zlib
+from array import array
+from collections import OrderedDict
+from datetime import datetime
+from typing import Callable, Dict, List
+
+from .ict_concepts import get_all_kill_zones_status, get_ict_structure
+from .supply_demand import find_all_zones
+from .strategy_analyzer import generate_trade_signal
+from .backtester import backtest_strategy
+from .killzone_strategy import calculate_asian_range, get_active_killzone_strategy, KILLZONE_BEHAVIORS
+from .playbook_backtester import backtest_playbooks
+
+# Bellek sınırı (LRU)
+MAX_ENTRIES = 256
+
+_cache: "OrderedDict[tuple, Dict]" = OrderedDict()
+_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0, "evictions": 0, "by_function": {}}
+
+
+def candle_fingerprint(candles: List[Dict], symbol: str = "BTC", interval: str = "1h") -> str:
+    """
+    Mum listesinin ucuz parmak izini üretir.
+
+    sembol + interval + mum sayısı + ilk/son zaman + kapanışların hash'i.
+    Son mum henüz kapanmamış olabileceği için onun OHLC'si de eklenir.
+    """
+    if not candles:
+        return f"{symbol}:{interval}:0"
+
+    closes = array('d', (c['close'] for c in candles))
+    closes_hash = zlib.crc32(closes.tobytes())
+
+    last = candles[-1]
+    last_bar = array('d', (last['open'], last['high'], last['low'], last['close']))
+    closes_hash = zlib.crc32(last_bar.tobytes(), closes_hash)
+
+    return f"{symbol}:{interval}:{len(candles)}:{candles[0]['timestamp']}:{last['timestamp']}:{closes_hash:08x}"
+
+
+def _freeze(value):
+    """Parametreleri hash'lenebilir hale getirir."""
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def _fresh(result: Dict) -> Dict:
+    """
+    Cache'teki sonucun derin kopyası; generated_at varsa şimdiki zaman.
+
+    Çağıranlar iç içe alanları (ör. signal['levels']) değiştirse de
+    cache bozulmaz.
+    """
+    result = copy.deepcopy(result)
+    if isinstance(result, dict) and "generated_at" in result:
+        result["generated_at"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    return result
+
+
+def memoize(name: str, fn: Callable, candles: List[Dict], symbol: str, interval: str, *args, **kwargs) -> Dict:
+    """
+    fn(candles, *args, **kwargs) sonucunu parmak izi ile saklar.
+
+    Dönen sonuç derin kopyadır (_fresh); çağıranlar güvenle değiştirebilir.
+    """
+    key = (name, candle_fingerprint(candles, symbol, interval), _freeze(args), _freeze(kwargs))
+
+    with _lock:
+        per_fn = _stats["by_function"].setdefault(name, {"hits": 0, "misses": 0})
+
+        cached = _cache.get(key)
+        if cached is not None:
+            _cache.move_to_end(key)
+            _stats["hits"] += 1
+            per_fn["hits"] += 1
+        else:
+            _stats["misses"] += 1
+            per_fn["misses"] += 1
+
+    # Kopyalama kilit dışında
+    if cached is not None:
+        return _fresh(cached)
+
+    result = fn(candles, *args, **kwargs)
+
+    with _lock:
+        _cache[key] = result
+        _cache.move_to_end(key)
+        while len(_cache) > MAX_ENTRIES:
+            _cache.popitem(last=False)
+            _stats["evictions"] += 1
+
+    return _fresh(result)
+
+
+# ============================================
+# CACHE'Lİ ANALİZ FONKSİYONLARI
+# ============================================
+
+def cached_ict_structure(candles: List[Dict], symbol: str = "BTC", interval: str = "1h") -> Dict:
+    """
+    get_ict_structure'ın cache'li versiyonu (sadece mumlara bağlı kısım).
+    """
+    return memoize("ict_structure", get_ict_structure, candles, symbol, interval)
+
+
+def cached_ict_analysis(candles: List[Dict], symbol: str = "BTC", interval: str = "1h") -> Dict:
+    """
+    get_ict_analysis ile aynı çıktı. Kill zone durumu her çağrıda taze.
+    """
+    return {
+        "kill_zones": get_all_kill_zones_status(),
+        **cached_ict_structure(candles, symbol, interval)
+    }
+
+
+def cached_zones(candles: List[Dict], symbol: str = "BTC", interval: str = "1h") -> Dict:
+    """
+    find_all_zones'un cache'li versiyonu.
+    """
+    return memoize("supply_demand", find_all_zones, candles, symbol, interval)
+
+
+def cached_trade_signal(candles: List[Dict], ict_analysis: Dict, symbol: str = "BTC", interval: str = "1h") -> Dict:
+    """
+    generate_trade_signal'in cache'li versiyonu.
+
+    Sinyal, ICT analizinin saate bağlı tek girdisine (aktif kill zone)
+    bağlı olduğu için anahtar ayrıca aktif zone id'sini içerir.
+    """
+    active_zone = (ict_analysis or {}).get('kill_zones', {}).get('active_zone')
+    zone_id = active_zone.get('id') if active_zone else None
+
+    return memoize(
+        "trade_signal",
+        lambda c, _zone: generate_trade_signal(c, ict_analysis),
+        candles, symbol, interval, zone_id
+    )
+
+
+def cached_backtest(candles: List[Dict], symbol: str = "BTC", interval: str = "1h", **params) -> Dict:
+    """
+    backtest_strategy'nin cache'li versiyonu.
+    """
+    return memoize("backtest", backtest_strategy, candles, symbol, interval, **params)
+
+
+def cached_asian_range(candles: List[Dict], symbol: str = "BTC", interval: str = "1h") -> Dict:
+    """
+    calculate_asian_range'in cache'li versiyonu.
+    """
+    return memoize("asian_range", calculate_asian_range, candles, symbol, interval)
+
+
+def cached_killzone_analysis(candles: List[Dict], symbol: str = "BTC", interval: str = "1h") -> Dict:
+    """
+    get_full_killzone_analysis ile aynı çıktı. Aktif strateji her çağrıda taze.
+    """
+    return {
+        "asian_range": cached_asian_range(candles, symbol, interval),
+        "active_strategy": get_active_killzone_strategy(),
+        "all_behaviors": KILLZONE_BEHAVIORS
+    }
+
+
+def cached_playbook_backtest(candles: List[Dict], symbol: str = "BTC", interval: str = "1h") -> Dict:
+    """
+    backtest_playbooks'un cache'li versiyonu (uzun geçmiş için).
+    """
+    return memoize("playbook_backtest", backtest_playbooks, candles, symbol, interval)
+
+
+def get_cache_stats() -> Dict:
+    """
+    Cache hit/miss metriklerini döndürür.
+    """
+    with _lock:
+        total = _stats["hits"] + _stats["misses"]
+        return {
+            "entries": len(_cache),
+            "max_entries": MAX_ENTRIES,
+            "hits": _stats["hits"],
+            "misses": _stats["misses"],
+            "evictions": _stats["evictions"],
+            "hit_rate": round(_stats["hits"] / total * 100, 1) if total else 0,
+            "by_function": {name: dict(counts) for name, counts in _stats["by_function"].items()}
+        }
+
+
+def clear_cache() -> Dict:
+    """
+    Cache'i ve metrikleri sıfırlar.
+    """
+    with _lock:
+        _cache.clear()
+        _stats.update({"hits": 0, "misses": 0, "evictions": 0, "by_function": {}})
+    return {"message": "Analiz cache'i temizlendi"}
+
+
+# Test
+if __name__ == "__main__":
+    import random
+
+    test_candles = []
+    price = 100
+    for i in range(48):
+        change = random.uniform(-2, 2)
+        test_candles.append({
+            'timestamp': f'2025-01-{1 + i // 24:02d} {i % 24:02d}:00',
+            'open': round(price, 2),
+            'high': round(max(price, price + change) + random.uniform(0, 1), 2),
+            'low': round(min(price, price + change) - random.uniform(0, 1), 2),
+            'close': round(price + change, 2)
+        })
+        price += change
+
+    for _ in range(3):
+        ict = cached_ict_analysis(test_candles)
+        cached_trade_signal(test_candles, ict)
+        cached_zones(test_candles)
+        cached_backtest(test_candles)
+
+    stats = get_cache_stats()
+    print(f"Parmak izi: {candle_fingerprint(test_candles)}")
+    print(f"Hit: {stats['hits']} | Miss: {stats['misses']} | Hit rate: %{stats['hit_rate']}")
@@ -4,10 +4,15 @@
 # Geçmiş verilerle strateji test edip GERÇEK win rate hesaplar
 
 from typing import Dict, List
-from datetime import datetime
-import statistics
 
-def backtest_strategy(candles: List[Dict], lookback: int = 5, min_trades: int = 50) -> Dict:
+import numpy as np
+
+from .bootstrap import bootstrap_trades, bootstrap_trade_statistics
+from .indicators import candle_arrays
+from .portfolio_backtester import vector_signals, vector_exits, WAIT, EXIT_BARS
+from .trade_stats import TradeStatsAccumulator
+
+def backtest_strategy(candles: List[Dict], lookback: int = 5, min_trades: int = 50, bootstrap: bool = False, exit_resolver=None) -> Dict:
     """
     Geçmiş verilerle strateji backtest yapar.
     
@@ -20,6 +25,12 @@ def backtest_strategy(candles: List[Dict], lookback: int = 5, min_trades: int =
         Mum verileri (open, high, low, close, timestamp)
     lookback : int
         Sinyal üretmek için geriye bakılacak mum sayısı
+    bootstrap : bool
+        True ise win rate, profit factor, expectancy ve max drawdown
+        için bootstrap güven aralıkları eklenir
+    exit_resolver : IntrabarExitResolver
+        Verilirse aynı mumda hem stop hem hedef görülen trade'ler
+        alt zaman dilimi verisiyle çözülür
     
     Returns:
     --------
@@ -28,75 +39,166 @@ def backtest_strategy(candles: List[Dict], lookback: int = 5, min_trades: int =
     if len(candles) < lookback + 5:
         return {"error": "Yetersiz veri", "min_required": lookback + 5}
     
+    # Resolver mum sırasını tek tek gezer; onsuz vektörel yol birebir aynı sonucu verir
+    if exit_resolver is None:
+        bars = candle_arrays(candles)
+        bars['timestamp'] = [c['timestamp'] for c in candles]
+        return backtest_bars(bars, lookback, min_trades, bootstrap)
+    
+    trades = _simulate_trades(candles, lookback, exit_resolver)
+    
+    # İstatistikleri hesapla
+    result = _calculate_statistics(trades)
+    
+    if bootstrap and trades:
+        result['confidence_intervals'] = bootstrap_trades(trades)
+    
+    if exit_resolver is not None and trades:
+        result['intrabar'] = exit_resolver.report()
+    
+    return result
+
+
+def backtest_bars(bars: Dict[str, np.ndarray], lookback: int = 5, min_trades: int = 50, bootstrap: bool = False) -> Dict:
+    """
+    backtest_strategy'nin kolon dizileriyle çalışan hali.
+    
+    bars: open/high/low/close dizileri (örn. CandleArchive.range()
+    view'ları, kopyalanmaz); recent_trades zamanı için opsiyonel
+    timestamp veya minutes (epoch dakika). Sinyal ve çıkış portfolio_backtester'ın
+    vektörel kurallarıyla (skaler versiyonla birebir aynı) hesaplanır.
+    exit_resolver desteklenmez (mum içi sıra için mum listesi gerekir).
+    """
+    opens, highs, lows, closes = bars['open'], bars['high'], bars['low'], bars['close']
+    
+    if closes.size < lookback + 5:
+        return {"error": "Yetersiz veri", "min_required": lookback + 5}
+    
+    direction, strength = vector_signals(opens, closes, lookback)
+    pnl, wins = vector_exits(direction, highs, lows, closes)
+    
+    # Trade'ler: [lookback, n - 3) aralığında WAIT olmayan mumlar
+    rows = np.flatnonzero(direction[:closes.size - EXIT_BARS] != WAIT)
+    directions = direction[rows]
+    # Python round() ile aynı yuvarlama (_trade_at'teki pnl_percent)
+    pnl_percent = np.array([round(value, 2) for value in pnl[rows].tolist()], dtype=np.float64)
+    
+    if 'timestamp' in bars:
+        timestamps = np.asarray(bars['timestamp'])[rows]
+    elif 'minutes' in bars:
+        timestamps = np.char.replace(np.datetime_as_string(bars['minutes'][rows].astype('datetime64[m]')), "T", " ")
+    else:
+        timestamps = None
+    
+    accumulator = TradeStatsAccumulator(keep_records=False)
+    accumulator.extend(directions, wins[rows], pnl_percent, timestamps=timestamps,
+                       entry_prices=closes[rows], exit_prices=closes[rows + EXIT_BARS],
+                       signal_strengths=strength[rows])
+    result = accumulator.statistics()
+    
+    if bootstrap and rows.size:
+        result['confidence_intervals'] = bootstrap_trade_statistics(pnl_percent, wins[rows], directions)
+    
+    return result
+
+
+def _simulate_trades(candles: List[Dict], lookback: int = 5, exit_resolver=None) -> List[Dict]:
+    """
+    Her mum için sinyal üretip trade sonuçlarını listeler.
+    
+    Walk-forward gibi trade'leri birleştirmesi gereken modüller
+    istatistik yerine ham trade listesini kullanır.
+    """
     trades = []
     
     # Her mum için sinyal üret ve sonucu kontrol et
     for i in range(lookback, len(candles) - 3):
-        # Son 'lookback' mumu al
-        window = candles[i-lookback:i+1]
-        current_candle = candles[i]
-        
-        # Basit sinyal üret
-        signal = _generate_signal(window)
-        
-        if signal['direction'] == 'WAIT':
-            continue
-        
-        # Sonraki 3 muma bak
-        entry_price = current_candle['close']
-        future_candles = candles[i+1:i+4]
-        
-        if len(future_candles) < 3:
-            continue
-        
+        trade = _trade_at(candles, i, lookback, exit_resolver)
+        if trade:
+            trades.append(trade)
+    
+    return trades
+
+
+def _trade_at(candles: List[Dict], i: int, lookback: int = 5, exit_resolver=None) -> Dict:
+    """
+    candles[i] mumunda açılan trade (sinyal WAIT ise None).
+    
+    candles[i - lookback] ile candles[i + 3] arası mevcut olmalı.
+    """
+    # Son 'lookback' mumu al
+    window = candles[i-lookback:i+1]
+    current_candle = candles[i]
+    
+    # Basit sinyal üret
+    signal = _generate_signal(window)
+    
+    if signal['direction'] == 'WAIT':
+        return None
+    
+    # Sonraki 3 muma bak
+    entry_price = current_candle['close']
+    future_candles = candles[i+1:i+4]
+    
+    if len(future_candles) < 3:
+        return None
+    
+    exit_price = future_candles[-1]['close']
+    result, pnl_percent = _resolve_exit(signal['direction'], entry_price, future_candles, exit_resolver)
+    
+    return {
+        'timestamp': current_candle['timestamp'],
+        'direction': signal['direction'],
+        'entry_price': entry_price,
+        'exit_price': exit_price,
+        'result': result,
+        'pnl_percent': round(pnl_percent, 2),
+        'signal_strength': signal['strength']
+    }
+
+
+def _resolve_exit(direction: str, entry_price: float, future_candles: List[Dict], exit_resolver=None) -> tuple:
+    """
+    Trade sonucunu (result, pnl_percent) hesaplar.
+    
+    Stop loss %1, Take profit %1.5. Pencere içinde hem stop hem hedef
+    görüldüyse varsayılan olarak önce stop kabul edilir (muhafazakar).
+    exit_resolver verilirse (bkz. exit_resolver.py) mumlar sırayla
+    gezilir ve aynı mumda ikisi de görüldüyse alt zaman dilimine bakılır.
+    """
+    exit_price = future_candles[-1]['close']
+    
+    if direction == 'LONG':
+        stop_loss = entry_price * 0.99
+        take_profit = entry_price * 1.015
+    else:
+        stop_loss = entry_price * 1.01
+        take_profit = entry_price * 0.985
+    
+    if exit_resolver is not None:
+        hit = exit_resolver.resolve(direction, stop_loss, take_profit, future_candles)
+    else:
         # En yüksek ve en düşük fiyatı bul
         future_high = max(c['high'] for c in future_candles)
         future_low = min(c['low'] for c in future_candles)
-        exit_price = future_candles[-1]['close']
-        
-        # Trade sonucunu hesapla
-        if signal['direction'] == 'LONG':
-            # Stop loss %1, Take profit %1.5
-            stop_loss = entry_price * 0.99
-            take_profit = entry_price * 1.015
-            
-            if future_low <= stop_loss:
-                result = 'LOSS'
-                pnl_percent = -1.0
-            elif future_high >= take_profit:
-                result = 'WIN'
-                pnl_percent = 1.5
-            else:
-                # TP veya SL'ye ulaşmadı, kapanış fiyatına göre
-                pnl_percent = ((exit_price - entry_price) / entry_price) * 100
-                result = 'WIN' if pnl_percent > 0 else 'LOSS'
         
-        else:  # SHORT
-            stop_loss = entry_price * 1.01
-            take_profit = entry_price * 0.985
-            
-            if future_high >= stop_loss:
-                result = 'LOSS'
-                pnl_percent = -1.0
-            elif future_low <= take_profit:
-                result = 'WIN'
-                pnl_percent = 1.5
-            else:
-                pnl_percent = ((entry_price - exit_price) / entry_price) * 100
-                result = 'WIN' if pnl_percent > 0 else 'LOSS'
-        
-        trades.append({
-            'timestamp': current_candle['timestamp'],
-            'direction': signal['direction'],
-            'entry_price': entry_price,
-            'exit_price': exit_price,
-            'result': result,
-            'pnl_percent': round(pnl_percent, 2),
-            'signal_strength': signal['strength']
-        })
+        if direction == 'LONG':
+            hit = 'STOP' if future_low <= stop_loss else ('TARGET' if future_high >= take_profit else None)
+        else:
+            hit = 'STOP' if future_high >= stop_loss else ('TARGET' if future_low <= take_profit else None)
     
-    # İstatistikleri hesapla
-    return _calculate_statistics(trades)
+    if hit == 'STOP':
+        return 'LOSS', -1.0
+    if hit == 'TARGET':
+        return 'WIN', 1.5
+    
+    # TP veya SL'ye ulaşmadı, kapanış fiyatına göre
+    if direction == 'LONG':
+        pnl_percent = ((exit_price - entry_price) / entry_price) * 100
+    else:
+        pnl_percent = ((entry_price - exit_price) / entry_price) * 100
+    
+    return ('WIN' if pnl_percent > 0 else 'LOSS'), pnl_percent
 
 
 def _generate_signal(candles: List[Dict]) -> Dict:
@@ -150,116 +252,14 @@ def _generate_signal(candles: List[Dict]) -> Dict:
 def _calculate_statistics(trades: List[Dict]) -> Dict:
     """
     Trade listesinden istatistikleri hesaplar.
-    """
-    if not trades:
-        return {
-            "error": "Trade bulunamadı",
-            "total_trades": 0
-        }
-    
-    total_trades = len(trades)
-    winning_trades = [t for t in trades if t['result'] == 'WIN']
-    losing_trades = [t for t in trades if t['result'] == 'LOSS']
-    
-    win_count = len(winning_trades)
-    loss_count = len(losing_trades)
-    
-    # Win Rate - EN ÖNEMLİ METRİK
-    win_rate = (win_count / total_trades) * 100 if total_trades > 0 else 0
-    
-    # PnL hesaplamaları
-    total_profit = sum(t['pnl_percent'] for t in winning_trades)
-    total_loss = abs(sum(t['pnl_percent'] for t in losing_trades))
-    net_pnl = sum(t['pnl_percent'] for t in trades)
-    
-    # Profit Factor
-    profit_factor = total_profit / total_loss if total_loss > 0 else 0
-    
-    # Average Win / Loss
-    avg_win = total_profit / win_count if win_count > 0 else 0
-    avg_loss = total_loss / loss_count if loss_count > 0 else 0
-    
-    # Risk/Reward Ratio
-    risk_reward = avg_win / avg_loss if avg_loss > 0 else 0
-    
-    # Expectancy (Trade başına beklenen getiri)
-    expectancy = (win_rate/100 * avg_win) - ((100-win_rate)/100 * avg_loss)
-    
-    # Maximum Drawdown
-    cumulative_pnl = []
-    running_total = 0
-    for t in trades:
-        running_total += t['pnl_percent']
-        cumulative_pnl.append(running_total)
-    
-    peak = cumulative_pnl[0]
-    max_drawdown = 0
-    for pnl in cumulative_pnl:
-        if pnl > peak:
-            peak = pnl
-        drawdown = peak - pnl
-        if drawdown > max_drawdown:
-            max_drawdown = drawdown
-    
-    # Consecutive wins/losses
-    max_consecutive_wins = 0
-    max_consecutive_losses = 0
-    current_wins = 0
-    current_losses = 0
-    
-    for t in trades:
-        if t['result'] == 'WIN':
-            current_wins += 1
-            current_losses = 0
-            max_consecutive_wins = max(max_consecutive_wins, current_wins)
-        else:
-            current_losses += 1
-            current_wins = 0
-            max_consecutive_losses = max(max_consecutive_losses, current_losses)
-    
-    # Long vs Short performansı
-    long_trades = [t for t in trades if t['direction'] == 'LONG']
-    short_trades = [t for t in trades if t['direction'] == 'SHORT']
     
-    long_win_rate = (len([t for t in long_trades if t['result'] == 'WIN']) / len(long_trades) * 100) if long_trades else 0
-    short_win_rate = (len([t for t in short_trades if t['result'] == 'WIN']) / len(short_trades) * 100) if short_trades else 0
+    Tek geçişte TradeStatsAccumulator ile (bkz. trade_stats.py).
+    """
+    accumulator = TradeStatsAccumulator(keep_records=False)
+    for trade in trades:
+        accumulator.add_trade(trade)
     
-    return {
-        "success": True,
-        "generated_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-        
-        # Ana Metrikler
-        "total_trades": total_trades,
-        "winning_trades": win_count,
-        "losing_trades": loss_count,
-        
-        # EN ÖNEMLİ: GERÇEK WIN RATE
-        "win_rate": round(win_rate, 1),
-        
-        # Karlılık
-        "profit_factor": round(profit_factor, 2),
-        "net_pnl_percent": round(net_pnl, 2),
-        "expectancy": round(expectancy, 3),
-        
-        # Ortalamalar
-        "avg_win_percent": round(avg_win, 2),
-        "avg_loss_percent": round(avg_loss, 2),
-        "risk_reward_ratio": round(risk_reward, 2),
-        
-        # Risk
-        "max_drawdown_percent": round(max_drawdown, 2),
-        "max_consecutive_wins": max_consecutive_wins,
-        "max_consecutive_losses": max_consecutive_losses,
-        
-        # Long vs Short
-        "long_trades": len(long_trades),
-        "short_trades": len(short_trades),
-        "long_win_rate": round(long_win_rate, 1),
-        "short_win_rate": round(short_win_rate, 1),
-        
-        # Son 10 trade
-        "recent_trades": trades[-10:] if len(trades) >= 10 else trades
-    }
+    return accumulator.statistics()
 
 
 def get_real_confidence(backtest_result: Dict, current_signal: str) -> float:
@@ -280,6 +280,23 @@ def get_real_confidence(backtest_result: Dict, current_signal: str) -> float:
         return backtest_result.get('win_rate', 50.0)
 
 
+def get_confidence_interval(backtest_result: Dict, current_signal: str) -> Dict:
+    """
+    get_real_confidence'ın döndürdüğü win rate için bootstrap
+    güven aralığını döndürür (backtest bootstrap=True ile çalıştıysa).
+    """
+    intervals = backtest_result.get('confidence_intervals')
+    if not intervals:
+        return None
+    
+    if current_signal == 'LONG':
+        return intervals.get('long_win_rate')
+    elif current_signal == 'SHORT':
+        return intervals.get('short_win_rate')
+    else:
+        return intervals.get('win_rate')
+
+
 # Test
 if __name__ == "__main__":
     # Örnek test verisi oluştur
@@ -0,0 +1,233 @@
+# ============================================
+# BOOTSTRAP - Backtest İstatistikleri İçin Güven Aralıkları
+# ============================================
+# 12 trade'den hesaplanan %58 win rate "kesin" değildir.
+# Trade sonuçlarını binlerce kez yeniden örnekleyip (bootstrap)
+# win rate, profit factor, expectancy ve max drawdown için
+# güven aralığı hesaplar.
+#
+# Max drawdown bir yol (sıra) istatistiğidir: trade'leri tek tek karıştırmak
+# kayıp serilerini dağıtır ve aralığı aşağı kaydırır. Bu yüzden trade'ler
+# ardışık bloklar halinde örneklenir (moving block bootstrap). Her olası
+# bloğun özeti (toplam, kazanç, en yüksek/en düşük seviye, iç drawdown) bir
+# kez hesaplanır; resample'lar trade yerine blok özetleriyle birleştirilir.
+
+import math
+import time
+import zlib
+from typing import Dict, List, Optional
+
+import numpy as np
+
+# Varsayılan blok uzunluğu √n (kayıp serileri bölünmesin), en fazla bu kadar
+MAX_BLOCK_SIZE = 100
+
+
+def _interval(samples: np.ndarray, point: float, confidence: float, decimals: int = 2) -> Dict:
+    """
+    Örneklerden yüzdelik güven aralığı çıkarır.
+    """
+    alpha = (100 - confidence) / 2
+    valid = samples[~np.isnan(samples)]
+
+    if valid.size == 0:
+        lower = upper = point
+    else:
+        lower, upper = np.percentile(valid, [alpha, 100 - alpha])
+
+    return {
+        "point": round(float(point), decimals),
+        "lower": round(float(lower), decimals),
+        "upper": round(float(upper), decimals)
+    }
+
+
+def _binomial_rate(rng: np.random.Generator, wins: np.ndarray, n_resamples: int, confidence: float) -> Dict:
+    """
+    Win rate için bootstrap dağılımı.
+
+    Bootstrap'te kazanan sayısı Binomial(n, p) dağılır; n x R matris
+    oluşturmadan aynı dağılımdan doğrudan örneklenir.
+    """
+    n = int(wins.size)
+    if n == 0:
+        return {"point": 0, "lower": 0, "upper": 0, "trades": 0}
+
+    p = float(wins.mean())
+    samples = rng.binomial(n, p, size=n_resamples) / n * 100
+
+    return {**_interval(samples, p * 100, confidence, decimals=1), "trades": n}
+
+
+def _block_summaries(cumulative: np.ndarray, cumulative_profit: np.ndarray, length: int,
+                     first: bool = False) -> tuple:
+    """
+    Her başlangıç noktası için `length` trade'lik bloğun özeti.
+
+    cumulative: başında 0 olan kümülatif PnL (n + 1). Seviyeler bloğun
+    başlangıcına göredir (0 dahil). first=True: serinin ilk bloğu, zirve
+    ilk trade'den başlar (backtester'ın drawdown tanımı).
+
+    Returns:
+    --------
+    (total, profit, high, low, drawdown) : her biri (n - length + 1,)
+    """
+    # Blok uzunluğu kadar kaydırılmış kolonlar üzerinden (satır başına döngü yok)
+    m = cumulative.size - length
+    base = cumulative[:m]
+    high = np.full(m, -np.inf)     # o ana kadarki zirve; sonunda bloğun en yükseği
+    low = np.full(m, np.inf)
+    drawdown = np.zeros(m)
+    level = np.empty(m)
+    for offset in range(1 if first else 0, length + 1):
+        np.subtract(cumulative[offset:offset + m], base, out=level)
+        np.maximum(high, level, out=high)
+        np.minimum(low, level, out=low)
+        np.maximum(drawdown, high - level, out=drawdown)
+
+    total = cumulative[length:] - base
+    profit = cumulative_profit[length:] - cumulative_profit[:m]
+    return total, profit, high, low, drawdown
+
+
+def bootstrap_trade_statistics(
+    pnl_percent: np.ndarray,
+    wins: np.ndarray,
+    directions: Optional[np.ndarray] = None,
+    n_resamples: int = 10000,
+    confidence: float = 95.0,
+    seed: Optional[int] = None,
+    block_size: Optional[int] = None
+) -> Dict:
+    """
+    Trade sonuçlarını yeniden örnekleyip güven aralıkları hesaplar.
+
+    Parameters:
+    -----------
+    pnl_percent : np.ndarray
+        Trade başına PnL (%), trade sırasıyla
+    wins : np.ndarray
+        Trade kazandı mı (bool)
+    directions : np.ndarray
+        1 = LONG, -1 = SHORT (opsiyonel, yön bazında win rate için)
+    n_resamples : int
+        Resample sayısı
+    confidence : float
+        Güven düzeyi (%)
+    seed : int
+        Rastgelelik tohumu. Verilmezse PnL dizisinden türetilir,
+        böylece aynı trade'ler için cevap hep aynı olur.
+    block_size : int
+        Ardışık örneklenen trade sayısı (varsayılan: √n, en fazla
+        MAX_BLOCK_SIZE; 1 = trade'ler tek tek, iid)
+
+    Returns:
+    --------
+    Dict : Her metrik için {"point", "lower", "upper"}
+    """
+    started = time.perf_counter()
+
+    pnl = np.asarray(pnl_percent, dtype=np.float64)
+    wins = np.asarray(wins, dtype=bool)
+    n = int(pnl.size)
+
+    if n == 0:
+        return {"error": "Trade bulunamadı", "n_trades": 0}
+
+    if seed is None:
+        seed = zlib.crc32(np.ascontiguousarray(pnl, dtype=np.float32).tobytes())
+    rng = np.random.default_rng(seed)
+
+    length = max(1, min(n, block_size or min(MAX_BLOCK_SIZE, round(math.sqrt(n)))))
+    cumulative = np.r_[0.0, np.cumsum(pnl)]
+    cumulative_profit = np.r_[0.0, np.cumsum(np.maximum(pnl, 0))]
+
+    # Resample: ilk blok, tam bloklar, (n bloğa bölünmüyorsa) kısa son blok.
+    # Satır = blok sırası, kolon = resample (kümülatif işlemler bitişik bellekte)
+    lengths = [length] * (n // length) + ([n % length] if n % length else [])
+    groups = [(lengths[0], 1, True)] + [
+        (size, lengths[1:].count(size), False) for size in sorted(set(lengths[1:]), reverse=True)
+    ]
+    total, profit, high, low, block_drawdown = (
+        np.empty((len(lengths), n_resamples), dtype=np.float32) for _ in range(5)
+    )
+    row = 0
+    for size, count, first in groups:
+        summaries = _block_summaries(cumulative, cumulative_profit, size, first)
+        starts = rng.integers(0, n - size + 1, size=(count, n_resamples), dtype=np.int32)
+        for summary, out in zip(summaries, (total, profit, high, low, block_drawdown)):
+            np.take(summary.astype(np.float32), starts, out=out[row:row + count])
+        row += count
+
+    totals = total.sum(axis=0, dtype=np.float64)
+    profits = profit.sum(axis=0, dtype=np.float64)
+
+    # Blokların birleşimi (yerinde): blok başlangıç seviyesi + blok içi en
+    # yüksek / en düşük; drawdown = blok içi veya önceki zirveden bloğun dibine
+    np.cumsum(total, axis=0, out=total)
+    np.add(high[1:], total[:-1], out=high[1:])
+    np.add(low[1:], total[:-1], out=low[1:])
+    np.maximum.accumulate(high, axis=0, out=high)
+    drawdowns = block_drawdown.max(axis=0).astype(np.float64)
+    if len(lengths) > 1:
+        np.subtract(high[:-1], low[1:], out=low[1:])
+        np.maximum(drawdowns, low[1:].max(axis=0), out=drawdowns)
+
+    # Kayıp toplamı = kazanç - net (kayıplar <= 0)
+    losses = profits - totals
+    with np.errstate(divide='ignore', invalid='ignore'):
+        profit_factors = np.where(losses > 1e-12, profits / losses, np.nan)
+    expectancies = totals / n
+
+    # Nokta tahminleri (backtester ile aynı tanımlar)
+    total_profit = float(pnl[pnl > 0].sum())
+    total_loss = float(-pnl[pnl <= 0].sum())
+    path = cumulative[1:]
+    point_drawdown = float((np.maximum.accumulate(path) - path).max())
+
+    result = {
+        "n_trades": n,
+        "n_resamples": n_resamples,
+        "block_size": length,
+        "confidence_level": confidence,
+        "win_rate": _binomial_rate(rng, wins, n_resamples, confidence),
+        "profit_factor": _interval(profit_factors, total_profit / total_loss if total_loss > 0 else 0, confidence),
+        "expectancy": _interval(expectancies, pnl.mean(), confidence, decimals=3),
+        "max_drawdown_percent": _interval(drawdowns, point_drawdown, confidence)
+    }
+
+    if directions is not None:
+        directions = np.asarray(directions)
+        result["long_win_rate"] = _binomial_rate(rng, wins[directions == 1], n_resamples, confidence)
+        result["short_win_rate"] = _binomial_rate(rng, wins[directions == -1], n_resamples, confidence)
+
+    result["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 2)
+    return result
+
+
+def bootstrap_trades(trades: List[Dict], n_resamples: int = 10000, confidence: float = 95.0) -> Dict:
+    """
+    Backtester trade listesi (dict) için kısayol.
+    """
+    pnl = np.fromiter((t['pnl_percent'] for t in trades), dtype=np.float64, count=len(trades))
+    wins = np.fromiter((t['result'] == 'WIN' for t in trades), dtype=bool, count=len(trades))
+    directions = np.fromiter((1 if t['direction'] == 'LONG' else -1 for t in trades), dtype=np.int8, count=len(trades))
+
+    return bootstrap_trade_statistics(pnl, wins, directions, n_resamples=n_resamples, confidence=confidence)
+
+
+# Test
+if __name__ == "__main__":
+    rng = np.random.default_rng(42)
+    test_pnl = rng.choice([-1.0, 1.5, 0.4, -0.3], size=1000)
+    test_wins = test_pnl > 0
+
+    result = bootstrap_trade_statistics(test_pnl, test_wins, n_resamples=10000)
+
+    print("=" * 50)
+    print("  BOOTSTRAP GÜVEN ARALIKLARI (%95)")
+    print("=" * 50)
+    for key in ("win_rate", "profit_factor", "expectancy", "max_drawdown_percent"):
+        ci = result[key]
+        print(f"  {key}: {ci['point']} [{ci['lower']}, {ci['upper']}]")
+    print(f"\n  {result['n_resamples']} resample x {result['n_trades']} trade (blok {result['block_size']}): {result['elapsed_ms']} ms")
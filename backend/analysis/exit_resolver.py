@@ -0,0 +1,193 @@
+# ============================================
+# EXIT RESOLVER - Mum İçi Stop/Hedef Sırası
+# ============================================
+# Backtester 3 mumluk çıkış penceresinde stop ve hedefin İKİSİ de
+# görüldüyse her zaman önce stop'u kabul eder → bu trade'ler hep LOSS.
+#
+# Bu resolver:
+# 1. Çıkış mumlarını sırayla gezer (hedef 1. mumda, stop 3. mumda → WIN)
+# 2. Sadece aynı mum içinde ikisi de görüldüyse alt zaman dilimi
+#    mumlarına (ör. 1h içindeki 5m'ler) bakıp hangisinin önce geldiğini bulur
+#
+# Alt zaman dilimi verisi TEMBEL yüklenir: belirsiz mum hiç çıkmazsa
+# loader hiç çağrılmaz.
+
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+
+def _to_minutes(timestamps: List[str]) -> np.ndarray:
+    """
+    "YYYY-MM-DD HH:MM" zaman damgalarını epoch dakikaya çevirir (vektörel).
+    """
+    return np.array(timestamps, dtype='datetime64[m]').astype(np.int64)
+
+
+class IntrabarExitResolver:
+    """
+    Belirsiz (aynı mumda hem stop hem hedef) çıkışları alt zaman
+    dilimi verisiyle çözer.
+
+    Kullanım:
+        resolver = IntrabarExitResolver(lambda: get_crypto_candles("BTC", 900, "5m")["candles"])
+        backtest_strategy(candles, exit_resolver=resolver)
+    """
+
+    def __init__(self, loader: Callable[[], List[Dict]], bar_minutes: int = 60):
+        """
+        loader : Alt zaman dilimi mumlarını döndüren fonksiyon (ilk ihtiyaçta çağrılır)
+        bar_minutes : Ana mumun süresi (1h = 60)
+        """
+        self._loader = loader
+        self._bar_minutes = bar_minutes
+
+        # Zaman damgası indeksi (tembel)
+        self._times: Optional[np.ndarray] = None
+        self._highs: Optional[np.ndarray] = None
+        self._lows: Optional[np.ndarray] = None
+
+        self.stats = {
+            "trades_checked": 0,
+            "window_ambiguous": 0,         # Eski yöntem LOSS sayardı
+            "resolved_by_bar_order": 0,    # Farklı mumlarda → sıra belli
+            "same_bar_ambiguous": 0,       # Aynı mumda ikisi de
+            "resolved_by_lower_tf": 0,     # Alt zaman dilimiyle çözüldü
+            "target_first": 0,
+            "stop_first": 0,
+            "unresolved": 0,               # Veri yok → muhafazakar (stop)
+            "outcome_changed": 0,          # Eski yöntemde LOSS, şimdi WIN
+            "lower_tf_loaded": False,
+            "lower_tf_bars": 0
+        }
+
+    def _ensure_index(self) -> bool:
+        """
+        Alt zaman dilimi verisini yükleyip zaman indeksini kurar.
+        """
+        if self._times is not None:
+            return self._times.size > 0
+
+        try:
+            bars = self._loader() or []
+        except Exception:
+            bars = []
+
+        bars = sorted(bars, key=lambda c: c['timestamp'])
+        self._times = _to_minutes([c['timestamp'] for c in bars]) if bars else np.empty(0, dtype=np.int64)
+        self._highs = np.array([c['high'] for c in bars], dtype=np.float64)
+        self._lows = np.array([c['low'] for c in bars], dtype=np.float64)
+
+        self.stats["lower_tf_loaded"] = True
+        self.stats["lower_tf_bars"] = int(self._times.size)
+        return self._times.size > 0
+
+    def _first_touch(self, bar: Dict, direction: str, stop_loss: float, take_profit: float) -> Optional[str]:
+        """
+        Ana mumun içindeki alt zaman dilimi mumlarında ilk dokunulan seviye.
+        """
+        if not self._ensure_index():
+            return None
+
+        start = int(_to_minutes([bar['timestamp']])[0])
+        lo = np.searchsorted(self._times, start, side='left')
+        hi = np.searchsorted(self._times, start + self._bar_minutes, side='left')
+
+        if hi <= lo:
+            return None
+
+        highs = self._highs[lo:hi]
+        lows = self._lows[lo:hi]
+
+        if direction == 'LONG':
+            stop_hits = lows <= stop_loss
+            target_hits = highs >= take_profit
+        else:
+            stop_hits = highs >= stop_loss
+            target_hits = lows <= take_profit
+
+        touched = stop_hits | target_hits
+        if not touched.any():
+            return None
+
+        first = int(np.argmax(touched))
+        if stop_hits[first] and target_hits[first]:
+            # Alt mumda da ikisi birden → hala belirsiz
+            return None
+
+        return 'STOP' if stop_hits[first] else 'TARGET'
+
+    def resolve(self, direction: str, stop_loss: float, take_profit: float, future_candles: List[Dict]) -> Optional[str]:
+        """
+        Çıkış penceresinde ilk dokunulan seviyeyi döndürür.
+
+        Returns: 'STOP', 'TARGET' veya None (hiçbiri)
+        """
+        self.stats["trades_checked"] += 1
+
+        if direction == 'LONG':
+            stop_flags = [c['low'] <= stop_loss for c in future_candles]
+            target_flags = [c['high'] >= take_profit for c in future_candles]
+        else:
+            stop_flags = [c['high'] >= stop_loss for c in future_candles]
+            target_flags = [c['low'] <= take_profit for c in future_candles]
+
+        if any(stop_flags) and any(target_flags):
+            self.stats["window_ambiguous"] += 1
+
+        for bar, stop_hit, target_hit in zip(future_candles, stop_flags, target_flags):
+            if stop_hit and target_hit:
+                self.stats["same_bar_ambiguous"] += 1
+                first = self._first_touch(bar, direction, stop_loss, take_profit)
+                if first is None:
+                    self.stats["unresolved"] += 1
+                    return 'STOP'
+                self.stats["resolved_by_lower_tf"] += 1
+                self.stats["target_first" if first == 'TARGET' else "stop_first"] += 1
+                if first == 'TARGET':
+                    self.stats["outcome_changed"] += 1
+                return first
+
+            if stop_hit or target_hit:
+                if any(stop_flags) and any(target_flags):
+                    self.stats["resolved_by_bar_order"] += 1
+                    # Stop önce geldiyse sonuç eski kuralla aynı (LOSS)
+                    if target_hit:
+                        self.stats["outcome_changed"] += 1
+                return 'STOP' if stop_hit else 'TARGET'
+
+        return None
+
+    def report(self) -> Dict:
+        """
+        Kaç trade'in belirsizlikten kurtarıldığını raporlar.
+
+        disambiguated sadece sonucu değişen trade'leri sayar: stop önce
+        geldiyse eski kural da LOSS verirdi, bu bir kazanım değildir.
+        """
+        return {
+            **self.stats,
+            "disambiguated": self.stats["outcome_changed"]
+        }
+
+
+# Test
+if __name__ == "__main__":
+    # 1h mum: hem stop (99) hem hedef (101.5) görülmüş
+    hourly = [
+        {"timestamp": "2025-01-01 01:00", "open": 100, "high": 102, "low": 98.5, "close": 100.5},
+        {"timestamp": "2025-01-01 02:00", "open": 100.5, "high": 101, "low": 100, "close": 100.8},
+        {"timestamp": "2025-01-01 03:00", "open": 100.8, "high": 101, "low": 100.2, "close": 100.9},
+    ]
+    # 5m mumlar: önce hedef (01:10), sonra stop (01:40)
+    five_min = [
+        {"timestamp": f"2025-01-01 01:{m:02d}", "open": 100, "close": 100,
+         "high": 101.6 if m == 10 else 100.5, "low": 98.5 if m == 40 else 99.5}
+        for m in range(0, 60, 5)
+    ]
+
+    resolver = IntrabarExitResolver(lambda: five_min)
+    first = resolver.resolve('LONG', 99.0, 101.5, hourly)
+
+    print(f"İlk dokunulan: {first}")   # TARGET
+    print(resolver.report())
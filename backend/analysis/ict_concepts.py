@@ -5,19 +5,24 @@
 
 from datetime import datetime, timezone, timedelta
 from typing import Dict, List, Optional
+import numpy as np
 import pandas as pd
 
+from common.session_calendar import KILL_ZONE_HOURS, SCHEDULE
+from .indicators import candle_arrays
+
 # ============================================
 # KILL ZONES (ICT)
 # ============================================
 # ICT'nin tanımladığı en aktif trading saatleri
+# Saatler session_calendar'dan gelir (tek tanım)
 
 ICT_KILL_ZONES = {
     "ASIAN": {
         "name": "Asian Kill Zone",
         "alias": "Asya Seansı",
-        "start_utc": 0,   # 00:00 UTC
-        "end_utc": 4,     # 04:00 UTC
+        "start_utc": KILL_ZONE_HOURS["ASIAN"][0],   # 00:00 UTC
+        "end_utc": KILL_ZONE_HOURS["ASIAN"][1],     # 04:00 UTC
         "start_turkey": 3,
         "end_turkey": 7,
         "color": "#F7931A",  # Turuncu
@@ -33,8 +38,8 @@ ICT_KILL_ZONES = {
     "LONDON": {
         "name": "London Kill Zone", 
         "alias": "Londra Seansı",
-        "start_utc": 7,   # 07:00 UTC
-        "end_utc": 10,    # 10:00 UTC
+        "start_utc": KILL_ZONE_HOURS["LONDON"][0],   # 07:00 UTC
+        "end_utc": KILL_ZONE_HOURS["LONDON"][1],    # 10:00 UTC
         "start_turkey": 10,
         "end_turkey": 13,
         "color": "#2962FF",  # Mavi
@@ -50,8 +55,8 @@ ICT_KILL_ZONES = {
     "NEW_YORK": {
         "name": "New York Kill Zone",
         "alias": "New York Seansı", 
-        "start_utc": 12,  # 12:00 UTC
-        "end_utc": 15,    # 15:00 UTC
+        "start_utc": KILL_ZONE_HOURS["NEW_YORK"][0],  # 12:00 UTC
+        "end_utc": KILL_ZONE_HOURS["NEW_YORK"][1],    # 15:00 UTC
         "start_turkey": 15,
         "end_turkey": 18,
         "color": "#089981",  # Yeşil
@@ -67,8 +72,8 @@ ICT_KILL_ZONES = {
     "LONDON_CLOSE": {
         "name": "London Close",
         "alias": "Londra Kapanışı",
-        "start_utc": 15,  # 15:00 UTC
-        "end_utc": 17,    # 17:00 UTC
+        "start_utc": KILL_ZONE_HOURS["LONDON_CLOSE"][0],  # 15:00 UTC
+        "end_utc": KILL_ZONE_HOURS["LONDON_CLOSE"][1],    # 17:00 UTC
         "start_turkey": 18,
         "end_turkey": 20,
         "color": "#787B86",  # Gri
@@ -89,18 +94,18 @@ def get_current_kill_zone() -> Optional[Dict]:
     Şu an hangi kill zone aktif olduğunu döndürür.
     """
     utc_now = datetime.now(timezone.utc)
-    current_hour = utc_now.hour
+    minute = utc_now.hour * 60 + utc_now.minute
     
-    for zone_id, zone in ICT_KILL_ZONES.items():
-        if zone["start_utc"] <= current_hour < zone["end_utc"]:
-            return {
-                "id": zone_id,
-                "active": True,
-                "minutes_remaining": (zone["end_utc"] - current_hour - 1) * 60 + (60 - utc_now.minute),
-                **zone
-            }
+    zone_id = SCHEDULE.active_kill_zone(minute)
+    if zone_id is None:
+        return None
     
-    return None
+    return {
+        "id": zone_id,
+        "active": True,
+        "minutes_remaining": int(SCHEDULE.minutes_until_zone_end[zone_id][minute]),
+        **ICT_KILL_ZONES[zone_id]
+    }
 
 
 def get_all_kill_zones_status() -> Dict:
@@ -109,28 +114,21 @@ def get_all_kill_zones_status() -> Dict:
     """
     utc_now = datetime.now(timezone.utc)
     turkey_now = utc_now + timedelta(hours=3)
-    current_hour = utc_now.hour
+    minute = utc_now.hour * 60 + utc_now.minute
+    active_id = SCHEDULE.active_kill_zone(minute)
     
     zones_status = []
     active_zone = None
     
     for zone_id, zone in ICT_KILL_ZONES.items():
-        is_active = zone["start_utc"] <= current_hour < zone["end_utc"]
-        
-        # Sonraki zone'a kalan süre
-        if current_hour < zone["start_utc"]:
-            hours_until = zone["start_utc"] - current_hour
-            minutes_until = hours_until * 60 - utc_now.minute
-        else:
-            # Yarın
-            hours_until = 24 - current_hour + zone["start_utc"]
-            minutes_until = hours_until * 60 - utc_now.minute
+        is_active = zone_id == active_id
         
+        # Süreler günlük programdan okunur (başlamadıysa bugün, geçtiyse yarın)
         zone_data = {
             "id": zone_id,
             "is_active": is_active,
-            "minutes_until_start": minutes_until if not is_active else 0,
-            "minutes_remaining": (zone["end_utc"] - current_hour - 1) * 60 + (60 - utc_now.minute) if is_active else 0,
+            "minutes_until_start": int(SCHEDULE.minutes_until_zone_start[zone_id][minute]) if not is_active else 0,
+            "minutes_remaining": int(SCHEDULE.minutes_until_zone_end[zone_id][minute]) if is_active else 0,
             **zone
         }
         
@@ -214,101 +212,180 @@ def analyze_market_structure(candles: List[Dict]) -> Dict:
 # FAIR VALUE GAP (FVG) - ICT
 # ============================================
 
+def fair_value_gap_arrays(bars: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """
+    find_fair_value_gaps'in kolon dizileriyle çalışan hali (tüm FVG'ler).
+    
+    bars: high/low dizileri (örn. CandleArchive.range() view'ları).
+    index: FVG'nin orta mumu (2. mum), bullish: True = BULLISH_FVG.
+    Bir üçlüde bullish ve bearish FVG aynı anda olamaz (low <= high).
+    """
+    highs, lows = bars['high'], bars['low']
+    n = highs.size - 2
+    
+    if n <= 0:
+        empty = np.empty(0)
+        return {"index": np.empty(0, dtype=np.int64), "bullish": np.empty(0, dtype=bool),
+                "top": empty, "bottom": empty, "midpoint": empty}
+    
+    # Bullish FVG: 1. mum high < 3. mum low / Bearish FVG: 1. mum low > 3. mum high
+    bullish_gap = highs[:n] < lows[2:]
+    bearish_gap = lows[:n] > highs[2:]
+    
+    rows = np.flatnonzero(bullish_gap | bearish_gap)
+    bullish = bullish_gap[rows]
+    top = np.where(bullish, lows[rows + 2], lows[rows])
+    bottom = np.where(bullish, highs[rows], highs[rows + 2])
+    
+    return {
+        "index": rows + 1,
+        "bullish": bullish,
+        "top": top,
+        "bottom": bottom,
+        "midpoint": (top + bottom) / 2
+    }
+
+
 def find_fair_value_gaps(candles: List[Dict]) -> List[Dict]:
     """
     Fair Value Gap (FVG) / Imbalance bölgelerini bulur.
     
     FVG: 3 ardışık mumda, 1. mumun high'ı ile 3. mumun low'u arasında boşluk
     """
-    fvgs = []
-    
     if len(candles) < 3:
-        return fvgs
+        return []
     
-    for i in range(len(candles) - 2):
-        candle1 = candles[i]
-        candle2 = candles[i + 1]
-        candle3 = candles[i + 2]
-        
-        # Bullish FVG: 1. mum high < 3. mum low
-        if candle1['high'] < candle3['low']:
+    gaps = fair_value_gap_arrays(candle_arrays(candles))
+    
+    fvgs = []
+    # Son 3 FVG
+    for index, bullish, top, bottom, midpoint in list(zip(
+        gaps["index"].tolist(), gaps["bullish"].tolist(), gaps["top"].tolist(),
+        gaps["bottom"].tolist(), gaps["midpoint"].tolist()
+    ))[-3:]:
+        if bullish:
             fvgs.append({
                 "type": "BULLISH_FVG",
                 "emoji": "🟢",
-                "top": candle3['low'],
-                "bottom": candle1['high'],
-                "midpoint": (candle3['low'] + candle1['high']) / 2,
-                "timestamp": candle2['timestamp'],
+                "top": top,
+                "bottom": bottom,
+                "midpoint": midpoint,
+                "timestamp": candles[index]['timestamp'],
                 "description": "Bullish Fair Value Gap - Potansiyel destek"
             })
-        
-        # Bearish FVG: 1. mum low > 3. mum high
-        if candle1['low'] > candle3['high']:
+        else:
             fvgs.append({
                 "type": "BEARISH_FVG",
                 "emoji": "🔴",
-                "top": candle1['low'],
-                "bottom": candle3['high'],
-                "midpoint": (candle1['low'] + candle3['high']) / 2,
-                "timestamp": candle2['timestamp'],
+                "top": top,
+                "bottom": bottom,
+                "midpoint": midpoint,
+                "timestamp": candles[index]['timestamp'],
                 "description": "Bearish Fair Value Gap - Potansiyel direnç"
             })
     
-    return fvgs[-3:] if len(fvgs) > 3 else fvgs  # Son 3 FVG
+    return fvgs
 
 
 # ============================================
 # ORDER BLOCKS (ICT)
 # ============================================
 
+def order_block_arrays(bars: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """
+    find_order_blocks'un kolon dizileriyle çalışan hali (tüm Order Block'lar).
+    
+    bars: open/high/low/close dizileri (örn. CandleArchive.range() view'ları).
+    index: Order Block mumu, bullish: True = BULLISH_OB. Kurallar
+    _order_block_at ile aynı (2 mum sonraki kapanışa göre %0.3 hareket).
+    """
+    opens, highs, lows, closes = bars['open'], bars['high'], bars['low'], bars['close']
+    
+    if closes.size < 4:
+        empty = np.empty(0)
+        return {"index": np.empty(0, dtype=np.int64), "bullish": np.empty(0, dtype=bool),
+                "high": empty, "low": empty}
+    
+    # i = 1 .. n - 3
+    current = slice(1, closes.size - 2)
+    next_move = closes[3:] - closes[current]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        move_percent = np.abs(next_move / closes[current]) * 100
+    strong = move_percent > 0.3
+    
+    # Bullish OB: düşüş sonrası son bearish mum / Bearish OB: yükseliş sonrası son bullish mum
+    bullish_ob = (closes[current] < opens[current]) & (next_move > 0) & strong
+    bearish_ob = (closes[current] > opens[current]) & (next_move < 0) & strong
+    
+    rows = np.flatnonzero(bullish_ob | bearish_ob) + 1
+    
+    return {
+        "index": rows,
+        "bullish": bullish_ob[rows - 1],
+        "high": highs[rows],
+        "low": lows[rows]
+    }
+
+
 def find_order_blocks(candles: List[Dict]) -> List[Dict]:
     """
     Order Block'ları bulur.
     
     Order Block: Güçlü hareket öncesi son ters yönlü mum
     """
-    order_blocks = []
-    
     if len(candles) < 4:
-        return order_blocks
+        return []
     
-    for i in range(1, len(candles) - 2):
-        prev_candle = candles[i - 1]
-        current_candle = candles[i]
-        next_candles = candles[i + 1:i + 3]
-        
-        # Mum yönlerini belirle
-        current_bullish = current_candle['close'] > current_candle['open']
-        current_bearish = current_candle['close'] < current_candle['open']
-        
-        # Sonraki mumlarda güçlü hareket var mı?
-        if len(next_candles) >= 2:
-            next_move = next_candles[-1]['close'] - current_candle['close']
-            move_percent = abs(next_move / current_candle['close']) * 100
-            
-            # Bullish Order Block (düşüş sonrası son bearish mum)
-            if current_bearish and next_move > 0 and move_percent > 0.3:
-                order_blocks.append({
-                    "type": "BULLISH_OB",
-                    "emoji": "🟩",
-                    "high": current_candle['high'],
-                    "low": current_candle['low'],
-                    "timestamp": current_candle['timestamp'],
-                    "description": "Bullish Order Block - Potansiyel alım bölgesi"
-                })
-            
-            # Bearish Order Block (yükseliş sonrası son bullish mum)
-            if current_bullish and next_move < 0 and move_percent > 0.3:
-                order_blocks.append({
-                    "type": "BEARISH_OB",
-                    "emoji": "🟥",
-                    "high": current_candle['high'],
-                    "low": current_candle['low'],
-                    "timestamp": current_candle['timestamp'],
-                    "description": "Bearish Order Block - Potansiyel satış bölgesi"
-                })
-    
-    return order_blocks[-2:] if len(order_blocks) > 2 else order_blocks
+    blocks = order_block_arrays(candle_arrays(candles))
+    
+    # Son 2 Order Block (sözlükler skaler kuralla aynı yerden üretilir)
+    return [_order_block_at(candles, index) for index in blocks["index"][-2:].tolist()]
+
+
+def _order_block_at(candles: List[Dict], i: int) -> Optional[Dict]:
+    """
+    candles[i] bir Order Block mu? (candles[i + 2] mevcut olmalı)
+    
+    Bir mum aynı anda hem bullish hem bearish olamayacağı için
+    en fazla bir Order Block döner.
+    """
+    current_candle = candles[i]
+    next_candles = candles[i + 1:i + 3]
+    
+    # Mum yönlerini belirle
+    current_bullish = current_candle['close'] > current_candle['open']
+    current_bearish = current_candle['close'] < current_candle['open']
+    
+    # Sonraki mumlarda güçlü hareket var mı?
+    if len(next_candles) < 2:
+        return None
+    
+    next_move = next_candles[-1]['close'] - current_candle['close']
+    move_percent = abs(next_move / current_candle['close']) * 100
+    
+    # Bullish Order Block (düşüş sonrası son bearish mum)
+    if current_bearish and next_move > 0 and move_percent > 0.3:
+        return {
+            "type": "BULLISH_OB",
+            "emoji": "🟩",
+            "high": current_candle['high'],
+            "low": current_candle['low'],
+            "timestamp": current_candle['timestamp'],
+            "description": "Bullish Order Block - Potansiyel alım bölgesi"
+        }
+    
+    # Bearish Order Block (yükseliş sonrası son bullish mum)
+    if current_bullish and next_move < 0 and move_percent > 0.3:
+        return {
+            "type": "BEARISH_OB",
+            "emoji": "🟥",
+            "high": current_candle['high'],
+            "low": current_candle['low'],
+            "timestamp": current_candle['timestamp'],
+            "description": "Bearish Order Block - Potansiyel satış bölgesi"
+        }
+    
+    return None
 
 
 # ============================================
@@ -329,10 +406,15 @@ def calculate_premium_discount(candles: List[Dict]) -> Dict:
     highs = [c['high'] for c in candles]
     lows = [c['low'] for c in candles]
     
-    range_high = max(highs)
-    range_low = min(lows)
-    current_price = candles[-1]['close']
+    return _premium_discount_from_range(max(highs), min(lows), candles[-1]['close'])
+
+
+def _premium_discount_from_range(range_high: float, range_low: float, current_price: float) -> Dict:
+    """
+    Range sınırlarından Premium/Discount seviyelerini hesaplar.
     
+    Replay gibi range'i kayan pencerede tutan modüller doğrudan kullanır.
+    """
     # Range hesapla
     total_range = range_high - range_low
     equilibrium = range_low + (total_range * 0.5)
@@ -378,22 +460,27 @@ def calculate_premium_discount(candles: List[Dict]) -> Dict:
 # ICT FULL ANALYSIS
 # ============================================
 
+def get_ict_structure(candles: List[Dict]) -> Dict:
+    """
+    ICT analizinin sadece mumlara bağlı kısmı (saatten bağımsız).
+    
+    Aynı mumlar için her zaman aynı sonucu verir, bu yüzden cache'lenebilir.
+    """
+    return {
+        "market_structure": analyze_market_structure(candles),
+        "fair_value_gaps": find_fair_value_gaps(candles),
+        "order_blocks": find_order_blocks(candles),
+        "premium_discount": calculate_premium_discount(candles)
+    }
+
+
 def get_ict_analysis(candles: List[Dict]) -> Dict:
     """
     Tüm ICT analizlerini birleştirir.
     """
-    kill_zones = get_all_kill_zones_status()
-    market_structure = analyze_market_structure(candles)
-    fvgs = find_fair_value_gaps(candles)
-    order_blocks = find_order_blocks(candles)
-    premium_discount = calculate_premium_discount(candles)
-    
     return {
-        "kill_zones": kill_zones,
-        "market_structure": market_structure,
-        "fair_value_gaps": fvgs,
-        "order_blocks": order_blocks,
-        "premium_discount": premium_discount
+        "kill_zones": get_all_kill_zones_status(),
+        **get_ict_structure(candles)
     }
 
 
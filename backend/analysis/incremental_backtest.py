@@ -0,0 +1,325 @@
+# ============================================
+# INCREMENTAL BACKTEST - Her Yeni Mumda O(1) Güncelleme
+# ============================================
+# /full-report her çağrıda backtest_strategy'yi tüm pencere için
+# yeniden çalıştırıyordu. Yeni bir mum kapandığında ise değişen tek şey:
+# - 3 mumluk çıkış penceresi yeni tamamlanan trade (eklenir)
+# - pencerenin başından düşen mumun trade'i (çıkarılır)
+# - oluşmakta olan son mum güncellenirse, çıkışı o mumda olan trade
+#
+# IncrementalBacktest bu üç işlemi O(1) yapar. Win rate sayaçları
+# (get_real_confidence'ın kullandığı) her an günceldir; tam istatistikler
+# ilk okumada vektörel hesaplanıp bir sonraki değişikliğe kadar saklanır.
+# Sonuç backtest_strategy(pencere) ile birebir aynıdır.
+
+import threading
+from collections import deque
+from typing import Dict, List
+
+import numpy as np
+
+from .backtester import _trade_at
+from .bootstrap import bootstrap_trades
+from .trade_stats import TradeStatsAccumulator, RECENT_TRADES
+
+# Trade'in çıkışı için gereken ileri mum sayısı (backtester ile aynı)
+EXIT_BARS = 3
+
+
+class IncrementalBacktest:
+    """
+    Kayan mum penceresi üzerinde sürekli güncel backtest.
+
+    Kullanım:
+        live = IncrementalBacktest(window=24)
+        live.sync(candles)              # Her istekte; sadece farkı işler
+        live.confidence('LONG')         # O(1)
+        live.statistics(bootstrap=True) # backtest_strategy(candles, bootstrap=True) ile aynı
+    """
+
+    def __init__(self, window: int = 24, lookback: int = 5):
+        self.window = window
+        self.lookback = lookback
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """Tüm durumu sıfırlar."""
+        self._candles: List[Dict] = []
+        self._base = 0          # _candles[0]'ın global indeksi
+        self._start = 0         # Penceredeki ilk mumun global indeksi
+        self._end = -1          # Son mumun global indeksi
+
+        # (giriş indeksi, trade) - giriş sırasıyla
+        self._trades = deque()
+
+        self.counts = {"total": 0, "wins": 0, "long": 0, "long_wins": 0, "short": 0, "short_wins": 0}
+
+        self._version = 0
+        self._cached = {}
+        self.updates = {"added": 0, "evicted": 0, "replaced": 0, "rebuilds": 0}
+
+    # ----------------------------------------
+    # İÇ YARDIMCILAR
+    # ----------------------------------------
+
+    def _bar(self, index: int) -> Dict:
+        return self._candles[index - self._base]
+
+    def _count(self, trade: Dict, sign: int) -> None:
+        win = trade['result'] == 'WIN'
+        side = "long" if trade['direction'] == 'LONG' else "short"
+        self.counts["total"] += sign
+        self.counts["wins"] += sign * win
+        self.counts[side] += sign
+        self.counts[f"{side}_wins"] += sign * win
+
+    def _evaluate(self, entry: int) -> None:
+        """
+        entry indeksindeki trade'i hesaplayıp sona ekler (çıkış penceresi tamam olmalı).
+        """
+        if entry - self.lookback < self._start:
+            return
+        lo = entry - self.lookback - self._base
+        local = self._candles[lo:entry + EXIT_BARS + 1 - self._base]
+        trade = _trade_at(local, self.lookback, self.lookback)
+        if trade:
+            self._trades.append((entry, trade))
+            self._count(trade, +1)
+
+    def _changed(self) -> None:
+        self._version += 1
+        self._cached = {}
+
+    # ----------------------------------------
+    # GÜNCELLEME (her biri O(1))
+    # ----------------------------------------
+
+    def add_bar(self, candle: Dict) -> None:
+        """
+        Yeni kapanan mumu ekler; pencere dolduysa en eski mumu çıkarır.
+        """
+        self._candles.append(candle)
+        self._end += 1
+
+        # Çıkış penceresi bu mumla tamamlanan trade
+        self._evaluate(self._end - EXIT_BARS)
+        self.updates["added"] += 1
+
+        if self._end - self._start + 1 > self.window:
+            self.evict_bar()
+
+        self._changed()
+
+    def evict_bar(self) -> None:
+        """
+        Pencerenin başındaki mumu ve ona bağlı trade'i çıkarır.
+        """
+        self._start += 1
+
+        # Sinyal penceresi artık eksik kalan trade
+        while self._trades and self._trades[0][0] - self.lookback < self._start:
+            _, trade = self._trades.popleft()
+            self._count(trade, -1)
+
+        # Listeyi ara ara sıkıştır (amortize O(1))
+        if self._start - self._base > max(64, self.window):
+            del self._candles[:self._start - self._base]
+            self._base = self._start
+
+        self.updates["evicted"] += 1
+        self._changed()
+
+    def replace_last_bar(self, candle: Dict) -> None:
+        """
+        Son mumu günceller (oluşmakta olan mum). Sadece çıkışı bu
+        mumda olan trade yeniden hesaplanır.
+        """
+        self._candles[-1] = candle
+
+        entry = self._end - EXIT_BARS
+        if self._trades and self._trades[-1][0] == entry:
+            _, trade = self._trades.pop()
+            self._count(trade, -1)
+        self._evaluate(entry)
+
+        self.updates["replaced"] += 1
+        self._changed()
+
+    def sync(self, candles: List[Dict]) -> "IncrementalBacktest":
+        """
+        Durumu verilen mum listesine (tam pencere) getirir.
+
+        Sadece son mum değişimi ve yeni mumlar işlenir; geçmiş uyuşmazsa
+        (ör. veri boşluğu veya aynı zamanlı ama revize edilmiş mumlar)
+        pencere baştan kurulur.
+        """
+        with self._lock:
+            self.window = len(candles)
+            known = self._end - self._start + 1
+
+            position = None
+            if known > 0 and candles:
+                last_timestamp = self._candles[-1]['timestamp']
+                for p in range(len(candles) - 1, -1, -1):
+                    if candles[p]['timestamp'] == last_timestamp:
+                        position = p
+                        break
+
+            if position is None or not self._aligned(candles, position):
+                self.reset()
+                self.window = len(candles)
+                self.updates["rebuilds"] += 1
+                for candle in candles:
+                    self.add_bar(candle)
+                return self
+
+            if candles[position] != self._candles[-1]:
+                self.replace_last_bar(candles[position])
+
+            for candle in candles[position + 1:]:
+                self.add_bar(candle)
+
+            # Pencere küçüldüyse
+            while self._end - self._start + 1 > self.window:
+                self.evict_bar()
+
+            return self
+
+    def _aligned(self, candles: List[Dict], position: int) -> bool:
+        """
+        Yeni mumlar eklendikten sonra pencere candles ile aynı mumlardan mı oluşacak?
+        """
+        new_bars = len(candles) - 1 - position
+        known = self._end - self._start + 1
+        if known + new_bars < len(candles):
+            return False    # Pencere büyümüş, baştaki mumlar eksik
+        first = self._start + (known + new_bars - len(candles))
+        if self._bar(first)['timestamp'] != candles[0]['timestamp']:
+            return False
+
+        # Ortak mumlar (son mum hariç, o replace_last_bar ile güncellenir)
+        # birebir aynı olmalı; revize edilmiş geçmiş eski trade'leri bozar
+        return self._candles[first - self._base:self._end - self._base] == candles[:position]
+
+    # ----------------------------------------
+    # OKUMA
+    # ----------------------------------------
+
+    def confidence(self, direction: str) -> float:
+        """
+        get_real_confidence ile aynı değer, sayaçlardan O(1).
+        """
+        c = self.counts
+        if c["total"] == 0 or self._end - self._start + 1 < self.lookback + 5:
+            return 50.0  # Veri yoksa nötr
+        if direction == 'LONG':
+            return round(c["long_wins"] / c["long"] * 100, 1) if c["long"] else 0
+        if direction == 'SHORT':
+            return round(c["short_wins"] / c["short"] * 100, 1) if c["short"] else 0
+        return round(c["wins"] / c["total"] * 100, 1)
+
+    def trades(self) -> List[Dict]:
+        """Penceredeki trade'ler (giriş sırasıyla)."""
+        return [trade for _, trade in self._trades]
+
+    def statistics(self, bootstrap: bool = False) -> Dict:
+        """
+        backtest_strategy(pencere, bootstrap=...) ile aynı sonuç.
+        Bir sonraki mum değişimine kadar saklanır.
+        """
+        with self._lock:
+            key = bool(bootstrap)
+            if key in self._cached:
+                return dict(self._cached[key])
+
+            if self._end - self._start + 1 < self.lookback + 5:
+                return {"error": "Yetersiz veri", "min_required": self.lookback + 5}
+
+            trades = self.trades()
+            n = len(trades)
+
+            accumulator = TradeStatsAccumulator(keep_records=False)
+            accumulator.extend(
+                np.fromiter((1 if t['direction'] == 'LONG' else -1 for t in trades), dtype=np.int8, count=n),
+                np.fromiter((t['result'] == 'WIN' for t in trades), dtype=bool, count=n),
+                np.fromiter((t['pnl_percent'] for t in trades), dtype=np.float64, count=n)
+            )
+            result = accumulator.statistics()
+
+            if n:
+                result['recent_trades'] = trades[-RECENT_TRADES:]
+                if bootstrap:
+                    result['confidence_intervals'] = bootstrap_trades(trades)
+
+            self._cached[key] = result
+            return dict(result)
+
+    def report(self) -> Dict:
+        """Güncelleme sayaçları."""
+        return {
+            "window": self.window,
+            "bars": self._end - self._start + 1,
+            "trades": self.counts["total"],
+            "version": self._version,
+            **self.updates
+        }
+
+
+# Sembol/interval başına canlı instance'lar
+_instances: Dict[tuple, IncrementalBacktest] = {}
+_instances_lock = threading.Lock()
+
+
+def get_live_backtest(symbol: str = "BTC", interval: str = "1h", window: int = 24,
+                      provider: str = None) -> IncrementalBacktest:
+    """
+    Sembol + interval + pencere + veri kaynağı için paylaşılan IncrementalBacktest.
+
+    Farklı kaynakların (yfinance / ccxt) mumları aynı durumu paylaşmaz.
+    """
+    key = (symbol.upper(), interval, window, provider)
+    with _instances_lock:
+        if key not in _instances:
+            _instances[key] = IncrementalBacktest(window=window)
+        return _instances[key]
+
+
+# Test
+if __name__ == "__main__":
+    import random
+    from datetime import datetime, timedelta
+
+    start = datetime(2025, 1, 1)
+    history = []
+    price = 100
+    for i in range(200):
+        change = random.uniform(-1, 1)
+        history.append({
+            'timestamp': (start + timedelta(hours=i)).strftime("%Y-%m-%d %H:%M"),
+            'open': round(price, 2),
+            'high': round(max(price, price + change) + random.uniform(0, 0.5), 2),
+            'low': round(min(price, price + change) - random.uniform(0, 0.5), 2),
+            'close': round(price + change, 2)
+        })
+        price += change
+
+    live = IncrementalBacktest(window=72)
+    for end in range(72, 200):
+        live.sync(history[end - 72:end])
+
+    stats = live.statistics()
+    print(f"Trade: {stats['total_trades']}, Win rate: %{stats['win_rate']}")
+    print(f"LONG güven: %{live.confidence('LONG')}")
+    print(live.report())
+
+    # Aynı zamanlı ama revize edilmiş geçmiş: sonuç taze backtest ile aynı olmalı
+    from .backtester import backtest_strategy
+
+    window = history[-72:]
+    revised = [dict(c, close=round(c['close'] * 1.01, 2), high=round(c['high'] * 1.01, 2)) for c in window[:-1]] + [window[-1]]
+    live.sync(revised)
+    expected = backtest_strategy(revised)
+    stats = live.statistics()
+    assert (stats['total_trades'], stats['win_rate']) == (expected['total_trades'], expected['win_rate']), (stats, expected)
+    print(f"Revize geçmiş: {stats['total_trades']} trade, %{stats['win_rate']} (taze backtest ile aynı) ✓")
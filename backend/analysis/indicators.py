@@ -0,0 +1,263 @@
+# ============================================
+# INDICATORS - Yerel Teknik İndikatör Motoru
+# ============================================
+# calculate_probability'nin kullandığı indikatörleri (RSI, MACD,
+# EMA/SMA 20/50/200, Stochastic, Bollinger, ATR, ADX) TradingView'a
+# gitmeden mum dizilerinden hesaplar.
+#
+# - Tüm seri döner (sadece son değer değil), geçmiş analiz yapılabilir
+# - Hesaplar vektörel (pandas ewm / rolling), binlerce mum < 1 ms
+# - Tanımlar TradingView (Pine) varsayılanlarıyla aynı: EMA ve Wilder
+#   ortalamaları ilk `period` mumun SMA'sı ile başlar
+# - Anahtar adları TradingView ile aynı ("RSI", "MACD.macd", "EMA20"...)
+
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+RSI_PERIOD = 14
+MACD_FAST, MACD_SLOW, MACD_SIGNAL = 12, 26, 9
+MA_PERIODS = (20, 50, 200)
+STOCH_PERIOD, STOCH_SMOOTH = 14, 3
+BB_PERIOD, BB_STD = 20, 2
+ATR_PERIOD = 14
+ADX_PERIOD = 14
+
+
+def _seeded(values: np.ndarray, period: int, alpha: float) -> np.ndarray:
+    """
+    Üssel ortalama, ilk geçerli `period` değerin SMA'sı ile başlar (Pine ta.ema / ta.rma).
+    """
+    series = pd.Series(values, dtype=np.float64)
+    valid = np.flatnonzero(~np.isnan(values))
+    result = np.full(values.size, np.nan)
+    if valid.size < period:
+        return result
+
+    start = valid[0] + period - 1
+    seeded = series.copy()
+    seeded.iloc[:start] = np.nan
+    seeded.iloc[start] = series.iloc[valid[0]:start + 1].mean()
+    result[start:] = seeded.iloc[start:].ewm(alpha=alpha, adjust=False).mean().to_numpy()
+    return result
+
+
+def ema(values: np.ndarray, period: int) -> np.ndarray:
+    """Üssel hareketli ortalama (alpha = 2 / (period + 1))."""
+    return _seeded(values, period, 2 / (period + 1))
+
+
+def rma(values: np.ndarray, period: int) -> np.ndarray:
+    """Wilder ortalaması (alpha = 1 / period) - RSI, ATR, ADX."""
+    return _seeded(values, period, 1 / period)
+
+
+def sma(values: np.ndarray, period: int) -> np.ndarray:
+    """Basit hareketli ortalama."""
+    return pd.Series(values).rolling(period).mean().to_numpy()
+
+
+def rsi(closes: np.ndarray, period: int = RSI_PERIOD) -> np.ndarray:
+    """Wilder RSI."""
+    delta = np.r_[np.nan, np.diff(closes)]
+    gain = rma(np.where(np.isnan(delta), np.nan, np.maximum(delta, 0)), period)
+    loss = rma(np.where(np.isnan(delta), np.nan, np.maximum(-delta, 0)), period)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        value = 100 - 100 / (1 + gain / loss)
+    return np.where(loss == 0, np.where(gain == 0, 50.0, 100.0), value)
+
+
+def macd(closes: np.ndarray, fast: int = MACD_FAST, slow: int = MACD_SLOW, signal: int = MACD_SIGNAL) -> tuple:
+    """MACD çizgisi ve sinyal çizgisi."""
+    line = ema(closes, fast) - ema(closes, slow)
+    return line, ema(line, signal)
+
+
+def stochastic(highs: np.ndarray, lows: np.ndarray, closes: np.ndarray, period: int = STOCH_PERIOD, smooth: int = STOCH_SMOOTH) -> tuple:
+    """Stochastic %K (yumuşatılmış) ve %D."""
+    highest = pd.Series(highs).rolling(period).max().to_numpy()
+    lowest = pd.Series(lows).rolling(period).min().to_numpy()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        raw = np.where(highest > lowest, (closes - lowest) / (highest - lowest) * 100, 50.0)
+    raw[np.isnan(highest)] = np.nan
+    k = sma(raw, smooth)
+    return k, sma(k, smooth)
+
+
+def bollinger(closes: np.ndarray, period: int = BB_PERIOD, width: float = BB_STD) -> tuple:
+    """Bollinger üst ve alt bantları (popülasyon std, Pine ile aynı)."""
+    rolling = pd.Series(closes).rolling(period)
+    middle = rolling.mean().to_numpy()
+    deviation = rolling.std(ddof=0).to_numpy()
+    return middle + width * deviation, middle - width * deviation
+
+
+def true_range(highs: np.ndarray, lows: np.ndarray, closes: np.ndarray) -> np.ndarray:
+    """True range (ilk mumda high - low)."""
+    previous = np.r_[np.nan, closes[:-1]]
+    ranges = np.fmax(highs - lows, np.fmax(np.abs(highs - previous), np.abs(lows - previous)))
+    return ranges
+
+
+def adx(highs: np.ndarray, lows: np.ndarray, closes: np.ndarray, period: int = ADX_PERIOD) -> np.ndarray:
+    """Wilder ADX."""
+    up = np.r_[np.nan, np.diff(highs)]
+    down = np.r_[np.nan, -np.diff(lows)]
+    plus_dm = np.where((up > down) & (up > 0), up, 0.0)
+    minus_dm = np.where((down > up) & (down > 0), down, 0.0)
+    plus_dm[0] = minus_dm[0] = np.nan
+
+    tr = true_range(highs, lows, closes)
+    tr[0] = np.nan
+    atr = rma(tr, period)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        plus_di = 100 * rma(plus_dm, period) / atr
+        minus_di = 100 * rma(minus_dm, period) / atr
+        total = plus_di + minus_di
+        dx = np.where(total > 0, 100 * np.abs(plus_di - minus_di) / total, 0.0)
+    dx[np.isnan(total)] = np.nan
+    return rma(dx, period)
+
+
+def candle_arrays(candles: List[Dict]) -> Dict[str, np.ndarray]:
+    """Mum listesini OHLCV dizilerine çevirir."""
+    n = len(candles)
+    return {
+        key: np.fromiter((c.get(key, 0) for c in candles), dtype=np.float64, count=n)
+        for key in ('open', 'high', 'low', 'close', 'volume')
+    }
+
+
+def compute_indicators(candles: List[Dict]) -> Dict[str, np.ndarray]:
+    """
+    Tüm indikatör serilerini hesaplar.
+
+    Parameters:
+    -----------
+    candles : List[Dict]
+        Zaman sıralı mumlar (open/high/low/close/volume)
+
+    Returns:
+    --------
+    Dict[str, np.ndarray] : TradingView anahtar adlarıyla seriler
+        (ısınma dönemindeki değerler NaN)
+    """
+    return indicator_series(candle_arrays(candles))
+
+
+def indicator_series(data: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """
+    compute_indicators'ın kolon dizileriyle çalışan hali.
+
+    data: open/high/low/close/volume dizileri (örn. CandleArchive.range()
+    view'ları; girdiler kopyalanmaz ve değiştirilmez).
+    """
+    opens, highs, lows, closes = data['open'], data['high'], data['low'], data['close']
+
+    series = {"open": opens, "high": highs, "low": lows, "close": closes, "volume": data['volume']}
+
+    series["RSI"] = rsi(closes)
+    series["MACD.macd"], series["MACD.signal"] = macd(closes)
+    for period in MA_PERIODS:
+        series[f"EMA{period}"] = ema(closes, period)
+        series[f"SMA{period}"] = sma(closes, period)
+    series["Stoch.K"], series["Stoch.D"] = stochastic(highs, lows, closes)
+    series["BB.upper"], series["BB.lower"] = bollinger(closes)
+    series["ATR"] = rma(true_range(highs, lows, closes), ATR_PERIOD)
+    series["ADX"] = adx(highs, lows, closes)
+
+    # TradingView "change": önceki kapanışa göre yüzde değişim
+    with np.errstate(divide='ignore', invalid='ignore'):
+        series["change"] = np.r_[np.nan, np.diff(closes) / closes[:-1] * 100]
+
+    return series
+
+
+def latest_values(series: Dict[str, np.ndarray], index: int = -1) -> Dict[str, float]:
+    """Serilerden tek mumun değerleri (NaN → None)."""
+    values = {}
+    for key, values_array in series.items():
+        value = float(values_array[index]) if values_array.size else float('nan')
+        values[key] = None if np.isnan(value) else value
+    return values
+
+
+def indicator_summary(values: Dict[str, float]) -> Dict:
+    """
+    TradingView özetine benzer AL/SAT/NÖTR oylaması.
+
+    Hareketli ortalamalar: kapanış üstünde AL, altında SAT.
+    Osilatörler: RSI (30/70), Stochastic (20/80 + kesişim), MACD (sinyal üstü/altı).
+    """
+    close = values.get("close")
+    votes = []
+
+    for period in MA_PERIODS:
+        for kind in ("EMA", "SMA"):
+            ma = values.get(f"{kind}{period}")
+            if close is not None and ma is not None:
+                votes.append(1 if close > ma else (-1 if close < ma else 0))
+
+    rsi_value = values.get("RSI")
+    if rsi_value is not None:
+        votes.append(1 if rsi_value < 30 else (-1 if rsi_value > 70 else 0))
+
+    k, d = values.get("Stoch.K"), values.get("Stoch.D")
+    if k is not None and d is not None:
+        votes.append(1 if k < 20 and k > d else (-1 if k > 80 and k < d else 0))
+
+    line, signal = values.get("MACD.macd"), values.get("MACD.signal")
+    if line is not None and signal is not None:
+        votes.append(1 if line > signal else (-1 if line < signal else 0))
+
+    buy, sell = votes.count(1), votes.count(-1)
+    rating = (buy - sell) / len(votes) if votes else 0
+
+    if rating > 0.5:
+        recommendation = "STRONG_BUY"
+    elif rating > 0.1:
+        recommendation = "BUY"
+    elif rating < -0.5:
+        recommendation = "STRONG_SELL"
+    elif rating < -0.1:
+        recommendation = "SELL"
+    else:
+        recommendation = "NEUTRAL"
+
+    return {"RECOMMENDATION": recommendation, "BUY": buy, "SELL": sell, "NEUTRAL": votes.count(0)}
+
+
+# Test
+if __name__ == "__main__":
+    import random
+    import time
+    from datetime import datetime, timedelta
+
+    start = datetime(2025, 1, 1)
+    test_candles = []
+    price = 1.08
+    for i in range(5000):
+        change = random.uniform(-0.002, 0.002)
+        test_candles.append({
+            'timestamp': (start + timedelta(hours=i)).strftime("%Y-%m-%d %H:%M"),
+            'open': round(price, 5),
+            'high': round(max(price, price + change) + random.uniform(0, 0.001), 5),
+            'low': round(min(price, price + change) - random.uniform(0, 0.001), 5),
+            'close': round(price + change, 5),
+            'volume': 0
+        })
+        price += change
+
+    started = time.perf_counter()
+    series = compute_indicators(test_candles)
+    elapsed = time.perf_counter() - started
+
+    latest = latest_values(series)
+    print("=" * 50)
+    print("  INDICATOR ENGINE")
+    print("=" * 50)
+    print(f"  {len(test_candles)} mum: {elapsed * 1000:.2f} ms")
+    for key in ("RSI", "MACD.macd", "EMA200", "Stoch.K", "BB.upper", "ATR", "ADX"):
+        print(f"  {key}: {latest[key]:.5f}")
+    print(f"  Özet: {indicator_summary(latest)}")
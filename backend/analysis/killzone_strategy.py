@@ -7,6 +7,10 @@
 from datetime import datetime, timezone, timedelta
 from typing import Dict, List, Optional
 
+import numpy as np
+
+from common.session_calendar import MINUTES_PER_DAY, SCHEDULE, candle_minutes
+
 # ============================================
 # KILL ZONE BEHAVIORS - Her Zone'un Davranışları
 # ============================================
@@ -190,31 +194,18 @@ def calculate_asian_range(candles: List[Dict], asia_start_hour: int = 0, asia_en
     if not candles:
         return {"error": "Veri yok"}
     
-    # Asia session mumlarını bul (UTC 00:00 - 04:00)
-    asia_candles = []
-    
-    for candle in candles:
-        ts = candle.get('timestamp', '')
-        try:
-            # Timestamp'ten saat bilgisini çıkar
-            if 'T' in str(ts):
-                hour = int(str(ts).split('T')[1].split(':')[0])
-            else:
-                hour = int(str(ts).split(':')[0]) if ':' in str(ts) else -1
-            
-            if asia_start_hour <= hour < asia_end_hour:
-                asia_candles.append(candle)
-        except:
-            continue
+    # Asia session mumlarını bul (UTC 00:00 - 04:00), sadece en son günün seansı
+    minutes = candle_minutes(candles)
+    hours = np.where(minutes >= 0, (minutes % MINUTES_PER_DAY) // 60, -1)
+    asia_indices = np.flatnonzero((hours >= asia_start_hour) & (hours < asia_end_hour))
     
-    if not asia_candles:
-        # Tüm mumların ilk %20'sini Asia olarak kabul et
-        asia_count = max(1, len(candles) // 5)
-        asia_candles = candles[:asia_count]
-    
-    if not asia_candles:
+    if asia_indices.size == 0:
         return {"error": "Asia verileri bulunamadı"}
     
+    days = minutes[asia_indices] // MINUTES_PER_DAY
+    asia_indices = asia_indices[days == days[-1]]
+    asia_candles = [candles[i] for i in asia_indices]
+    
     # High ve Low hesapla
     asian_high = max(c['high'] for c in asia_candles)
     asian_low = min(c['low'] for c in asia_candles)
@@ -238,9 +229,10 @@ def calculate_asian_range(candles: List[Dict], asia_start_hour: int = 0, asia_en
         position_emoji = "↔️"
         suggestion = "Hala Asian Range içinde - Breakout bekle"
     
-    # Sweep kontrolü
-    high_swept = any(c['high'] > asian_high for c in candles[len(asia_candles):])
-    low_swept = any(c['low'] < asian_low for c in candles[len(asia_candles):])
+    # Sweep kontrolü (Asia seansından sonraki mumlar)
+    after_asia = candles[int(asia_indices[-1]) + 1:]
+    high_swept = any(c['high'] > asian_high for c in after_asia)
+    low_swept = any(c['low'] < asian_low for c in after_asia)
     
     return {
         "asian_high": round(asian_high, 2),
@@ -263,36 +255,16 @@ def get_active_killzone_strategy() -> Dict:
     """
     utc_now = datetime.now(timezone.utc)
     turkey_now = utc_now + timedelta(hours=3)
-    current_hour = utc_now.hour
+    minute = utc_now.hour * 60 + utc_now.minute
     
-    # Aktif zone'u bul
-    active_zone = None
-    active_zone_id = None
-    
-    zones_hours = {
-        "ASIAN": (0, 4),
-        "LONDON": (7, 10),
-        "NEW_YORK": (12, 15),
-        "LONDON_CLOSE": (15, 17)
-    }
-    
-    for zone_id, (start, end) in zones_hours.items():
-        if start <= current_hour < end:
-            active_zone = KILLZONE_BEHAVIORS[zone_id]
-            active_zone_id = zone_id
-            break
+    # Aktif zone (günlük programdan)
+    active_zone_id = SCHEDULE.active_kill_zone(minute)
+    active_zone = KILLZONE_BEHAVIORS[active_zone_id] if active_zone_id else None
     
     # Zone dışındaysa
     if not active_zone:
-        # En yakın zone'u bul
-        next_zone = None
-        min_hours = 24
-        
-        for zone_id, (start, end) in zones_hours.items():
-            hours_until = start - current_hour if start > current_hour else (24 - current_hour + start)
-            if hours_until < min_hours:
-                min_hours = hours_until
-                next_zone = zone_id
+        # En yakın zone
+        next_zone, min_hours = SCHEDULE.next_kill_zone_by_hour[utc_now.hour]
         
         return {
             "is_active": False,
@@ -306,7 +278,7 @@ def get_active_killzone_strategy() -> Dict:
         }
     
     # Aktif zone bilgileri
-    minutes_in_zone = (current_hour - zones_hours[active_zone_id][0]) * 60 + utc_now.minute
+    minutes_in_zone = int(SCHEDULE.minutes_since_zone_start[active_zone_id][minute])
     
     return {
         "is_active": True,
@@ -0,0 +1,401 @@
+# ============================================
+# OPTIMIZER - Successive Halving ile Parametre Arama
+# ============================================
+# Stop, hedef, çıkış süresi (horizon), lookback ve skor eşiklerinin
+# tam grid'i binlerce kombinasyon eder. Successive halving:
+# 1. Çok sayıda konfigürasyonu KISA bir geçmiş diliminde dener
+# 2. En kötüleri eler (her turda sadece 1/eta kadarı kalır)
+# 3. Kalanları eta kat daha UZUN dilimde tekrar dener
+# ... tam geçmişe ulaşana kadar.
+#
+# Değerlendirme vektörel motorla (portfolio_backtester) ve paralel
+# process'lerde yapılır. Her aramanın izi JSON olarak kaydedilir.
+
+import itertools
+import json
+import math
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from .portfolio_backtester import vector_signals, vector_exits, _vector_statistics, WAIT
+
+# Arama uzayı
+SEARCH_SPACE = {
+    "lookback": (3, 5, 8, 13, 21),
+    "stop_percent": (0.5, 0.75, 1.0, 1.5, 2.0),
+    "target_percent": (0.75, 1.0, 1.5, 2.0, 3.0),
+    "horizon": (2, 3, 5, 8, 12),
+    "entry_threshold": (20, 40, 60),
+    "momentum_threshold": (0.25, 0.5, 1.0),
+}
+
+# backtester'ın bugünkü sabit değerleri (karşılaştırma için hep denenir)
+DEFAULT_PARAMS = {
+    "lookback": 5,
+    "stop_percent": 1.0,
+    "target_percent": 1.5,
+    "horizon": 3,
+    "entry_threshold": 40,
+    "momentum_threshold": 0.5,
+}
+
+OBJECTIVES = ("expectancy", "net_pnl", "sharpe")
+
+# Arama izlerinin kaydedildiği klasör
+TRACE_DIR = os.path.join(os.path.dirname(__file__), '..', 'data', 'optimizer_runs')
+
+
+# ============================================
+# DEĞERLENDİRME
+# ============================================
+
+def _candle_arrays(candles: List[Dict]) -> Dict[str, np.ndarray]:
+    """Mum listesini OHLC dizilerine çevirir."""
+    return {
+        field: np.fromiter((c[field] for c in candles), dtype=np.float64, count=len(candles))
+        for field in ("open", "high", "low", "close")
+    }
+
+
+def _score(pnl: np.ndarray, objective: str) -> float:
+    """Trade PnL dizisinden hedef metrik."""
+    if objective == "net_pnl":
+        return float(pnl.sum())
+    if objective == "sharpe":
+        std = pnl.std()
+        return float(pnl.mean() / std * math.sqrt(pnl.size)) if std > 0 else 0.0
+    return float(pnl.mean())
+
+
+def _evaluate_batch(args) -> List[Dict]:
+    """
+    Bir grup konfigürasyonu aynı dilimde değerlendirir (process worker'da).
+
+    Aynı sinyal parametrelerini (lookback + eşikler) paylaşan
+    konfigürasyonlar sinyali bir kez hesaplar.
+    """
+    arrays, configs, objective, min_trades = args
+    opens, highs, lows, closes = arrays["open"], arrays["high"], arrays["low"], arrays["close"]
+    T = closes.size
+
+    signal_cache = {}
+    results = []
+
+    for params in configs:
+        signal_key = (params["lookback"], params["entry_threshold"], params["momentum_threshold"])
+        if signal_key not in signal_cache:
+            direction, _ = vector_signals(opens, closes, *signal_key)
+            signal_cache[signal_key] = direction
+        direction = signal_cache[signal_key]
+
+        horizon = params["horizon"]
+        pnl, wins = vector_exits(direction, highs, lows, closes,
+                                 params["stop_percent"], params["target_percent"], horizon)
+
+        # Çıkış penceresi tamamlanan trade'ler
+        traded = direction[:max(0, T - horizon)] != WAIT
+        trade_pnl = np.round(pnl[:traded.size][traded], 2)
+
+        if trade_pnl.size < min_trades:
+            score = None
+        else:
+            score = round(_score(trade_pnl, objective), 5)
+
+        results.append({
+            "params": params,
+            "score": score,
+            "trades": int(trade_pnl.size),
+            "win_rate": round(float(wins[:traded.size][traded].mean() * 100), 1) if trade_pnl.size else 0
+        })
+
+    return results
+
+
+def evaluate_params(candles: List[Dict], params: Dict = None, objective: str = "expectancy") -> Dict:
+    """
+    Tek bir konfigürasyonun tam istatistikleri.
+    """
+    params = {**DEFAULT_PARAMS, **(params or {})}
+    arrays = _candle_arrays(candles)
+
+    direction, _ = vector_signals(arrays["open"], arrays["close"], params["lookback"],
+                                  params["entry_threshold"], params["momentum_threshold"])
+    pnl, wins = vector_exits(direction, arrays["high"], arrays["low"], arrays["close"],
+                             params["stop_percent"], params["target_percent"], params["horizon"])
+
+    n = max(0, len(candles) - params["horizon"])
+    traded = direction[:n] != WAIT
+
+    stats = _vector_statistics(pnl[:n][traded], wins[:n][traded], direction[:n][traded])
+    stats["score"] = round(_score(np.round(pnl[:n][traded], 2), objective), 5) if traded.any() else None
+    return {"params": params, "objective": objective, **stats}
+
+
+# ============================================
+# SUCCESSIVE HALVING
+# ============================================
+
+def _sample_configs(space: Dict, count: int, rng: random.Random) -> List[Dict]:
+    """
+    Arama uzayından tekrarsız konfigürasyon örnekler (varsayılan hep dahil).
+    """
+    keys = list(space.keys())
+    sizes = [len(space[k]) for k in keys]
+    total = math.prod(sizes)
+
+    default = {k: DEFAULT_PARAMS[k] for k in keys if k in DEFAULT_PARAMS}
+    if count >= total:
+        configs = [dict(zip(keys, values)) for values in itertools.product(*(space[k] for k in keys))]
+    else:
+        configs = []
+        for flat in rng.sample(range(total), count):
+            values = []
+            for size, key in zip(reversed(sizes), reversed(keys)):
+                flat, pick = divmod(flat, size)
+                values.append(space[key][pick])
+            configs.append(dict(zip(reversed(keys), values)))
+
+    full = [{**DEFAULT_PARAMS, **c} for c in configs]
+    if len(default) == len(keys) and default not in configs:
+        full[-1] = dict(DEFAULT_PARAMS)
+    return full
+
+
+def _rank(results: List[Dict]) -> List[Dict]:
+    """En iyi skordan en kötüye (geçersizler en sonda)."""
+    return sorted(results, key=lambda r: (r["score"] is None, -(r["score"] or 0)))
+
+
+def _write_trace(trace: Dict, path: str) -> None:
+    """İzi atomik olarak JSON'a yazar."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(trace, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def successive_halving(
+    candles: List[Dict],
+    budget: int = 5_000_000,
+    eta: int = 3,
+    min_bars: int = 168,
+    objective: str = "expectancy",
+    min_trades: int = 10,
+    space: Dict = None,
+    workers: int = None,
+    seed: int = 42,
+    symbol: str = "BTC",
+    trace_path: Optional[str] = None,
+    executor: Optional[ProcessPoolExecutor] = None,
+    progress_callback: Optional[Callable[[float, str], None]] = None
+) -> Dict:
+    """
+    Successive halving ile en iyi parametreleri arar.
+
+    Parameters:
+    -----------
+    candles : List[Dict]
+        Tam geçmiş mum verisi
+    budget : int
+        Toplam hesaplama bütçesi (konfigürasyon x mum değerlendirmesi).
+        Her tur yaklaşık budget / tur_sayısı kadar harcar.
+    eta : int
+        Eleme oranı: her turda en iyi 1/eta kalır, dilim eta kat uzar
+    min_bars : int
+        İlk turdaki dilim uzunluğu (en son mumlar)
+    objective : str
+        "expectancy", "net_pnl" veya "sharpe"
+    min_trades : int
+        Bu sayıdan az trade üreten konfigürasyon elenir
+    workers : int
+        Paralel process sayısı (1 = aynı process'te; en fazla CPU sayısı)
+    trace_path : str
+        İzin kaydedileceği dosya (varsayılan: data/optimizer_runs/)
+
+    Returns:
+    --------
+    Dict : En iyi parametreler, varsayılanla kıyas ve tur bazında iz
+    """
+    if objective not in OBJECTIVES:
+        return {"error": f"Geçersiz objective: {objective}", "supported": list(OBJECTIVES)}
+
+    space = space or SEARCH_SPACE
+    total_bars = len(candles)
+    min_bars = min(min_bars, total_bars)
+
+    if total_bars < max(space["lookback"]) + max(space["horizon"]) + min_trades:
+        return {"error": "Yetersiz veri", "available": total_bars}
+
+    started = time.perf_counter()
+    arrays = _candle_arrays(candles)
+
+    # Tur sayısı ve başlangıç konfigürasyon sayısı
+    rungs = max(1, math.ceil(math.log(total_bars / min_bars, eta)) + 1) if total_bars > min_bars else 1
+    grid_size = math.prod(len(v) for v in space.values())
+    n_configs = int(min(grid_size, max(eta, budget // (rungs * min_bars))))
+
+    rng = random.Random(seed)
+    survivors = _sample_configs(space, n_configs, rng)
+
+    workers = _clamp_workers(workers)
+    own_executor = executor is None and workers > 1
+    if own_executor:
+        executor = ProcessPoolExecutor(max_workers=workers)
+
+    trace = {
+        "symbol": symbol,
+        "started_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "config": {
+            "budget": budget, "eta": eta, "min_bars": min_bars, "objective": objective,
+            "min_trades": min_trades, "total_bars": total_bars, "grid_size": grid_size,
+            "initial_configs": n_configs, "rungs": rungs, "workers": workers, "seed": seed,
+            "space": {k: list(v) for k, v in space.items()}
+        },
+        "rungs": []
+    }
+
+    spent = 0
+    ranked = []
+
+    try:
+        for rung in range(rungs):
+            bars = total_bars if rung == rungs - 1 else min(total_bars, min_bars * eta ** rung)
+            rung_started = time.perf_counter()
+
+            # En son 'bars' mum
+            sliced = {k: v[total_bars - bars:] for k, v in arrays.items()}
+
+            # Aynı sinyal parametreleri aynı gruba düşsün diye sırala
+            survivors.sort(key=lambda p: (p["lookback"], p["entry_threshold"], p["momentum_threshold"]))
+            chunks = max(1, min(len(survivors), workers * 4))
+            size = math.ceil(len(survivors) / chunks)
+            jobs = [(sliced, survivors[i:i + size], objective, min_trades) for i in range(0, len(survivors), size)]
+
+            results = []
+            if executor is not None:
+                for batch in executor.map(_evaluate_batch, jobs):
+                    results.extend(batch)
+            else:
+                for job in jobs:
+                    results.extend(_evaluate_batch(job))
+
+            spent += len(survivors) * bars
+            ranked = _rank(results)
+            keep = max(1, len(ranked) // eta) if rung < rungs - 1 else len(ranked)
+
+            trace["rungs"].append({
+                "rung": rung,
+                "bars": bars,
+                "period": f"{candles[total_bars - bars]['timestamp']} → {candles[-1]['timestamp']}",
+                "evaluated": len(results),
+                "promoted": keep if rung < rungs - 1 else 0,
+                "elapsed_seconds": round(time.perf_counter() - rung_started, 3),
+                "results": ranked
+            })
+
+            if progress_callback:
+                progress_callback((rung + 1) / rungs, f"Tur {rung + 1}/{rungs}: {len(results)} konfigürasyon, {bars} mum")
+
+            survivors = [r["params"] for r in ranked[:keep] if r["score"] is not None] or [ranked[0]["params"]]
+    finally:
+        if own_executor:
+            executor.shutdown()
+
+    best = ranked[0]
+    baseline = evaluate_params(candles, DEFAULT_PARAMS, objective)
+    best_full = evaluate_params(candles, best["params"], objective)
+
+    trace["finished_at"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    trace["best"] = best_full
+    trace["baseline"] = baseline
+
+    trace_path = trace_path or os.path.join(TRACE_DIR, f"{symbol}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    _write_trace(trace, trace_path)
+
+    return {
+        "success": True,
+        "symbol": symbol,
+        "objective": objective,
+        "best_params": best["params"],
+        "best": best_full,
+        "baseline": baseline,
+        "improvement": round(best_full["score"] - baseline["score"], 5)
+            if best_full.get("score") is not None and baseline.get("score") is not None else None,
+        "top": [{k: r[k] for k in ("params", "score", "trades", "win_rate")} for r in ranked[:10]],
+        "search": {
+            "grid_size": grid_size,
+            "initial_configs": n_configs,
+            "rungs": [{k: v for k, v in r.items() if k != "results"} for r in trace["rungs"]],
+            "bar_evaluations": spent,
+            "budget": budget,
+            "elapsed_seconds": round(time.perf_counter() - started, 2)
+        },
+        "trace_file": os.path.abspath(trace_path)
+    }
+
+
+def _clamp_workers(workers: int = None) -> int:
+    """İstemciden gelen process sayısı 1 ile CPU sayısı arasına çekilir."""
+    cpus = os.cpu_count() or 1
+    return max(1, min(workers or cpus, cpus))
+
+
+def optimize_symbols(candle_sets: Dict[str, List[Dict]], workers: int = None, **kwargs) -> Dict:
+    """
+    Birden fazla sembol için (ör. 8 kripto) sırayla optimizasyon.
+    Process havuzu tüm semboller için bir kez açılır.
+    """
+    workers = _clamp_workers(workers)
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    results = {}
+
+    try:
+        for symbol, candles in candle_sets.items():
+            results[symbol] = successive_halving(candles, workers=workers, symbol=symbol, executor=executor, **kwargs)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    return {
+        "success": True,
+        "generated_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "results": results
+    }
+
+
+# Test
+if __name__ == "__main__":
+    from datetime import timedelta
+
+    start = datetime(2025, 1, 1)
+    test_candles = []
+    price = 30000.0
+    rnd = random.Random(7)
+    for i in range(24 * 120):
+        close = price * (1 + rnd.gauss(0, 0.006))
+        test_candles.append({
+            'timestamp': (start + timedelta(hours=i)).strftime("%Y-%m-%d %H:%M"),
+            'open': round(price, 2),
+            'high': round(max(price, close) * (1 + abs(rnd.gauss(0, 0.003))), 2),
+            'low': round(min(price, close) * (1 - abs(rnd.gauss(0, 0.003))), 2),
+            'close': round(close, 2)
+        })
+        price = close
+
+    result = successive_halving(test_candles, budget=2_000_000, trace_path=os.path.join(TRACE_DIR, "test_run.json"))
+
+    print("=" * 50)
+    print("  SUCCESSIVE HALVING")
+    print("=" * 50)
+    for r in result["search"]["rungs"]:
+        print(f"  Tur {r['rung']}: {r['evaluated']} konfigürasyon x {r['bars']} mum ({r['elapsed_seconds']}s)")
+    print(f"\n  En iyi: {result['best_params']}")
+    print(f"  Skor: {result['best']['score']} (varsayılan: {result['baseline']['score']})")
+    print(f"  Süre: {result['search']['elapsed_seconds']}s, iz: {result['trace_file']}")
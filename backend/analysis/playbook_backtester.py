@@ -0,0 +1,351 @@
+# ============================================
+# PLAYBOOK BACKTESTER - Kill Zone Stratejilerinin Backtest'i
+# ============================================
+# KILLZONE_BEHAVIORS'daki stratejiler (Asian Range Breakout, London
+# Sweep & Reverse, NY Reversal...) metin olarak duruyordu. Bu modül
+# her birini mekanik giriş / stop / hedef kurallarına çevirip tüm
+# geçmişte test eder.
+#
+# Mumlar işlem günü × gün içi mum (D×S) matrisine yerleşir; her kural
+# tüm günler için aynı anda (axis=1 üzerinde) değerlendirilir:
+# - Giriş: kill zone penceresinde kuralı sağlayan ilk mumun kapanışı
+# - Çıkış: sonraki mumlarda stop veya hedefe ilk dokunuş, yoksa gün sonu
+#   (aynı mumda ikisi de görülürse önce stop - muhafazakar)
+
+import time
+from typing import Dict, List
+
+import numpy as np
+
+from common.session_calendar import SCHEDULE, label_timestamps
+from .killzone_strategy import KILLZONE_BEHAVIORS
+from .trade_stats import TradeStatsAccumulator
+
+LONG = 1
+SHORT = -1
+
+# Asian Range Breakout hedefi: range'in 1.5 katı
+BREAKOUT_TARGET_RANGES = 1.5
+
+# London Breakout hedefi: 1:2 RR
+TREND_REWARD_RISK = 2.0
+
+_ZONE = {zone_id: code for code, zone_id in enumerate(SCHEDULE.kill_zone_ids)}
+
+
+def _day_matrix(candles: List[Dict], dst: bool = False) -> Dict[str, np.ndarray]:
+    """
+    Mumları işlem günü × gün içi sıra matrisine yerleştirir (boşluklar NaN).
+    """
+    labels = label_timestamps([c['timestamp'] for c in candles], dst=dst)
+    order = np.argsort(labels["minutes"], kind='stable')
+    trading_day = labels["trading_day"][order]
+    n = trading_day.size
+
+    new_day = np.r_[True, trading_day[1:] != trading_day[:-1]]
+    day_row = np.cumsum(new_day) - 1
+    day_starts = np.flatnonzero(new_day)
+    slot = np.arange(n) - day_starts[day_row]
+    shape = (day_starts.size, int(slot.max()) + 1 if n else 0)
+
+    matrix = {
+        "days": trading_day[day_starts].astype('datetime64[D]'),
+        "valid": np.zeros(shape, dtype=bool),
+        "kill_zone": np.full(shape, -1, dtype=np.int8),
+    }
+    matrix["valid"][day_row, slot] = True
+    matrix["kill_zone"][day_row, slot] = labels["kill_zone"][order]
+    for key in ('open', 'high', 'low', 'close'):
+        values = np.fromiter((c[key] for c in candles), dtype=np.float64, count=n)[order]
+        matrix[key] = np.full(shape, np.nan)
+        matrix[key][day_row, slot] = values
+
+    return matrix
+
+
+def _first(mask: np.ndarray) -> np.ndarray:
+    """Her satırda ilk True'nun sütunu (yoksa -1)."""
+    first = np.argmax(mask, axis=1)
+    return np.where(mask.any(axis=1), first, -1)
+
+
+def _take(values: np.ndarray, slots: np.ndarray) -> np.ndarray:
+    """Satır başına slots sütunundaki değer (slot -1 ise NaN)."""
+    taken = values[np.arange(values.shape[0]), np.clip(slots, 0, None)]
+    return np.where(slots >= 0, taken, np.nan)
+
+
+def _zone_levels(m: Dict, zone: str) -> tuple:
+    """Zone'un gün bazında high/low'u (zone yoksa NaN)."""
+    mask = m["kill_zone"] == _ZONE[zone]
+    has = mask.any(axis=1)
+    high = np.where(has, np.max(np.where(mask, m["high"], -np.inf), axis=1), np.nan)
+    low = np.where(has, np.min(np.where(mask, m["low"], np.inf), axis=1), np.nan)
+    return high, low
+
+
+def _zone_open_close(m: Dict, zone: str) -> tuple:
+    """Zone'un ilk açılışı, son kapanışı ve son mumunun sırası."""
+    mask = m["kill_zone"] == _ZONE[zone]
+    first = _first(mask)
+    last = np.where(mask.any(axis=1), mask.shape[1] - 1 - np.argmax(mask[:, ::-1], axis=1), -1)
+    return _take(m["open"], first), _take(m["close"], last), last
+
+
+def _running(values: np.ndarray, mask: np.ndarray, fn, fill: float) -> np.ndarray:
+    """mask içindeki değerlerin satır bazında kümülatif max/min'i."""
+    return fn.accumulate(np.where(mask, values, fill), axis=1)
+
+
+def _resolve_exits(m: Dict, entry_slot: np.ndarray, direction: np.ndarray, stop: np.ndarray, target: np.ndarray) -> Dict:
+    """
+    Tüm günlerin trade'lerini aynı anda kapatır.
+
+    Stop < giriş < hedef (LONG) sağlanmayan trade'ler atılır.
+    """
+    entry = _take(m["close"], entry_slot)
+    with np.errstate(invalid='ignore'):
+        valid_risk = np.where(direction == LONG, (stop < entry) & (entry < target), (target < entry) & (entry < stop))
+    trade = (entry_slot >= 0) & (direction != 0) & valid_risk
+
+    slots = np.arange(m["valid"].shape[1])
+    after = m["valid"] & (slots[None, :] > entry_slot[:, None]) & trade[:, None]
+
+    is_long = (direction == LONG)[:, None]
+    with np.errstate(invalid='ignore'):
+        stop_hit = after & np.where(is_long, m["low"] <= stop[:, None], m["high"] >= stop[:, None])
+        target_hit = after & np.where(is_long, m["high"] >= target[:, None], m["low"] <= target[:, None])
+
+    first_exit = _first(stop_hit | target_hit)
+    stopped = (first_exit >= 0) & _take(stop_hit, first_exit).astype(bool)
+    targeted = (first_exit >= 0) & ~stopped
+
+    # Ne stop ne hedef: gün sonu kapanışı
+    last_slot = m["valid"].shape[1] - 1 - np.argmax(m["valid"][:, ::-1], axis=1)
+    exit_price = np.where(stopped, stop, np.where(targeted, target, _take(m["close"], last_slot)))
+
+    rows = np.flatnonzero(trade)
+    pnl = direction[rows] * (exit_price[rows] - entry[rows]) / entry[rows] * 100
+    return {
+        "rows": rows,
+        "direction": direction[rows].astype(np.int8),
+        "entry": entry[rows],
+        "exit": exit_price[rows],
+        "pnl": np.round(pnl, 2),
+        "exit_reason": np.where(stopped[rows], "STOP", np.where(targeted[rows], "TARGET", "DAY_END"))
+    }
+
+
+# ============================================
+# KURALLAR (her biri: entry_slot, direction, stop, target)
+# ============================================
+
+def _asian_range_breakout(m: Dict) -> tuple:
+    """London açılışında Asian High/Low kapanışla kırılırsa kırılım yönünde."""
+    asian_high, asian_low = _zone_levels(m, "ASIAN")
+    window = m["kill_zone"] == _ZONE["LONDON"]
+    with np.errstate(invalid='ignore'):
+        long_slot = _first(window & (m["close"] > asian_high[:, None]))
+        short_slot = _first(window & (m["close"] < asian_low[:, None]))
+
+    direction, entry_slot = _pick(long_slot, short_slot)
+    entry = _take(m["close"], entry_slot)
+    size = asian_high - asian_low
+    stop = np.where(direction == LONG, asian_low, asian_high)
+    target = entry + direction * size * BREAKOUT_TARGET_RANGES
+    return entry_slot, direction, stop, target
+
+
+def _london_sweep_reverse(m: Dict) -> tuple:
+    """London'da Asian seviyesi sweep edilip geri kapanırsa ters yönde."""
+    asian_high, asian_low = _zone_levels(m, "ASIAN")
+    window = m["kill_zone"] == _ZONE["LONDON"]
+    with np.errstate(invalid='ignore'):
+        short_slot = _first(window & (m["high"] > asian_high[:, None]) & (m["close"] < asian_high[:, None]))
+        long_slot = _first(window & (m["low"] < asian_low[:, None]) & (m["close"] > asian_low[:, None]))
+
+    direction, entry_slot = _pick(long_slot, short_slot)
+    sweep_high = _take(_running(m["high"], window, np.maximum, -np.inf), entry_slot)
+    sweep_low = _take(_running(m["low"], window, np.minimum, np.inf), entry_slot)
+    stop = np.where(direction == LONG, sweep_low, sweep_high)
+    target = np.where(direction == LONG, asian_high, asian_low)
+    return entry_slot, direction, stop, target
+
+
+def _london_breakout(m: Dict) -> tuple:
+    """London bir Asian tarafını sweep edip ters yönde kapanırsa o yönde (1:2 RR)."""
+    asian_high, asian_low = _zone_levels(m, "ASIAN")
+    london_high, london_low = _zone_levels(m, "LONDON")
+    london_open, london_close, last = _zone_open_close(m, "LONDON")
+
+    with np.errstate(invalid='ignore'):
+        long = (london_low < asian_low) & (london_close > london_open)
+        short = (london_high > asian_high) & (london_close < london_open)
+    direction = np.where(long, LONG, np.where(short, SHORT, 0))
+    entry_slot = np.where(direction != 0, last, -1)
+
+    stop = np.where(direction == LONG, london_low, london_high)
+    target = london_close + direction * np.abs(london_close - stop) * TREND_REWARD_RISK
+    return entry_slot, direction, stop, target
+
+
+def _ny_continuation(m: Dict) -> tuple:
+    """NY'nin ilk mumunda London yönünde; stop London'ın diğer ucu."""
+    london_high, london_low = _zone_levels(m, "LONDON")
+    london_open, london_close, _ = _zone_open_close(m, "LONDON")
+    entry_slot = _first(m["kill_zone"] == _ZONE["NEW_YORK"])
+
+    with np.errstate(invalid='ignore'):
+        direction = np.sign(london_close - london_open)
+    direction = np.where(np.isnan(direction), 0, direction).astype(np.int64)
+
+    stop = np.where(direction == LONG, london_low, london_high)
+    target = np.where(direction == LONG, london_high, london_low) + direction * (london_high - london_low) * 0.5
+    return entry_slot, direction, stop, target
+
+
+def _extreme_rejection(m: Dict, zone: str) -> tuple:
+    """
+    Zone içinde günün yeni high'ı yapılıp altında kapanırsa SHORT (low için LONG).
+    Stop rejection mumunun ucu, hedef günün equilibrium'u.
+    """
+    window = m["kill_zone"] == _ZONE[zone]
+    day_high = _running(m["high"], m["valid"], np.maximum, -np.inf)
+    day_low = _running(m["low"], m["valid"], np.minimum, np.inf)
+    prior_high = np.c_[np.full(day_high.shape[0], -np.inf), day_high[:, :-1]]
+    prior_low = np.c_[np.full(day_low.shape[0], np.inf), day_low[:, :-1]]
+
+    with np.errstate(invalid='ignore'):
+        short_slot = _first(window & (m["high"] > prior_high) & (m["close"] < prior_high))
+        long_slot = _first(window & (m["low"] < prior_low) & (m["close"] > prior_low))
+
+    direction, entry_slot = _pick(long_slot, short_slot)
+    stop = np.where(direction == LONG, _take(m["low"], entry_slot), _take(m["high"], entry_slot))
+    target = (_take(day_high, entry_slot) + _take(day_low, entry_slot)) / 2
+    return entry_slot, direction, stop, target
+
+
+def _pick(long_slot: np.ndarray, short_slot: np.ndarray) -> tuple:
+    """Önce gerçekleşen yönü seçer (aynı mumda ikisi varsa trade yok)."""
+    long_first = (long_slot >= 0) & ((short_slot < 0) | (long_slot < short_slot))
+    short_first = (short_slot >= 0) & ((long_slot < 0) | (short_slot < long_slot))
+    direction = np.where(long_first, LONG, np.where(short_first, SHORT, 0))
+    entry_slot = np.where(long_first, long_slot, np.where(short_first, short_slot, -1))
+    return direction, entry_slot
+
+
+# Strateji adı (KILLZONE_BEHAVIORS ile aynı) → kural
+PLAYBOOK_RULES = {
+    "ASIAN": {"Asian Range Breakout": _asian_range_breakout},
+    "LONDON": {"London Sweep & Reverse": _london_sweep_reverse, "London Breakout": _london_breakout},
+    "NEW_YORK": {"NY Continuation": _ny_continuation, "NY Reversal": lambda m: _extreme_rejection(m, "NEW_YORK")},
+    "LONDON_CLOSE": {"LC Mean Reversion": lambda m: _extreme_rejection(m, "LONDON_CLOSE")},
+}
+
+
+def _playbook_statistics(m: Dict, trades: Dict) -> Dict:
+    """backtest_strategy ile aynı istatistik alanları + çıkış dağılımı."""
+    accumulator = TradeStatsAccumulator(keep_records=False)
+    accumulator.extend(trades["direction"], trades["pnl"] > 0, trades["pnl"])
+    result = accumulator.statistics()
+
+    if trades["rows"].size:
+        result["exit_reasons"] = {reason: int((trades["exit_reason"] == reason).sum()) for reason in ("TARGET", "STOP", "DAY_END")}
+        result["recent_trades"] = [
+            {
+                "date": str(m["days"][row]),
+                "direction": "LONG" if d == LONG else "SHORT",
+                "entry_price": round(float(e), 2),
+                "exit_price": round(float(x), 2),
+                "result": "WIN" if p > 0 else "LOSS",
+                "pnl_percent": float(p),
+                "exit_reason": str(r)
+            }
+            for row, d, e, x, p, r in list(zip(trades["rows"], trades["direction"], trades["entry"], trades["exit"], trades["pnl"], trades["exit_reason"]))[-5:]
+        ]
+
+    return result
+
+
+def backtest_playbooks(candles: List[Dict], dst: bool = False) -> Dict:
+    """
+    KILLZONE_BEHAVIORS'daki tüm stratejileri geçmişte test eder.
+
+    Parameters:
+    -----------
+    candles : List[Dict]
+        Zaman sıralı mumlar ("YYYY-MM-DD HH:MM", UTC), tercihen saatlik
+    dst : bool
+        Kill zone saatleri New York yaz saatine göre kaydırılsın mı
+
+    Returns:
+    --------
+    Dict : zone → strateji adı → istatistikler (backtest_strategy alanları)
+    """
+    if not candles:
+        return {"error": "Veri yok"}
+
+    started = time.perf_counter()
+    matrix = _day_matrix(candles, dst=dst)
+
+    results = {}
+    for zone, rules in PLAYBOOK_RULES.items():
+        results[zone] = {}
+        for name, rule in rules.items():
+            trades = _resolve_exits(matrix, *rule(matrix))
+            stats = _playbook_statistics(matrix, trades)
+            stats["type"] = next((s["type"] for s in KILLZONE_BEHAVIORS[zone]["strategies"] if s["name"] == name), None)
+            results[zone][name] = stats
+
+    return {
+        "trading_days": int(matrix["days"].size),
+        "bars": len(candles),
+        "strategies": results,
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 2)
+    }
+
+
+def attach_to_behaviors(behaviors: Dict, playbook: Dict) -> Dict:
+    """
+    KILLZONE_BEHAVIORS kopyasında her stratejinin yanına backtest özetini ekler.
+    """
+    summary_keys = ("total_trades", "win_rate", "net_pnl_percent", "expectancy", "profit_factor", "max_drawdown_percent")
+    attached = {}
+    for zone, behavior in behaviors.items():
+        strategies = []
+        for strategy in behavior.get("strategies", []):
+            stats = playbook.get("strategies", {}).get(zone, {}).get(strategy["name"])
+            backtest = {k: stats[k] for k in summary_keys if k in stats} if stats else None
+            strategies.append({**strategy, "backtest": backtest})
+        attached[zone] = {**behavior, "strategies": strategies}
+    return attached
+
+
+# Test
+if __name__ == "__main__":
+    import random
+    from datetime import datetime, timedelta
+
+    start = datetime(2025, 1, 1)
+    test_candles = []
+    price = 100
+    for i in range(24 * 180):
+        change = random.uniform(-1, 1)
+        test_candles.append({
+            'timestamp': (start + timedelta(hours=i)).strftime("%Y-%m-%d %H:%M"),
+            'open': round(price, 2),
+            'high': round(max(price, price + change) + random.uniform(0, 0.5), 2),
+            'low': round(min(price, price + change) - random.uniform(0, 0.5), 2),
+            'close': round(price + change, 2)
+        })
+        price = max(10, price + change)
+
+    result = backtest_playbooks(test_candles)
+
+    print("=" * 50)
+    print("  KILL ZONE PLAYBOOK BACKTEST")
+    print("=" * 50)
+    print(f"  {result['trading_days']} gün: {result['elapsed_ms']} ms")
+    for zone, strategies in result['strategies'].items():
+        for name, stats in strategies.items():
+            print(f"  {name}: {stats['total_trades']} trade, win rate %{stats.get('win_rate', 0)}, net %{stats.get('net_pnl_percent', 0)}")
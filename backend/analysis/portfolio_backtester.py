@@ -0,0 +1,356 @@
+# ============================================
+# PORTFOLIO BACKTESTER - Çoklu Kripto, Tek Vektörel Çalıştırma
+# ============================================
+# Tüm kriptoları ortak bir zaman ızgarasında (zaman x sembol) 2-D
+# diziye hizalar. Sinyal üretimi ve çıkış çözümü TÜM semboller için
+# aynı anda NumPy ile yapılır (backtester._generate_signal ve
+# backtester._resolve_exit ile birebir aynı kurallar).
+#
+# Sembol bazında ve portföy bazında equity, drawdown, eşzamanlı
+# pozisyon (exposure) ve getiri korelasyonu raporlar.
+
+from datetime import datetime
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+# Trade çıkışı için ileri mum sayısı (backtester ile aynı)
+EXIT_BARS = 3
+
+# Sinyal yönleri
+LONG = 1
+SHORT = -1
+WAIT = 0
+
+
+# ============================================
+# HİZALAMA
+# ============================================
+
+def build_price_matrix(candle_sets: Dict[str, List[Dict]]) -> Dict:
+    """
+    Sembol → mum listesi sözlüğünü ortak zaman ızgarasına hizalar.
+
+    Eksik mumlar NaN olur.
+
+    Returns:
+    --------
+    Dict : symbols, times (datetime64[m]), open/high/low/close (T x S)
+    """
+    symbols = [s for s, candles in candle_sets.items() if candles]
+    parsed = {
+        s: np.array([c['timestamp'] for c in candle_sets[s]], dtype='datetime64[m]')
+        for s in symbols
+    }
+
+    times = np.unique(np.concatenate(list(parsed.values()))) if symbols else np.empty(0, dtype='datetime64[m]')
+    shape = (times.size, len(symbols))
+
+    matrix = {field: np.full(shape, np.nan) for field in ("open", "high", "low", "close")}
+
+    for col, symbol in enumerate(symbols):
+        rows = np.searchsorted(times, parsed[symbol])
+        for field in matrix:
+            matrix[field][rows, col] = [c[field] for c in candle_sets[symbol]]
+
+    return {"symbols": symbols, "times": times, **matrix}
+
+
+def _window_all(mask: np.ndarray, before: int, after: int) -> np.ndarray:
+    """
+    out[i] = mask[i-before .. i+after] hepsi True mu (sınır dışı False).
+    """
+    T = mask.shape[0]
+    bad = np.concatenate([np.zeros((1,) + mask.shape[1:], dtype=np.int64),
+                          np.cumsum(~mask, axis=0, dtype=np.int64)])
+    out = np.zeros(mask.shape, dtype=bool)
+
+    lo, hi = before, T - after
+    if hi > lo:
+        idx = np.arange(lo, hi)
+        out[lo:hi] = (bad[idx + after + 1] - bad[idx - before]) == 0
+
+    return out
+
+
+# ============================================
+# VEKTÖREL SİNYAL + ÇIKIŞ
+# ============================================
+
+def vector_signals(opens: np.ndarray, closes: np.ndarray, lookback: int = 5,
+                   entry_threshold: int = 40, momentum_threshold: float = 0.5) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    backtester._generate_signal'in tüm mumlar (ve tüm semboller) için
+    vektörel hali. Pencere: [i - lookback, i].
+
+    Toplamlar Python sum() ile aynı sırada (soldan sağa) yapılır,
+    böylece sonuçlar skaler versiyonla birebir aynıdır.
+
+    entry_threshold / momentum_threshold optimizer içindir; varsayılanlar
+    backtester ile aynıdır (|skor| >= 40, momentum %0.5).
+
+    Returns:
+    --------
+    (direction, strength) : LONG=1 / SHORT=-1 / WAIT=0 ve |skor|
+    """
+    T = closes.shape[0]
+    direction = np.zeros(closes.shape, dtype=np.int8)
+    strength = np.zeros(closes.shape, dtype=np.int16)
+
+    if T <= lookback:
+        return direction, strength
+
+    i = slice(lookback, T)
+
+    def shifted(a, k):
+        """a[i - k] (i = lookback..T-1)"""
+        return a[lookback - k:T - k]
+
+    # EMA (basit ortalama) - soldan sağa toplam
+    short_sum = shifted(closes, 2) + shifted(closes, 1) + shifted(closes, 0)
+    ema_short = short_sum / 3
+
+    long_sum = shifted(closes, lookback).copy()
+    for k in range(lookback - 1, -1, -1):
+        long_sum += shifted(closes, k)
+    ema_long = long_sum / (lookback + 1)
+
+    # Son 3 mumun yönü
+    bullish_count = sum((shifted(closes, k) > shifted(opens, k)).astype(np.int8) for k in (2, 1, 0))
+
+    # Momentum
+    first = shifted(closes, lookback)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        momentum = (closes[i] - first) / first * 100
+
+    score = np.where(ema_short > ema_long, 30, -30)
+    score += np.where(bullish_count >= 2, 20, -20)
+    score += np.select([momentum > momentum_threshold, momentum < -momentum_threshold], [20, -20], 0)
+
+    direction[i] = np.select([score >= entry_threshold, score <= -entry_threshold], [LONG, SHORT], WAIT)
+    strength[i] = np.abs(score)
+
+    return direction, strength
+
+
+def vector_exits(direction: np.ndarray, highs: np.ndarray, lows: np.ndarray, closes: np.ndarray,
+                 stop_percent: float = 1.0, target_percent: float = 1.5, horizon: int = EXIT_BARS) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    backtester._resolve_exit'in vektörel hali (varsayılan: stop %1,
+    hedef %1.5, 3 mumluk pencere, pencerede ikisi de varsa önce stop).
+
+    Returns:
+    --------
+    (pnl_percent, wins) : trade olmayan hücrelerde pnl = 0, wins = False
+    """
+    T = closes.shape[0]
+    pnl = np.zeros(closes.shape)
+    wins = np.zeros(closes.shape, dtype=bool)
+
+    if T <= horizon:
+        return pnl, wins
+
+    n = T - horizon
+    entry = closes[:n]
+    future_high = np.maximum.reduce([highs[k:k + n] for k in range(1, horizon + 1)])
+    future_low = np.minimum.reduce([lows[k:k + n] for k in range(1, horizon + 1)])
+    exit_price = closes[horizon:horizon + n]
+
+    is_long = direction[:n] == LONG
+
+    # 1 - 1/100 == 0.99 ve 1 + 1.5/100 == 1.015 (float olarak da), varsayılanlar birebir aynı
+    stop_factor = stop_percent / 100
+    target_factor = target_percent / 100
+    stop = np.where(is_long, entry * (1 - stop_factor), entry * (1 + stop_factor))
+    target = np.where(is_long, entry * (1 + target_factor), entry * (1 - target_factor))
+
+    stop_hit = np.where(is_long, future_low <= stop, future_high >= stop)
+    target_hit = np.where(is_long, future_high >= target, future_low <= target)
+
+    # Eksik (0 doldurulmuş) hücreler geçersiz trade'dir, sonradan maskelenir
+    with np.errstate(divide='ignore', invalid='ignore'):
+        close_pnl = np.where(is_long, (exit_price - entry) / entry, (entry - exit_price) / entry) * 100
+
+    trade_pnl = np.select([stop_hit, target_hit], [-float(stop_percent), float(target_percent)], close_pnl)
+    active = direction[:n] != WAIT
+
+    pnl[:n] = np.where(active, trade_pnl, 0.0)
+    wins[:n] = active & (trade_pnl > 0)
+
+    return pnl, wins
+
+
+# ============================================
+# İSTATİSTİK
+# ============================================
+
+def _max_drawdown(cumulative: np.ndarray) -> float:
+    """Kümülatif PnL eğrisinin zirveden en büyük düşüşü."""
+    if cumulative.size == 0:
+        return 0.0
+    return float((np.maximum.accumulate(cumulative) - cumulative).max())
+
+
+def _vector_statistics(pnl: np.ndarray, wins: np.ndarray, directions: np.ndarray) -> Dict:
+    """
+    Tek sembolün trade dizilerinden özet istatistikler.
+    """
+    total = int(pnl.size)
+    if total == 0:
+        return {"total_trades": 0}
+
+    rounded = np.round(pnl, 2)
+    win_count = int(wins.sum())
+    total_profit = float(rounded[wins].sum())
+    total_loss = float(abs(rounded[~wins].sum()))
+    win_rate = win_count / total * 100
+    avg_win = total_profit / win_count if win_count else 0
+    avg_loss = total_loss / (total - win_count) if total - win_count else 0
+
+    longs = directions == LONG
+    shorts = directions == SHORT
+
+    return {
+        "total_trades": total,
+        "winning_trades": win_count,
+        "losing_trades": total - win_count,
+        "win_rate": round(win_rate, 1),
+        "profit_factor": round(total_profit / total_loss, 2) if total_loss > 0 else 0,
+        "net_pnl_percent": round(float(rounded.sum()), 2),
+        "expectancy": round((win_rate / 100 * avg_win) - ((100 - win_rate) / 100 * avg_loss), 3),
+        "max_drawdown_percent": round(_max_drawdown(np.cumsum(rounded)), 2),
+        "long_trades": int(longs.sum()),
+        "short_trades": int(shorts.sum()),
+        "long_win_rate": round(float(wins[longs].mean() * 100), 1) if longs.any() else 0,
+        "short_win_rate": round(float(wins[shorts].mean() * 100), 1) if shorts.any() else 0
+    }
+
+
+# ============================================
+# PORTFÖY BACKTEST
+# ============================================
+
+def portfolio_backtest(candle_sets: Dict[str, List[Dict]], lookback: int = 5) -> Dict:
+    """
+    Tüm semboller için tek vektörel backtest.
+
+    Parameters:
+    -----------
+    candle_sets : Dict[str, List[Dict]]
+        Sembol → mum listesi (ör. {"BTC": [...], "ETH": [...]})
+    lookback : int
+        Sinyal penceresi (backtest_strategy ile aynı)
+
+    Returns:
+    --------
+    Dict : Sembol bazında + portföy istatistikleri, korelasyon matrisi
+    """
+    matrix = build_price_matrix(candle_sets)
+    symbols = matrix["symbols"]
+    times = matrix["times"]
+
+    if not symbols or times.size < lookback + 5:
+        return {"error": "Yetersiz veri", "min_required": lookback + 5}
+
+    opens, highs, lows, closes = matrix["open"], matrix["high"], matrix["low"], matrix["close"]
+
+    # Penceredeki (ısınma + çıkış) tüm mumlar mevcut olmalı
+    finite = np.isfinite(opens) & np.isfinite(highs) & np.isfinite(lows) & np.isfinite(closes)
+    valid = _window_all(finite, lookback, EXIT_BARS)
+
+    direction, strength = vector_signals(opens, closes, lookback)
+    direction = np.where(valid, direction, WAIT).astype(np.int8)
+
+    pnl, wins = vector_exits(direction, np.nan_to_num(highs), np.nan_to_num(lows), np.nan_to_num(closes))
+    traded = direction != WAIT
+
+    # Sembol bazında
+    per_symbol = {}
+    for col, symbol in enumerate(symbols):
+        mask = traded[:, col]
+        per_symbol[symbol] = _vector_statistics(pnl[mask, col], wins[mask, col], direction[mask, col])
+
+    # Portföy: her sembole eşit sermaye (1/S), trade'ler giriş mumunda işlenir
+    bar_returns = np.round(pnl, 2).sum(axis=1) / len(symbols)
+    equity = np.cumsum(bar_returns)
+
+    # Eşzamanlı açık pozisyonlar (trade giriş + 3 mum boyunca açık)
+    open_positions = np.zeros(traded.shape, dtype=np.int16)
+    net_exposure = np.zeros(traded.shape, dtype=np.int16)
+    for k in range(EXIT_BARS):
+        open_positions[k:] += traded[:traded.shape[0] - k]
+        net_exposure[k:] += direction[:direction.shape[0] - k]
+    concurrent = open_positions.sum(axis=1)
+    net = net_exposure.sum(axis=1)
+
+    # Strateji getirilerinin korelasyonu (giriş mumu bazında)
+    correlation = {}
+    if len(symbols) > 1:
+        with np.errstate(invalid='ignore', divide='ignore'):
+            corr = np.corrcoef(pnl, rowvar=False)
+        for a, sym_a in enumerate(symbols):
+            correlation[sym_a] = {
+                sym_b: (round(float(corr[a, b]), 3) if np.isfinite(corr[a, b]) else None)
+                for b, sym_b in enumerate(symbols)
+            }
+
+    all_mask = traded.ravel()
+    combined = _vector_statistics(pnl.ravel()[all_mask], wins.ravel()[all_mask], direction.ravel()[all_mask])
+
+    return {
+        "success": True,
+        "generated_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "symbols": symbols,
+        "bars": int(times.size),
+        "period": f"{str(times[0]).replace('T', ' ')} → {str(times[-1]).replace('T', ' ')}",
+
+        "per_symbol": per_symbol,
+
+        "portfolio": {
+            **combined,
+            "equal_weight_return_percent": round(float(equity[-1]), 2),
+            "equal_weight_max_drawdown_percent": round(_max_drawdown(equity), 2),
+            "max_concurrent_positions": int(concurrent.max()),
+            "avg_concurrent_positions": round(float(concurrent.mean()), 2),
+            "max_net_long_exposure": int(net.max()),
+            "max_net_short_exposure": int(-net.min())
+        },
+
+        "equity_curve": [
+            {"timestamp": str(t).replace('T', ' '), "equity": round(float(e), 2)}
+            for t, e in zip(times[-50:], equity[-50:])
+        ],
+
+        "correlation": correlation
+    }
+
+
+# Test
+if __name__ == "__main__":
+    import random
+
+    sets = {}
+    for symbol in ("BTC", "ETH", "SOL"):
+        candles = []
+        price = 100
+        for i in range(500):
+            change = random.uniform(-2, 2)
+            candles.append({
+                'timestamp': f'2025-01-{1 + i // 24:02d} {i % 24:02d}:00',
+                'open': round(price, 2),
+                'high': round(max(price, price + change) + random.uniform(0, 1), 2),
+                'low': round(min(price, price + change) - random.uniform(0, 1), 2),
+                'close': round(price + change, 2)
+            })
+            price += change
+        sets[symbol] = candles
+
+    result = portfolio_backtest(sets)
+
+    print("=" * 50)
+    print("  PORTFÖY BACKTEST")
+    print("=" * 50)
+    for symbol, stats in result["per_symbol"].items():
+        print(f"  {symbol}: {stats['total_trades']} trade, win rate %{stats['win_rate']}")
+    print(f"\n  Portföy getirisi: %{result['portfolio']['equal_weight_return_percent']}")
+    print(f"  Max eşzamanlı pozisyon: {result['portfolio']['max_concurrent_positions']}")
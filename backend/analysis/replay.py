@@ -0,0 +1,246 @@
+# ============================================
+# REPLAY - Canlı Sinyal Hattının Geçmişte Yeniden Oynatılması
+# ============================================
+# backtest_strategy basitleştirilmiş _generate_signal'i test eder.
+# Bu modül ise canlıda sunulan sinyali, yani
+#     generate_trade_signal(candles, get_ict_analysis(candles))
+# çıktısını geçmişte mum mum yeniden üretir ve backtest eder.
+#
+# Her adımda ICT durumu bir önceki adımdan devralınır:
+# - Order Block'lar: her yeni mumda sadece 1 aday kontrol edilir
+# - Premium/Discount range'i: monoton deque ile kayan max/min
+# - Market structure: sadece son 5 mum
+# Trend ve destek/direnç zaten son 24 mumdan fazlasına bakmaz.
+# Sonuç, batch fonksiyonlarla birebir aynıdır.
+
+import time
+from collections import deque
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from .ict_concepts import ICT_KILL_ZONES, analyze_market_structure, _order_block_at, _premium_discount_from_range
+from .strategy_analyzer import generate_trade_signal
+from .backtester import _resolve_exit, _calculate_statistics
+from .bootstrap import bootstrap_trades
+
+# Canlı /trade-signal 24 saatlik (24 mum) pencere kullanır
+LIVE_WINDOW = 24
+
+# Güven kalibrasyonu için aralıklar (generate_trade_signal %45-75 döndürür)
+CONFIDENCE_BUCKETS = ((45, 55), (55, 65), (65, 75.1))
+
+
+def _build_zone_table() -> List[Optional[Dict]]:
+    """
+    UTC saat → aktif kill zone tablosu (get_all_kill_zones_status ile aynı kural).
+    """
+    table = [None] * 24
+    for zone_id, zone in ICT_KILL_ZONES.items():
+        for hour in range(zone["start_utc"], zone["end_utc"]):
+            table[hour] = {"id": zone_id, "is_active": True, **zone}
+    return table
+
+
+_ZONE_BY_HOUR = _build_zone_table()
+
+
+def kill_zone_at(timestamp: str) -> Optional[Dict]:
+    """
+    "YYYY-MM-DD HH:MM" (UTC) mum zamanında aktif olan kill zone.
+    """
+    return _ZONE_BY_HOUR[int(timestamp[11:13])]
+
+
+class SignalReplay:
+    """
+    Mumları tek tek alıp her adımda canlı sinyali üretir.
+
+    Kullanım:
+        replay = SignalReplay()
+        for candle in candles:
+            signal = replay.push(candle)   # Pencere dolana kadar None
+    """
+
+    def __init__(self, window: int = LIVE_WINDOW):
+        self.window = window
+        self._candles = deque(maxlen=window)
+        self._index = -1
+
+        # Kayan max/min: (index, değer), değerler monoton
+        self._max_high = deque()
+        self._min_low = deque()
+
+        # Penceredeki Order Block'lar: (index, order_block)
+        self._order_blocks = deque()
+
+    def push(self, candle: Dict) -> Optional[Dict]:
+        """
+        Yeni mumu ekler, pencere doluysa canlı sinyali döndürür.
+        """
+        self._index += 1
+        index = self._index
+        self._candles.append(candle)
+        start = index - len(self._candles) + 1
+
+        # Range sınırları (Premium/Discount)
+        while self._max_high and self._max_high[-1][1] <= candle['high']:
+            self._max_high.pop()
+        self._max_high.append((index, candle['high']))
+        while self._max_high[0][0] < start:
+            self._max_high.popleft()
+
+        while self._min_low and self._min_low[-1][1] >= candle['low']:
+            self._min_low.pop()
+        self._min_low.append((index, candle['low']))
+        while self._min_low[0][0] < start:
+            self._min_low.popleft()
+
+        # Yeni mumla kesinleşen tek Order Block adayı: 2 mum öncesi
+        # (find_order_blocks pencerenin ilk mumunu aday saymaz)
+        if len(self._candles) >= 4:
+            order_block = _order_block_at([self._candles[-3], self._candles[-2], candle], 0)
+            if order_block:
+                self._order_blocks.append((index - 2, order_block))
+        while self._order_blocks and self._order_blocks[0][0] <= start:
+            self._order_blocks.popleft()
+
+        if len(self._candles) < self.window:
+            return None
+
+        window = list(self._candles)
+        recent_obs = [ob for _, ob in self._order_blocks]
+
+        ict = {
+            "kill_zones": {"active_zone": kill_zone_at(candle['timestamp'])},
+            "market_structure": analyze_market_structure(window[-5:]),
+            "order_blocks": recent_obs[-2:],
+            "premium_discount": _premium_discount_from_range(self._max_high[0][1], self._min_low[0][1], candle['close'])
+        }
+
+        return generate_trade_signal(window, ict)
+
+
+def _calibration(trades: List[Dict]) -> List[Dict]:
+    """
+    Sinyalin verdiği güven ile gerçekleşen win rate karşılaştırması.
+    """
+    buckets = []
+    for low, high in CONFIDENCE_BUCKETS:
+        group = [t for t in trades if low <= t['confidence'] < high]
+        if not group:
+            continue
+        wins = sum(1 for t in group if t['result'] == 'WIN')
+        buckets.append({
+            "confidence_range": f"%{low}-{min(high, 75):g}",
+            "trades": len(group),
+            "avg_confidence": round(sum(t['confidence'] for t in group) / len(group), 1),
+            "actual_win_rate": round(wins / len(group) * 100, 1)
+        })
+    return buckets
+
+
+def replay_backtest(candles: List[Dict], window: int = LIVE_WINDOW, bootstrap: bool = False, exit_resolver=None) -> Dict:
+    """
+    Canlı sinyal hattını geçmişte yeniden oynatıp backtest yapar.
+
+    Parameters:
+    -----------
+    candles : List[Dict]
+        Mum verileri (UTC zaman damgalı)
+    window : int
+        Canlı analizin gördüğü mum sayısı (varsayılan 24)
+    bootstrap : bool
+        True ise bootstrap güven aralıkları eklenir
+    exit_resolver : IntrabarExitResolver
+        Aynı mumda stop/hedef belirsizliği için (opsiyonel)
+
+    Returns:
+    --------
+    Dict : backtest_strategy ile aynı istatistikler + replay bilgisi
+    """
+    if len(candles) < window + 4:
+        return {"error": "Yetersiz veri", "min_required": window + 4}
+
+    started = time.perf_counter()
+    replay = SignalReplay(window)
+    trades = []
+    counts = {"LONG": 0, "SHORT": 0, "WAIT": 0}
+
+    for i, candle in enumerate(candles):
+        signal = replay.push(candle)
+        if signal is None:
+            continue
+
+        direction = signal['direction']
+        counts[direction] += 1
+
+        if direction == 'WAIT' or i + 3 >= len(candles):
+            continue
+
+        future_candles = candles[i + 1:i + 4]
+        result, pnl_percent = _resolve_exit(direction, candle['close'], future_candles, exit_resolver)
+
+        trades.append({
+            'timestamp': candle['timestamp'],
+            'direction': direction,
+            'entry_price': candle['close'],
+            'exit_price': future_candles[-1]['close'],
+            'result': result,
+            'pnl_percent': round(pnl_percent, 2),
+            'signal_strength': abs(signal['scores']['total_score']),
+            'confidence': signal['confidence']
+        })
+
+    elapsed = time.perf_counter() - started
+
+    result = _calculate_statistics(trades)
+
+    if bootstrap and trades:
+        result['confidence_intervals'] = bootstrap_trades(trades)
+
+    if exit_resolver is not None and trades:
+        result['intrabar'] = exit_resolver.report()
+
+    result['replay'] = {
+        "strategy": "generate_trade_signal + ICT",
+        "window": window,
+        "bars": len(candles),
+        "signals": counts,
+        "calibration": _calibration(trades),
+        "elapsed_seconds": round(elapsed, 3),
+        "bars_per_second": round(len(candles) / elapsed) if elapsed > 0 else 0
+    }
+
+    return result
+
+
+# Test
+if __name__ == "__main__":
+    import random
+    from datetime import timedelta
+
+    start = datetime(2025, 1, 1)
+    test_candles = []
+    price = 100
+    for i in range(5000):
+        change = random.uniform(-1, 1)
+        test_candles.append({
+            'timestamp': (start + timedelta(hours=i)).strftime("%Y-%m-%d %H:%M"),
+            'open': round(price, 2),
+            'high': round(max(price, price + change) + random.uniform(0, 0.5), 2),
+            'low': round(min(price, price + change) - random.uniform(0, 0.5), 2),
+            'close': round(price + change, 2)
+        })
+        price += change
+
+    result = replay_backtest(test_candles)
+
+    print("=" * 50)
+    print("  REPLAY BACKTEST (canlı sinyal)")
+    print("=" * 50)
+    print(f"  Trade: {result['total_trades']}")
+    print(f"  Win Rate: %{result['win_rate']}")
+    print(f"  Sinyaller: {result['replay']['signals']}")
+    print(f"  Hız: {result['replay']['bars_per_second']} mum/sn")
+    for bucket in result['replay']['calibration']:
+        print(f"  Güven {bucket['confidence_range']}: gerçek %{bucket['actual_win_rate']} ({bucket['trades']} trade)")
@@ -0,0 +1,331 @@
+# ============================================
+# SESSION RANGES - Günlük Seans Range Tablosu
+# ============================================
+# Her işlem günü için her kill zone'un open/high/low/close değerleri
+# ve seans sonrası sweep / gün sonu breakout bilgisi.
+#
+# Tüm tablo tek vektörel group-by ile hesaplanır (np.*.reduceat):
+# aylarca saatlik mum birkaç milisaniyede işlenir. killzone_analytics
+# bu tablodan KILLZONE_BEHAVIORS'daki iddiaların geçmiş oranlarını çıkarır.
+
+import time
+from typing import Dict, List
+
+import numpy as np
+
+from common.session_calendar import SCHEDULE, label_timestamps
+from .killzone_strategy import KILLZONE_BEHAVIORS
+
+# Tablodaki seanslar (kill zone sırası = zaman sırası)
+SESSIONS = tuple(SCHEDULE.kill_zone_ids)
+
+# Endpoint'te döndürülen son gün sayısı
+RECENT_DAYS = 10
+
+BREAKOUT_UP = 1
+BREAKOUT_DOWN = -1
+
+
+def _candle_arrays(candles: List[Dict]) -> Dict[str, np.ndarray]:
+    """Mum listesini kolon dizilerine çevirir."""
+    n = len(candles)
+    return {
+        key: np.fromiter((c[key] for c in candles), dtype=np.float64, count=n)
+        for key in ('open', 'high', 'low', 'close')
+    }
+
+
+def session_range_table(candles: List[Dict], dst: bool = False, day_start_hour: int = 0) -> Dict:
+    """
+    İşlem günü × seans range tablosu.
+
+    Parameters:
+    -----------
+    candles : List[Dict]
+        Zaman sıralı mumlar ("YYYY-MM-DD HH:MM", UTC)
+    dst : bool
+        Kill zone saatleri New York yaz saatine göre kaydırılsın mı
+    day_start_hour : int
+        İşlem gününün başladığı UTC saat
+
+    Returns:
+    --------
+    Dict :
+        days        : işlem günleri (datetime64[D], D adet)
+        sessions    : seans id'leri (Z adet)
+        open, high, low, close : D×Z (seans yoksa NaN)
+        bars        : D×Z mum sayısı
+        high_swept, low_swept  : D×Z, seanstan sonra gün içinde range dışına çıkıldı mı
+        breakout    : D×Z, gün kapanışı range'in üstünde (1) / altında (-1) / içinde (0)
+        day_open, day_high, day_low, day_close : D
+    """
+    return session_range_arrays(
+        _candle_arrays(candles), [c['timestamp'] for c in candles],
+        dst=dst, day_start_hour=day_start_hour
+    )
+
+
+def session_range_arrays(prices: Dict[str, np.ndarray], timestamps, dst: bool = False, day_start_hour: int = 0) -> Dict:
+    """
+    session_range_table'ın kolon dizileriyle çalışan hali.
+
+    prices: open/high/low/close dizileri, timestamps: zaman damgaları veya
+    epoch dakika (örn. CandleArchive.range() view'ları, kopyalanmaz).
+    """
+    labels = label_timestamps(timestamps, dst=dst, day_start_hour=day_start_hour)
+
+    order = np.argsort(labels["minutes"], kind='stable')
+    if np.any(order != np.arange(order.size)):
+        prices = {k: v[order] for k, v in prices.items()}
+        labels = {k: v[order] for k, v in labels.items()}
+
+    opens, highs, lows, closes = prices['open'], prices['high'], prices['low'], prices['close']
+    trading_day = labels["trading_day"]
+    kill_zone = labels["kill_zone"].astype(np.int64)
+    n, zones = trading_day.size, len(SESSIONS)
+
+    # Gün grupları (mumlar zaman sıralı → günler ardışık)
+    day_starts = np.flatnonzero(np.r_[True, trading_day[1:] != trading_day[:-1]])
+    day_ends = np.r_[day_starts[1:], n]
+    day_row = np.cumsum(np.r_[True, trading_day[1:] != trading_day[:-1]]) - 1
+
+    table = {
+        "days": trading_day[day_starts].astype('datetime64[D]') if n else np.array([], dtype='datetime64[D]'),
+        "sessions": list(SESSIONS),
+        "day_open": opens[day_starts],
+        "day_high": np.maximum.reduceat(highs, day_starts) if n else np.array([]),
+        "day_low": np.minimum.reduceat(lows, day_starts) if n else np.array([]),
+        "day_close": closes[day_ends - 1],
+    }
+
+    shape = (day_starts.size, zones)
+    for key in ("open", "high", "low", "close"):
+        table[key] = np.full(shape, np.nan)
+    table["bars"] = np.zeros(shape, dtype=np.int64)
+    table["high_swept"] = np.zeros(shape, dtype=bool)
+    table["low_swept"] = np.zeros(shape, dtype=bool)
+    table["breakout"] = np.zeros(shape, dtype=np.int8)
+
+    # Seans grupları: (gün, zone) anahtarına göre
+    in_zone = np.flatnonzero(kill_zone >= 0)
+    if in_zone.size == 0:
+        return table
+
+    keys = day_row[in_zone] * zones + kill_zone[in_zone]
+    in_zone = in_zone[np.argsort(keys, kind='stable')]
+    keys = day_row[in_zone] * zones + kill_zone[in_zone]
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    ends = np.r_[starts[1:], keys.size]
+
+    rows, cols = keys[starts] // zones, keys[starts] % zones
+    session_high = np.maximum.reduceat(highs[in_zone], starts)
+    session_low = np.minimum.reduceat(lows[in_zone], starts)
+
+    table["open"][rows, cols] = opens[in_zone[starts]]
+    table["high"][rows, cols] = session_high
+    table["low"][rows, cols] = session_low
+    table["close"][rows, cols] = closes[in_zone[ends - 1]]
+    table["bars"][rows, cols] = ends - starts
+
+    # Seans sonrasından gün sonuna kadar max/min: [son mum + 1, gün sonu)
+    after_start = in_zone[ends - 1] + 1
+    after_end = day_ends[rows]
+    has_after = after_end > after_start
+    bounds = np.column_stack([after_start, after_end]).ravel()
+    after_high = np.maximum.reduceat(np.append(highs, np.nan), bounds)[::2]
+    after_low = np.minimum.reduceat(np.append(lows, np.nan), bounds)[::2]
+
+    with np.errstate(invalid='ignore'):
+        table["high_swept"][rows, cols] = has_after & (after_high > session_high)
+        table["low_swept"][rows, cols] = has_after & (after_low < session_low)
+
+    day_close = table["day_close"][rows]
+    table["breakout"][rows, cols] = np.where(day_close > session_high, BREAKOUT_UP, np.where(day_close < session_low, BREAKOUT_DOWN, 0))
+
+    return table
+
+
+def _rate(mask: np.ndarray, base: np.ndarray) -> float:
+    """base içindeki mask oranı (%)."""
+    count = int(base.sum())
+    return round(float((mask & base).sum()) / count * 100, 1) if count else 0.0
+
+
+def _session_stats(table: Dict, column: int, complete: np.ndarray) -> Dict:
+    """Tek seansın geçmiş oranları."""
+    present = (table["bars"][:, column] > 0) & complete
+    high_swept = table["high_swept"][:, column]
+    low_swept = table["low_swept"][:, column]
+    breakout = table["breakout"][:, column]
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        range_percent = (table["high"][:, column] - table["low"][:, column]) / table["open"][:, column] * 100
+
+    return {
+        "days": int(present.sum()),
+        "avg_range_percent": round(float(range_percent[present].mean()), 3) if present.any() else 0.0,
+        "high_sweep_rate": _rate(high_swept, present),
+        "low_sweep_rate": _rate(low_swept, present),
+        "any_sweep_rate": _rate(high_swept | low_swept, present),
+        "both_sweep_rate": _rate(high_swept & low_swept, present),
+        "breakout_up_rate": _rate(breakout == BREAKOUT_UP, present),
+        "breakout_down_rate": _rate(breakout == BREAKOUT_DOWN, present),
+        "false_breakout_rate": _rate((high_swept | low_swept) & (breakout == 0), present),
+        "bullish_rate": _rate(table["close"][:, column] > table["open"][:, column], present)
+    }
+
+
+def _behavior_checks(table: Dict, complete: np.ndarray, stats: Dict) -> Dict:
+    """
+    KILLZONE_BEHAVIORS'daki davranış iddialarının geçmiş karşılıkları.
+    """
+    col = {s: i for i, s in enumerate(SESSIONS)}
+    o, h, l, c, bars = table["open"], table["high"], table["low"], table["close"], table["bars"]
+    has = lambda s: (bars[:, col[s]] > 0) & complete
+
+    checks = {}
+
+    # ASIAN: range oluşumu → diğer seanslardan dar range
+    others = [stats[s]["avg_range_percent"] for s in ("LONDON", "NEW_YORK") if stats[s]["days"]]
+    ratio = stats["ASIAN"]["avg_range_percent"] / np.mean(others) if others and np.mean(others) > 0 else None
+    checks["ASIAN"] = {
+        "claim": KILLZONE_BEHAVIORS["ASIAN"]["primary_behavior"],
+        "range_vs_london_ny": round(float(ratio), 2) if ratio is not None else None,
+        "supported": bool(ratio is not None and ratio < 1)
+    }
+
+    # LONDON: Asian range sweep (Judas Swing) ve ters yöne dönüş
+    a, lo = col["ASIAN"], col["LONDON"]
+    base = has("ASIAN") & has("LONDON")
+    with np.errstate(invalid='ignore'):
+        sweep_high = h[:, lo] > h[:, a]
+        sweep_low = l[:, lo] < l[:, a]
+        judas = (sweep_high & (table["day_close"] < o[:, lo])) | (sweep_low & (table["day_close"] > o[:, lo]))
+    sweep_rate = _rate(sweep_high | sweep_low, base)
+    checks["LONDON"] = {
+        "claim": KILLZONE_BEHAVIORS["LONDON"]["primary_behavior"],
+        "asian_sweep_rate": sweep_rate,
+        "judas_swing_rate": _rate(judas, base & (sweep_high | sweep_low)),
+        "supported": sweep_rate > 50
+    }
+
+    # NEW_YORK: London yönüne devam mı, dönüş mü
+    ny = col["NEW_YORK"]
+    base = has("LONDON") & has("NEW_YORK")
+    with np.errstate(invalid='ignore'):
+        london_dir = np.sign(c[:, lo] - o[:, lo])
+        ny_dir = np.sign(c[:, ny] - o[:, ny])
+    base = base & (london_dir != 0) & (ny_dir != 0)
+    continuation_rate = _rate(ny_dir == london_dir, base)
+    reversal_rate = _rate(ny_dir == -london_dir, base)
+    checks["NEW_YORK"] = {
+        "claim": KILLZONE_BEHAVIORS["NEW_YORK"]["primary_behavior"],
+        "continuation_rate": continuation_rate,
+        "reversal_rate": reversal_rate,
+        "dominant": "CONTINUATION" if continuation_rate >= reversal_rate else "REVERSAL",
+        "supported": bool(base.any())
+    }
+
+    # LONDON_CLOSE: günün hareketine ters kapanış
+    lc = col["LONDON_CLOSE"]
+    base = has("LONDON_CLOSE")
+    with np.errstate(invalid='ignore'):
+        day_dir = np.sign(o[:, lc] - table["day_open"])
+        lc_dir = np.sign(c[:, lc] - o[:, lc])
+    base = base & (day_dir != 0) & (lc_dir != 0)
+    reversal_rate = _rate(lc_dir == -day_dir, base)
+    checks["LONDON_CLOSE"] = {
+        "claim": KILLZONE_BEHAVIORS["LONDON_CLOSE"]["primary_behavior"],
+        "reversal_rate": reversal_rate,
+        "supported": reversal_rate > 50
+    }
+
+    return checks
+
+
+def _recent_rows(table: Dict, count: int = RECENT_DAYS) -> List[Dict]:
+    """Tablonun son günleri (JSON için)."""
+    rows = []
+    for d in range(max(0, len(table["days"]) - count), len(table["days"])):
+        sessions = {}
+        for z, session in enumerate(SESSIONS):
+            if table["bars"][d, z] == 0:
+                continue
+            sessions[session] = {
+                "open": round(float(table["open"][d, z]), 2),
+                "high": round(float(table["high"][d, z]), 2),
+                "low": round(float(table["low"][d, z]), 2),
+                "close": round(float(table["close"][d, z]), 2),
+                "high_swept": bool(table["high_swept"][d, z]),
+                "low_swept": bool(table["low_swept"][d, z]),
+                "breakout": int(table["breakout"][d, z])
+            }
+        rows.append({"date": str(table["days"][d]), "sessions": sessions})
+    return rows
+
+
+def killzone_analytics(candles: List[Dict], dst: bool = False) -> Dict:
+    """
+    Seans bazında geçmiş sweep / breakout oranları.
+
+    Son (devam eden) işlem günü oranlara katılmaz.
+
+    Returns:
+    --------
+    Dict : sessions (seans istatistikleri), behaviors (iddia kontrolleri),
+           recent_days (son günlerin tablosu)
+    """
+    if not candles:
+        return {"error": "Veri yok"}
+
+    started = time.perf_counter()
+    table = session_range_table(candles, dst=dst)
+
+    complete = np.ones(len(table["days"]), dtype=bool)
+    complete[-1:] = False
+
+    stats = {session: _session_stats(table, z, complete) for z, session in enumerate(SESSIONS)}
+    behaviors = _behavior_checks(table, complete, stats)
+    elapsed = time.perf_counter() - started
+
+    return {
+        "trading_days": int(complete.sum()),
+        "bars": len(candles),
+        "dst": dst,
+        "sessions": stats,
+        "behaviors": behaviors,
+        "recent_days": _recent_rows(table),
+        "elapsed_ms": round(elapsed * 1000, 2)
+    }
+
+
+# Test
+if __name__ == "__main__":
+    import random
+    from datetime import datetime, timedelta
+
+    start = datetime(2025, 1, 1)
+    test_candles = []
+    price = 100
+    for i in range(24 * 180):
+        change = random.uniform(-1, 1)
+        test_candles.append({
+            'timestamp': (start + timedelta(hours=i)).strftime("%Y-%m-%d %H:%M"),
+            'open': round(price, 2),
+            'high': round(max(price, price + change) + random.uniform(0, 0.5), 2),
+            'low': round(min(price, price + change) - random.uniform(0, 0.5), 2),
+            'close': round(price + change, 2)
+        })
+        price = max(10, price + change)
+
+    result = killzone_analytics(test_candles)
+
+    print("=" * 50)
+    print("  KILL ZONE ANALYTICS")
+    print("=" * 50)
+    print(f"  {result['trading_days']} gün, {result['bars']} mum: {result['elapsed_ms']} ms")
+    for session, s in result['sessions'].items():
+        print(f"  {session}: range %{s['avg_range_percent']}, sweep %{s['any_sweep_rate']}, "
+              f"breakout ↑%{s['breakout_up_rate']} ↓%{s['breakout_down_rate']}")
+    for session, check in result['behaviors'].items():
+        print(f"  {session} ({check['claim']}): {'✅' if check['supported'] else '❌'}")
@@ -0,0 +1,347 @@
+# ============================================
+# TRADE STATS - Tek Geçişli İstatistik Biriktirici
+# ============================================
+# _calculate_statistics her trade'i dict olarak tutup liste üzerinden
+# ~6 kez geçiyordu (win/loss filtreleri, kümülatif PnL, drawdown,
+# seriler, long/short ayrımı).
+#
+# TradeStatsAccumulator her trade'de tüm sayaçları tek seferde günceller
+# (toplamlar, zirve/drawdown, seriler, yön bazında sayımlar). Trade'ler
+# dict yerine kompakt bir NumPy structured array'de saklanır.
+# Çıktı _calculate_statistics ile birebir aynıdır.
+
+from collections import deque
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import numpy as np
+
+# Trade kaydı (~47 byte, dict yerine)
+TRADE_DTYPE = np.dtype([
+    ('timestamp', 'S19'),
+    ('direction', 'i1'),        # 1 = LONG, -1 = SHORT
+    ('entry_price', 'f8'),
+    ('exit_price', 'f8'),
+    ('win', '?'),
+    ('pnl_percent', 'f8'),
+    ('signal_strength', 'i2')
+])
+
+# recent_trades için saklanan son trade sayısı
+RECENT_TRADES = 10
+
+DIRECTION_CODES = {'LONG': 1, 'SHORT': -1}
+DIRECTION_NAMES = {1: 'LONG', -1: 'SHORT'}
+
+
+class TradeStatsAccumulator:
+    """
+    Trade'leri tek tek alıp istatistikleri sürekli güncel tutar.
+
+    Kullanım:
+        acc = TradeStatsAccumulator()
+        for trade in trades:
+            acc.add_trade(trade)
+        stats = acc.statistics()   # _calculate_statistics(trades) ile aynı
+    """
+
+    def __init__(self, keep_records: bool = True, capacity: int = 1024):
+        """
+        keep_records : Trade'leri structured array'de sakla (False ise sadece sayaçlar)
+        capacity : Başlangıç kapasitesi (dolunca ikiye katlanır)
+        """
+        self.keep_records = keep_records
+        self._records = np.empty(capacity if keep_records else 0, dtype=TRADE_DTYPE)
+        self._recent = deque(maxlen=RECENT_TRADES)
+
+        self.total = 0
+        self.wins = 0
+
+        # Python sum() ile aynı başlangıç (int 0) → aynı çıktı tipleri
+        self.profit_sum = 0
+        self.loss_sum = 0
+        self.running_total = 0
+
+        self.peak = None
+        self.max_drawdown = 0
+
+        self.current_wins = 0
+        self.current_losses = 0
+        self.max_consecutive_wins = 0
+        self.max_consecutive_losses = 0
+
+        self.long_count = 0
+        self.long_wins = 0
+        self.short_count = 0
+        self.short_wins = 0
+
+    # ----------------------------------------
+    # GÜNCELLEME
+    # ----------------------------------------
+
+    def add(self, direction: int, win: bool, pnl_percent: float,
+            timestamp: str = "", entry_price: float = 0.0, exit_price: float = 0.0,
+            signal_strength: int = 0, trade: Optional[Dict] = None) -> None:
+        """
+        Tek trade ekler. Tüm sayaçlar O(1) güncellenir.
+
+        trade verilirse recent_trades'te orijinal dict döndürülür.
+        """
+        self.total += 1
+
+        if win:
+            self.wins += 1
+            self.profit_sum += pnl_percent
+            self.current_wins += 1
+            self.current_losses = 0
+            if self.current_wins > self.max_consecutive_wins:
+                self.max_consecutive_wins = self.current_wins
+        else:
+            self.loss_sum += pnl_percent
+            self.current_losses += 1
+            self.current_wins = 0
+            if self.current_losses > self.max_consecutive_losses:
+                self.max_consecutive_losses = self.current_losses
+
+        # Kümülatif PnL ve drawdown
+        self.running_total += pnl_percent
+        if self.peak is None or self.running_total > self.peak:
+            self.peak = self.running_total
+        drawdown = self.peak - self.running_total
+        if drawdown > self.max_drawdown:
+            self.max_drawdown = drawdown
+
+        # Long / Short
+        if direction == 1:
+            self.long_count += 1
+            self.long_wins += win
+        else:
+            self.short_count += 1
+            self.short_wins += win
+
+        if self.keep_records:
+            if self.total > self._records.size:
+                grown = np.empty(max(1, self._records.size * 2), dtype=TRADE_DTYPE)
+                grown[:self._records.size] = self._records
+                self._records = grown
+            self._records[self.total - 1] = (
+                timestamp.encode(), direction, entry_price, exit_price, win, pnl_percent, signal_strength
+            )
+
+        if trade is not None:
+            self._recent.append(trade)
+        else:
+            self._recent.append((timestamp, direction, entry_price, exit_price, win, pnl_percent, signal_strength))
+
+    def add_trade(self, trade: Dict) -> None:
+        """
+        Backtester trade dict'i ekler.
+        """
+        self.add(
+            DIRECTION_CODES[trade['direction']],
+            trade['result'] == 'WIN',
+            trade['pnl_percent'],
+            timestamp=str(trade.get('timestamp', '')),
+            entry_price=trade.get('entry_price', 0.0),
+            exit_price=trade.get('exit_price', 0.0),
+            signal_strength=trade.get('signal_strength', 0),
+            trade=trade
+        )
+
+    def extend(self, directions: np.ndarray, wins: np.ndarray, pnl_percent: np.ndarray,
+               timestamps=None, entry_prices=None, exit_prices=None, signal_strengths=None) -> None:
+        """
+        Trade dizilerini tek seferde ekler (vektörel simülasyonlar için).
+
+        add() ile tek tek eklemekle birebir aynı sonucu verir:
+        np.cumsum soldan sağa topladığı için toplamlar da aynıdır.
+        """
+        directions = np.asarray(directions, dtype=np.int8)
+        wins = np.asarray(wins, dtype=bool)
+        pnl = np.asarray(pnl_percent, dtype=np.float64)
+        n = int(pnl.size)
+        if n == 0:
+            return
+
+        # Toplamlar (mevcut değerden devam ederek, sıralı)
+        cumulative = np.cumsum(np.concatenate(([self.running_total], pnl)))[1:]
+        self.profit_sum = float(np.cumsum(np.concatenate(([self.profit_sum], pnl[wins])))[-1]) if wins.any() else self.profit_sum
+        self.loss_sum = float(np.cumsum(np.concatenate(([self.loss_sum], pnl[~wins])))[-1]) if not wins.all() else self.loss_sum
+
+        # Zirve ve drawdown
+        start_peak = cumulative[0] if self.peak is None else self.peak
+        peaks = np.maximum.accumulate(np.concatenate(([start_peak], cumulative)))[1:]
+        self.peak = float(peaks[-1])
+        self.max_drawdown = max(self.max_drawdown, float((peaks - cumulative).max()))
+        self.running_total = float(cumulative[-1])
+
+        # Seriler: son sıfırlamadan bu yana geçen trade sayısı
+        index = np.arange(n)
+        for flags, current, best in ((wins, 'current_wins', 'max_consecutive_wins'),
+                                     (~wins, 'current_losses', 'max_consecutive_losses')):
+            last_reset = np.maximum.accumulate(np.where(flags, -1, index))
+            streak = np.where(last_reset < 0, index + 1 + getattr(self, current), index - last_reset)
+            streak[~flags] = 0
+            setattr(self, best, max(getattr(self, best), int(streak.max())))
+            setattr(self, current, int(streak[-1]))
+
+        # Sayımlar
+        longs = directions == 1
+        self.total += n
+        self.wins += int(wins.sum())
+        self.long_count += int(longs.sum())
+        self.long_wins += int((wins & longs).sum())
+        self.short_count += int(n - longs.sum())
+        self.short_wins += int((wins & ~longs).sum())
+
+        def column(values, default):
+            return np.full(n, default) if values is None else np.asarray(values)
+
+        timestamps = column(timestamps, "")
+        entry_prices = column(entry_prices, 0.0)
+        exit_prices = column(exit_prices, 0.0)
+        signal_strengths = column(signal_strengths, 0)
+
+        if self.keep_records:
+            stored = self.total - n
+            if self.total > self._records.size:
+                grown = np.empty(max(self.total, self._records.size * 2), dtype=TRADE_DTYPE)
+                grown[:stored] = self._records[:stored]
+                self._records = grown
+            block = self._records[stored:self.total]
+            block['timestamp'] = timestamps.astype('S19')
+            block['direction'] = directions
+            block['entry_price'] = entry_prices
+            block['exit_price'] = exit_prices
+            block['win'] = wins
+            block['pnl_percent'] = pnl
+            block['signal_strength'] = signal_strengths
+
+        for i in range(max(0, n - RECENT_TRADES), n):
+            self._recent.append((
+                str(timestamps[i]), int(directions[i]), float(entry_prices[i]), float(exit_prices[i]),
+                bool(wins[i]), float(pnl[i]), int(signal_strengths[i])
+            ))
+
+    # ----------------------------------------
+    # OKUMA
+    # ----------------------------------------
+
+    @property
+    def records(self) -> np.ndarray:
+        """
+        Eklenen trade'ler (structured array görünümü, kopya değil).
+        """
+        return self._records[:self.total]
+
+    def recent_trades(self) -> List[Dict]:
+        """
+        Son 10 trade (dict olarak).
+        """
+        trades = []
+        for item in self._recent:
+            if isinstance(item, dict):
+                trades.append(item)
+                continue
+            timestamp, direction, entry_price, exit_price, win, pnl_percent, signal_strength = item
+            trades.append({
+                'timestamp': timestamp,
+                'direction': DIRECTION_NAMES[direction],
+                'entry_price': entry_price,
+                'exit_price': exit_price,
+                'result': 'WIN' if win else 'LOSS',
+                'pnl_percent': pnl_percent,
+                'signal_strength': signal_strength
+            })
+        return trades
+
+    def statistics(self) -> Dict:
+        """
+        Güncel istatistikler (_calculate_statistics ile aynı yapı).
+        """
+        if self.total == 0:
+            return {
+                "error": "Trade bulunamadı",
+                "total_trades": 0
+            }
+
+        total_trades = self.total
+        win_count = self.wins
+        loss_count = total_trades - win_count
+
+        # Win Rate - EN ÖNEMLİ METRİK
+        win_rate = (win_count / total_trades) * 100
+
+        # PnL hesaplamaları
+        total_profit = self.profit_sum
+        total_loss = abs(self.loss_sum)
+        net_pnl = self.running_total
+
+        profit_factor = total_profit / total_loss if total_loss > 0 else 0
+
+        avg_win = total_profit / win_count if win_count > 0 else 0
+        avg_loss = total_loss / loss_count if loss_count > 0 else 0
+
+        risk_reward = avg_win / avg_loss if avg_loss > 0 else 0
+
+        expectancy = (win_rate/100 * avg_win) - ((100-win_rate)/100 * avg_loss)
+
+        long_win_rate = (self.long_wins / self.long_count * 100) if self.long_count else 0
+        short_win_rate = (self.short_wins / self.short_count * 100) if self.short_count else 0
+
+        return {
+            "success": True,
+            "generated_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+
+            # Ana Metrikler
+            "total_trades": total_trades,
+            "winning_trades": win_count,
+            "losing_trades": loss_count,
+
+            # EN ÖNEMLİ: GERÇEK WIN RATE
+            "win_rate": round(win_rate, 1),
+
+            # Karlılık
+            "profit_factor": round(profit_factor, 2),
+            "net_pnl_percent": round(net_pnl, 2),
+            "expectancy": round(expectancy, 3),
+
+            # Ortalamalar
+            "avg_win_percent": round(avg_win, 2),
+            "avg_loss_percent": round(avg_loss, 2),
+            "risk_reward_ratio": round(risk_reward, 2),
+
+            # Risk
+            "max_drawdown_percent": round(self.max_drawdown, 2),
+            "max_consecutive_wins": self.max_consecutive_wins,
+            "max_consecutive_losses": self.max_consecutive_losses,
+
+            # Long vs Short
+            "long_trades": self.long_count,
+            "short_trades": self.short_count,
+            "long_win_rate": round(long_win_rate, 1),
+            "short_win_rate": round(short_win_rate, 1),
+
+            # Son 10 trade
+            "recent_trades": self.recent_trades()
+        }
+
+
+# Test
+if __name__ == "__main__":
+    import time
+
+    rng = np.random.default_rng(42)
+    n = 1_000_000
+    test_pnl = np.round(rng.choice([-1.0, 1.5, 0.4, -0.3], size=n), 2)
+    test_wins = test_pnl > 0
+    test_directions = np.where(rng.random(n) < 0.5, 1, -1)
+
+    started = time.perf_counter()
+    acc = TradeStatsAccumulator()
+    acc.extend(test_directions, test_wins, test_pnl)
+    stats = acc.statistics()
+
+    print(f"1M trade (extend): {time.perf_counter() - started:.2f}s")
+    print(f"Win rate: %{stats['win_rate']}, PF: {stats['profit_factor']}, DD: %{stats['max_drawdown_percent']}")
+    print(f"Kayıt boyutu: {acc.records.nbytes / 1e6:.1f} MB")
@@ -0,0 +1,265 @@
+# ============================================
+# WALK-FORWARD BACKTEST - Kayan Train/Test Fold'ları
+# ============================================
+# Uzun geçmişi kayan train/test pencerelerine böler.
+# Her fold'da parametre (lookback) SADECE train verisinde seçilir,
+# sonra görülmemiş test verisinde ölçülür. Fold'lar paralel
+# process'lerde çalışır.
+#
+# Güvendiğimiz win rate: test fold'larının birleşik sonucu.
+
+import os
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from .backtester import _simulate_trades, _calculate_statistics
+
+# Train'de denenecek lookback değerleri
+DEFAULT_LOOKBACK_GRID = (3, 5, 8, 13)
+
+# Trade'in çıkışı için gereken ileri mum sayısı (backtester ile aynı)
+EXIT_BARS = 3
+
+
+def build_folds(total_bars: int, train_size: int, test_size: int, step: int = None) -> List[Dict]:
+    """
+    Kayan train/test fold sınırlarını üretir.
+
+    Örnek (train=4, test=2, step=2):
+        fold 0: train [0, 4)  test [4, 6)
+        fold 1: train [2, 6)  test [6, 8)
+    """
+    step = step or test_size
+    folds = []
+
+    start = 0
+    while start + train_size + test_size <= total_bars:
+        folds.append({
+            "fold": len(folds),
+            "train_start": start,
+            "train_end": start + train_size,
+            "test_start": start + train_size,
+            "test_end": start + train_size + test_size
+        })
+        start += step
+
+    return folds
+
+
+def _run_fold(args) -> Dict:
+    """
+    Tek bir fold'u çalıştırır (process worker'da).
+
+    args: (fold, train_candles, test_source, test_offset, lookback_grid, min_train_trades)
+    test_source[test_offset] test penceresinin ilk mumudur.
+    """
+    fold, train_candles, test_source, test_offset, lookback_grid, min_train_trades = args
+    fold_start = time.perf_counter()
+
+    # 1. TRAIN: En iyi lookback'i seç (expectancy'ye göre)
+    best = None
+    for lookback in lookback_grid:
+        trades = _simulate_trades(train_candles, lookback)
+        if len(trades) < min_train_trades:
+            continue
+        stats = _calculate_statistics(trades)
+        if best is None or stats['expectancy'] > best['stats']['expectancy']:
+            best = {"lookback": lookback, "stats": stats}
+
+    train_seconds = time.perf_counter() - fold_start
+
+    if best is None:
+        return {
+            **fold,
+            "error": "Train verisinde yeterli trade yok",
+            "trades": [],
+            "timing": {"train_seconds": round(train_seconds, 4), "test_seconds": 0, "total_seconds": round(train_seconds, 4)}
+        }
+
+    # 2. TEST: Seçilen lookback ile görülmemiş veride ölç
+    # Test penceresinin başına lookback kadar ısınma mumu eklenir,
+    # sonuna da çıkış için EXIT_BARS mum (varsa).
+    test_start = time.perf_counter()
+    lookback = best["lookback"]
+    test_candles = test_source[max(0, test_offset - lookback):]
+    test_trades = _simulate_trades(test_candles, lookback) if len(test_candles) > lookback + EXIT_BARS else []
+    test_stats = _calculate_statistics(test_trades)
+    test_seconds = time.perf_counter() - test_start
+
+    return {
+        **fold,
+        "lookback": lookback,
+        "train": {
+            "win_rate": best["stats"]["win_rate"],
+            "expectancy": best["stats"]["expectancy"],
+            "total_trades": best["stats"]["total_trades"]
+        },
+        "test": {
+            "win_rate": test_stats.get("win_rate", 0),
+            "expectancy": test_stats.get("expectancy", 0),
+            "profit_factor": test_stats.get("profit_factor", 0),
+            "net_pnl_percent": test_stats.get("net_pnl_percent", 0),
+            "total_trades": test_stats.get("total_trades", 0)
+        },
+        "trades": test_trades,
+        "timing": {
+            "train_seconds": round(train_seconds, 4),
+            "test_seconds": round(test_seconds, 4),
+            "total_seconds": round(time.perf_counter() - fold_start, 4)
+        }
+    }
+
+
+def walk_forward_backtest(
+    candles: List[Dict],
+    train_size: int = 336,
+    test_size: int = 72,
+    step: int = None,
+    lookback_grid: tuple = DEFAULT_LOOKBACK_GRID,
+    min_train_trades: int = 20,
+    workers: int = None,
+    progress_callback: Optional[Callable[[float, str], None]] = None
+) -> Dict:
+    """
+    Walk-forward backtest yapar.
+
+    Parameters:
+    -----------
+    candles : List[Dict]
+        Uzun geçmiş mum verisi (aylar)
+    train_size : int
+        Train penceresi (mum sayısı, 1h için 336 = 2 hafta)
+    test_size : int
+        Test penceresi (mum sayısı, 1h için 72 = 3 gün)
+    step : int
+        Fold'lar arası kayma (varsayılan: test_size → testler örtüşmez)
+    lookback_grid : tuple
+        Train'de denenecek lookback değerleri
+    workers : int
+        Paralel process sayısı (1 = aynı process'te çalış; en fazla CPU sayısı)
+    progress_callback : Callable
+        Her fold bittiğinde progress_callback(oran, mesaj) çağrılır
+
+    Returns:
+    --------
+    Dict : Fold bazında ve birleşik istatistikler + zamanlamalar
+    """
+    folds = build_folds(len(candles), train_size, test_size, step)
+
+    if not folds:
+        return {
+            "error": "Yetersiz veri",
+            "min_required": train_size + test_size,
+            "available": len(candles)
+        }
+
+    max_lookback = max(lookback_grid)
+    jobs = []
+    for fold in folds:
+        train_candles = candles[fold["train_start"]:fold["train_end"]]
+        # Test kaynağı: ısınma + test + çıkış mumları
+        source_start = max(0, fold["test_start"] - max_lookback)
+        test_source = candles[source_start:fold["test_end"] + EXIT_BARS]
+        test_offset = fold["test_start"] - source_start
+        jobs.append((fold, train_candles, test_source, test_offset, lookback_grid, min_train_trades))
+
+    # İstemciden gelen değer CPU ve fold sayısıyla sınırlanır
+    workers = max(1, min(workers or len(jobs), len(jobs), os.cpu_count() or 1))
+    started = time.perf_counter()
+    results = []
+
+    if workers <= 1 or len(jobs) == 1:
+        for job in jobs:
+            results.append(_run_fold(job))
+            if progress_callback:
+                progress_callback(len(results) / len(jobs), f"Fold {len(results)}/{len(jobs)} tamamlandı")
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for result in executor.map(_run_fold, jobs):
+                results.append(result)
+                if progress_callback:
+                    progress_callback(len(results) / len(jobs), f"Fold {len(results)}/{len(jobs)} tamamlandı")
+
+    wall_seconds = time.perf_counter() - started
+
+    # Birleşik (out-of-sample) istatistikler
+    all_trades = [t for r in results for t in r["trades"]]
+    aggregate = _calculate_statistics(all_trades)
+    aggregate.pop("generated_at", None)
+
+    valid = [r for r in results if "test" in r and r["test"]["total_trades"] > 0]
+    fold_win_rates = [r["test"]["win_rate"] for r in valid]
+    fold_seconds = sum(r["timing"]["total_seconds"] for r in results)
+
+    fold_reports = []
+    for r in results:
+        report = {k: v for k, v in r.items() if k != "trades"}
+        report["train_period"] = f"{candles[r['train_start']]['timestamp']} → {candles[r['train_end'] - 1]['timestamp']}"
+        report["test_period"] = f"{candles[r['test_start']]['timestamp']} → {candles[r['test_end'] - 1]['timestamp']}"
+        fold_reports.append(report)
+
+    return {
+        "success": True,
+        "generated_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "config": {
+            "total_bars": len(candles),
+            "train_size": train_size,
+            "test_size": test_size,
+            "step": step or test_size,
+            "lookback_grid": list(lookback_grid),
+            "workers": workers
+        },
+        "total_folds": len(folds),
+
+        # Görülmemiş veride birleşik sonuç (GÜVENİLEN win rate)
+        "aggregate": aggregate,
+
+        # Fold'lar arası tutarlılık
+        "fold_summary": {
+            "folds_with_trades": len(valid),
+            "profitable_folds": sum(1 for r in valid if r["test"]["net_pnl_percent"] > 0),
+            "mean_win_rate": round(statistics.mean(fold_win_rates), 1) if fold_win_rates else 0,
+            "stdev_win_rate": round(statistics.stdev(fold_win_rates), 1) if len(fold_win_rates) > 1 else 0,
+            "min_win_rate": min(fold_win_rates) if fold_win_rates else 0,
+            "max_win_rate": max(fold_win_rates) if fold_win_rates else 0
+        },
+
+        "folds": fold_reports,
+
+        "timing": {
+            "wall_seconds": round(wall_seconds, 3),
+            "fold_seconds_total": round(fold_seconds, 3),
+            "parallel_speedup": round(fold_seconds / wall_seconds, 2) if wall_seconds > 0 else 0
+        }
+    }
+
+
+# Test
+if __name__ == "__main__":
+    import random
+
+    test_candles = []
+    price = 100
+    for i in range(2000):
+        change = random.uniform(-1, 1)
+        test_candles.append({
+            'timestamp': f'bar-{i}',
+            'open': round(price, 2),
+            'high': round(max(price, price + change) + random.uniform(0, 0.5), 2),
+            'low': round(min(price, price + change) - random.uniform(0, 0.5), 2),
+            'close': round(price + change, 2)
+        })
+        price += change
+
+    result = walk_forward_backtest(test_candles, train_size=336, test_size=168)
+
+    print("=" * 50)
+    print("  WALK-FORWARD SONUÇLARI")
+    print("=" * 50)
+    print(f"Fold: {result['total_folds']}")
+    print(f"OOS Win Rate: %{result['aggregate'].get('win_rate')}")
+    print(f"Fold win rate: %{result['fold_summary']['mean_win_rate']} ± {result['fold_summary']['stdev_win_rate']}")
+    print(f"Süre: {result['timing']['wall_seconds']}s (speedup {result['timing']['parallel_speedup']}x)")
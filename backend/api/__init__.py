@@ -0,0 +1,4 @@
+# API modülü
+from .http_cache import make_etag, seconds_until_next_bar, not_modified
+from .executor import analysis_executor, AnalysisExecutor
+from .jobs import job_manager, JobManager
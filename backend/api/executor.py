@@ -0,0 +1,353 @@
+# ============================================
+# ANALYSIS EXECUTOR - Analizler İçin Process Havuzu
+# ============================================
+# backtest_strategy, find_all_zones, get_ict_analysis gibi CPU ağır
+# çağrılar event loop'u (async) veya GIL'i (sync thread'ler) tıkar.
+# Bu modül analizleri ayrı process'lerde çalıştırır:
+#
+# - Her worker tek process'lik bir havuzdur; sembol her zaman aynı
+#   worker'a gider (sembol affinity). Böylece worker'daki analiz cache'i
+#   (analysis_cache) ve canlı backtest durumu (incremental_backtest)
+#   o sembol için sıcak kalır.
+# - Worker'lar analiz modüllerini başlangıçta import eder (ısınma).
+# - Çöken worker yeniden başlatılır ve iş bir kez tekrar denenir.
+# - ANALYSIS_WORKERS=0 ise işler thread havuzunda çalışır (eski davranış).
+# - snapshot(): sonuç host genelinde paylaşılır (data/shared_cache);
+#   N uvicorn worker'ı aynı mumları bir kez analiz eder. Snapshot'lanan
+#   görevler sadece mumlara bağlı kısmı döndürür; kill zone durumu ve
+#   aktif strateji with_live_fields ile her istekte taze eklenir.
+#
+# Böylece uzun bir backtest /sessions veya /pairs cevabını bekletmez.
+
+import asyncio
+import multiprocessing
+import os
+import threading
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+from typing import Callable, Dict, List, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+from analysis.analysis_cache import (
+    cached_ict_structure, cached_zones, cached_trade_signal, cached_backtest,
+    cached_asian_range, get_cache_stats, candle_fingerprint, _freeze
+)
+from analysis.ict_concepts import ICT_KILL_ZONES
+from analysis.killzone_strategy import get_active_killzone_strategy, KILLZONE_BEHAVIORS
+from analysis.backtester import backtest_strategy, get_confidence_interval
+from analysis.exit_resolver import IntrabarExitResolver
+from analysis.incremental_backtest import get_live_backtest
+from data.crypto_fetcher import get_crypto_candles
+from data.candle_archive import candle_archive
+from decision.probability_series import backtest_probability_bars
+from data.shared_cache import shared_cache, cache_key, ANALYSIS_TTL_SECONDS
+
+# Worker sayısı (0 = process havuzu yok, thread havuzu kullanılır)
+DEFAULT_WORKERS = int(os.environ.get("ANALYSIS_WORKERS", min(4, os.cpu_count() or 1)))
+
+
+# ============================================
+# WORKER TARAFI GÖREVLER
+# ============================================
+# Bir endpoint'in birbirine bağlı analizleri tek görevde çalışır:
+# mumlar worker'a bir kez gider, ara sonuçlar process'te kalır.
+
+def _warm_worker():
+    """Worker başlangıcı: modüller import edildi, cache'ler boş."""
+    return os.getpid()
+
+
+def _signal_input(structure: Dict, zone_id: Optional[str]) -> Dict:
+    """
+    Sinyalin gördüğü ICT analizi. Saat ana process'te okunur; worker'a
+    sadece aktif zone id'si gelir (snapshot anahtarının parçası).
+    """
+    active_zone = {"id": zone_id, **ICT_KILL_ZONES[zone_id]} if zone_id else None
+    return {"kill_zones": {"active_zone": active_zone}, **structure}
+
+
+def signal_task(candles: List[Dict], symbol: str = "BTC", zone_id: str = None) -> Dict:
+    """ICT yapısı + trade sinyali (zone_id: aktif kill zone)."""
+    ict = cached_ict_structure(candles, symbol)
+    return {"ict": ict, "signal": cached_trade_signal(candles, _signal_input(ict, zone_id), symbol)}
+
+
+def report_task(candles: List[Dict], symbol: str = "BTC", bootstrap: bool = False, zones: bool = False,
+                provider: str = None, zone_id: str = None) -> Dict:
+    """
+    Tam rapor analizleri: ICT, sinyal, canlı backtest (güven oranı),
+    kill zone stratejisi ve istenirse supply/demand zone'ları.
+    provider: mumların kaynağı (canlı backtest durumu kaynak başına tutulur)
+    zone_id: aktif kill zone (saate bağlı alanları with_live_fields ekler)
+    """
+    ict = cached_ict_structure(candles, symbol)
+    signal = cached_trade_signal(candles, _signal_input(ict, zone_id), symbol)
+
+    # Canlı backtest sadece yeni/değişen mumları işler (durum bu worker'da)
+    live_backtest = get_live_backtest(symbol, "1h", len(candles), provider).sync(candles)
+    backtest = live_backtest.statistics(bootstrap=bootstrap)
+
+    direction = signal.get('direction', 'WAIT')
+    if backtest.get('success'):
+        signal['confidence'] = live_backtest.confidence(direction)
+        signal['confidence_source'] = 'BACKTEST'
+        if bootstrap:
+            signal['backtest_trades'] = backtest.get('total_trades', 0)
+            signal['confidence_interval'] = get_confidence_interval(backtest, direction)
+    elif bootstrap:
+        signal['confidence_source'] = 'ESTIMATED'
+
+    result = {
+        "ict": ict,
+        "signal": signal,
+        "backtest": backtest,
+        "killzone": {"asian_range": cached_asian_range(candles, symbol)}
+    }
+    if zones:
+        result["zones"] = cached_zones(candles, symbol)
+
+    return result
+
+
+def backtest_task(candles: List[Dict], symbol: str = "BTC", hours: int = 72, intrabar: bool = False) -> Dict:
+    """
+    /backtest görevi. intrabar=True ise belirsiz trade'ler için 5m mumlar
+    worker içinden (sadece gerekirse) çekilir.
+    """
+    if intrabar:
+        # 1h mum başına 12 adet 5m mum (+ çıkış penceresi)
+        resolver = IntrabarExitResolver(
+            lambda: get_crypto_candles(symbol, hours=(hours + 3) * 12, interval="5m").get('candles', []),
+            bar_minutes=60
+        )
+        return backtest_strategy(candles, min_trades=50, bootstrap=True, exit_resolver=resolver)
+
+    return cached_backtest(candles, symbol, min_trades=50, bootstrap=True)
+
+
+def archive_backtest_task(symbol: str, interval: str, start=None, end=None, **params) -> Dict:
+    """
+    Arşivdeki [start, end) aralığında olasılık backtest'i. Mumlar worker'a
+    gönderilmez: worker arşivi kendisi memmap'ler (sayfalar process'ler
+    arasında paylaşılır).
+    """
+    bars = candle_archive.range(symbol, interval, start, end)
+    return backtest_probability_bars(bars, **params)
+
+
+# ============================================
+# SAATE BAĞLI ALANLAR (ana process)
+# ============================================
+# snapshot sonuçları 60 sn paylaşılır; kill zone durumu ve aktif strateji
+# cache'lenmez, snapshot'tan sonra eklenir.
+
+def active_zone_id(kill_zones: Dict) -> Optional[str]:
+    """get_all_kill_zones_status sonucundaki aktif zone'un id'si."""
+    active_zone = kill_zones.get('active_zone')
+    return active_zone.get('id') if active_zone else None
+
+
+def live_killzone(asian_range: Dict) -> Dict:
+    """get_full_killzone_analysis çıktısı: saklanan Asian range + taze aktif strateji."""
+    return {
+        "asian_range": asian_range,
+        "active_strategy": get_active_killzone_strategy(),
+        "all_behaviors": KILLZONE_BEHAVIORS
+    }
+
+
+def with_live_fields(report: Dict, kill_zones: Dict) -> Dict:
+    """
+    signal_task / report_task snapshot'ına saate bağlı alanları ekler
+    (ana process'te, her istekte): ICT'ye kill zone durumu, kill zone
+    bölümüne aktif strateji.
+    """
+    report = dict(report)
+    report["ict"] = {"kill_zones": kill_zones, **report["ict"]}
+    if "killzone" in report:
+        report["killzone"] = live_killzone(report["killzone"]["asian_range"])
+    return report
+
+
+# ============================================
+# EXECUTOR
+# ============================================
+
+class AnalysisExecutor:
+    """
+    Sembol affinity'li process havuzu.
+
+    Kullanım:
+        result = await analysis_executor.run("BTC", cached_zones, candles, "BTC")
+    """
+
+    def __init__(self, workers: int = None):
+        self.workers = DEFAULT_WORKERS if workers is None else max(0, workers)
+        self._pools: List[Optional[ProcessPoolExecutor]] = [None] * self.workers
+        self._lock = threading.Lock()
+        self._symbols: Dict[str, int] = {}
+        self._stats = {
+            "submitted": 0, "completed": 0, "failed": 0, "restarts": 0,
+            "by_worker": [0] * self.workers
+        }
+
+    def worker_for(self, symbol: str) -> int:
+        """Sembolün worker'ı (process yeniden başlasa da sabit)."""
+        return zlib.crc32(symbol.upper().encode()) % self.workers
+
+    def _pool(self, index: int) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pools[index] is None:
+                # spawn: sunucunun thread'leri kopyalanmaz (fork + thread kilitlenmesi yok)
+                self._pools[index] = ProcessPoolExecutor(
+                    max_workers=1,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_warm_worker
+                )
+            return self._pools[index]
+
+    def _restart(self, index: int, broken: ProcessPoolExecutor):
+        with self._lock:
+            if self._pools[index] is broken:
+                self._pools[index] = None
+                self._stats["restarts"] += 1
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    async def run(self, symbol: str, fn: Callable, *args, **kwargs):
+        """
+        fn(*args, **kwargs)'u sembolün worker'ında çalıştırır.
+
+        fn modül seviyesinde tanımlı olmalı (pickle edilebilir).
+        """
+        call = partial(fn, *args, **kwargs)
+
+        with self._lock:
+            self._stats["submitted"] += 1
+
+        if not self.workers:
+            try:
+                return await run_in_threadpool(call)
+            finally:
+                with self._lock:
+                    self._stats["completed"] += 1
+
+        index = self.worker_for(symbol)
+        with self._lock:
+            self._symbols[symbol.upper()] = index
+            self._stats["by_worker"][index] += 1
+
+        loop = asyncio.get_running_loop()
+        for attempt in range(2):
+            pool = self._pool(index)
+            try:
+                result = await loop.run_in_executor(pool, call)
+                break
+            except BrokenProcessPool:
+                self._restart(index, pool)
+                if attempt:
+                    with self._lock:
+                        self._stats["failed"] += 1
+                    raise
+            except Exception:
+                with self._lock:
+                    self._stats["failed"] += 1
+                raise
+
+        with self._lock:
+            self._stats["completed"] += 1
+        return result
+
+    async def snapshot(self, symbol: str, fn: Callable, candles: List[Dict], *args,
+                       ttl: float = ANALYSIS_TTL_SECONDS, **kwargs):
+        """
+        run() ile aynı, sonuç host genelinde paylaşılır: anahtar fonksiyon +
+        mum parmak izi + parametreler. Aynı mumlar için diğer uvicorn
+        worker'ları analizi tekrar çalıştırmaz, hesaplanmasını bekler.
+        """
+        key = cache_key(
+            f"analysis:{fn.__name__}",
+            candle_fingerprint(candles, symbol.upper()), _freeze(args), _freeze(kwargs)
+        )
+        return await shared_cache.get_or_compute_async(
+            key, ttl, lambda: self.run(symbol, fn, candles, *args, **kwargs)
+        )
+
+    def start(self):
+        """Worker'ları önceden başlatır (ilk istek import beklemesin)."""
+        for index in range(self.workers):
+            self._pool(index).submit(_warm_worker)
+
+    def shutdown(self, wait: bool = False):
+        """Tüm worker'ları kapatır."""
+        with self._lock:
+            pools, self._pools = self._pools, [None] * self.workers
+        for pool in pools:
+            if pool is not None:
+                pool.shutdown(wait=wait, cancel_futures=True)
+
+    async def worker_cache_stats(self) -> List[Dict]:
+        """Her worker'ın analiz cache metrikleri."""
+        if not self.workers:
+            return [get_cache_stats()]
+
+        loop = asyncio.get_running_loop()
+        return list(await asyncio.gather(*(
+            loop.run_in_executor(self._pool(index), get_cache_stats)
+            for index in range(self.workers)
+        )))
+
+    def stats(self) -> Dict:
+        """Executor metrikleri ve sembol → worker dağılımı."""
+        with self._lock:
+            return {
+                "mode": "process" if self.workers else "thread",
+                "workers": self.workers,
+                "running": sum(pool is not None for pool in self._pools),
+                "submitted": self._stats["submitted"],
+                "completed": self._stats["completed"],
+                "failed": self._stats["failed"],
+                "restarts": self._stats["restarts"],
+                "tasks_by_worker": list(self._stats["by_worker"]),
+                "symbols": dict(self._symbols)
+            }
+
+
+# Uygulama genelinde paylaşılan executor
+analysis_executor = AnalysisExecutor()
+
+
+# Test
+if __name__ == "__main__":
+    import random
+    import time
+
+    test_candles = []
+    price = 100
+    for i in range(72):
+        change = random.uniform(-2, 2)
+        test_candles.append({
+            'timestamp': f'2025-01-{1 + i // 24:02d} {i % 24:02d}:00',
+            'open': round(price, 2),
+            'high': round(max(price, price + change) + random.uniform(0, 1), 2),
+            'low': round(min(price, price + change) - random.uniform(0, 1), 2),
+            'close': round(price + change, 2),
+            'volume': 0
+        })
+        price += change
+
+    async def main():
+        executor = AnalysisExecutor(workers=2)
+        started = time.perf_counter()
+        executor.start()
+        for symbol in ("BTC", "ETH", "BTC"):
+            report = await executor.run(symbol, report_task, test_candles, symbol, zones=True)
+            print(f"{symbol} → worker {executor.worker_for(symbol)}: {report['signal'].get('direction')}")
+        print(f"Süre: {time.perf_counter() - started:.2f} sn")
+        print(f"Worker cache'leri: {[s['hits'] for s in await executor.worker_cache_stats()]} hit")
+        print(executor.stats())
+        executor.shutdown()
+
+    asyncio.run(main())
@@ -0,0 +1,120 @@
+# ============================================
+# HTTP CACHE - ETag, Cache-Control ve 304
+# ============================================
+# Analiz çıktıları (sembol, interval, son mum) üçlüsünün saf fonksiyonu.
+# Aynı mumlar için analizi tekrar çalıştırmadan 304 Not Modified döndürür,
+# Cache-Control ile tarayıcı ve Vercel edge'in bir sonraki mum kapanışına
+# kadar cevabı saklamasını sağlar.
+#
+# Saate bağlı alan içeren cevaplar (kill zone durumu, aktif strateji)
+# live=True ile işaretlenir: ETag dakika dilimini de içerir ve en fazla
+# dakika sonuna kadar saklanır.
+
+import hashlib
+import json
+import time
+from typing import Dict, List, Optional
+
+from fastapi import Request, Response
+
+from data.crypto_fetcher import INTERVAL_SECONDS
+
+
+def seconds_until_next_bar(interval: str, now: float = None) -> int:
+    """
+    Bir sonraki mum kapanışına kalan saniyeyi döndürür.
+
+    Mumlar UTC epoch'a hizalıdır (1h mum her saat başı kapanır).
+    """
+    step = INTERVAL_SECONDS.get(interval, 3600)
+    now = time.time() if now is None else now
+
+    return max(1, step - int(now) % step)
+
+
+def make_etag(symbol: str, interval: str, candles: List[Dict], **params) -> str:
+    """
+    Mum verisinden weak ETag üretir.
+
+    ETag = son mum zamanı + girdilerin içerik hash'i (OHLCV + parametreler).
+    Cevaptaki generated_at gibi alanlar değiştiği için weak (W/) kullanılır.
+    """
+    digest = hashlib.blake2b(digest_size=12)
+    digest.update(json.dumps([symbol, interval, params], sort_keys=True, default=str).encode())
+
+    for c in candles:
+        digest.update(
+            f"{c['timestamp']}|{c['open']}|{c['high']}|{c['low']}|{c['close']}|{c.get('volume', 0)};".encode()
+        )
+
+    last_bar = candles[-1]['timestamp'] if candles else "empty"
+    last_bar = "".join(ch for ch in str(last_bar) if ch.isdigit()) or "empty"
+
+    return f'W/"{symbol}-{interval}-{last_bar}-{digest.hexdigest()}"'
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    If-None-Match başlığını weak karşılaştırma ile kontrol eder.
+    """
+    if not if_none_match:
+        return False
+
+    if if_none_match.strip() == "*":
+        return True
+
+    wanted = etag[2:] if etag.startswith("W/") else etag
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag == wanted:
+            return True
+
+    return False
+
+
+def not_modified(request: Request, response: Response, etag: str, interval: str,
+                 live: bool = False) -> Optional[Response]:
+    """
+    Cache başlıklarını ekler; istemcideki ETag güncelse 304 döndürür.
+
+    live=True: cevap saate bağlı alanlar içerir (kill zone durumu,
+    minutes_in_zone); ETag'e dakika dilimi eklenir ve cevap en fazla
+    dakika sonuna kadar saklanır.
+
+    Kullanım:
+        cached = not_modified(request, response, etag, "1h")
+        if cached:
+            return cached   # Analiz hiç çalışmaz
+    """
+    max_age = seconds_until_next_bar(interval)
+    if live:
+        now = time.time()
+        etag = f'{etag[:-1]}-m{int(now) // 60}"'
+        max_age = min(max_age, seconds_until_next_bar("1m", now))
+
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={max_age}",
+    }
+
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    response.headers.update(headers)
+    return None
+
+
+# Test
+if __name__ == "__main__":
+    test_candles = [
+        {"timestamp": "2025-01-01 00:00", "open": 100, "high": 101, "low": 99, "close": 100.5, "volume": 10},
+        {"timestamp": "2025-01-01 01:00", "open": 100.5, "high": 102, "low": 100, "close": 101.8, "volume": 12},
+    ]
+
+    etag = make_etag("BTC", "1h", test_candles, endpoint="test")
+    print(f"ETag: {etag}")
+    print(f"Eşleşme: {_etag_matches(etag, etag)}")
+    print(f"Canlı ETag: {etag[:-1]}-m{int(time.time()) // 60}\"")
+    print(f"Sonraki mum kapanışına: {seconds_until_next_bar('1h')} sn")
@@ -0,0 +1,538 @@
+# ============================================
+# JOBS - Arka Plan Backtest İşleri
+# ============================================
+# Uzun backtest, walk-forward, optimizasyon ve geçmiş veri doldurma
+# (backfill) koşuları tek HTTP isteğine sığmaz. Bu modül onları iş (job) olarak çalıştırır:
+#
+# - POST ile gönderilir, hemen job id döner; GET ile sorgulanır,
+#   SSE (text/event-stream) ile ilerleme izlenir
+# - İşler ayrı, sınırlı bir process havuzunda çalışır (JOB_WORKERS);
+#   API worker'ları ve analiz executor'ı meşgul edilmez
+# - Aynı tür + parametreler (hash) için çalışan ya da saklanan iş varsa
+#   yeni iş açılmaz, mevcut olan döner
+# - Bekleyen iş sayısı sınırlıdır (MAX_PENDING_JOBS)
+# - Biten işlerin sonuçları RESULT_TTL_SECONDS boyunca, en fazla
+#   MAX_RETAINED_JOBS adet saklanır; eskiler silinir
+#
+# İlerleme: iş process'i (oran, mesaj) bilgisini bir multiprocessing
+# kuyruğuna yazar, ana process'teki okuyucu thread job durumunu günceller.
+#
+# `uvicorn --workers N`: iş kayıtları host genelindeki SQLite dosyasında
+# tutulur (shared_cache ile aynı dosya). GET /jobs/{id} ve SSE isteği
+# hangi worker'a düşerse düşsün işi görür; dedup ve MAX_PENDING_JOBS host
+# geneldir. İş, gönderimi alan worker'ın havuzunda çalışır; o worker
+# kapanırsa işi bir sonraki gönderim/listeleme FAILED işaretler.
+
+import asyncio
+import hashlib
+import json
+import math
+import multiprocessing
+import os
+import pickle
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ProcessPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime
+from typing import AsyncIterator, Dict, List, Optional
+
+from data.shared_cache import CACHE_FILE
+
+# İş kayıtları (shared_cache ile aynı SQLite dosyası, ayrı tablo)
+JOBS_FILE = os.environ.get("JOBS_DB_PATH", CACHE_FILE)
+# Aynı anda çalışan iş sayısı (uvicorn worker başına)
+JOB_WORKERS = int(os.environ.get("JOB_WORKERS", 1))
+# Kuyrukta + çalışan en fazla iş
+MAX_PENDING_JOBS = 20
+# Biten işlerin saklanma süresi ve sayısı
+RESULT_TTL_SECONDS = 3600
+MAX_RETAINED_JOBS = 100
+# SSE: durum kontrol aralığı ve keep-alive (saniye)
+EVENT_POLL_SECONDS = 0.25
+KEEPALIVE_SECONDS = 15
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+FINISHED = (DONE, FAILED)
+
+# İş türleri ve varsayılan parametreleri
+JOB_KINDS = {
+    "backtest": {"symbol": "BTC", "hours": 72, "lookback": 5, "min_trades": 50, "intrabar": False},
+    "walk_forward": {"symbol": "BTC", "days": 90, "train_hours": 336, "test_hours": 72, "workers": 1},
+    "optimize": {"symbol": "BTC", "days": 90, "budget": 5_000_000, "objective": "expectancy", "workers": 1},
+    "replay": {"symbol": "BTC", "days": 30},
+    "backfill": {"symbol": "BTC", "interval": "1h", "start": None, "end": None, "workers": 4, "rate": 2.0,
+                 "provider": "yfinance", "compress": False},
+}
+
+
+# ============================================
+# İŞ PROCESS'İ TARAFI
+# ============================================
+
+_progress_queue = None
+
+
+def _init_job_worker(queue):
+    """İş process'i başlangıcı: ilerleme kuyruğu saklanır."""
+    global _progress_queue
+    _progress_queue = queue
+
+
+def _report(job_id: str, fraction: float, message: str):
+    if _progress_queue is not None:
+        _progress_queue.put((job_id, fraction, message))
+
+
+def _history(symbol: str, days: int) -> List[Dict]:
+    from data.crypto_fetcher import get_crypto_history
+
+    history = get_crypto_history(symbol, days=days)
+    if not history.get('success'):
+        raise RuntimeError(history.get('error', 'Veri alınamadı'))
+    return history.get('candles', [])
+
+
+def run_job(job_id: str, kind: str, params: Dict) -> Dict:
+    """
+    İşi çalıştırır (iş process'inde). Hata fırlatırsa iş FAILED olur.
+    """
+    from analysis.backtester import backtest_strategy
+    from analysis.exit_resolver import IntrabarExitResolver
+    from analysis.optimizer import successive_halving
+    from analysis.replay import replay_backtest
+    from analysis.walk_forward import walk_forward_backtest
+    from data.crypto_fetcher import get_crypto_candles
+
+    def progress(fraction: float, message: str):
+        # Veri çekme ilk %10
+        _report(job_id, 0.1 + 0.9 * fraction, message)
+
+    symbol = params["symbol"].upper()
+    _report(job_id, 0.0, "Veri çekiliyor")
+
+    if kind == "backtest":
+        hours = params["hours"]
+        candles = _history(symbol, math.ceil(hours / 24) + 1)[-hours:]
+        resolver = None
+        if params["intrabar"]:
+            resolver = IntrabarExitResolver(
+                lambda: get_crypto_candles(symbol, hours=(hours + 3) * 12, interval="5m").get('candles', []),
+                bar_minutes=60
+            )
+        progress(0.0, f"{len(candles)} mum, backtest çalışıyor")
+        result = backtest_strategy(candles, lookback=params["lookback"], min_trades=params["min_trades"],
+                                   bootstrap=True, exit_resolver=resolver)
+
+    elif kind == "walk_forward":
+        candles = _history(symbol, params["days"])
+        result = walk_forward_backtest(candles, train_size=params["train_hours"], test_size=params["test_hours"],
+                                       workers=params["workers"], progress_callback=progress)
+
+    elif kind == "optimize":
+        candles = _history(symbol, params["days"])
+        result = successive_halving(candles, budget=params["budget"], objective=params["objective"],
+                                    workers=params["workers"], symbol=symbol, progress_callback=progress)
+
+    elif kind == "backfill":
+        from data.backfill import backfill
+        # Kısmi hata {"success": False} döner → iş FAILED, tekrar gönderim kaldığı yerden devam eder
+        result = backfill(symbol, params["interval"], params["start"], params["end"],
+                          workers=params["workers"], rate=params["rate"], provider=params["provider"],
+                          compress=params["compress"],
+                          progress_callback=lambda fraction, message: _report(job_id, fraction, message))
+
+    else:  # replay
+        candles = _history(symbol, params["days"])
+        progress(0.0, f"{len(candles)} mum yeniden oynatılıyor")
+        result = replay_backtest(candles, bootstrap=True)
+
+    result['crypto'] = symbol
+    _report(job_id, 1.0, "Tamamlandı")
+    return result
+
+
+# ============================================
+# JOB YÖNETİCİSİ (API PROCESS'İ)
+# ============================================
+
+def job_hash(kind: str, params: Dict) -> str:
+    """Tür + parametrelerin hash'i (tekrar eden işleri bulmak için)."""
+    payload = json.dumps([kind, params], sort_keys=True, default=str)
+    return hashlib.blake2b(payload.encode(), digest_size=12).hexdigest()
+
+
+def _now() -> str:
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _process_alive(pid: int) -> bool:
+    """Aynı host'taki process hâlâ çalışıyor mu?"""
+    if pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS jobs ("
+    " id TEXT PRIMARY KEY, kind TEXT NOT NULL, params TEXT NOT NULL, hash TEXT NOT NULL,"
+    " status TEXT NOT NULL, progress REAL NOT NULL, message TEXT NOT NULL, result BLOB, error TEXT,"
+    " created_at TEXT NOT NULL, created_epoch REAL NOT NULL, started_at TEXT, finished_at TEXT,"
+    " finished_epoch REAL, owner INTEGER NOT NULL, version INTEGER NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS jobs_hash ON jobs (hash)",
+)
+
+# Sonuç dışındaki kolonlar (liste/SSE sorguları sonucu okumaz)
+_COLUMNS = "id, kind, params, status, progress, message, error, created_at, started_at, finished_at"
+
+
+def _job_dict(row: sqlite3.Row, include_result: bool = True) -> Dict:
+    """SQLite satırı → API'nin döndürdüğü iş sözlüğü."""
+    data = {
+        "id": row["id"],
+        "kind": row["kind"],
+        "params": json.loads(row["params"]),
+        "status": row["status"],
+        "progress": round(row["progress"] * 100, 1),
+        "message": row["message"],
+        "created_at": row["created_at"],
+        "started_at": row["started_at"],
+        "finished_at": row["finished_at"],
+    }
+    if row["error"]:
+        data["error"] = row["error"]
+    if include_result and row["status"] in FINISHED and "result" in row.keys() and row["result"] is not None:
+        data["result"] = pickle.loads(row["result"])
+    return data
+
+
+class JobManager:
+    """
+    Sınırlı process havuzunda iş kuyruğu; iş kayıtları host genelinde
+    paylaşılan SQLite dosyasında tutulur.
+
+    Kullanım:
+        submitted = job_manager.submit("walk_forward", {"days": 180})
+        job_manager.get(submitted["job"]["id"])
+    """
+
+    def __init__(self, workers: int = JOB_WORKERS, max_pending: int = MAX_PENDING_JOBS,
+                 ttl_seconds: float = RESULT_TTL_SECONDS, max_retained: int = MAX_RETAINED_JOBS,
+                 path: str = JOBS_FILE):
+        self.workers = max(1, workers)
+        self.max_pending = max_pending
+        self.ttl_seconds = ttl_seconds
+        self.max_retained = max_retained
+        self.path = path or ":memory:"
+        self._conn: Optional[sqlite3.Connection] = None
+        self._conn_pid: Optional[int] = None
+        self._lock = threading.Lock()
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._queue = None
+        self._reader: Optional[threading.Thread] = None
+        self._stats = {"submitted": 0, "deduplicated": 0, "rejected": 0, "evicted": 0, "orphaned": 0}
+
+    # ----------------------------------------
+    # SQLite (process başına tek bağlantı, kilit altında kullanılır)
+    # ----------------------------------------
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is not None and self._conn_pid == os.getpid():
+            return self._conn
+
+        try:
+            if self.path != ":memory:":
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            for statement in _SCHEMA:
+                conn.execute(statement)
+        except sqlite3.Error as e:
+            # Paylaşılan dosya yoksa sadece bu process'in işleri görünür
+            print(f"İş kayıtları açılamadı, process içi kayıt kullanılacak: {e}")
+            self.path = ":memory:"
+            conn = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+            for statement in _SCHEMA:
+                conn.execute(statement)
+
+        conn.row_factory = sqlite3.Row
+        self._conn, self._conn_pid = conn, os.getpid()
+        return conn
+
+    @contextmanager
+    def _transaction(self):
+        """Yazma transaction'ı: dedup + ekleme diğer worker'lara karşı atomik."""
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    # ----------------------------------------
+    # Havuz ve ilerleme okuyucu
+    # ----------------------------------------
+
+    def _ensure_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            context = multiprocessing.get_context("spawn")
+            if self._queue is None:
+                self._queue = context.Queue()
+                self._reader = threading.Thread(target=self._read_progress, daemon=True)
+                self._reader.start()
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=context,
+                initializer=_init_job_worker,
+                initargs=(self._queue,)
+            )
+        return self._pool
+
+    def _read_progress(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            job_id, fraction, message = item
+            with self._lock:
+                self._connection().execute(
+                    "UPDATE jobs SET status = ?, started_at = COALESCE(started_at, ?), progress = MAX(progress, ?),"
+                    " message = ?, version = version + 1 WHERE id = ? AND status IN (?, ?)",
+                    (RUNNING, _now(), fraction, message, job_id, QUEUED, RUNNING)
+                )
+
+    def _finish(self, job_id: str, future: Future):
+        try:
+            result = future.result()
+            error = None
+        except BaseException as e:
+            result, error = None, f"{type(e).__name__}: {e}"
+
+        # {"success": False} dönen iş de hatalıdır (ör. kısmen indirilen backfill)
+        if isinstance(result, dict) and result.get("success") is False:
+            error = result.get("error") or "İş başarısız oldu"
+
+        with self._lock:
+            conn = self._connection()
+            if error is None:
+                conn.execute(
+                    "UPDATE jobs SET status = ?, result = ?, progress = 1.0, message = ?, finished_at = ?,"
+                    " finished_epoch = ?, version = version + 1 WHERE id = ?",
+                    (DONE, pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL), "Tamamlandı",
+                     _now(), time.time(), job_id)
+                )
+            else:
+                # FAILED işler dedup'a girmez: aynı iş tekrar gönderilebilir.
+                # Başarısız sonuç (varsa) ayrıntılar için saklanır.
+                conn.execute(
+                    "UPDATE jobs SET status = ?, result = ?, error = ?, message = ?, finished_at = ?,"
+                    " finished_epoch = ?, version = version + 1 WHERE id = ?",
+                    (FAILED, None if result is None else pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL),
+                     error, "Hata", _now(), time.time(), job_id)
+                )
+                # Çöken havuz bir sonraki gönderimde yeniden kurulur
+                if self._pool is not None and getattr(self._pool, "_broken", False):
+                    self._pool = None
+
+    # ----------------------------------------
+    # Saklama / eviction
+    # ----------------------------------------
+
+    def _evict(self, conn: sqlite3.Connection):
+        """
+        Sahibi kapanmış işleri FAILED yapar; süresi dolan ve sayı sınırını
+        aşan biten işleri siler (transaction içinde).
+        """
+        now = time.time()
+
+        active = conn.execute("SELECT id, owner FROM jobs WHERE status IN (?, ?)", (QUEUED, RUNNING)).fetchall()
+        for row in active:
+            if not _process_alive(row["owner"]):
+                conn.execute(
+                    "UPDATE jobs SET status = ?, error = ?, message = ?, finished_at = ?, finished_epoch = ?,"
+                    " version = version + 1 WHERE id = ?",
+                    (FAILED, "İşi çalıştıran process kapandı", "Hata", _now(), now, row["id"])
+                )
+                self._stats["orphaned"] += 1
+
+        expired = conn.execute(
+            "DELETE FROM jobs WHERE status IN (?, ?) AND finished_epoch < ?", (*FINISHED, now - self.ttl_seconds)
+        ).rowcount
+        overflow = conn.execute(
+            "DELETE FROM jobs WHERE id IN (SELECT id FROM jobs WHERE status IN (?, ?)"
+            " ORDER BY finished_epoch DESC LIMIT -1 OFFSET ?)", (*FINISHED, self.max_retained)
+        ).rowcount
+        self._stats["evicted"] += expired + overflow
+
+    # ----------------------------------------
+    # Public API
+    # ----------------------------------------
+
+    def submit(self, kind: str, params: Dict = None) -> Dict:
+        """
+        Yeni iş gönderir (veya aynı parametreli mevcut işi döndürür).
+
+        Dedup ve kuyruk sınırı host geneldir; iş bu process'in havuzunda çalışır.
+
+        Returns:
+        --------
+        Dict : {"success", "job", "deduplicated"} veya {"success": False, "error"}
+        """
+        if kind not in JOB_KINDS:
+            return {"success": False, "error": f"Geçersiz iş türü: {kind}", "supported": list(JOB_KINDS)}
+
+        params = params or {}
+        unknown = set(params) - set(JOB_KINDS[kind])
+        if unknown:
+            return {"success": False, "error": f"Bilinmeyen parametre: {', '.join(sorted(unknown))}",
+                    "allowed": JOB_KINDS[kind]}
+
+        merged = {**JOB_KINDS[kind], **params}
+        merged["symbol"] = str(merged["symbol"]).upper()
+        params_hash = job_hash(kind, merged)
+
+        with self._lock, self._transaction() as conn:
+            self._evict(conn)
+
+            existing = conn.execute(
+                f"SELECT {_COLUMNS} FROM jobs WHERE hash = ? AND status != ? ORDER BY created_epoch DESC LIMIT 1",
+                (params_hash, FAILED)
+            ).fetchone()
+            if existing is not None:
+                self._stats["deduplicated"] += 1
+                return {"success": True, "job": _job_dict(existing, include_result=False), "deduplicated": True}
+
+            pending = conn.execute("SELECT COUNT(*) FROM jobs WHERE status IN (?, ?)", (QUEUED, RUNNING)).fetchone()[0]
+            if pending >= self.max_pending:
+                self._stats["rejected"] += 1
+                return {"success": False, "error": "İş kuyruğu dolu, daha sonra tekrar deneyin",
+                        "pending": pending, "max_pending": self.max_pending}
+
+            job_id = uuid.uuid4().hex[:12]
+            conn.execute(
+                "INSERT INTO jobs (id, kind, params, hash, status, progress, message, created_at, created_epoch,"
+                " owner, version) VALUES (?, ?, ?, ?, ?, 0.0, ?, ?, ?, ?, 0)",
+                (job_id, kind, json.dumps(merged, default=str), params_hash, QUEUED, "Sırada",
+                 _now(), time.time(), os.getpid())
+            )
+            self._stats["submitted"] += 1
+            # Havuza gönderim başarısız olursa kayıt geri alınır
+            future = self._ensure_pool().submit(run_job, job_id, kind, merged)
+            job = _job_dict(conn.execute(f"SELECT {_COLUMNS} FROM jobs WHERE id = ?", (job_id,)).fetchone(),
+                            include_result=False)
+
+        future.add_done_callback(lambda f: self._finish(job_id, f))
+        return {"success": True, "job": job, "deduplicated": False}
+
+    def get(self, job_id: str, include_result: bool = True) -> Optional[Dict]:
+        """İşin durumu (ve bittiyse sonucu); yoksa None. Herhangi bir worker'dan okunabilir."""
+        columns = f"{_COLUMNS}, result" if include_result else _COLUMNS
+        with self._lock:
+            row = self._connection().execute(f"SELECT {columns} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return _job_dict(row, include_result) if row else None
+
+    def version(self, job_id: str) -> Optional[int]:
+        with self._lock:
+            row = self._connection().execute("SELECT version FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return row["version"] if row else None
+
+    def list(self) -> List[Dict]:
+        """Saklanan tüm işler (sonuçsuz), yeniden eskiye."""
+        with self._lock, self._transaction() as conn:
+            self._evict(conn)
+            rows = conn.execute(f"SELECT {_COLUMNS} FROM jobs ORDER BY created_epoch DESC").fetchall()
+        return [_job_dict(row, include_result=False) for row in rows]
+
+    def stats(self) -> Dict:
+        """Host geneli iş sayıları + bu process'in sayaçları."""
+        with self._lock:
+            rows = self._connection().execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status").fetchall()
+            by_status = {row["status"]: row["n"] for row in rows}
+            return {
+                "workers": self.workers,
+                "max_pending": self.max_pending,
+                "store": None if self.path == ":memory:" else os.path.abspath(self.path),
+                "retained": sum(by_status.values()),
+                "by_status": by_status,
+                **self._stats
+            }
+
+    def shutdown(self):
+        """Havuzu ve okuyucu thread'i kapatır (çalışan işler iptal edilmez)."""
+        pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+        if self._queue is not None:
+            self._queue.put(None)
+            self._queue = None
+
+
+async def job_events(manager: JobManager, job_id: str) -> AsyncIterator[str]:
+    """
+    İşin durumunu Server-Sent Events olarak yayınlar.
+
+    Her değişiklikte "progress" olayı, bitişte "done"/"failed" olayı
+    gönderilir ve akış kapanır. Sonuç GET /jobs/{id} ile alınır.
+    Yöneticinin kilidi ve SQLite sorguları event loop'u tıkamasın diye
+    yoklamalar thread'de çalışır.
+    """
+    last_version = None
+    last_sent = time.monotonic()
+
+    while True:
+        version = await asyncio.to_thread(manager.version, job_id)
+        if version is None:
+            yield f"event: error\ndata: {json.dumps({'error': 'İş bulunamadı', 'id': job_id})}\n\n"
+            return
+
+        if version != last_version:
+            job = await asyncio.to_thread(manager.get, job_id, include_result=False)
+            event = job["status"] if job["status"] in FINISHED else "progress"
+            yield f"event: {event}\ndata: {json.dumps(job, ensure_ascii=False)}\n\n"
+            last_version, last_sent = version, time.monotonic()
+            if event in FINISHED:
+                return
+        elif time.monotonic() - last_sent > KEEPALIVE_SECONDS:
+            # Proxy'lerin bağlantıyı kapatmaması için yorum satırı
+            yield ": keep-alive\n\n"
+            last_sent = time.monotonic()
+
+        await asyncio.sleep(EVENT_POLL_SECONDS)
+
+
+# Uygulama genelinde paylaşılan iş yöneticisi
+job_manager = JobManager()
+
+
+# Test
+if __name__ == "__main__":
+    print("=" * 50)
+    print("  JOB MANAGER")
+    print("=" * 50)
+
+    manager = JobManager(workers=1)
+    first = manager.submit("replay", {"days": 7})
+    second = manager.submit("replay", {"days": 7, "symbol": "btc"})
+    print(f"  İş: {first['job']['id']} | tekrar gönderim aynı iş: {second['deduplicated']}")
+    print(f"  Geçersiz tür: {manager.submit('nope')['error']}")
+
+    async def follow():
+        async for event in job_events(manager, first['job']['id']):
+            print("  " + event.strip().replace("\n", " | ")[:110])
+
+    asyncio.run(follow())
+    job = manager.get(first['job']['id'])
+    print(f"  Durum: {job['status']} | {job.get('error') or list(job.get('result', {}))[:5]}")
+    print(f"  {manager.stats()}")
+    manager.shutdown()
@@ -0,0 +1,2 @@
+# Common modülü (analysis ve data katmanlarının ortak tanımları)
+from .session_calendar import label_timestamps, candle_minutes, SCHEDULE
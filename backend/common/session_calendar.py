@@ -0,0 +1,318 @@
+# ============================================
+# SESSION CALENDAR - Tek Seans Takvimi
+# ============================================
+# Seans saatleri tek yerde tanımlanır; session_tracker, ict_concepts,
+# killzone_strategy ve candle_quality buradan okur. Ne analysis ne data
+# katmanına bağlıdır (sadece numpy); iki katman da buradan import eder.
+#
+# 1. label_timestamps: Tüm zaman damgası dizisini tek vektörel geçişte
+#    seans, kill zone ve işlem günü ile etiketler (opsiyonel yaz saati).
+# 2. SCHEDULE: Günün her dakikası için önceden hesaplanmış tablo.
+#    "Şu an hangi zone, kaç dakika kaldı" soruları O(1) okumadır.
+
+from datetime import datetime, timezone, timedelta
+from functools import lru_cache
+from typing import Dict, List, Optional
+from zoneinfo import ZoneInfo
+
+import numpy as np
+
+MINUTES_PER_DAY = 24 * 60
+
+# ============================================
+# TANIMLAR (UTC saat, [başlangıç, bitiş))
+# ============================================
+
+# Forex seansları
+SESSION_HOURS = {
+    "ASIA": (0, 9),        # 03:00-12:00 Türkiye
+    "LONDON": (7, 16),     # 10:00-19:00 Türkiye
+    "NEW_YORK": (12, 21),  # 15:00-00:00 Türkiye
+}
+
+# Seansların kendi kill zone'ları (açılıştaki en aktif saatler)
+SESSION_KILL_ZONE_HOURS = {
+    "ASIA": (0, 2),
+    "LONDON": (7, 9),
+    "NEW_YORK": (12, 14),
+}
+
+# ICT kill zone'ları (çakışmaz)
+KILL_ZONE_HOURS = {
+    "ASIAN": (0, 4),
+    "LONDON": (7, 10),
+    "NEW_YORK": (12, 15),
+    "LONDON_CLOSE": (15, 17),
+}
+
+# Yaz saati (dst=True) için her tanımın bağlı olduğu saat dilimi.
+# Saatler standart (kış) saatine göredir; bölge yaz saatindeyken
+# aynı yerel saat UTC'de 1 saat erkene kayar.
+SESSION_TIMEZONES = {
+    "ASIA": "Asia/Tokyo",
+    "LONDON": "Europe/London",
+    "NEW_YORK": "America/New_York",
+}
+KILL_ZONE_TIMEZONE = "America/New_York"   # ICT kill zone'ları New York saatiyle tanımlar
+
+TURKEY_OFFSET_MINUTES = 3 * 60
+
+NO_ZONE = -1
+
+
+# ============================================
+# GÜNLÜK PROGRAM (dakika tablosu)
+# ============================================
+
+def _hours_mask(start: int, end: int) -> np.ndarray:
+    """Gün içi dakika maskesi (gece yarısını geçen aralıklar dahil)."""
+    minutes = np.arange(MINUTES_PER_DAY)
+    if end < start:
+        return (minutes >= start * 60) | (minutes < end * 60)
+    return (minutes >= start * 60) & (minutes < end * 60)
+
+
+def _minutes_until(target_hour: int) -> np.ndarray:
+    """Her dakikadan bir sonraki target_hour:00'a kalan dakika (0 ise 24 saat)."""
+    minutes = np.arange(MINUTES_PER_DAY)
+    return np.where(minutes < target_hour * 60, target_hour * 60 - minutes, MINUTES_PER_DAY - minutes + target_hour * 60)
+
+
+class DailySchedule:
+    """
+    Günün 1440 dakikası için seans / kill zone tabloları.
+
+    Tüm sorgular dakika indeksiyle O(1) okumadır.
+    """
+
+    def __init__(self):
+        minutes = np.arange(MINUTES_PER_DAY)
+
+        # ICT kill zone kodu (KILL_ZONE_IDS indeksi, yoksa -1)
+        self.kill_zone_ids: List[str] = list(KILL_ZONE_HOURS)
+        self.kill_zone = np.full(MINUTES_PER_DAY, NO_ZONE, dtype=np.int8)
+        for code, (start, end) in enumerate(KILL_ZONE_HOURS.values()):
+            self.kill_zone[_hours_mask(start, end)] = code
+
+        self.minutes_until_zone_start = {z: _minutes_until(s) for z, (s, _) in KILL_ZONE_HOURS.items()}
+        self.minutes_until_zone_end = {z: e * 60 - minutes for z, (_, e) in KILL_ZONE_HOURS.items()}
+        self.minutes_since_zone_start = {z: minutes - s * 60 for z, (s, _) in KILL_ZONE_HOURS.items()}
+
+        # Saat bazında bir sonraki kill zone (zone dışındayken)
+        self.next_kill_zone_by_hour = []
+        for hour in range(24):
+            next_zone, min_hours = None, 24
+            for zone_id, (start, _) in KILL_ZONE_HOURS.items():
+                hours_until = start - hour if start > hour else (24 - hour + start)
+                if hours_until < min_hours:
+                    min_hours, next_zone = hours_until, zone_id
+            self.next_kill_zone_by_hour.append((next_zone, min_hours))
+
+        # Forex seansları
+        self.session_ids: List[str] = list(SESSION_HOURS)
+        self.session_active = {s: _hours_mask(*hours) for s, hours in SESSION_HOURS.items()}
+        self.session_kill_zone = {s: _hours_mask(*hours) for s, hours in SESSION_KILL_ZONE_HOURS.items()}
+        self.minutes_until_session_end = {s: _minutes_until(e) for s, (_, e) in SESSION_HOURS.items()}
+        self.minutes_until_session_kill_zone_end = {s: e * 60 - minutes for s, (_, e) in SESSION_KILL_ZONE_HOURS.items()}
+
+        # Seans bit maskesi (bit i = session_ids[i])
+        self.session_mask = np.zeros(MINUTES_PER_DAY, dtype=np.int8)
+        for bit, session_id in enumerate(self.session_ids):
+            self.session_mask |= self.session_active[session_id].astype(np.int8) << bit
+
+    def active_kill_zone(self, minute: int) -> Optional[str]:
+        """Dakikadaki ICT kill zone id'si."""
+        code = self.kill_zone[minute]
+        return self.kill_zone_ids[code] if code != NO_ZONE else None
+
+    def active_sessions(self, minute: int) -> List[str]:
+        """Dakikada açık olan seanslar."""
+        return [s for s in self.session_ids if self.session_active[s][minute]]
+
+    def status(self, minute: int) -> Dict:
+        """
+        Dakika için özet durum (tümü tablo okuması).
+        """
+        zone = self.active_kill_zone(minute)
+        next_zone, hours_until = self.next_kill_zone_by_hour[minute // 60]
+        return {
+            "minute_of_day": int(minute),
+            "kill_zone": zone,
+            "kill_zone_minutes_remaining": int(self.minutes_until_zone_end[zone][minute]) if zone else 0,
+            "next_kill_zone": next_zone if zone is None else None,
+            "minutes_until_kill_zone": {z: int(t[minute]) for z, t in self.minutes_until_zone_start.items()},
+            "sessions": self.active_sessions(minute),
+            "session_kill_zones": [s for s in self.session_ids if self.session_kill_zone[s][minute]]
+        }
+
+
+SCHEDULE = DailySchedule()
+
+
+# ============================================
+# ZAMAN
+# ============================================
+
+def minute_of_day(now: datetime = None, dst: bool = False, timezone_name: str = KILL_ZONE_TIMEZONE) -> int:
+    """
+    UTC zamanın gün içi dakikası (dst=True ise yaz saati kaydırmalı).
+    """
+    now = now or datetime.now(timezone.utc)
+    minute = now.hour * 60 + now.minute
+    if dst:
+        epoch_minute = int(now.replace(tzinfo=now.tzinfo or timezone.utc).timestamp() // 60)
+        minute = (minute + int(dst_shift_minutes(np.array([epoch_minute]), timezone_name)[0])) % MINUTES_PER_DAY
+    return minute
+
+
+def parse_timestamps(timestamps) -> np.ndarray:
+    """
+    "YYYY-MM-DD HH:MM" (UTC) zaman damgalarını epoch dakikaya çevirir (vektörel).
+
+    Geçersiz zaman damgaları ValueError fırlatır.
+    """
+    return np.asarray(timestamps, dtype='datetime64[m]').astype(np.int64)
+
+
+@lru_cache(maxsize=None)
+def _dst_transitions(timezone_name: str, year: int) -> tuple:
+    """
+    Yıl içindeki yaz saati geçişleri: ((epoch_dakika, kaydırma_dakika), ...)
+    Kaydırma = o anki UTC offset - yılın standart (en küçük) offset'i.
+    """
+    tz = ZoneInfo(timezone_name)
+    start = datetime(year, 1, 1, tzinfo=timezone.utc)
+
+    def offset(moment: datetime) -> int:
+        return int(moment.astimezone(tz).utcoffset().total_seconds() // 60)
+
+    days = [start + timedelta(days=d) for d in range(367)]
+    offsets = [offset(d) for d in days]
+    standard = min(offsets)
+
+    edges = [(int(start.timestamp() // 60), offsets[0] - standard)]
+    for d in range(366):
+        if offsets[d] == offsets[d + 1]:
+            continue
+        for hour in range(1, 25):
+            moment = days[d] + timedelta(hours=hour)
+            if offset(moment) != offsets[d]:
+                edges.append((int(moment.timestamp() // 60), offset(moment) - standard))
+                break
+
+    return tuple(edges)
+
+
+def dst_shift_minutes(epoch_minutes: np.ndarray, timezone_name: str) -> np.ndarray:
+    """
+    Her zaman için yaz saati kaydırması (dakika, genelde 0 veya 60).
+    """
+    if epoch_minutes.size == 0:
+        return np.zeros(0, dtype=np.int64)
+
+    years = epoch_minutes.astype('datetime64[m]').astype('datetime64[Y]').astype(np.int64) + 1970
+    edges = [edge for year in range(int(years.min()), int(years.max()) + 1) for edge in _dst_transitions(timezone_name, year)]
+    starts = np.array([e[0] for e in edges], dtype=np.int64)
+    shifts = np.array([e[1] for e in edges], dtype=np.int64)
+
+    index = np.clip(np.searchsorted(starts, epoch_minutes, side='right') - 1, 0, None)
+    return shifts[index]
+
+
+# ============================================
+# VEKTÖREL ETİKETLEME
+# ============================================
+
+def label_timestamps(timestamps, dst: bool = False, day_start_hour: int = 0) -> Dict[str, np.ndarray]:
+    """
+    Zaman damgası dizisini tek geçişte etiketler.
+
+    Parameters:
+    -----------
+    timestamps : List[str] veya np.ndarray
+        "YYYY-MM-DD HH:MM" (UTC) veya epoch dakika (int64)
+    dst : bool
+        True ise her tanım kendi saat diliminin yaz saatine göre kaydırılır
+    day_start_hour : int
+        İşlem gününün başladığı UTC saat (kripto 0, forex için ör. 22)
+
+    Returns:
+    --------
+    Dict[str, np.ndarray] :
+        minutes        : epoch dakika
+        minute_of_day  : gün içi dakika (UTC)
+        hour           : UTC saat
+        kill_zone      : ICT kill zone kodu (SCHEDULE.kill_zone_ids indeksi, -1 = yok)
+        session_mask   : seans bitleri (bit i = SCHEDULE.session_ids[i])
+        session_kill_zone_mask : seans kill zone bitleri
+        trading_day    : işlem günü numarası (epoch'tan gün)
+    """
+    timestamps = np.asarray(timestamps)
+    minutes = timestamps.astype(np.int64) if np.issubdtype(timestamps.dtype, np.integer) else parse_timestamps(timestamps)
+    minute_of_day_utc = minutes % MINUTES_PER_DAY
+
+    def local_minute(timezone_name: str) -> np.ndarray:
+        if not dst:
+            return minute_of_day_utc
+        return (minutes + dst_shift_minutes(minutes, timezone_name)) % MINUTES_PER_DAY
+
+    kill_zone = SCHEDULE.kill_zone[local_minute(KILL_ZONE_TIMEZONE)]
+
+    session_mask = np.zeros(minutes.shape, dtype=np.int8)
+    session_kill_zone_mask = np.zeros(minutes.shape, dtype=np.int8)
+    for bit, session_id in enumerate(SCHEDULE.session_ids):
+        minute = local_minute(SESSION_TIMEZONES[session_id])
+        session_mask |= SCHEDULE.session_active[session_id][minute].astype(np.int8) << bit
+        session_kill_zone_mask |= SCHEDULE.session_kill_zone[session_id][minute].astype(np.int8) << bit
+
+    return {
+        "minutes": minutes,
+        "minute_of_day": minute_of_day_utc,
+        "hour": minute_of_day_utc // 60,
+        "kill_zone": kill_zone,
+        "session_mask": session_mask,
+        "session_kill_zone_mask": session_kill_zone_mask,
+        "trading_day": (minutes - day_start_hour * 60) // MINUTES_PER_DAY
+    }
+
+
+def candle_minutes(candles: List[Dict]) -> np.ndarray:
+    """
+    Mumların epoch dakikası (zaman damgası geçersizse -1).
+    """
+    timestamps = [c.get('timestamp', '') for c in candles]
+    try:
+        return parse_timestamps(timestamps)
+    except ValueError:
+        minutes = np.full(len(timestamps), -1, dtype=np.int64)
+        for i, ts in enumerate(timestamps):
+            try:
+                minutes[i] = parse_timestamps([ts])[0]
+            except ValueError:
+                continue
+        return minutes
+
+
+# Test
+if __name__ == "__main__":
+    import time
+
+    start = np.datetime64('2024-01-01T00:00', 'm').astype(np.int64)
+    minutes = start + np.arange(0, 2 * 365 * 24 * 60, 60)   # 2 yıl, saatlik
+
+    started = time.perf_counter()
+    labels = label_timestamps(minutes, dst=True)
+    elapsed = time.perf_counter() - started
+
+    print("=" * 50)
+    print("  SESSION CALENDAR")
+    print("=" * 50)
+    print(f"  {minutes.size} mum etiketlendi (DST): {elapsed * 1000:.1f} ms")
+
+    for label in ("2024-01-15 12:00", "2024-07-15 11:00"):
+        idx = int((parse_timestamps([label])[0] - start) // 60)
+        code = labels["kill_zone"][idx]
+        print(f"  {label} UTC → {SCHEDULE.kill_zone_ids[code] if code >= 0 else '-'}")
+
+    status = SCHEDULE.status(minute_of_day())
+    print(f"\n  Şu an: kill zone={status['kill_zone']}, seanslar={status['sessions']}")
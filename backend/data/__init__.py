@@ -1,7 +1,8 @@
 # Data modülü
-from .price_fetcher import get_analysis
+from .price_fetcher import get_analysis, get_batch_analysis, get_local_analysis
+from .forex_fetcher import get_forex_candles
 from .session_tracker import get_session_status
 from .btc_reporter import get_btc_candles
-from .crypto_fetcher import get_crypto_candles, get_multi_crypto_summary, SUPPORTED_CRYPTOS
+from .crypto_fetcher import get_crypto_candles, get_crypto_history, get_multi_crypto_summary, SUPPORTED_CRYPTOS
 from .market_data import get_top_coins, get_trending_coins, get_global_market_data, get_economic_calendar, get_full_market_data
 
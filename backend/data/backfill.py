@@ -0,0 +1,384 @@
+# ============================================
+# BACKFILL - Paralel Geçmiş Veri Doldurma
+# ============================================
+# get_crypto_candles sadece son 5-10 günü çeker. Backfill istenen tarih
+# aralığını yfinance'ın interval başına sınırlarına uyan parçalara böler
+# ve mum arşivine (data/candle_archive) yazar:
+#
+# - Parçalar sınırlı bir thread havuzunda eşzamanlı indirilir; tüm
+#   istekler ortak bir hız sınırlayıcıdan (token bucket) geçer
+# - Hatalı parça birkaç kez (artan bekleme ile) tekrar denenir
+# - Biten her parça arşiv klasöründe ara dosyaya yazılır: çöken ya da
+#   yarıda kalan backfill tekrar çalıştırılınca sadece eksik parçaları
+#   indirir
+# - Tüm parçalar bitince mumlar birleştirilir, çakışan mumlar tekilleşir
+#   ve arşive katılır (merge: geçmişe ekleme de desteklenir)
+#
+# compress=True ise arşive yazdıktan sonra sıkıştırılmış kopya
+# (data/candle_codec) güncellenir.
+#
+# provider="ccxt" mumları borsadan çeker (data/exchange_fetcher): geriye
+# dönük sınır yoktur, parçalar EXCHANGE_CHUNK_BARS mumluktur.
+#
+# Komut satırı:
+#   python -m data.backfill BTC --interval 1h --start 2023-01-01
+#   python -m data.backfill BTC --interval 1m --start 2022-01-01 --provider ccxt --compress
+
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from .candle_archive import CandleArchive, candle_archive, _arrays_from_candles, _to_minute, COLUMNS
+from .candle_codec import compress_series
+from .crypto_fetcher import SUPPORTED_CRYPTOS, INTERVAL_SECONDS, PROVIDERS, fetch_candle_range
+
+# yfinance sınırları: interval → (parça günü, en fazla geriye gidilebilen gün)
+BACKFILL_LIMITS = {
+    "1m": (7, 30),
+    "2m": (30, 60),
+    "5m": (30, 60),
+    "15m": (30, 60),
+    "30m": (30, 60),
+    "1h": (90, 730),
+    "1d": (1825, None),
+}
+
+# ccxt parçası: 10 borsa sayfası
+EXCHANGE_CHUNK_BARS = 10_000
+
+# Varsayılanlar
+DEFAULT_WORKERS = 4
+DEFAULT_RATE = 2.0          # istek / saniye
+MAX_RETRIES = 3
+RETRY_BACKOFF_SECONDS = 2.0
+
+
+# ============================================
+# HIZ SINIRLAYICI
+# ============================================
+
+class RateLimiter:
+    """
+    Thread güvenli token bucket: saniyede `rate` istek, en fazla `burst`
+    anlık istek.
+    """
+
+    def __init__(self, rate: float = DEFAULT_RATE, burst: int = 1):
+        self.rate = max(rate, 1e-6)
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Token alınana kadar bekler."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def penalize(self, seconds: float):
+        """
+        Sağlayıcı hız sınırı hatası döndürdüğünde tüm istekleri `seconds`
+        kadar geciktirir (token'lar eksiye çekilir).
+        """
+        with self._lock:
+            self._tokens = min(self._tokens, 0.0) - seconds * self.rate
+
+
+# ============================================
+# PARÇALAMA VE İNDİRME
+# ============================================
+
+def _utc(value) -> datetime:
+    """Epoch dakika / "YYYY-MM-DD[ HH:MM]" / datetime → UTC datetime."""
+    if isinstance(value, datetime):
+        return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+    return datetime.fromtimestamp(_to_minute(value) * 60, tz=timezone.utc)
+
+
+def plan_chunks(interval: str, start, end=None, now: datetime = None, provider: str = "yfinance") -> Dict:
+    """
+    Tarih aralığını sağlayıcı sınırlarına uyan [başlangıç, bitiş) parçalarına böler.
+
+    Parça sınırları epoch'tan itibaren chunk_days'lik sabit ızgaradadır:
+    başlangıç (sınıra çekilme) veya bitiş (şimdi) kaysa da aradaki
+    parçalar aynı kalır, ara dosyalar tekrar çalıştırmada yeniden kullanılır.
+
+    Returns:
+    --------
+    Dict : start, end, chunks [(start, end), ...], clamped (başlangıç
+           sağlayıcı sınırına çekildiyse True), requested_start,
+           step (ızgara adımı, saniye) veya {"error"}
+    """
+    if provider not in PROVIDERS:
+        return {"error": f"Geçersiz veri kaynağı: {provider}", "supported": list(PROVIDERS)}
+
+    if provider == "ccxt":
+        if interval not in INTERVAL_SECONDS:
+            return {"error": f"Desteklenmeyen interval: {interval}", "supported": list(INTERVAL_SECONDS)}
+        chunk_days, max_days = INTERVAL_SECONDS[interval] * EXCHANGE_CHUNK_BARS / 86400, None
+    elif interval not in BACKFILL_LIMITS:
+        return {"error": f"Desteklenmeyen interval: {interval}", "supported": list(BACKFILL_LIMITS)}
+    else:
+        chunk_days, max_days = BACKFILL_LIMITS[interval]
+    now = now or datetime.now(timezone.utc)
+    try:
+        start, end = _utc(start), _utc(end) if end is not None else now
+    except ValueError as e:
+        return {"error": f"Geçersiz tarih: {e}"}
+    end = min(end, now)
+    requested_start = start
+
+    clamped = False
+    if max_days is not None and start < now - timedelta(days=max_days):
+        # Sağlayıcı sınırının biraz içi (istek anındaki kaymaya karşı)
+        start, clamped = now - timedelta(days=max_days) + timedelta(hours=1), True
+
+    step = int(chunk_days * 86400)
+    chunks = []
+    cursor = start
+    while cursor < end:
+        boundary = datetime.fromtimestamp((int(cursor.timestamp()) // step + 1) * step, tz=timezone.utc)
+        chunk_end = min(boundary, end)
+        chunks.append((cursor, chunk_end))
+        cursor = chunk_end
+
+    return {"start": start, "end": end, "chunks": chunks, "clamped": clamped,
+            "requested_start": requested_start, "step": step}
+
+
+def yfinance_chunk(symbol: str, interval: str, start: datetime, end: datetime) -> List[Dict]:
+    """Tek parçayı yfinance'tan indirir (veri yoksa boş liste, hata fırlatabilir)."""
+    return fetch_candle_range(SUPPORTED_CRYPTOS[symbol]["symbol"], interval, start, end)
+
+
+def exchange_chunk(symbol: str, interval: str, start: datetime, end: datetime) -> List[Dict]:
+    """Tek parçayı ccxt ile borsadan indirir (sayfalar sıralı, hız sınırı borsa başına)."""
+    from .exchange_fetcher import fetch_exchange_range
+    return fetch_exchange_range(symbol, interval, start, end)
+
+
+def _chunk_file(staging: str, start: datetime, end: datetime) -> str:
+    return os.path.join(staging, f"chunk_{int(start.timestamp()) // 60}_{int(end.timestamp()) // 60}.npz")
+
+
+def _save_chunk(path: str, candles: List[Dict]):
+    """Parçayı atomik olarak ara dosyaya yazar."""
+    arrays = _arrays_from_candles(candles) if candles else {
+        name: np.zeros(0, dtype=np.int64 if name == "minutes" else np.float64) for name in COLUMNS
+    }
+    temp = f"{path}.tmp.npz"
+    np.savez(temp, **arrays)
+    os.replace(temp, path)
+
+
+def _discard_stale_chunks(staging: str, chunks: List[tuple]):
+    """Plandaki parçalara ait olmayan ara dosyaları siler (ör. bitişi değişen son parça)."""
+    expected = {os.path.basename(_chunk_file(staging, *chunk)) for chunk in chunks}
+    for name in os.listdir(staging):
+        if name.startswith("chunk_") and name not in expected:
+            try:
+                os.remove(os.path.join(staging, name))
+            except OSError:
+                pass
+
+
+def _load_staging(staging: str) -> Dict[str, np.ndarray]:
+    """Ara dosyalardaki tüm mumlar (tekilleştirme arşivde yapılır)."""
+    parts = []
+    for name in sorted(os.listdir(staging)):
+        if name.startswith("chunk_") and name.endswith(".npz") and ".tmp" not in name:
+            with np.load(os.path.join(staging, name)) as data:
+                parts.append({column: data[column] for column in COLUMNS})
+    if not parts:
+        return {name: np.zeros(0) for name in COLUMNS}
+    return {name: np.concatenate([part[name] for part in parts]) for name in COLUMNS}
+
+
+# ============================================
+# BACKFILL
+# ============================================
+
+def backfill(symbol: str, interval: str = "1h", start=None, end=None,
+             workers: int = DEFAULT_WORKERS, rate: float = DEFAULT_RATE,
+             archive: CandleArchive = None, fetcher: Callable = None,
+             progress_callback: Optional[Callable[[float, str], None]] = None,
+             provider: str = "yfinance", compress: bool = False) -> Dict:
+    """
+    Tarih aralığını parçalar halinde indirip mum arşivine yazar.
+
+    Parameters:
+    -----------
+    symbol : str
+        Kripto kodu (SUPPORTED_CRYPTOS)
+    interval : str
+        BACKFILL_LIMITS anahtarlarından biri
+    start, end : str, int veya datetime
+        Aralık (UTC); end None = şimdi. yfinance'ın geriye dönük sınırından
+        eski başlangıç bu sınıra çekilir (clamped)
+    workers : int
+        Eşzamanlı indirme sayısı
+    rate : float
+        Saniyedeki en fazla istek (tüm worker'lar toplamı)
+    fetcher : Callable
+        fetcher(symbol, interval, start, end) → mum listesi (varsayılan yfinance)
+    progress_callback : Callable
+        (oran, mesaj) ilerleme bildirimi
+    provider : str
+        "yfinance" veya "ccxt" (borsa, geriye dönük sınır yok)
+    compress : bool
+        True ise arşivin sıkıştırılmış kopyası da güncellenir
+
+    Returns:
+    --------
+    Dict : parça sayıları, indirilen / arşive eklenen mum, hatalar
+    """
+    symbol = symbol.upper()
+    if symbol not in SUPPORTED_CRYPTOS:
+        return {"success": False, "error": f"Desteklenmeyen kripto: {symbol}",
+                "supported": list(SUPPORTED_CRYPTOS.keys())}
+    if start is None:
+        return {"success": False, "error": "start gerekli"}
+
+    plan = plan_chunks(interval, start, end, provider=provider)
+    if "error" in plan:
+        return {"success": False, **plan}
+    if not plan["chunks"]:
+        return {"success": False, "error": "Aralık boş veya sağlayıcının geriye dönük sınırının dışında",
+                "max_days": BACKFILL_LIMITS.get(interval, (None, None))[1] if provider == "yfinance" else None}
+
+    archive = archive or candle_archive
+    fetcher = fetcher or (exchange_chunk if provider == "ccxt" else yfinance_chunk)
+    limiter = RateLimiter(rate, burst=max(1, workers))
+    started = time.perf_counter()
+
+    # Ara dosyalar istenen başlangıç + kaynak + ızgaraya göre (sınıra çekilen
+    # başlangıç her çalıştırmada kayar): aynı istekle tekrar çalıştırma kaldığı
+    # yerden devam eder, farklı kaynağın parçaları aynı seriye karışmaz
+    staging = os.path.join(
+        archive._dir(symbol, interval),
+        f"backfill-{provider}-{int(plan['requested_start'].timestamp()) // 60}-{plan['step']}"
+    )
+    os.makedirs(staging, exist_ok=True)
+
+    chunks = plan["chunks"]
+    _discard_stale_chunks(staging, chunks)
+    pending = [chunk for chunk in chunks if not os.path.exists(_chunk_file(staging, *chunk))]
+    resumed = len(chunks) - len(pending)
+    failed = []
+    fetched = 0
+    done = resumed
+    lock = threading.Lock()
+
+    def download(chunk):
+        for attempt in range(MAX_RETRIES):
+            limiter.acquire()
+            try:
+                candles = fetcher(symbol, interval, *chunk)
+                _save_chunk(_chunk_file(staging, *chunk), candles)
+                return len(candles)
+            except Exception:
+                if attempt == MAX_RETRIES - 1:
+                    raise
+                time.sleep(RETRY_BACKOFF_SECONDS * 2 ** attempt)
+
+    if progress_callback and resumed:
+        progress_callback(resumed / len(chunks), f"{resumed} parça önceki çalıştırmadan devam ediyor")
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = {pool.submit(download, chunk): chunk for chunk in pending}
+        for future in as_completed(futures):
+            chunk = futures[future]
+            with lock:
+                done += 1
+                try:
+                    fetched += future.result()
+                except Exception as e:
+                    failed.append({
+                        "start": chunk[0].strftime("%Y-%m-%d %H:%M"),
+                        "end": chunk[1].strftime("%Y-%m-%d %H:%M"),
+                        "error": f"{type(e).__name__}: {e}"
+                    })
+            if progress_callback:
+                progress_callback(0.95 * done / len(chunks), f"{done}/{len(chunks)} parça")
+
+    result = {
+        "symbol": symbol,
+        "interval": interval,
+        "provider": provider,
+        "start": plan["start"].strftime("%Y-%m-%d %H:%M"),
+        "end": plan["end"].strftime("%Y-%m-%d %H:%M"),
+        "clamped": plan["clamped"],
+        "chunks": len(chunks),
+        "downloaded_chunks": len(pending) - len(failed),
+        "resumed_chunks": resumed,
+        "fetched_bars": fetched,
+    }
+
+    if failed:
+        # Ara dosyalar kalır, tekrar çalıştırma sadece hatalı parçaları indirir
+        result.update({
+            "success": False,
+            "error": f"{len(failed)} parça indirilemedi, tekrar çalıştırınca kaldığı yerden devam eder",
+            "failed": failed,
+            "elapsed_seconds": round(time.perf_counter() - started, 2)
+        })
+        return result
+
+    if progress_callback:
+        progress_callback(0.95, "Arşive yazılıyor")
+
+    merged = archive.merge(symbol, interval, _load_staging(staging))
+    if not merged.get("success"):
+        return {**result, "success": False, "error": merged.get("error")}
+    shutil.rmtree(staging, ignore_errors=True)
+
+    if compress:
+        if progress_callback:
+            progress_callback(0.98, "Sıkıştırılmış kopya güncelleniyor")
+        result["compressed"] = compress_series(symbol, interval, archive)
+
+    result.update({
+        "success": True,
+        "added_bars": merged["added"],
+        "archive_bars": merged["bars"],
+        "elapsed_seconds": round(time.perf_counter() - started, 2)
+    })
+    return result
+
+
+# Komut satırı
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Mum arşivine geçmiş veri doldurur")
+    parser.add_argument("symbol", help="Kripto kodu (BTC, ETH ...)")
+    parser.add_argument("--interval", default="1h", choices=list(INTERVAL_SECONDS))
+    parser.add_argument("--provider", default="yfinance", choices=list(PROVIDERS))
+    parser.add_argument("--start", required=True, help="YYYY-MM-DD[ HH:MM] (UTC)")
+    parser.add_argument("--end", default=None, help="YYYY-MM-DD[ HH:MM] (UTC), varsayılan şimdi")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    parser.add_argument("--rate", type=float, default=DEFAULT_RATE, help="istek / saniye")
+    parser.add_argument("--compress", action="store_true", help="sıkıştırılmış kopyayı da güncelle")
+    args = parser.parse_args()
+
+    result = backfill(
+        args.symbol, args.interval, args.start, args.end,
+        workers=args.workers, rate=args.rate, provider=args.provider, compress=args.compress,
+        progress_callback=lambda fraction, message: print(f"  %{fraction * 100:5.1f}  {message}")
+    )
+    print(json.dumps(result, indent=2, ensure_ascii=False))
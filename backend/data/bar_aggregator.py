@@ -0,0 +1,485 @@
+# ============================================
+# BAR AGGREGATOR - İşlem Akışından Canlı Mumlar
+# ============================================
+# Canlı kullanımda yfinance'ı saatlik sorgulamak yerine mumlar işlem
+# (trade / tick) akışından kurulur. Birçok sembolün işlemleri tek
+# aggregator'a verilir; her (sembol, interval) için son N kapanmış mum
+# önceden ayrılmış dairesel NumPy tamponlarında tutulur:
+#
+# - Tampon 2N uzunluğundadır ve her mum iki kez yazılır (i ve i + N):
+#   son N mum her zaman bitişik bir dilimdir, window() kopyasız view
+#   döndürür. Anahtarlar CandleArchive.range() ile aynıdır (minutes +
+#   OHLCV), indicator_series / bar_probability_series doğrudan kullanır.
+# - Bellek sembol başına sabittir (interval sayısı x 2N x 6 x 8 byte);
+#   işlem başına dizi / liste / sözlük oluşturulmaz. İşlem sadece en küçük
+#   interval'in süren mumunu günceller; üst interval'ler (5m, 1h ...)
+#   kapanan alt mumlardan katlanır.
+# - Mum kapanınca subscribe() ile kaydedilen callback'ler çağrılır.
+#   İşlem gelmeyen dakikalar önceki kapanışla düz (hacimsiz) mum olarak
+#   kapanır; close_due() işlem beklemeden süresi dolan mumları kapatır.
+#
+# Aggregator tek bir akış thread'inden beslenir. window() view'ları bir
+# sonraki mum kapanışında üzerine yazılır: analiz kapanış callback'inde
+# yapılmalı ya da view .copy() ile saklanmalıdır.
+
+import math
+from typing import Callable, Dict, List, Sequence
+
+import numpy as np
+
+from .candle_archive import minutes_to_timestamps
+from .crypto_fetcher import INTERVAL_SECONDS
+
+# Tampon satırları (window() anahtarları: minutes + bunlar)
+PRICE_COLUMNS = ("open", "high", "low", "close", "volume")
+DEFAULT_INTERVALS = ("1m", "5m", "15m", "1h")
+DEFAULT_CAPACITY = 1000
+
+
+# ============================================
+# DAİRESEL TAMPON
+# ============================================
+
+class BarRing:
+    """
+    Son `capacity` kapanmış mum; her mum iki kez yazılır, son N mum
+    her zaman bitişik bir dilimdir.
+    """
+
+    __slots__ = ("capacity", "count", "_minutes", "_prices")
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY):
+        self.capacity = max(1, capacity)
+        self.count = 0   # toplam kapanan mum
+        self._minutes = np.zeros(2 * self.capacity, dtype=np.int64)
+        self._prices = np.zeros((5, 2 * self.capacity), dtype=np.float64)
+
+    def push(self, minute: int, open_price: float, high_price: float, low_price: float,
+             close_price: float, volume: float):
+        """Kapanan mumu yazar (yeni dizi oluşturmaz)."""
+        i = self.count % self.capacity
+        j = i + self.capacity
+        self._minutes[i] = self._minutes[j] = minute
+        prices = self._prices
+        prices[0, i] = prices[0, j] = open_price
+        prices[1, i] = prices[1, j] = high_price
+        prices[2, i] = prices[2, j] = low_price
+        prices[3, i] = prices[3, j] = close_price
+        prices[4, i] = prices[4, j] = volume
+        self.count += 1
+
+    def window(self, bars: int = None) -> Dict[str, np.ndarray]:
+        """
+        Son `bars` mum (varsayılan tümü), eskiden yeniye, kopyasız ve salt okunur.
+
+        Returns:
+        --------
+        Dict[str, np.ndarray] : minutes, open, high, low, close, volume
+        """
+        end = self.count if self.count < self.capacity else self.count % self.capacity + self.capacity
+        size = min(self.count, self.capacity)
+        start = end - (size if bars is None else max(0, min(bars, size)))
+
+        views = {"minutes": self._minutes[start:end]}
+        for row, name in enumerate(PRICE_COLUMNS):
+            views[name] = self._prices[row, start:end]
+        for view in views.values():
+            view.flags.writeable = False
+        return views
+
+    @property
+    def nbytes(self) -> int:
+        return self._minutes.nbytes + self._prices.nbytes
+
+
+# ============================================
+# SÜREN MUM
+# ============================================
+
+class _Series:
+    """Tek interval: süren mum + kapanmış mumların tamponu."""
+
+    __slots__ = ("interval", "step", "ring", "minute", "empty",
+                 "open", "high", "low", "close", "volume", "trades")
+
+    def __init__(self, interval: str, capacity: int):
+        self.interval = interval
+        self.step = INTERVAL_SECONDS[interval] // 60
+        self.ring = BarRing(capacity)
+        self.minute = -1     # süren mumun başlangıcı (epoch dakika)
+        self.empty = True    # süren mumda henüz işlem / alt mum yok
+        self.open = self.high = self.low = self.close = math.nan
+        self.volume = 0.0
+        self.trades = 0
+
+    def start(self, minute: int):
+        self.minute = minute
+        self.empty = True
+        self.volume = 0.0
+        self.trades = 0
+
+    def fold(self, open_price: float, high_price: float, low_price: float,
+             close_price: float, volume: float, trades: int):
+        """Kapanan alt interval mumunu süren muma katar."""
+        if self.empty:
+            self.open, self.high, self.low = open_price, high_price, low_price
+            self.empty = False
+        else:
+            if high_price > self.high:
+                self.high = high_price
+            if low_price < self.low:
+                self.low = low_price
+        self.close = close_price
+        self.volume += volume
+        self.trades += trades
+
+
+class _SymbolBars:
+    """Sembolün tüm interval'leri (ilki işlemlerle güncellenen taban)."""
+
+    __slots__ = ("symbol", "series", "base", "last_close", "late_trades")
+
+    def __init__(self, symbol: str, intervals: Sequence[str], capacity: int):
+        self.symbol = symbol
+        self.series = [_Series(interval, capacity) for interval in intervals]
+        self.base = self.series[0]
+        self.last_close = math.nan
+        self.late_trades = 0
+
+
+# ============================================
+# AGGREGATOR
+# ============================================
+
+class BarAggregator:
+    """
+    İşlem akışından çok sembollü, çok interval'li canlı mumlar.
+
+    Parameters:
+    -----------
+    intervals : Sequence[str]
+        Mum zaman dilimleri; hepsi en küçüğünün katı olmalı (1m, 5m, 1h ...)
+    capacity : int
+        Interval başına tutulan kapanmış mum sayısı (N)
+    """
+
+    def __init__(self, intervals: Sequence[str] = DEFAULT_INTERVALS, capacity: int = DEFAULT_CAPACITY):
+        unknown = [interval for interval in intervals if interval not in INTERVAL_SECONDS]
+        if unknown or not intervals:
+            raise ValueError(f"Desteklenmeyen interval: {', '.join(unknown)} (desteklenen: {', '.join(INTERVAL_SECONDS)})")
+
+        self.intervals = sorted(set(intervals), key=INTERVAL_SECONDS.get)
+        base = INTERVAL_SECONDS[self.intervals[0]]
+        if any(INTERVAL_SECONDS[interval] % base for interval in self.intervals):
+            raise ValueError(f"Tüm interval'ler {self.intervals[0]} katı olmalı")
+
+        self.capacity = capacity
+        self._symbols: Dict[str, _SymbolBars] = {}
+        self._subscribers: List[Callable[[Dict], None]] = []
+        self._trades = 0
+        self._bars_closed = 0
+        self._callback_errors = 0
+        self._last_callback_error = None
+
+    # ---------- Semboller ve abonelik ----------
+
+    def add_symbol(self, symbol: str) -> _SymbolBars:
+        """Sembolün tamponlarını ayırır (ilk işlemde otomatik)."""
+        state = self._symbols.get(symbol)
+        if state is None:
+            state = self._symbols[symbol] = _SymbolBars(symbol, self.intervals, self.capacity)
+        return state
+
+    def subscribe(self, callback: Callable[[Dict], None]):
+        """
+        Mum kapanışı callback'i: callback(event). event: symbol, interval,
+        minute, timestamp, open, high, low, close, volume, trades.
+        """
+        self._subscribers.append(callback)
+
+    # ---------- İşlem akışı ----------
+
+    def on_trade(self, symbol: str, time_ms: int, price: float, size: float = 0.0) -> bool:
+        """
+        Tek işlemi süren muma katar.
+
+        Parameters:
+        -----------
+        symbol : str
+            Sembol (örn. "BTC")
+        time_ms : int
+            İşlem zamanı (epoch milisaniye, UTC)
+        price, size : float
+            Fiyat ve miktar
+
+        Returns:
+        --------
+        bool : False = işlem kapanmış bir muma ait (geç geldi, sayılır ve atlanır)
+        """
+        state = self._symbols.get(symbol) or self.add_symbol(symbol)
+        base = state.base
+        minute = time_ms // 60_000
+        bucket = minute - minute % base.step
+
+        if bucket != base.minute:
+            if bucket < base.minute:
+                state.late_trades += 1
+                return False
+            self._advance(state, bucket)
+
+        if base.empty:
+            base.open = base.high = base.low = price
+            base.empty = False
+        elif price > base.high:
+            base.high = price
+        elif price < base.low:
+            base.low = price
+        base.close = price
+        base.volume += size
+        base.trades += 1
+        self._trades += 1
+        return True
+
+    def close_due(self, now_ms: int) -> int:
+        """
+        İşlem gelmese de süresi dolan mumları kapatır (zamanlayıcıdan çağrılır).
+
+        Returns:
+        --------
+        int : kapanan mum sayısı (tüm interval'ler)
+        """
+        closed = self._bars_closed
+        minute = now_ms // 60_000
+        for state in self._symbols.values():
+            base = state.base
+            bucket = minute - minute % base.step
+            if base.minute >= 0 and bucket > base.minute:
+                self._advance(state, bucket)
+        return self._bars_closed - closed
+
+    def _advance(self, state: _SymbolBars, bucket: int):
+        """Süren taban mumu ve aradaki işlemsiz mumları kapatır, yeni mumu başlatır."""
+        base = state.base
+        if base.minute >= 0:
+            self._close_base(state)
+            for minute in range(base.minute + base.step, bucket, base.step):
+                base.start(minute)
+                self._close_base(state)
+        base.start(bucket)
+
+    def _close_base(self, state: _SymbolBars, emit: bool = True):
+        """Taban mumu tampona yazar ve üst interval'lere katar."""
+        base = state.base
+        flat = base.empty
+        if flat:
+            # İşlemsiz dakika: önceki kapanışla düz mum
+            base.open = base.high = base.low = base.close = state.last_close
+        state.last_close = base.close
+        self._push(state, base, emit)
+
+        end = base.minute + base.step
+        for series in state.series[1:]:
+            if series.minute < 0 or base.minute >= series.minute + series.step:
+                # İlk üst mum akışın başladığı andan itibarendir (kısmi olabilir)
+                series.start(base.minute - base.minute % series.step)
+            if not flat:
+                series.fold(base.open, base.high, base.low, base.close, base.volume, base.trades)
+            if end == series.minute + series.step:
+                if series.empty:
+                    series.open = series.high = series.low = series.close = state.last_close
+                self._push(state, series, emit)
+                series.start(end)
+
+    def _push(self, state: _SymbolBars, series: _Series, emit: bool):
+        series.ring.push(series.minute, series.open, series.high, series.low, series.close, series.volume)
+        self._bars_closed += 1
+        if emit and self._subscribers:
+            event = {
+                "symbol": state.symbol,
+                "interval": series.interval,
+                "minute": series.minute,
+                "timestamp": minutes_to_timestamps(np.array([series.minute]))[0],
+                "open": series.open,
+                "high": series.high,
+                "low": series.low,
+                "close": series.close,
+                "volume": series.volume,
+                "trades": series.trades,
+            }
+            for callback in self._subscribers:
+                try:
+                    callback(event)
+                except Exception as e:
+                    # Akış bir abonenin hatasıyla durmaz
+                    self._callback_errors += 1
+                    self._last_callback_error = f"{type(e).__name__}: {e}"
+
+    # ---------- Geçmişle başlatma ----------
+
+    def seed(self, symbol: str, bars: Dict[str, np.ndarray]) -> int:
+        """
+        Tamponları taban interval geçmişiyle doldurur (callback çağrılmaz).
+
+        bars: minutes + OHLCV dizileri, en küçük interval'de ve sıralı (örn.
+        CandleArchive.tail("BTC", "1m", 1000)). Canlı işlemlerden önce
+        çağrılmalı; akış son mumdan devam eder.
+
+        Returns:
+        --------
+        int : katlanan mum sayısı
+        """
+        state = self.add_symbol(symbol)
+        base = state.base
+        minutes = np.asarray(bars["minutes"], dtype=np.int64)
+        # Üst interval tamponları için gereken kadar taban mum
+        keep = self.capacity * state.series[-1].step // base.step
+        start = max(0, minutes.size - keep)
+        columns = [np.asarray(bars[name], dtype=np.float64)[start:].tolist() for name in PRICE_COLUMNS]
+
+        seeded = 0
+        for minute, open_price, high_price, low_price, close_price, volume in zip(minutes[start:].tolist(), *columns):
+            if minute - minute % base.step <= base.minute:
+                continue
+            base.start(minute - minute % base.step)
+            base.open, base.high, base.low, base.close = open_price, high_price, low_price, close_price
+            base.volume, base.empty = volume, False
+            self._close_base(state, emit=False)
+            seeded += 1
+
+        if seeded:
+            base.start(base.minute + base.step)
+        return seeded
+
+    # ---------- Okuma ----------
+
+    def window(self, symbol: str, interval: str, bars: int = None) -> Dict[str, np.ndarray]:
+        """
+        Son kapanmış mumlar, kopyasız view (indicator_series /
+        bar_probability_series girdisi). Bir sonraki kapanışta üzerine
+        yazılır; saklanacaksa .copy().
+
+        Returns:
+        --------
+        Dict[str, np.ndarray] : minutes, open, high, low, close, volume
+            (sembol / interval yoksa {})
+        """
+        state = self._symbols.get(symbol)
+        if state is None or interval not in self.intervals:
+            return {}
+        return state.series[self.intervals.index(interval)].ring.window(bars)
+
+    def forming(self, symbol: str, interval: str) -> Dict:
+        """Süren (henüz kapanmamış) mum."""
+        state = self._symbols.get(symbol)
+        if state is None or interval not in self.intervals:
+            return {}
+        series = state.series[self.intervals.index(interval)]
+        if series.minute < 0:
+            return {}
+
+        # Üst interval: katlanmış alt mumlar + taban interval'in süren mumu
+        base = state.base
+        values = [series.open, series.high, series.low, series.close, series.volume, series.trades]
+        if series is not base and not base.empty:
+            if series.empty:
+                values = [base.open, base.high, base.low, base.close, base.volume, base.trades]
+            else:
+                values = [values[0], max(values[1], base.high), min(values[2], base.low), base.close,
+                          values[4] + base.volume, values[5] + base.trades]
+        elif series.empty and base.empty:
+            return {"timestamp": minutes_to_timestamps(np.array([series.minute]))[0], "trades": 0}
+
+        return {
+            "timestamp": minutes_to_timestamps(np.array([series.minute]))[0],
+            **dict(zip(("open", "high", "low", "close", "volume", "trades"), values))
+        }
+
+    def stats(self) -> Dict:
+        """Sembol, işlem, kapanan mum ve bellek sayaçları."""
+        nbytes = sum(series.ring.nbytes for state in self._symbols.values() for series in state.series)
+        return {
+            "symbols": len(self._symbols),
+            "intervals": self.intervals,
+            "capacity": self.capacity,
+            "trades": self._trades,
+            "late_trades": sum(state.late_trades for state in self._symbols.values()),
+            "bars_closed": self._bars_closed,
+            "callback_errors": self._callback_errors,
+            "last_callback_error": self._last_callback_error,
+            "memory_bytes": nbytes,
+            "memory_bytes_per_symbol": nbytes // len(self._symbols) if self._symbols else 0,
+        }
+
+
+# Test
+if __name__ == "__main__":
+    import time
+    import tracemalloc
+
+    from analysis.indicators import indicator_series
+
+    symbols = ["BTC", "ETH", "SOL", "XRP", "BNB", "ADA", "DOGE", "AVAX"]
+    trades_per_symbol = 250_000
+    rng = np.random.default_rng(7)
+
+    # Sembol başına ~3 gün, dakikada ~58 işlem; bazı dakikalarda hiç işlem yok
+    start_ms = 1_704_067_200_000
+    times = np.sort(rng.integers(0, 3 * 86_400_000, size=trades_per_symbol)) + start_ms
+    times = times[(times // 60_000) % 97 != 5]
+    prices = 40_000 * np.exp(np.cumsum(rng.normal(0, 2e-4, size=times.size)))
+    sizes = rng.exponential(0.1, size=times.size)
+    stream = list(zip(times.tolist(), prices.tolist(), sizes.tolist()))
+
+    aggregator = BarAggregator(capacity=1000)
+    closes = {}
+    aggregator.subscribe(lambda event: closes.__setitem__(event["interval"], closes.get(event["interval"], 0) + 1))
+    for symbol in symbols:
+        aggregator.add_symbol(symbol)
+
+    started = time.perf_counter()
+    on_trade = aggregator.on_trade
+    for symbol in symbols:
+        for time_ms, price, size in stream:
+            on_trade(symbol, time_ms, price, size)
+    elapsed = time.perf_counter() - started
+
+    # Aynı akış 3 gün sonrası için tekrar: tamponlar dolu, bellek artmamalı
+    later = [(time_ms + 3 * 86_400_000, price, size) for time_ms, price, size in stream[:50_000]]
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    for time_ms, price, size in later:
+        on_trade("ETH", time_ms, price, size)
+    growth = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    aggregator.close_due(int(times[-1]) + 60_000)
+
+    # Referans: aynı işlemlerden NumPy ile 5m mumlar
+    minutes = times // 60_000
+    buckets = minutes - minutes % 5
+    first = np.r_[0, np.flatnonzero(np.diff(buckets)) + 1]
+    reference = {
+        "minutes": buckets[first],
+        "open": prices[first],
+        "high": np.maximum.reduceat(prices, first),
+        "low": np.minimum.reduceat(prices, first),
+        "close": prices[np.r_[first[1:] - 1, prices.size - 1]],
+        "volume": np.add.reduceat(sizes, first),
+    }
+    window = aggregator.window("BTC", "5m")
+    matched = np.isin(window["minutes"], reference["minutes"])
+    positions = np.searchsorted(reference["minutes"], window["minutes"][matched])
+    equal = all(np.allclose(window[name][matched], reference[name][positions]) for name in reference)
+
+    stats = aggregator.stats()
+    print("=" * 50)
+    print("  BAR AGGREGATOR")
+    print("=" * 50)
+    print(f"  {len(stream) * len(symbols):,} işlem, {len(symbols)} sembol: {elapsed:.2f} sn "
+          f"({len(stream) * len(symbols) / elapsed:,.0f} işlem/sn)")
+    print(f"  Kapanan mum: {closes}")
+    print(f"  Sembol başına bellek: {stats['memory_bytes_per_symbol'] / 1024:.0f} KB, "
+          f"akış sırasında bellek artışı: {growth} byte")
+    print(f"  5m pencere referansla aynı: {equal}, kopyasız: {window['close'].base is not None}")
+
+    series = indicator_series(aggregator.window("BTC", "1m"))
+    print(f"  1m RSI (son kapanış): {series['RSI'][-1]:.2f}, süren 1h: {aggregator.forming('BTC', '1h')}")
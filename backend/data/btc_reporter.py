@@ -8,7 +8,11 @@ import pandas as pd
 from datetime import datetime, timedelta
 from typing import Dict, List
 
-def get_btc_candles(hours: int = 24, interval: str = "1h") -> Dict:
+from .shared_cache import shared, CANDLE_TTL_SECONDS
+from .crypto_fetcher import check_candles, get_crypto_candles, CANDLE_PROVIDER
+
+@shared("btc_candles", CANDLE_TTL_SECONDS)
+def get_btc_candles(hours: int = 24, interval: str = "1h", provider: str = None) -> Dict:
     """
     Bitcoin'in son X saatlik mum verilerini çeker.
     
@@ -20,10 +24,21 @@ def get_btc_candles(hours: int = 24, interval: str = "1h") -> Dict:
     interval : str
         Mum zaman dilimi: "1h", "15m", "4h", "1d" vs.
     
+    provider : str
+        "yfinance" veya "ccxt" (varsayılan: CANDLE_PROVIDER)
+    
     Döndürür:
     ---------
     Dict : Mum verileri ve analiz
     """
+    # yfinance dışındaki kaynaklar crypto_fetcher'ın sağlayıcı seçiminden geçer
+    provider = provider or CANDLE_PROVIDER
+    if provider != "yfinance":
+        result = get_crypto_candles("BTC", hours=hours, interval=interval, provider=provider)
+        if result.get("success"):
+            result.setdefault("provider", provider)
+        return result
+    
     try:
         # BTC-USD verisini çek
         btc = yf.Ticker("BTC-USD")
@@ -34,9 +49,6 @@ def get_btc_candles(hours: int = 24, interval: str = "1h") -> Dict:
         if df.empty:
             return {"success": False, "error": "Veri alınamadı"}
         
-        # Son X saatlik veriyi al
-        df = df.tail(hours)
-        
         # Mum listesi oluştur
         candles = []
         for idx, row in df.iterrows():
@@ -74,6 +86,10 @@ def get_btc_candles(hours: int = 24, interval: str = "1h") -> Dict:
                 "change_percent": round(change_percent, 2)
             })
         
+        # Eksik/tekrar eden mumlar düzeltilir, sonra son X saatlik veri alınır
+        candles, quality = check_candles(candles, "BTC-USD", interval, window_bars=hours)
+        candles = candles[-hours:]
+        
         # Genel istatistikler
         total_green = sum(1 for c in candles if c['type'] == "YESIL")
         total_red = sum(1 for c in candles if c['type'] == "KIRMIZI")
@@ -100,6 +116,7 @@ def get_btc_candles(hours: int = 24, interval: str = "1h") -> Dict:
             "success": True,
             "symbol": "BTC/USD",
             "interval": interval,
+            "provider": provider,
             "period_hours": hours,
             "generated_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
             
@@ -114,6 +131,7 @@ def get_btc_candles(hours: int = 24, interval: str = "1h") -> Dict:
                 "current_price": last_close
             },
             
+            "quality": quality,
             "candles": candles
         }
         
@@ -0,0 +1,433 @@
+# ============================================
+# CANDLE ARCHIVE - Bellek Eşlemeli Mum Arşivi
+# ============================================
+# Yıllarca 1m/5m veri her process'in belleğine sığmaz. Arşiv her
+# (sembol, interval) için sabit genişlikli kolon dosyaları tutar:
+#
+#   archive/BTC/5m/minutes.bin   int64   epoch dakika (sıralı, tekrar yok)
+#   archive/BTC/5m/open.bin      float64
+#   archive/BTC/5m/high.bin ...  float64
+#   archive/BTC/5m/meta.json     geçerli mum sayısı (count), nesil
+#
+# - Okuma np.memmap (mode='r') ile: dosyalar işletim sisteminin sayfa
+#   cache'inden paylaşılır, N process aynı sayfaları tek kopya kullanır.
+# - range() zaman aralığını minutes kolonunda ikili arama ile bulur ve
+#   kopyasız (zero-copy) NumPy view'ları döndürür. Anahtarlar
+#   indicator_series / probability_series / session_range_arrays ile aynı.
+# - Yazma sadece sona ekleme: önce kolonlar, en son meta.json (atomik
+#   os.replace). Okuyucular sadece count kadarını görür, yarım kalmış
+#   yazma görünmez ve bir sonraki append'de kırpılır.
+# - Geçmişe mum ekleme (merge, örn. backfill) seriyi yeni nesil dosyalara
+#   (open.1.bin ...) yazar ve meta.json ile tek adımda geçer; açık
+#   memmap'ler eski nesli okumaya devam eder.
+
+import fcntl
+import json
+import os
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Union
+
+import numpy as np
+
+from common.session_calendar import parse_timestamps
+
+# Arşiv klasörü (SHARED_CACHE_PATH gibi ortam değişkeniyle değiştirilebilir)
+ARCHIVE_DIR = os.environ.get(
+    "CANDLE_ARCHIVE_PATH",
+    os.path.join(os.path.dirname(__file__), "archive")
+)
+
+# Kolonlar ve sabit genişlikli tipleri
+COLUMNS = {
+    "minutes": np.dtype(np.int64),
+    "open": np.dtype(np.float64),
+    "high": np.dtype(np.float64),
+    "low": np.dtype(np.float64),
+    "close": np.dtype(np.float64),
+    "volume": np.dtype(np.float64),
+}
+
+FORMAT_VERSION = 1
+
+Timestamp = Union[int, str, None]
+
+
+def _to_minute(value: Timestamp) -> Optional[int]:
+    """Epoch dakika veya "YYYY-MM-DD[ HH:MM]" → epoch dakika."""
+    if value is None or isinstance(value, (int, np.integer)):
+        return value
+    return int(parse_timestamps([str(value).replace(" ", "T")])[0])
+
+
+def minutes_to_timestamps(minutes: np.ndarray) -> List[str]:
+    """Epoch dakika → "YYYY-MM-DD HH:MM" (UTC)."""
+    return [ts.replace("T", " ") for ts in np.datetime_as_string(np.asarray(minutes).astype('datetime64[m]'))]
+
+
+def _arrays_from_candles(candles: List[Dict]) -> Dict[str, np.ndarray]:
+    """Mum listesini arşiv kolonlarına çevirir."""
+    n = len(candles)
+    arrays = {"minutes": parse_timestamps([c['timestamp'] for c in candles])}
+    for key in ("open", "high", "low", "close", "volume"):
+        arrays[key] = np.fromiter((c.get(key, 0) or 0 for c in candles), dtype=np.float64, count=n)
+    return arrays
+
+
+def _sorted_unique(arrays: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """Zamana göre sıralar; aynı zamanlı mumlardan sonuncusunu tutar."""
+    minutes = arrays["minutes"]
+    order = np.argsort(minutes, kind='stable')
+    minutes = minutes[order]
+    keep = np.r_[minutes[1:] != minutes[:-1], True] if minutes.size else np.zeros(0, dtype=bool)
+    return {name: values[order][keep] for name, values in arrays.items()}
+
+
+def _column_file(folder: str, name: str, generation: int = 0) -> str:
+    """Kolon dosyası (ilk nesil: open.bin, sonrakiler: open.<nesil>.bin)."""
+    return os.path.join(folder, f"{name}.bin" if not generation else f"{name}.{generation}.bin")
+
+
+class CandleArchive:
+    """
+    (sembol, interval) başına memmap kolon dosyaları.
+
+    Kullanım:
+        archive = CandleArchive()
+        archive.append("BTC", "5m", candles)
+        bars = archive.range("BTC", "5m", "2023-01-01", "2024-01-01")
+        series = indicator_series(bars)     # kopya yok
+    """
+
+    def __init__(self, root: str = None):
+        self.root = root or ARCHIVE_DIR
+        self._lock = threading.Lock()
+        # (sembol, interval) → (meta sürümü, count, {kolon: memmap})
+        self._maps: Dict[tuple, tuple] = {}
+
+    # ----------------------------------------
+    # Dosya düzeni
+    # ----------------------------------------
+
+    def _dir(self, symbol: str, interval: str) -> str:
+        return os.path.join(self.root, symbol.upper(), interval)
+
+    def _meta_path(self, symbol: str, interval: str) -> str:
+        return os.path.join(self._dir(symbol, interval), "meta.json")
+
+    def _read_meta(self, symbol: str, interval: str) -> Optional[Dict]:
+        try:
+            with open(self._meta_path(symbol, interval)) as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def _write_meta(self, symbol: str, interval: str, meta: Dict):
+        path = self._meta_path(symbol, interval)
+        temp = f"{path}.{os.getpid()}.tmp"
+        with open(temp, "w") as f:
+            json.dump(meta, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp, path)
+
+    # ----------------------------------------
+    # Okuma
+    # ----------------------------------------
+
+    def columns(self, symbol: str, interval: str) -> Dict[str, np.ndarray]:
+        """
+        Serinin tüm kolonları (salt okunur memmap'ler, arşiv yoksa boş diziler).
+
+        Harita process başına bir kez açılır; meta.json değişince (append)
+        yeniden açılır.
+        """
+        key = (symbol.upper(), interval)
+        try:
+            stat = os.stat(self._meta_path(symbol, interval))
+            version = (stat.st_ino, stat.st_mtime_ns)
+        except FileNotFoundError:
+            return {name: np.zeros(0, dtype=dtype) for name, dtype in COLUMNS.items()}
+
+        with self._lock:
+            cached = self._maps.get(key)
+            if cached and cached[0] == version:
+                return dict(cached[2])
+
+        meta = self._read_meta(symbol, interval) or {"count": 0}
+        count = int(meta["count"])
+        folder = self._dir(symbol, interval)
+        generation = meta.get("generation", 0)
+        maps = {
+            name: (np.memmap(_column_file(folder, name, generation), dtype=dtype, mode='r', shape=(count,))
+                   if count else np.zeros(0, dtype=dtype))
+            for name, dtype in COLUMNS.items()
+        }
+
+        with self._lock:
+            self._maps[key] = (version, count, maps)
+        return dict(maps)
+
+    def range(self, symbol: str, interval: str, start: Timestamp = None, end: Timestamp = None) -> Dict[str, np.ndarray]:
+        """
+        [start, end) aralığındaki mumlar, kopyasız view olarak.
+
+        Parameters:
+        -----------
+        symbol, interval : str
+            Seri (örn. "BTC", "5m")
+        start, end : int veya str
+            Epoch dakika veya "YYYY-MM-DD[ HH:MM]" (UTC); None = sınırsız
+
+        Returns:
+        --------
+        Dict[str, np.ndarray] : minutes, open, high, low, close, volume
+            (salt okunur; değiştirmek için .copy())
+        """
+        data = self.columns(symbol, interval)
+        minutes = data["minutes"]
+        start, end = _to_minute(start), _to_minute(end)
+
+        lo = 0 if start is None else int(np.searchsorted(minutes, start, side='left'))
+        hi = minutes.size if end is None else int(np.searchsorted(minutes, end, side='left'))
+        hi = max(lo, hi)
+        return {name: column[lo:hi] for name, column in data.items()}
+
+    def tail(self, symbol: str, interval: str, bars: int) -> Dict[str, np.ndarray]:
+        """Son `bars` mum (kopyasız)."""
+        data = self.columns(symbol, interval)
+        return {name: column[-bars:] if bars else column[:0] for name, column in data.items()}
+
+    def candles(self, symbol: str, interval: str, start: Timestamp = None, end: Timestamp = None) -> List[Dict]:
+        """
+        Aralıktaki mumlar mum listesi olarak (dict bekleyen analizler için).
+
+        Bu bir kopyadır; uzun aralıklarda range() tercih edilmeli.
+        """
+        data = self.range(symbol, interval, start, end)
+        timestamps = minutes_to_timestamps(data["minutes"])
+        columns = [data[key].tolist() for key in ("open", "high", "low", "close", "volume")]
+        return [
+            {"timestamp": ts, "open": o, "high": h, "low": l, "close": c, "volume": v}
+            for ts, o, h, l, c, v in zip(timestamps, *columns)
+        ]
+
+    def last_minute(self, symbol: str, interval: str) -> Optional[int]:
+        """Serideki son mumun epoch dakikası (boşsa None)."""
+        meta = self._read_meta(symbol, interval)
+        return meta.get("last") if meta and meta.get("count") else None
+
+    # ----------------------------------------
+    # Yazma
+    # ----------------------------------------
+
+    def append(self, symbol: str, interval: str, candles: Union[List[Dict], Dict[str, np.ndarray]]) -> Dict:
+        """
+        Mumları serinin sonuna ekler.
+
+        Sadece arşivdeki son mumdan yeni olanlar eklenir (arşiv yalnızca
+        büyür); gelen parti kendi içinde sıralanır, aynı zamanlı mumlardan
+        sonuncusu tutulur. Aynı seriye yazan process'ler dosya kilidiyle
+        sıraya girer.
+
+        Parameters:
+        -----------
+        candles : List[Dict] veya Dict[str, np.ndarray]
+            Mum listesi ya da range() ile aynı anahtarlı kolonlar
+
+        Returns:
+        --------
+        Dict : success, appended, bars (serideki toplam mum)
+        """
+        arrays = self._normalize(candles)
+        if "error" in arrays:
+            return {"success": False, "error": arrays["error"]}
+
+        folder = self._dir(symbol, interval)
+        os.makedirs(folder, exist_ok=True)
+
+        with self._series_lock(folder):
+            meta = self._read_meta(symbol, interval) or self._new_meta(symbol, interval)
+            count = int(meta["count"])
+            generation = meta.get("generation", 0)
+
+            if count:
+                new = arrays["minutes"] > meta["last"]
+                arrays = {name: values[new] for name, values in arrays.items()}
+
+            appended = int(arrays["minutes"].size)
+            if appended:
+                for name, dtype in COLUMNS.items():
+                    with open(_column_file(folder, name, generation), "ab") as f:
+                        # Yarım kalmış önceki yazmayı kırp
+                        f.truncate(count * dtype.itemsize)
+                        f.write(np.ascontiguousarray(arrays[name], dtype=dtype).tobytes())
+                        f.flush()
+                        os.fsync(f.fileno())
+
+                if meta["first"] is None:
+                    meta["first"] = int(arrays["minutes"][0])
+                meta["last"] = int(arrays["minutes"][-1])
+                meta["count"] = count + appended
+                self._write_meta(symbol, interval, meta)
+
+        return {"success": True, "appended": appended, "bars": count + appended}
+
+    def merge(self, symbol: str, interval: str, candles: Union[List[Dict], Dict[str, np.ndarray]]) -> Dict:
+        """
+        Mumları seriye zaman sırasına göre katar (geçmişe ekleme dahil).
+
+        Hepsi son mumdan yeniyse append() ile aynıdır. Aksi halde seri yeni
+        nesil dosyalara yeniden yazılır; arşivde zaten olan zamanlar
+        korunur (gelen mum atlanır).
+
+        Returns:
+        --------
+        Dict : success, added (yeni zamanlar), bars
+        """
+        arrays = self._normalize(candles)
+        if "error" in arrays:
+            return {"success": False, "error": arrays["error"]}
+        if not arrays["minutes"].size:
+            return {"success": True, "added": 0, "bars": int((self._read_meta(symbol, interval) or {}).get("count", 0))}
+
+        # Arşivde zaten olan zamanlar atlanır
+        existing_minutes = self.columns(symbol, interval)["minutes"]
+        if existing_minutes.size:
+            position = np.clip(np.searchsorted(existing_minutes, arrays["minutes"]), 0, existing_minutes.size - 1)
+            new = existing_minutes[position] != arrays["minutes"]
+            arrays = {name: values[new] for name, values in arrays.items()}
+            if not arrays["minutes"].size:
+                return {"success": True, "added": 0, "bars": int(existing_minutes.size)}
+
+        last = self.last_minute(symbol, interval)
+        if last is None or arrays["minutes"][0] > last:
+            result = self.append(symbol, interval, arrays)
+            return {"success": result["success"], "added": result.get("appended", 0), "bars": result.get("bars", 0)}
+
+        folder = self._dir(symbol, interval)
+        with self._series_lock(folder):
+            meta = self._read_meta(symbol, interval)
+            count, generation = int(meta["count"]), meta.get("generation", 0)
+            existing = {
+                name: np.fromfile(_column_file(folder, name, generation), dtype=dtype, count=count)
+                for name, dtype in COLUMNS.items()
+            }
+            # Önce gelenler, sonra mevcutlar: aynı zamanda mevcut mum kalır
+            merged = _sorted_unique({
+                name: np.concatenate([arrays[name], existing[name]]) for name in COLUMNS
+            })
+
+            new_generation = generation + 1
+            for name, dtype in COLUMNS.items():
+                with open(_column_file(folder, name, new_generation), "wb") as f:
+                    f.write(np.ascontiguousarray(merged[name], dtype=dtype).tobytes())
+                    f.flush()
+                    os.fsync(f.fileno())
+
+            total = int(merged["minutes"].size)
+            meta.update({
+                "generation": new_generation, "count": total,
+                "first": int(merged["minutes"][0]), "last": int(merged["minutes"][-1])
+            })
+            self._write_meta(symbol, interval, meta)
+
+            # Eski nesil silinir (açık memmap'ler dosya kapanana kadar okumaya devam eder)
+            for name in COLUMNS:
+                try:
+                    os.remove(_column_file(folder, name, generation))
+                except FileNotFoundError:
+                    pass
+
+        return {"success": True, "added": total - count, "bars": total}
+
+    def _normalize(self, candles) -> Dict[str, np.ndarray]:
+        """Mum listesi / kolonlar → sıralı, tekrarsız arşiv kolonları (hata: {"error"})."""
+        try:
+            arrays = _arrays_from_candles(candles) if isinstance(candles, list) else {
+                name: np.asarray(candles[name], dtype=dtype) for name, dtype in COLUMNS.items()
+            }
+        except (KeyError, ValueError) as e:
+            return {"error": f"Geçersiz mum verisi: {e}"}
+        return _sorted_unique(arrays)
+
+    def _new_meta(self, symbol: str, interval: str) -> Dict:
+        return {
+            "symbol": symbol.upper(), "interval": interval, "version": FORMAT_VERSION,
+            "columns": {name: dtype.str for name, dtype in COLUMNS.items()},
+            "generation": 0, "count": 0, "first": None, "last": None
+        }
+
+    @contextmanager
+    def _series_lock(self, folder: str):
+        """Aynı seriye yazan process'ler arası kilit."""
+        with open(os.path.join(folder, ".lock"), "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            yield
+
+    # ----------------------------------------
+    # Bilgi
+    # ----------------------------------------
+
+    def series(self) -> List[Dict]:
+        """Arşivdeki tüm seriler: sembol, interval, mum sayısı, aralık, boyut."""
+        result = []
+        if not os.path.isdir(self.root):
+            return result
+
+        for symbol in sorted(os.listdir(self.root)):
+            symbol_dir = os.path.join(self.root, symbol)
+            if not os.path.isdir(symbol_dir):
+                continue
+            for interval in sorted(os.listdir(symbol_dir)):
+                meta = self._read_meta(symbol, interval)
+                if not meta:
+                    continue
+                count = int(meta["count"])
+                result.append({
+                    "symbol": symbol,
+                    "interval": interval,
+                    "bars": count,
+                    "first": minutes_to_timestamps([meta["first"]])[0] if count else None,
+                    "last": minutes_to_timestamps([meta["last"]])[0] if count else None,
+                    "size_mb": round(count * sum(d.itemsize for d in COLUMNS.values()) / 1e6, 2)
+                })
+        return result
+
+
+# Uygulama genelinde paylaşılan arşiv
+candle_archive = CandleArchive()
+
+
+# Test
+if __name__ == "__main__":
+    import tempfile
+    import time
+
+    archive = CandleArchive(tempfile.mkdtemp(prefix="candle_archive_"))
+
+    # 2 yıl 5m mum (~210k)
+    n = 2 * 365 * 288
+    start = np.datetime64('2023-01-01T00:00', 'm').astype(np.int64)
+    closes = 30000 * np.exp(np.cumsum(np.random.normal(0, 0.001, n)))
+    opens = np.r_[closes[0], closes[:-1]]
+    bars = {
+        "minutes": start + np.arange(n) * 5,
+        "open": opens,
+        "high": np.maximum(opens, closes) * 1.0005,
+        "low": np.minimum(opens, closes) * 0.9995,
+        "close": closes,
+        "volume": np.ones(n),
+    }
+
+    started = time.perf_counter()
+    print(archive.append("BTC", "5m", {k: v[:n // 2] for k, v in bars.items()}))
+    print(archive.append("BTC", "5m", {k: v[n // 4:] for k, v in bars.items()}))   # çakışan kısım atlanır
+    print(f"Yazma: {time.perf_counter() - started:.2f} sn")
+
+    started = time.perf_counter()
+    year = archive.range("BTC", "5m", "2024-01-01", "2025-01-01")
+    print(f"2024: {year['close'].size} mum, {(time.perf_counter() - started) * 1000:.2f} ms, "
+          f"memmap={isinstance(year['close'], np.memmap)}")
+    print(archive.candles("BTC", "5m", "2024-06-01 12:00", "2024-06-01 12:15"))
+    print(archive.series())
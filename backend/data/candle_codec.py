@@ -0,0 +1,469 @@
+# ============================================
+# CANDLE CODEC - Sıkıştırılmış Mum Dosyası
+# ============================================
+# Yıllarca 1m float64 OHLCV (8 kripto) onlarca GB tutar. Bu format mumları
+# bloklar halinde sıkıştırır:
+#
+# - Zaman: epoch dakika farkları (sabit interval → tekrar eden küçük sayı)
+# - Fiyat: tick ölçekli tamsayı (10^decimals), close önceki close'a göre,
+#   open önceki close'a göre, high/low mum gövdesine göre fark
+# - Farklar zigzag ile işaretsiz sayıya çevrilir ve blok içindeki en
+#   büyük değere yetecek en dar tipte (uint8/16/32/64) saklanır
+# - Her kolon byte-shuffle (önce tüm düşük byte'lar, sonra yüksekler)
+#   + zlib ile sıkıştırılır; zlib %10'dan az kazandırıyorsa ham saklanır
+#   (gürültülü kolonlarda çözme maliyeti sıfır)
+#
+# Blok indeksi (ilk/son dakika, offset) yan dosyadadır: zaman aralığı
+# okuması sadece kesişen blokları açar. Çözme tamamen vektörel
+# (np.frombuffer + cumsum), mum başına Python döngüsü yok.
+#
+# Dosya düzeni:
+#   candles.fxc     : MAGIC | blok 1 | blok 2 | ...   (sadece eklenir)
+#   candles.fxc.idx : indeks (json), geçici dosya + os.replace ile yazılır
+#
+# Çökme güvenliği (candle_archive'daki meta.json ile aynı): bloklar önce
+# yazılıp fsync edilir, indeks en son atomik olarak değişir. Yarıda kalan
+# ekleme eski indeksi bozmaz; indeksin dışındaki yarım kuyruk bir sonraki
+# eklemede kesilir.
+#
+# compress_series arşivdeki seriyi sıkıştırılmış kopyaya taşır; backfill
+# compress=True ile (iş parametresi / --compress) doldurmadan sonra çağırır.
+
+import json
+import os
+import struct
+import zlib
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from .candle_archive import ARCHIVE_DIR, CandleArchive, candle_archive, _to_minute, Timestamp
+
+MAGIC = b"FXCC0002"
+FORMAT_VERSION = 2
+INDEX_SUFFIX = ".idx"
+
+# Blok başına mum sayısı (1m için ~45 gün)
+BLOCK_BARS = 65536
+
+# zlib seviyesi (6: boyut / hız dengesi)
+COMPRESSION_LEVEL = 6
+
+# Bundan az sıkışan kolonlar ham saklanır (sıkıştırılmış / ham)
+MAX_COMPRESSED_RATIO = 0.9
+
+# Varsayılan ölçekler (crypto_fetcher fiyatları 4, hacmi 2 haneye yuvarlar)
+PRICE_DECIMALS = 4
+VOLUME_DECIMALS = 2
+
+COLUMNS = ("minutes", "open", "high", "low", "close", "volume")
+
+# Dar tip kodları
+_UINT_TYPES = (np.dtype('<u1'), np.dtype('<u2'), np.dtype('<u4'), np.dtype('<u8'))
+
+_BLOCK_HEADER = struct.Struct("<IqqB")     # mum sayısı, ilk dakika, ilk close, kolon sayısı
+_COLUMN_HEADER = struct.Struct("<BI")      # tip kodu (+ RAW_FLAG), uzunluk
+RAW_FLAG = 0x80
+
+
+def compressed_path(symbol: str, interval: str) -> str:
+    """Serinin arşivdeki sıkıştırılmış dosyası."""
+    return os.path.join(ARCHIVE_DIR, symbol.upper(), interval, "candles.fxc")
+
+
+# ============================================
+# KODLAMA
+# ============================================
+
+def _zigzag(values: np.ndarray) -> np.ndarray:
+    """İşaretli → işaretsiz (0, -1, 1, -2 ... → 0, 1, 2, 3 ...)."""
+    return ((values << 1) ^ (values >> 63)).view(np.uint64)
+
+
+def _unzigzag(values: np.ndarray) -> np.ndarray:
+    """_zigzag'in tersi (int64, yerinde)."""
+    sign = values & 1
+    np.negative(sign, out=sign)
+    values >>= 1
+    values ^= sign
+    return values
+
+
+def _pack_column(values: np.ndarray) -> bytes:
+    """Zigzag'lenmiş kolonu en dar tipte, byte-shuffle + zlib ile paketler."""
+    peak = int(values.max()) if values.size else 0
+    code = next(i for i, dtype in enumerate(_UINT_TYPES) if peak <= np.iinfo(dtype).max)
+    narrow = values.astype(_UINT_TYPES[code])
+    shuffled = narrow.view(np.uint8).reshape(-1, narrow.itemsize).T.tobytes()
+
+    payload = zlib.compress(shuffled, COMPRESSION_LEVEL)
+    if len(payload) > len(shuffled) * MAX_COMPRESSED_RATIO:
+        payload, code = shuffled, code | RAW_FLAG
+    return _COLUMN_HEADER.pack(code, len(payload)) + payload
+
+
+def _unpack_column(buffer: memoryview, offset: int, count: int) -> tuple:
+    """(zigzag değerleri int64, yeni offset)."""
+    code, length = _COLUMN_HEADER.unpack_from(buffer, offset)
+    offset += _COLUMN_HEADER.size
+    payload = buffer[offset:offset + length]
+    if not code & RAW_FLAG:
+        payload = zlib.decompress(payload)
+    width = _UINT_TYPES[code & ~RAW_FLAG].itemsize
+
+    # Byte düzlemlerinden int64'e: değer = Σ düzlem[k] << 8k
+    planes = np.frombuffer(payload, dtype=np.uint8, count=count * width).reshape(width, count)
+    values = planes[0].astype(np.int64)
+    for k in range(1, width):
+        values |= planes[k].astype(np.int64) << (8 * k)
+    return values, offset + length
+
+
+def _scaled(values: np.ndarray, decimals: int) -> np.ndarray:
+    """Ondalık değerleri tick ölçekli tamsayıya çevirir."""
+    return np.rint(np.asarray(values, dtype=np.float64) * 10 ** decimals).astype(np.int64)
+
+
+def encode_block(bars: Dict[str, np.ndarray], price_decimals: int = PRICE_DECIMALS,
+                 volume_decimals: int = VOLUME_DECIMALS) -> bytes:
+    """
+    Tek bloğu kodlar.
+
+    bars: minutes + OHLCV dizileri (zaman sıralı, CandleArchive.range() ile aynı anahtarlar)
+    """
+    minutes = np.asarray(bars["minutes"], dtype=np.int64)
+    opens, highs = _scaled(bars["open"], price_decimals), _scaled(bars["high"], price_decimals)
+    lows, closes = _scaled(bars["low"], price_decimals), _scaled(bars["close"], price_decimals)
+    volumes = _scaled(bars["volume"], volume_decimals)
+    n = minutes.size
+
+    previous_close = np.r_[closes[:1], closes[:-1]]
+    body_high = np.maximum(opens, closes)
+    body_low = np.minimum(opens, closes)
+
+    columns = (
+        np.diff(minutes, prepend=minutes[:1]),   # zaman farkı
+        opens - previous_close,                  # açılış boşluğu
+        highs - body_high,                       # üst fitil
+        body_low - lows,                         # alt fitil
+        np.diff(closes, prepend=closes[:1]),     # kapanış farkı
+        np.diff(volumes, prepend=0),             # hacim farkı
+    )
+
+    header = _BLOCK_HEADER.pack(n, int(minutes[0]), int(closes[0]), len(columns))
+    return header + b"".join(_pack_column(_zigzag(column)) for column in columns)
+
+
+def _empty(n: int) -> Dict[str, np.ndarray]:
+    return {name: np.empty(n, dtype=np.int64 if name == "minutes" else np.float64) for name in COLUMNS}
+
+
+def decode_block(buffer, price_decimals: int = PRICE_DECIMALS, volume_decimals: int = VOLUME_DECIMALS,
+                 out: Dict[str, np.ndarray] = None) -> Dict[str, np.ndarray]:
+    """
+    encode_block'un tersi: minutes (int64) + OHLCV (float64).
+
+    out verilirse sonuç bu dizilere yazılır (range() tüm blokları tek
+    seferde ayrılmış dizilere çözer, birleştirme kopyası olmaz).
+    """
+    buffer = memoryview(buffer)
+    n, first_minute, first_close, column_count = _BLOCK_HEADER.unpack_from(buffer, 0)
+    offset = _BLOCK_HEADER.size
+    out = _empty(n) if out is None else out
+
+    deltas = []
+    for _ in range(column_count):
+        values, offset = _unpack_column(buffer, offset, n)
+        deltas.append(_unzigzag(values))
+    minute_step, gap, upper_wick, lower_wick, close_step, volume_step = deltas
+
+    minutes = np.cumsum(minute_step, out=minute_step)
+    minutes += first_minute
+    out["minutes"][:] = minutes
+
+    closes = np.cumsum(close_step, out=close_step)
+    closes += first_close
+    gap[0] += closes[0]
+    gap[1:] += closes[:-1]
+    opens = gap
+
+    upper_wick += np.maximum(opens, closes)
+    lower_wick -= np.minimum(opens, closes)
+    np.negative(lower_wick, out=lower_wick)
+
+    price_scale = 10.0 ** price_decimals
+    np.divide(opens, price_scale, out=out["open"])
+    np.divide(upper_wick, price_scale, out=out["high"])
+    np.divide(lower_wick, price_scale, out=out["low"])
+    np.divide(closes, price_scale, out=out["close"])
+    np.divide(np.cumsum(volume_step, out=volume_step), 10.0 ** volume_decimals, out=out["volume"])
+    return out
+
+
+# ============================================
+# DOSYA
+# ============================================
+
+class CompressedCandleFile:
+    """
+    Blok indeksli sıkıştırılmış mum dosyası.
+
+    Kullanım:
+        f = CompressedCandleFile(compressed_path("BTC", "1m"))
+        f.append(candle_archive.range("BTC", "1m"))
+        bars = f.range("2024-01-01", "2024-02-01")   # sadece kesişen bloklar
+    """
+
+    def __init__(self, path: str, price_decimals: int = PRICE_DECIMALS,
+                 volume_decimals: int = VOLUME_DECIMALS, block_bars: int = BLOCK_BARS):
+        self.path = path
+        self.block_bars = block_bars
+        self.price_decimals = price_decimals
+        self.volume_decimals = volume_decimals
+        self.blocks: List[Dict] = []
+        self._data_end = len(MAGIC)
+
+        # İndeks yoksa (ilk ekleme yarıda kaldıysa) dosya boş sayılır
+        if os.path.exists(self.index_path):
+            self._read_index()
+
+    @property
+    def index_path(self) -> str:
+        return self.path + INDEX_SUFFIX
+
+    def _read_index(self):
+        with open(self.index_path) as f:
+            index = json.load(f)
+        if index.get("version") != FORMAT_VERSION:
+            raise ValueError(f"Desteklenmeyen mum dosyası sürümü: {self.index_path}")
+
+        # Dosyanın ölçekleri esastır
+        self.price_decimals = index["price_decimals"]
+        self.volume_decimals = index["volume_decimals"]
+        self.blocks = index["blocks"]
+        self._data_end = index["data_end"]
+
+    def _write_index(self, blocks: List[Dict], data_end: int):
+        """İndeksi geçici dosyaya yazıp atomik olarak değiştirir."""
+        temp = f"{self.index_path}.{os.getpid()}.tmp"
+        with open(temp, "w") as f:
+            json.dump({
+                "version": FORMAT_VERSION,
+                "price_decimals": self.price_decimals,
+                "volume_decimals": self.volume_decimals,
+                "data_end": data_end,
+                "blocks": blocks
+            }, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp, self.index_path)
+
+    @property
+    def bars(self) -> int:
+        return sum(block["count"] for block in self.blocks)
+
+    @property
+    def last_minute(self) -> Optional[int]:
+        return self.blocks[-1]["last"] if self.blocks else None
+
+    def append(self, bars: Dict[str, np.ndarray]) -> Dict:
+        """
+        Son mumdan yeni olan mumları yeni blok(lar) olarak ekler.
+
+        Returns:
+        --------
+        Dict : success, appended, blocks
+        """
+        minutes = np.asarray(bars["minutes"], dtype=np.int64)
+        start = 0 if self.last_minute is None else int(np.searchsorted(minutes, self.last_minute, side='right'))
+        total = minutes.size - start
+        if total <= 0:
+            return {"success": True, "appended": 0, "blocks": len(self.blocks)}
+
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        blocks = list(self.blocks)
+        with open(self.path, "r+b" if os.path.exists(self.path) else "w+b") as f:
+            # İndeksin dışındaki (yarıda kalmış eklemeden) kuyruk kesilir
+            f.seek(0)
+            if f.read(len(MAGIC)) != MAGIC:
+                f.seek(0)
+                f.write(MAGIC)
+            f.truncate(self._data_end)
+            f.seek(self._data_end)
+
+            for lo in range(start, minutes.size, self.block_bars):
+                hi = min(lo + self.block_bars, minutes.size)
+                block = encode_block(
+                    {name: bars[name][lo:hi] for name in COLUMNS},
+                    self.price_decimals, self.volume_decimals
+                )
+                blocks.append({
+                    "first": int(minutes[lo]), "last": int(minutes[hi - 1]),
+                    "offset": f.tell(), "length": len(block), "count": hi - lo
+                })
+                f.write(block)
+
+            data_end = f.tell()
+            f.flush()
+            os.fsync(f.fileno())
+
+        # Bloklar diskte; yeni indeks yazılana kadar okuyucular eski indeksi görür
+        self._write_index(blocks, data_end)
+        self.blocks, self._data_end = blocks, data_end
+
+        return {"success": True, "appended": total, "blocks": len(self.blocks)}
+
+    def range(self, start: Timestamp = None, end: Timestamp = None) -> Dict[str, np.ndarray]:
+        """
+        [start, end) aralığındaki mumlar (sadece kesişen bloklar çözülür).
+
+        Returns:
+        --------
+        Dict[str, np.ndarray] : minutes, open, high, low, close, volume
+        """
+        start, end = _to_minute(start), _to_minute(end)
+        chosen = [
+            block for block in self.blocks
+            if (start is None or block["last"] >= start) and (end is None or block["first"] < end)
+        ]
+        if not chosen:
+            return _empty(0)
+
+        data = _empty(sum(block["count"] for block in chosen))
+        position = 0
+        with open(self.path, "rb") as f:
+            for block in chosen:
+                f.seek(block["offset"])
+                end_position = position + block["count"]
+                decode_block(
+                    f.read(block["length"]), self.price_decimals, self.volume_decimals,
+                    out={name: values[position:end_position] for name, values in data.items()}
+                )
+                position = end_position
+
+        minutes = data["minutes"]
+        lo = 0 if start is None else int(np.searchsorted(minutes, start, side='left'))
+        hi = minutes.size if end is None else int(np.searchsorted(minutes, end, side='left'))
+        if lo == 0 and hi == minutes.size:
+            return data
+        return {name: values[lo:hi] for name, values in data.items()}
+
+    def stats(self) -> Dict:
+        """Boyut ve sıkıştırma oranı."""
+        size = self._data_end if self.blocks else 0
+        raw = self.bars * 8 * len(COLUMNS)
+        return {
+            "bars": self.bars,
+            "blocks": len(self.blocks),
+            "size_mb": round(size / 1e6, 2),
+            "raw_mb": round(raw / 1e6, 2),
+            "ratio": round(raw / size, 1) if size else None
+        }
+
+
+def compress_series(symbol: str, interval: str, archive: CandleArchive = None,
+                    price_decimals: int = PRICE_DECIMALS, path: str = None) -> Dict:
+    """
+    Arşivdeki serinin sıkıştırılmış kopyasını günceller (sadece yeni mumlar).
+
+    Arşive kopyanın son mumundan eski mumlar eklendiyse (backfill geçmişe
+    merge ettiyse) kopya baştan yazılır: yeni dosya çifti geçici adla
+    hazırlanır, önce eski indeks silinir, sonra dosyalar yerine taşınır.
+    Arada çökme olursa indeks yoktur, bir sonraki çağrı yine baştan yazar.
+
+    Returns:
+    --------
+    Dict : success, appended, blocks, rebuilt + dosya istatistikleri
+    """
+    archive = archive or candle_archive
+    path = path or os.path.join(archive._dir(symbol, interval), "candles.fxc")
+    compressed = CompressedCandleFile(path, price_decimals=price_decimals)
+
+    if compressed.last_minute is not None:
+        covered = archive.range(symbol, interval, None, compressed.last_minute + 1)["minutes"].size
+        if covered != compressed.bars:
+            temp = f"{path}.{os.getpid()}.rebuild"
+            fresh = CompressedCandleFile(temp, price_decimals=price_decimals)
+            result = fresh.append(archive.range(symbol, interval))
+
+            if os.path.exists(compressed.index_path):
+                os.remove(compressed.index_path)
+            os.replace(temp, path)
+            os.replace(fresh.index_path, compressed.index_path)
+
+            compressed = CompressedCandleFile(path)
+            result.update({"rebuilt": True, **compressed.stats()})
+            return result
+
+    result = compressed.append(archive.range(symbol, interval, compressed.last_minute))
+    result.update({"rebuilt": False, **compressed.stats()})
+    return result
+
+
+# Test / benchmark
+if __name__ == "__main__":
+    import tempfile
+    import time
+
+    folder = tempfile.mkdtemp(prefix="candle_codec_")
+
+    # 1 yıl 1m mum (~525k), 2 haneli fiyatlar ve hacimler
+    n = 365 * 1440
+    rng = np.random.default_rng(7)
+    closes = np.round(30000 * np.exp(np.cumsum(rng.normal(0, 0.0005, n))), 2)
+    opens = np.r_[closes[0], closes[:-1]]
+    bars = {
+        "minutes": np.datetime64('2024-01-01T00:00', 'm').astype(np.int64) + np.arange(n),
+        "open": opens,
+        "high": np.round(np.maximum(opens, closes) + rng.exponential(5, n), 2),
+        "low": np.round(np.minimum(opens, closes) - rng.exponential(5, n), 2),
+        "close": closes,
+        "volume": np.round(rng.exponential(20, n), 2),
+    }
+    raw_bytes = n * 8 * len(COLUMNS)
+
+    def measure(label: str, size: int, read, repeat: int = 5):
+        read()
+        started = time.perf_counter()
+        for _ in range(repeat):
+            read()
+        elapsed = (time.perf_counter() - started) / repeat
+        print(f"  {label:<12} {size / 1e6:8.2f} MB  {raw_bytes / elapsed / 1e6:8.0f} MB/s  ({elapsed * 1000:.1f} ms)")
+
+    print("=" * 60)
+    print(f"  {n} adet 1m mum, ham float64: {raw_bytes / 1e6:.1f} MB")
+    print("=" * 60)
+
+    # Ham kolonlar
+    for name in COLUMNS:
+        bars[name].tofile(os.path.join(folder, f"{name}.bin"))
+    measure("Ham", raw_bytes, lambda: {
+        name: np.fromfile(os.path.join(folder, f"{name}.bin"), dtype=np.int64 if name == "minutes" else np.float64)
+        for name in COLUMNS
+    })
+
+    # Sıkıştırılmış
+    path = os.path.join(folder, "candles.fxc")
+    started = time.perf_counter()
+    compressed = CompressedCandleFile(path, price_decimals=2)
+    compressed.append(bars)
+    print(f"  Kodlama: {time.perf_counter() - started:.2f} sn, {compressed.stats()}")
+    reader = CompressedCandleFile(path)
+    measure("Sıkıştırılmış", os.path.getsize(path), lambda: reader.range())
+
+    decoded = reader.range()
+    assert all(np.array_equal(decoded[name], bars[name]) for name in COLUMNS), "Kayıpsız değil!"
+
+    # Parquet (pyarrow kuruluysa)
+    try:
+        import pandas as pd
+        parquet = os.path.join(folder, "candles.parquet")
+        pd.DataFrame(bars).to_parquet(parquet)
+        measure("Parquet", os.path.getsize(parquet), lambda: pd.read_parquet(parquet))
+    except ImportError as e:
+        print(f"  Parquet      atlandı ({e.name or 'pyarrow'} kurulu değil)")
+
+    # Blok düzeyinde rastgele erişim
+    started = time.perf_counter()
+    week = reader.range("2024-06-01", "2024-06-08")
+    print(f"  1 hafta aralık: {week['close'].size} mum, {(time.perf_counter() - started) * 1000:.1f} ms")
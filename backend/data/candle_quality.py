@@ -0,0 +1,332 @@
+# ============================================
+# CANDLE QUALITY - Mum Serisi Kontrolü ve Onarımı
+# ============================================
+# yfinance saatlik kripto serilerinde eksik ve tekrar eden mumlar döner.
+# find_fair_value_gaps / find_order_blocks ardışık olmayan mumları ardışık
+# sanıp hayali yapılar üretir. Bu modül mumları analizden önce düzeltir:
+#
+# - Tek vektörel geçiş: zaman damgası dizisinde sıra dışı, tekrar eden,
+#   interval'e hizasız mumlar ve boşluklar (eksik mum aralıkları)
+# - Temizleme: sıralama + tekrarları atma (son gelen mum kalır)
+# - Onarım: sadece eksik aralıklar tekrar çekilir (yakın boşluklar tek
+#   istekte birleşir, istek sayısı sınırlı) ve sadece eksik mumlar eklenir
+# - window_bars verilirse sadece döndürülecek son mumların aralığındaki
+#   boşluklar onarılır; cache_key verilirse tekrar çekildiği halde dolmayan
+#   boşluklar (kaynakta da yok) UNREPAIRABLE_TTL_SECONDS boyunca istenmez
+#
+# Forex hafta sonu kapanışı boşluk sayılmaz (market="forex").
+
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from common.session_calendar import candle_minutes
+
+MINUTES_PER_DAY = 1440
+SATURDAY = 5
+
+# Onarımda en fazla istek (kalan boşluklar raporlanır)
+MAX_REPAIR_REQUESTS = 3
+# Aralarında bu kadar mumdan az olan boşluklar tek istekte çekilir
+MERGE_GAPS_WITHIN_BARS = 24
+# Raporda listelenen en fazla boşluk
+MAX_REPORTED_GAPS = 20
+# Kaynakta da olmayan boşluklar bu süre tekrar çekilmez (saniye)
+UNREPAIRABLE_TTL_SECONDS = 6 * 3600
+
+# cache_key (ör. sembol, interval) → {(başlangıç, bitiş) dakika: geçerlilik}
+_unrepairable: Dict[Tuple, Dict[Tuple[int, int], float]] = {}
+_unrepairable_lock = threading.Lock()
+
+
+def _weekday(minutes: np.ndarray) -> np.ndarray:
+    """Pazartesi = 0 (1970-01-01 Perşembe)."""
+    return (minutes // MINUTES_PER_DAY + 3) % 7
+
+
+def _weekend_closures(before: np.ndarray, after: np.ndarray, step: int) -> np.ndarray:
+    """Boşluk bir hafta sonunu (Cumartesi) kapsıyor ve en fazla ~3 gün mü?"""
+    days_to_saturday = (SATURDAY - _weekday(before)) % 7
+    saturday = (before // MINUTES_PER_DAY + days_to_saturday) * MINUTES_PER_DAY
+    return (saturday < after) & (after - before <= 3 * MINUTES_PER_DAY + step)
+
+
+def _format(minute: int) -> str:
+    return str(np.datetime64(int(minute), 'm')).replace("T", " ")
+
+
+def inspect_minutes(minutes: np.ndarray, step: int, market: str = "crypto") -> Dict:
+    """
+    Zaman damgası dizisini tek geçişte kontrol eder.
+
+    Parameters:
+    -----------
+    minutes : np.ndarray
+        Epoch dakika (geçersiz zaman damgaları -1)
+    step : int
+        Interval (dakika)
+    market : str
+        "crypto" (7/24) veya "forex" (hafta sonu kapanışı boşluk sayılmaz)
+
+    Returns:
+    --------
+    Dict :
+        order          : zaman sıralama indeksi (sıralıysa None)
+        keep           : sıralı dizide tutulacak mumlar (tekrarların sonuncusu)
+        gap_after      : sıralı+tekil dizide ardından boşluk gelen mum indeksleri
+        missing        : her boşluktaki eksik mum sayısı
+        + istatistikler (bars, out_of_order, duplicates, invalid, misaligned,
+          gaps, missing_bars, largest_gap_bars, coverage_percent)
+        unique_minutes : sıralı, tekil epoch dakikalar
+    """
+    minutes = np.asarray(minutes, dtype=np.int64)
+    valid = minutes >= 0
+    invalid = int((~valid).sum())
+
+    diffs = np.diff(minutes)
+    out_of_order = int((diffs < 0).sum())
+    order = np.argsort(minutes, kind='stable') if out_of_order or invalid else None
+    ordered = minutes if order is None else minutes[order]
+
+    # Tekrar: sıralı dizide aynı zaman (sonuncusu tutulur); geçersizler atılır
+    keep = np.r_[ordered[1:] != ordered[:-1], True] & (ordered >= 0) if ordered.size else np.zeros(0, dtype=bool)
+    duplicates = int(ordered.size - invalid - keep.sum())
+
+    unique = ordered[keep]
+    steps = np.diff(unique)
+    gap_after = np.flatnonzero(steps > step)
+    missing = steps[gap_after] // step - 1 + (steps[gap_after] % step > 0)
+
+    if market == "forex" and gap_after.size:
+        closed = _weekend_closures(unique[gap_after], unique[gap_after + 1], step)
+        gap_after, missing = gap_after[~closed], missing[~closed]
+
+    expected = int(unique.size + missing.sum())
+    return {
+        "order": order,
+        "keep": keep,
+        "gap_after": gap_after,
+        "missing": missing,
+        "bars": int(minutes.size),
+        "out_of_order": out_of_order,
+        "duplicates": duplicates,
+        "invalid": invalid,
+        "misaligned": int((unique % step != 0).sum()),
+        "gaps": int(gap_after.size),
+        "missing_bars": int(missing.sum()),
+        "largest_gap_bars": int(missing.max()) if missing.size else 0,
+        "coverage_percent": round(unique.size / expected * 100, 2) if expected else 100.0,
+        "unique_minutes": unique,
+    }
+
+
+def _report(inspection: Dict, step: int) -> Dict:
+    """inspect_minutes sonucundan JSON uyumlu rapor."""
+    unique = inspection["unique_minutes"]
+    gaps = [
+        {
+            "from": _format(unique[i] + step),
+            "to": _format(unique[i + 1] - step),
+            "missing_bars": int(count)
+        }
+        for i, count in zip(inspection["gap_after"][-MAX_REPORTED_GAPS:], inspection["missing"][-MAX_REPORTED_GAPS:])
+    ]
+    report = {key: inspection[key] for key in (
+        "bars", "out_of_order", "duplicates", "invalid", "misaligned",
+        "gaps", "missing_bars", "largest_gap_bars", "coverage_percent"
+    )}
+    report["gap_ranges"] = gaps
+    return report
+
+
+def clean_candles(candles: List[Dict], step: int, market: str = "crypto") -> Tuple[List[Dict], Dict]:
+    """
+    Mumları sıralar, tekrarları ve geçersiz zaman damgalarını atar.
+
+    Returns:
+    --------
+    (List[Dict], Dict) : temiz mumlar, kalite raporu
+    """
+    candles, inspection = _clean(candles, step, market)
+    return candles, _report(inspection, step)
+
+
+def _clean(candles: List[Dict], step: int, market: str) -> Tuple[List[Dict], Dict]:
+    inspection = inspect_minutes(candle_minutes(candles), step, market)
+    order, keep = inspection["order"], inspection["keep"]
+
+    if order is not None:
+        candles = [candles[i] for i in order]
+    if not keep.all():
+        candles = [c for c, kept in zip(candles, keep) if kept]
+
+    return candles, inspection
+
+
+def _repair_ranges(unique: np.ndarray, gap_after: np.ndarray, step: int, max_requests: int) -> List[Tuple[int, int]]:
+    """
+    Tekrar çekilecek [başlangıç, bitiş) dakika aralıkları. Yakın boşluklar
+    birleşir; en yeni boşluklar önceliklidir (analiz son mumlara bakar).
+    """
+    ranges = []
+    for i in gap_after[::-1]:
+        start, end = int(unique[i]) + step, int(unique[i + 1])
+        if ranges and ranges[-1][0] - end <= MERGE_GAPS_WITHIN_BARS * step:
+            ranges[-1] = (start, ranges[-1][1])
+        else:
+            if len(ranges) == max_requests:
+                break
+            ranges.append((start, end))
+    return ranges
+
+
+def _known_unrepairable(cache_key: Tuple) -> set:
+    """Süresi dolmamış onarılamaz boşluklar (süresi dolanlar silinir)."""
+    now = time.time()
+    with _unrepairable_lock:
+        gaps = _unrepairable.get(cache_key)
+        if not gaps:
+            return set()
+        for gap in [gap for gap, expires_at in gaps.items() if expires_at <= now]:
+            del gaps[gap]
+        return set(gaps)
+
+
+def _remember_unrepairable(cache_key: Tuple, gaps: List[Tuple[int, int]]):
+    expires_at = time.time() + UNREPAIRABLE_TTL_SECONDS
+    with _unrepairable_lock:
+        _unrepairable.setdefault(cache_key, {}).update({gap: expires_at for gap in gaps})
+
+
+def _gap_bounds(inspection: Dict, step: int) -> List[Tuple[int, int]]:
+    """Boşlukların [ilk eksik dakika, sonraki mevcut dakika) sınırları."""
+    unique = inspection["unique_minutes"]
+    return [(int(unique[i]) + step, int(unique[i + 1])) for i in inspection["gap_after"]]
+
+
+def repair_candles(candles: List[Dict], step: int, fetcher: Optional[Callable] = None,
+                   market: str = "crypto", max_requests: int = MAX_REPAIR_REQUESTS,
+                   window_bars: Optional[int] = None, cache_key: Optional[Tuple] = None) -> Tuple[List[Dict], Dict]:
+    """
+    Mumları temizler ve boşlukları sadece eksik aralıkları tekrar çekerek doldurur.
+
+    Parameters:
+    -----------
+    candles : List[Dict]
+        Mumlar ("YYYY-MM-DD HH:MM", UTC)
+    step : int
+        Interval (dakika)
+    fetcher : Callable
+        fetcher(start_minute, end_minute) → [start, end) aralığının mumları;
+        None ise sadece temizlenir ve raporlanır
+    max_requests : int
+        En fazla tekrar çekme isteği
+    window_bars : int
+        Verilirse sadece son window_bars mumluk aralıktaki boşluklar onarılır
+        (çağıran sadece son mumları döndürüyorsa)
+    cache_key : tuple
+        Verilirse (ör. (sembol, interval)) tekrar çekildiği halde dolmayan
+        boşluklar hatırlanır ve UNREPAIRABLE_TTL_SECONDS boyunca istenmez
+
+    Returns:
+    --------
+    (List[Dict], Dict) : onarılmış mumlar, rapor (+ requests, repaired_bars,
+                         remaining_missing_bars, skipped_outside_window,
+                         skipped_unrepairable)
+    """
+    candles, inspection = _clean(candles, step, market)
+    report = _report(inspection, step)
+    report.update({"requests": 0, "repaired_bars": 0, "remaining_missing_bars": report["missing_bars"],
+                   "skipped_outside_window": 0, "skipped_unrepairable": 0})
+    if fetcher is None or not report["gaps"]:
+        return candles, report
+
+    unique = inspection["unique_minutes"]
+    gap_after = inspection["gap_after"]
+
+    since = None
+    if window_bars:
+        # Döndürülecek pencerenin başı; tamamen öncesindeki boşluklar atlanır
+        since = int(unique[-1]) - (window_bars - 1) * step
+        in_window = unique[gap_after + 1] > since
+        report["skipped_outside_window"] = int((~in_window).sum())
+        gap_after = gap_after[in_window]
+
+    if cache_key is not None and gap_after.size:
+        known = _known_unrepairable(cache_key)
+        if known:
+            repairable = np.array([(int(unique[i]) + step, int(unique[i + 1])) not in known for i in gap_after], dtype=bool)
+            report["skipped_unrepairable"] = int((~repairable).sum())
+            gap_after = gap_after[repairable]
+
+    fills, filled, attempted = [], set(), []
+    for start, end in _repair_ranges(unique, gap_after, step, max_requests):
+        if since is not None:
+            start = max(start, since)
+        report["requests"] += 1
+        try:
+            fetched = fetcher(start, end)
+        except Exception as e:
+            # Geçici hata: onarılamaz sayılmaz
+            report.setdefault("repair_errors", []).append(f"{type(e).__name__}: {e}")
+            continue
+        attempted.append((start, end))
+        # Sadece aralıktaki ve seride olmayan mumlar eklenir
+        fetched_minutes = candle_minutes(fetched)
+        wanted = (fetched_minutes >= start) & (fetched_minutes < end) & ~np.isin(fetched_minutes, unique)
+        for i in np.flatnonzero(wanted):
+            minute = int(fetched_minutes[i])
+            if minute not in filled:
+                filled.add(minute)
+                fills.append(fetched[i])
+
+    if fills:
+        candles, inspection = _clean(candles + fills, step, market)
+        report["repaired_bars"] = len(fills)
+        report["remaining_missing_bars"] = report["missing_bars"] - len(fills)
+
+    if cache_key is not None and attempted:
+        # İstendiği halde hâlâ eksik olan boşluklar kaynakta da yok
+        _remember_unrepairable(cache_key, [
+            (gap_start, gap_end) for gap_start, gap_end in _gap_bounds(inspection, step)
+            if any(gap_start < end and gap_end > start for start, end in attempted)
+        ])
+
+    return candles, report
+
+
+# Test
+if __name__ == "__main__":
+    import time
+    from datetime import datetime, timedelta
+
+    start = datetime(2024, 1, 1)
+    source = [{
+        'timestamp': (start + timedelta(hours=i)).strftime("%Y-%m-%d %H:%M"),
+        'open': 100 + i, 'high': 101 + i, 'low': 99 + i, 'close': 100.5 + i, 'volume': 1
+    } for i in range(10_000)]
+
+    # yfinance benzeri bozulma: boşluklar, tekrarlar, sıra dışı mumlar
+    broken = [c for i, c in enumerate(source) if i % 997 not in (1, 2, 3) and not 5000 <= i < 5040]
+    broken += broken[100:105]
+    broken[10], broken[11] = broken[11], broken[10]
+
+    def fetch_range(start_minute: int, end_minute: int) -> List[Dict]:
+        lo = (start_minute - source_start) // 60
+        return source[max(0, lo):(end_minute - source_start) // 60]
+
+    source_start = int(candle_minutes(source[:1])[0])
+
+    started = time.perf_counter()
+    repaired, report = repair_candles(broken, 60, fetcher=fetch_range, max_requests=20)
+    elapsed = time.perf_counter() - started
+
+    print("=" * 50)
+    print("  CANDLE QUALITY")
+    print("=" * 50)
+    for key in ("bars", "out_of_order", "duplicates", "gaps", "missing_bars", "coverage_percent",
+                "requests", "repaired_bars", "remaining_missing_bars"):
+        print(f"  {key}: {report[key]}")
+    print(f"  Onarılmış seri kaynakla aynı: {repaired == source} ({elapsed * 1000:.1f} ms)")
@@ -2,10 +2,18 @@
 # CRYPTO FETCHER - Kripto Veri Çekme
 # ============================================
 # BTC, SOL, ETH ve diğer kripto verilerini çeker
+#
+# Kaynak CANDLE_PROVIDER ortam değişkeni veya provider parametresiyle
+# seçilir: "yfinance" (varsayılan) ya da "ccxt" (borsa API'si,
+# data/exchange_fetcher.py). Her iki kaynak aynı mum yapısını döndürür.
 
+import os
 import yfinance as yf
 from typing import Dict, List
-from datetime import datetime
+from datetime import datetime, timezone
+
+from .shared_cache import shared, CANDLE_TTL_SECONDS, HISTORY_TTL_SECONDS
+from .candle_quality import repair_candles
 
 # Desteklenen kripto paralar
 SUPPORTED_CRYPTOS = {
@@ -19,8 +27,25 @@ SUPPORTED_CRYPTOS = {
     "AVAX": {"symbol": "AVAX-USD", "name": "Avalanche", "emoji": "🔺"},
 }
 
+# Mum kaynağı: "yfinance" veya "ccxt"
+PROVIDERS = ("yfinance", "ccxt")
+CANDLE_PROVIDER = os.environ.get("CANDLE_PROVIDER", "yfinance")
+
+# Mum zaman dilimlerinin saniye karşılıkları
+INTERVAL_SECONDS = {
+    "1m": 60,
+    "2m": 120,
+    "5m": 300,
+    "15m": 900,
+    "30m": 1800,
+    "1h": 3600,
+    "4h": 14400,
+    "1d": 86400,
+}
+
 
-def get_crypto_candles(crypto: str = "BTC", hours: int = 24, interval: str = "1h") -> Dict:
+@shared("crypto_candles", CANDLE_TTL_SECONDS)
+def get_crypto_candles(crypto: str = "BTC", hours: int = 24, interval: str = "1h", provider: str = None) -> Dict:
     """
     Kripto para için mum verisi çeker.
     
@@ -32,6 +57,8 @@ def get_crypto_candles(crypto: str = "BTC", hours: int = 24, interval: str = "1h
         Kaç saatlik veri
     interval : str
         Mum zaman dilimi: 1h, 4h, 1d
+    provider : str
+        "yfinance" veya "ccxt" (varsayılan: CANDLE_PROVIDER)
     
     Returns:
     --------
@@ -46,6 +73,10 @@ def get_crypto_candles(crypto: str = "BTC", hours: int = 24, interval: str = "1h
             "supported": list(SUPPORTED_CRYPTOS.keys())
         }
     
+    provider = provider or CANDLE_PROVIDER
+    if provider != "yfinance":
+        return _from_provider(provider, "get_exchange_candles", crypto, hours=hours, interval=interval)
+    
     crypto_info = SUPPORTED_CRYPTOS[crypto]
     symbol = crypto_info["symbol"]
     
@@ -59,79 +90,78 @@ def get_crypto_candles(crypto: str = "BTC", hours: int = 24, interval: str = "1h
         if df.empty:
             return {"success": False, "error": "Veri alınamadı"}
         
-        # Son X saatlik veriyi al
-        df = df.tail(hours)
+        # Eksik/tekrar eden mumlar düzeltilir (sadece son X mumun aralığı), sonra son X mum alınır
+        candles, quality = _checked_candles(df, symbol, interval, window_bars=hours)
+        candles = candles[-hours:]
         
-        # Mum listesi oluştur
-        candles = []
-        for idx, row in df.iterrows():
-            timestamp = idx.strftime("%Y-%m-%d %H:%M") if hasattr(idx, 'strftime') else str(idx)
-            
-            open_price = row['Open']
-            close_price = row['Close']
-            high_price = row['High']
-            low_price = row['Low']
-            volume = row['Volume']
-            
-            # Mum tipi
-            if close_price > open_price:
-                candle_type = "YESIL"
-                emoji = "🟢"
-            elif close_price < open_price:
-                candle_type = "KIRMIZI"
-                emoji = "🔴"
-            else:
-                candle_type = "DOJI"
-                emoji = "⚪"
-            
-            change_percent = ((close_price - open_price) / open_price) * 100
-            
-            candles.append({
-                "timestamp": timestamp,
-                "open": round(open_price, 4),
-                "high": round(high_price, 4),
-                "low": round(low_price, 4),
-                "close": round(close_price, 4),
-                "volume": round(volume, 2),
-                "type": candle_type,
-                "emoji": emoji,
-                "change_percent": round(change_percent, 2)
-            })
+        return {
+            "success": True,
+            "crypto": crypto,
+            "name": crypto_info["name"],
+            "emoji": crypto_info["emoji"],
+            "symbol": symbol,
+            "interval": interval,
+            "period_hours": hours,
+            "generated_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "summary": _summarize_candles(candles),
+            "quality": quality,
+            "candles": candles
+        }
         
-        # İstatistikler
-        if candles:
-            total_green = sum(1 for c in candles if c['type'] == "YESIL")
-            total_red = sum(1 for c in candles if c['type'] == "KIRMIZI")
-            
-            first_open = candles[0]['open']
-            last_close = candles[-1]['close']
-            total_change = ((last_close - first_open) / first_open) * 100
-            
-            highest = max(c['high'] for c in candles)
-            lowest = min(c['low'] for c in candles)
-            
-            if total_green > total_red:
-                trend = "YUKARI"
-                trend_emoji = "📈"
-            elif total_red > total_green:
-                trend = "ASAGI"
-                trend_emoji = "📉"
-            else:
-                trend = "YATAY"
-                trend_emoji = "➡️"
-            
-            summary = {
-                "trend": trend,
-                "trend_emoji": trend_emoji,
-                "total_change_percent": round(total_change, 2),
-                "green_candles": total_green,
-                "red_candles": total_red,
-                "highest_price": highest,
-                "lowest_price": lowest,
-                "current_price": last_close
-            }
-        else:
-            summary = {}
+    except Exception as e:
+        return {
+            "success": False,
+            "error": str(e),
+            "crypto": crypto
+        }
+
+
+@shared("crypto_history", HISTORY_TTL_SECONDS)
+def get_crypto_history(crypto: str = "BTC", days: int = 90, interval: str = "1h", provider: str = None) -> Dict:
+    """
+    Uzun geçmiş mum verisi çeker (walk-forward backtest için).
+    
+    yfinance 1h veriyi en fazla 730 gün geriye verir; ccxt için sınır yoktur.
+    
+    Parameters:
+    -----------
+    crypto : str
+        Kripto kodu: BTC, SOL, ETH, XRP, BNB, ADA, DOGE, AVAX
+    days : int
+        Kaç günlük veri
+    interval : str
+        Mum zaman dilimi: 1h, 4h, 1d
+    provider : str
+        "yfinance" veya "ccxt" (varsayılan: CANDLE_PROVIDER)
+    
+    Returns:
+    --------
+    Dict : get_crypto_candles ile aynı yapı
+    """
+    crypto = crypto.upper()
+    
+    if crypto not in SUPPORTED_CRYPTOS:
+        return {
+            "success": False,
+            "error": f"Desteklenmeyen kripto: {crypto}",
+            "supported": list(SUPPORTED_CRYPTOS.keys())
+        }
+    
+    provider = provider or CANDLE_PROVIDER
+    if provider != "yfinance":
+        return _from_provider(provider, "get_exchange_history", crypto, days=days, interval=interval)
+    
+    crypto_info = SUPPORTED_CRYPTOS[crypto]
+    symbol = crypto_info["symbol"]
+    days = max(1, min(days, 730))
+    
+    try:
+        df = yf.Ticker(symbol).history(period=f"{days}d", interval=interval)
+        
+        if df.empty:
+            return {"success": False, "error": "Veri alınamadı"}
+        
+        candles, quality = _checked_candles(df, symbol, interval)
         
         return {
             "success": True,
@@ -140,9 +170,10 @@ def get_crypto_candles(crypto: str = "BTC", hours: int = 24, interval: str = "1h
             "emoji": crypto_info["emoji"],
             "symbol": symbol,
             "interval": interval,
-            "period_hours": hours,
+            "period_days": days,
             "generated_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            "summary": summary,
+            "summary": _summarize_candles(candles),
+            "quality": quality,
             "candles": candles
         }
         
@@ -154,6 +185,137 @@ def get_crypto_candles(crypto: str = "BTC", hours: int = 24, interval: str = "1h
         }
 
 
+def _from_provider(provider: str, function: str, crypto: str, **kwargs) -> Dict:
+    """yfinance dışındaki kaynağa yönlendirir."""
+    if provider not in PROVIDERS:
+        return {"success": False, "error": f"Geçersiz veri kaynağı: {provider}", "supported": list(PROVIDERS)}
+    
+    from . import exchange_fetcher
+    return getattr(exchange_fetcher, function)(crypto, **kwargs)
+
+
+def fetch_candle_range(symbol: str, interval: str, start: datetime, end: datetime) -> List[Dict]:
+    """
+    yfinance sembolü için [start, end) aralığının mumları (veri yoksa boş liste).
+
+    Backfill parçaları ve boşluk onarımı bunu kullanır; hata fırlatabilir.
+    """
+    df = yf.Ticker(symbol).history(start=start, end=end, interval=interval, raise_errors=True)
+    return [] if df.empty else _candles_from_dataframe(df)
+
+
+def _checked_candles(df, symbol: str, interval: str, market: str = "crypto", window_bars: int = None) -> tuple:
+    """
+    DataFrame → kalite kontrolünden geçmiş mumlar + kalite raporu.
+
+    Sıra dışı / tekrar eden mumlar atılır; kriptoda (7/24) boşluklar sadece
+    eksik aralıklar tekrar çekilerek doldurulur. window_bars verilirse sadece
+    son window_bars mumun aralığı onarılır. Kaynakta da olmayan boşluklar
+    sembol/interval başına hatırlanır ve bir süre tekrar istenmez.
+    """
+    return check_candles(_candles_from_dataframe(df), symbol, interval, market, window_bars)
+
+
+def check_candles(candles: List[Dict], symbol: str, interval: str, market: str = "crypto",
+                  window_bars: int = None) -> tuple:
+    """Mum listesi için _checked_candles (rapor None = bilinmeyen interval)."""
+    step = INTERVAL_SECONDS.get(interval, 0) // 60
+    if not step:
+        return candles, None
+
+    def fetch_gap(start_minute: int, end_minute: int) -> List[Dict]:
+        return fetch_candle_range(
+            symbol, interval,
+            datetime.fromtimestamp(start_minute * 60, tz=timezone.utc),
+            datetime.fromtimestamp(end_minute * 60, tz=timezone.utc)
+        )
+
+    return repair_candles(candles, step, fetcher=fetch_gap if market == "crypto" else None, market=market,
+                          window_bars=window_bars, cache_key=(symbol, interval))
+
+
+def _candles_from_dataframe(df) -> List[Dict]:
+    """
+    yfinance DataFrame'ini mum listesine çevirir.
+    """
+    candles = []
+    for idx, row in df.iterrows():
+        timestamp = idx.strftime("%Y-%m-%d %H:%M") if hasattr(idx, 'strftime') else str(idx)
+        candles.append(_make_candle(timestamp, row['Open'], row['High'], row['Low'], row['Close'], row['Volume']))
+    
+    return candles
+
+
+def _make_candle(timestamp: str, open_price: float, high_price: float, low_price: float,
+                 close_price: float, volume: float) -> Dict:
+    """
+    Tek mum sözlüğü (tüm sağlayıcılar aynı yapıyı döndürür).
+    """
+    # Mum tipi
+    if close_price > open_price:
+        candle_type = "YESIL"
+        emoji = "🟢"
+    elif close_price < open_price:
+        candle_type = "KIRMIZI"
+        emoji = "🔴"
+    else:
+        candle_type = "DOJI"
+        emoji = "⚪"
+    
+    change_percent = ((close_price - open_price) / open_price) * 100 if open_price else 0.0
+    
+    return {
+        "timestamp": timestamp,
+        "open": round(open_price, 4),
+        "high": round(high_price, 4),
+        "low": round(low_price, 4),
+        "close": round(close_price, 4),
+        "volume": round(volume, 2),
+        "type": candle_type,
+        "emoji": emoji,
+        "change_percent": round(change_percent, 2)
+    }
+
+
+def _summarize_candles(candles: List[Dict]) -> Dict:
+    """
+    Mum listesinden özet istatistikleri hesaplar.
+    """
+    if not candles:
+        return {}
+    
+    total_green = sum(1 for c in candles if c['type'] == "YESIL")
+    total_red = sum(1 for c in candles if c['type'] == "KIRMIZI")
+    
+    first_open = candles[0]['open']
+    last_close = candles[-1]['close']
+    total_change = ((last_close - first_open) / first_open) * 100
+    
+    highest = max(c['high'] for c in candles)
+    lowest = min(c['low'] for c in candles)
+    
+    if total_green > total_red:
+        trend = "YUKARI"
+        trend_emoji = "📈"
+    elif total_red > total_green:
+        trend = "ASAGI"
+        trend_emoji = "📉"
+    else:
+        trend = "YATAY"
+        trend_emoji = "➡️"
+    
+    return {
+        "trend": trend,
+        "trend_emoji": trend_emoji,
+        "total_change_percent": round(total_change, 2),
+        "green_candles": total_green,
+        "red_candles": total_red,
+        "highest_price": highest,
+        "lowest_price": lowest,
+        "current_price": last_close
+    }
+
+
 def get_multi_crypto_summary() -> Dict:
     """
     Birden fazla kripto için özet bilgi döndürür.
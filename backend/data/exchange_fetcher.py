@@ -0,0 +1,415 @@
+# ============================================
+# EXCHANGE FETCHER - ccxt ile Borsa Mum Verisi
+# ============================================
+# yfinance kripto verisi gecikmeli ve sınırlıdır (1m en fazla 30 gün,
+# 1h en fazla 730 gün). Bu modül mumları doğrudan borsadan ccxt
+# fetch_ohlcv ile çeker ve crypto_fetcher ile aynı mum yapısını döndürür:
+#
+# - Aralık, sayfa başına PAGE_LIMIT mumluk zaman dilimlerine bölünür;
+#   sayfalar thread havuzunda eşzamanlı çekilir
+# - Tüm istekler borsa başına ortak bir hız sınırlayıcıdan geçer
+#   (borsanın rateLimit değerinden); hız sınırı hatasında tüm istekler
+#   yavaşlar, ağ hatasında sayfa artan bekleme ile tekrar denenir
+# - Sayfalar sıralı birleştirilir, kalite kontrolünden (candle_quality)
+#   geçer
+#
+# Kaynak seçimi: CANDLE_PROVIDER=ccxt veya get_crypto_candles(provider="ccxt").
+# Borsa: CCXT_EXCHANGE (varsayılan binance), "mock" = yerel test borsası.
+
+import math
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from .backfill import RateLimiter
+from .candle_quality import clean_candles
+from .crypto_fetcher import SUPPORTED_CRYPTOS, INTERVAL_SECONDS, _make_candle, _summarize_candles
+
+# Ayarlar
+EXCHANGE_ID = os.environ.get("CCXT_EXCHANGE", "binance")
+QUOTE_CURRENCY = os.environ.get("CCXT_QUOTE", "USDT")
+
+PAGE_LIMIT = 1000            # fetch_ohlcv başına en fazla mum
+DEFAULT_WORKERS = 8          # eşzamanlı sayfa isteği
+MAX_RETRIES = 4
+RETRY_BACKOFF_SECONDS = 1.0
+RATE_LIMIT_PENALTY_SECONDS = 1.0
+
+
+# ============================================
+# TEST BORSASI
+# ============================================
+
+class NetworkError(Exception):
+    """Geçici hata (ccxt.NetworkError karşılığı)."""
+
+
+class RateLimitExceeded(NetworkError):
+    """Hız sınırı aşıldı (ccxt.RateLimitExceeded karşılığı)."""
+
+
+class MockExchange:
+    """
+    ccxt arayüzünü taklit eden yerel borsa: deterministik fiyatlar,
+    ağ gecikmesi ve saniyelik istek sınırı. Çağrı sayısı ve en yüksek
+    eşzamanlılık ölçülür.
+    """
+
+    id = "mock"
+    timeframes = {interval: interval for interval in INTERVAL_SECONDS}
+
+    def __init__(self, latency: float = 0.05, rate_limit_ms: int = 50,
+                 max_requests_per_second: Optional[int] = None, listed_at: str = "2017-01-01"):
+        self.latency = latency
+        self.rateLimit = rate_limit_ms
+        # Varsayılan: rateLimit'in iki katı anlık isteğe izin verilir
+        self.max_requests_per_second = max_requests_per_second or 2 * 1000 // rate_limit_ms
+        self.listed_at_ms = int(datetime.strptime(listed_at, "%Y-%m-%d").replace(tzinfo=timezone.utc).timestamp()) * 1000
+        self.markets = {}
+        self.calls = 0
+        self.rejected = 0
+        self.peak_concurrency = 0
+        self._active = 0
+        self._recent = []
+        self._lock = threading.Lock()
+
+    def load_markets(self) -> Dict:
+        self.markets = {f"{code}/{QUOTE_CURRENCY}": {"base": code, "quote": QUOTE_CURRENCY} for code in SUPPORTED_CRYPTOS}
+        return self.markets
+
+    def parse_timeframe(self, timeframe: str) -> int:
+        return INTERVAL_SECONDS[timeframe]
+
+    def fetch_ohlcv(self, symbol: str, timeframe: str = "1m", since: int = None, limit: int = None) -> List[list]:
+        with self._lock:
+            now = time.monotonic()
+            self._recent = [t for t in self._recent if now - t < 1.0]
+            if len(self._recent) >= self.max_requests_per_second:
+                self.rejected += 1
+                raise RateLimitExceeded(f"{self.id} 429 Too Many Requests")
+            self._recent.append(now)
+            self.calls += 1
+            self._active += 1
+            self.peak_concurrency = max(self.peak_concurrency, self._active)
+        try:
+            time.sleep(self.latency)
+            if symbol not in self.markets:
+                raise ValueError(f"{self.id} {symbol} sembolü yok")
+            return self._rows(symbol, timeframe, since, min(limit or PAGE_LIMIT, PAGE_LIMIT))
+        finally:
+            with self._lock:
+                self._active -= 1
+
+    def _rows(self, symbol: str, timeframe: str, since: Optional[int], limit: int) -> List[list]:
+        step = self.parse_timeframe(timeframe) * 1000
+        now = int(time.time() * 1000) // step * step
+        first = now - (limit - 1) * step if since is None else -(-since // step) * step
+        first = max(first, -(-self.listed_at_ms // step) * step)
+        times = np.arange(first, min(first + limit * step, now + step), step, dtype=np.int64)
+
+        # Sembole göre farklı, zamana göre deterministik fiyat
+        base = 100.0 * (1 + sum(map(ord, symbol)) % 50)
+        minutes = times / 60_000
+        price = base * (1 + 0.1 * np.sin(minutes / 10_000) + 0.01 * np.sin(minutes / 37))
+        close = base * (1 + 0.1 * np.sin((minutes + step / 60_000) / 10_000) + 0.01 * np.sin((minutes + step / 60_000) / 37))
+        wick = base * 0.002 * (1 + np.cos(minutes / 7) ** 2)
+        high = np.maximum(price, close) + wick
+        low = np.minimum(price, close) - wick
+        volume = 10 + 5 * np.abs(np.sin(minutes / 13))
+        return np.column_stack([times, price, high, low, close, volume]).tolist()
+
+
+# ============================================
+# BORSA VE HIZ SINIRLAYICI
+# ============================================
+
+_exchanges: Dict[str, object] = {}
+_limiters: Dict[str, RateLimiter] = {}
+_exchange_lock = threading.Lock()
+
+
+def get_exchange(exchange_id: str = None):
+    """
+    Piyasaları yüklenmiş borsa nesnesi (süreç içinde tekil).
+
+    "mock" yerel test borsasıdır; diğerleri ccxt gerektirir.
+    """
+    exchange_id = exchange_id or EXCHANGE_ID
+    with _exchange_lock:
+        if exchange_id not in _exchanges:
+            if exchange_id == "mock":
+                exchange = MockExchange()
+            else:
+                try:
+                    import ccxt
+                except ImportError:
+                    raise RuntimeError("ccxt kurulu değil (pip install ccxt)")
+                if not hasattr(ccxt, exchange_id):
+                    raise ValueError(f"Desteklenmeyen borsa: {exchange_id}")
+                # Hız sınırı ccxt'nin değil, eşzamanlı isteklerin ortak sınırlayıcısıyla
+                exchange = getattr(ccxt, exchange_id)({"enableRateLimit": False, "timeout": 15_000})
+            exchange.load_markets()
+            _exchanges[exchange_id] = exchange
+        return _exchanges[exchange_id]
+
+
+def _limiter(exchange) -> RateLimiter:
+    """Borsanın rateLimit (ms / istek) değerinden ortak sınırlayıcı."""
+    with _exchange_lock:
+        if exchange.id not in _limiters:
+            _limiters[exchange.id] = RateLimiter(1000 / max(exchange.rateLimit, 1), burst=DEFAULT_WORKERS)
+        return _limiters[exchange.id]
+
+
+def _error_classes(exchange) -> tuple:
+    """(hız sınırı hataları, geçici hatalar)"""
+    if isinstance(exchange, MockExchange):
+        return (RateLimitExceeded,), (NetworkError,)
+    import ccxt
+    return (ccxt.RateLimitExceeded, ccxt.DDoSProtection), (ccxt.NetworkError,)
+
+
+def market_symbol(crypto: str) -> str:
+    """BTC → BTC/USDT"""
+    return f"{crypto.upper()}/{QUOTE_CURRENCY}"
+
+
+# ============================================
+# SAYFALI ÇEKME
+# ============================================
+
+def fetch_ohlcv_range(exchange, symbol: str, interval: str, start_ms: int, end_ms: int,
+                      workers: int = DEFAULT_WORKERS) -> Dict:
+    """
+    [start_ms, end_ms) aralığının OHLCV satırlarını sayfalar halinde çeker.
+
+    Parameters:
+    -----------
+    exchange : ccxt borsası veya MockExchange
+    symbol : str
+        Borsa sembolü (BTC/USDT)
+    interval : str
+        Mum zaman dilimi (INTERVAL_SECONDS)
+    start_ms, end_ms : int
+        Aralık (epoch milisaniye)
+    workers : int
+        Eşzamanlı sayfa isteği (1 = sıralı)
+
+    Returns:
+    --------
+    Dict : rows (N x 6 ndarray: zaman ms, open, high, low, close, volume;
+           zamana göre sıralı), pages, requests, retries
+    """
+    step = exchange.parse_timeframe(interval) * 1000
+    start_ms = start_ms // step * step
+    span = PAGE_LIMIT * step
+    pages = [(since, min(since + span, end_ms)) for since in range(start_ms, end_ms, span)]
+
+    limiter = _limiter(exchange)
+    rate_errors, network_errors = _error_classes(exchange)
+    stats = {"requests": 0, "retries": 0}
+    stats_lock = threading.Lock()
+
+    def request(since: int) -> List[list]:
+        for attempt in range(MAX_RETRIES):
+            limiter.acquire()
+            with stats_lock:
+                stats["requests"] += 1
+            try:
+                return exchange.fetch_ohlcv(symbol, interval, since=since, limit=PAGE_LIMIT)
+            except rate_errors:
+                if attempt == MAX_RETRIES - 1:
+                    raise
+                limiter.penalize(RATE_LIMIT_PENALTY_SECONDS * 2 ** attempt)
+            except network_errors:
+                if attempt == MAX_RETRIES - 1:
+                    raise
+                time.sleep(RETRY_BACKOFF_SECONDS * 2 ** attempt)
+            with stats_lock:
+                stats["retries"] += 1
+
+    def fetch_page(page: tuple) -> List[list]:
+        # Borsa sayfa başına daha az mum verirse sayfa içinde devam edilir
+        since, until = page
+        rows = []
+        while since < until:
+            batch = [row for row in request(since) if row[0] < until]
+            if not batch or batch[-1][0] < since:
+                break
+            rows.extend(batch)
+            since = batch[-1][0] + step
+        return rows
+
+    if workers > 1 and len(pages) > 1:
+        with ThreadPoolExecutor(max_workers=min(workers, len(pages))) as pool:
+            results = list(pool.map(fetch_page, pages))
+    else:
+        results = [fetch_page(page) for page in pages]
+
+    rows = [row for result in results for row in result]
+    table = np.array(rows, dtype=np.float64).reshape(-1, 6)
+    table = table[~np.isnan(table[:, :5]).any(axis=1)]
+    table[:, 5] = np.nan_to_num(table[:, 5])
+
+    return {"rows": table, "pages": len(pages), **stats}
+
+
+def candles_from_rows(rows: np.ndarray) -> List[Dict]:
+    """OHLCV satırları → crypto_fetcher mum yapısı (zaman UTC "YYYY-MM-DD HH:MM")."""
+    if not len(rows):
+        return []
+    minutes = (rows[:, 0] // 60_000).astype(np.int64).astype('datetime64[m]')
+    timestamps = np.char.replace(np.datetime_as_string(minutes, unit='m'), "T", " ")
+    return [
+        _make_candle(str(timestamp), *row[1:])
+        for timestamp, row in zip(timestamps, rows.tolist())
+    ]
+
+
+def fetch_exchange_range(symbol: str, interval: str, start: datetime, end: datetime,
+                         exchange_id: str = None, workers: int = 1) -> List[Dict]:
+    """
+    Kripto kodu için [start, end) aralığının mumları (backfill parçaları).
+
+    Backfill parçaları zaten paralel çekildiği için varsayılan sıralıdır.
+    """
+    exchange = get_exchange(exchange_id)
+    result = fetch_ohlcv_range(
+        exchange, market_symbol(symbol), interval,
+        int(start.timestamp() * 1000), int(end.timestamp() * 1000), workers=workers
+    )
+    return candles_from_rows(result["rows"])
+
+
+# ============================================
+# CRYPTO_FETCHER İLE AYNI ARAYÜZ
+# ============================================
+
+def _exchange_candles(crypto: str, interval: str, start_ms: int, end_ms: int, exchange_id: str = None) -> Dict:
+    """Ortak gövde: çekme, kalite kontrolü ve yanıt."""
+    crypto = crypto.upper()
+    if crypto not in SUPPORTED_CRYPTOS:
+        return {"success": False, "error": f"Desteklenmeyen kripto: {crypto}",
+                "supported": list(SUPPORTED_CRYPTOS.keys())}
+    if interval not in INTERVAL_SECONDS:
+        return {"success": False, "error": f"Desteklenmeyen interval: {interval}",
+                "supported": list(INTERVAL_SECONDS)}
+
+    symbol = market_symbol(crypto)
+    try:
+        exchange = get_exchange(exchange_id)
+        if symbol not in exchange.markets:
+            return {"success": False, "error": f"{exchange.id} borsasında {symbol} yok", "crypto": crypto}
+
+        started = time.perf_counter()
+        fetched = fetch_ohlcv_range(exchange, symbol, interval, start_ms, end_ms)
+        if not len(fetched["rows"]):
+            return {"success": False, "error": "Veri alınamadı"}
+
+        # Borsa verisi tekrar çekilmez; sadece sıralanır, tekilleşir ve raporlanır
+        candles, quality = clean_candles(candles_from_rows(fetched["rows"]), INTERVAL_SECONDS[interval] // 60)
+    except Exception as e:
+        return {"success": False, "error": f"{type(e).__name__}: {e}", "crypto": crypto}
+
+    crypto_info = SUPPORTED_CRYPTOS[crypto]
+    return {
+        "success": True,
+        "crypto": crypto,
+        "name": crypto_info["name"],
+        "emoji": crypto_info["emoji"],
+        "symbol": symbol,
+        "interval": interval,
+        "provider": "ccxt",
+        "exchange": exchange.id,
+        "generated_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "fetch": {
+            "pages": fetched["pages"],
+            "requests": fetched["requests"],
+            "retries": fetched["retries"],
+            "elapsed_seconds": round(time.perf_counter() - started, 2)
+        },
+        "summary": _summarize_candles(candles),
+        "quality": quality,
+        "candles": candles
+    }
+
+
+def get_exchange_candles(crypto: str = "BTC", hours: int = 24, interval: str = "1h", exchange_id: str = None) -> Dict:
+    """
+    Borsadan son `hours` mumu çeker (get_crypto_candles ile aynı yapı,
+    + provider, exchange, fetch).
+
+    Parameters:
+    -----------
+    crypto : str
+        Kripto kodu: BTC, SOL, ETH, XRP, BNB, ADA, DOGE, AVAX
+    hours : int
+        Kaç mum (süren mum dahil)
+    interval : str
+        Mum zaman dilimi: 1m ... 1d
+    exchange_id : str
+        ccxt borsa kimliği (varsayılan CCXT_EXCHANGE)
+    """
+    step = INTERVAL_SECONDS.get(interval, 3600) * 1000
+    now = int(time.time() * 1000)
+    result = _exchange_candles(crypto, interval, now // step * step - (max(1, hours) - 1) * step, now, exchange_id)
+    if result.get("success"):
+        result["candles"] = result["candles"][-hours:]
+        result["summary"] = _summarize_candles(result["candles"])
+        result["period_hours"] = hours
+    return result
+
+
+def get_exchange_history(crypto: str = "BTC", days: int = 90, interval: str = "1h", exchange_id: str = None) -> Dict:
+    """
+    Borsadan uzun geçmiş çeker (get_crypto_history ile aynı yapı). yfinance'ın
+    aksine geriye dönük sınır yoktur; 1m geçmiş de sayfalar halinde gelir.
+    """
+    days = max(1, days)
+    now = int(time.time() * 1000)
+    result = _exchange_candles(crypto, interval, now - days * 86_400_000, now, exchange_id)
+    if result.get("success"):
+        result["period_days"] = days
+    return result
+
+
+# Test
+if __name__ == "__main__":
+    days = 30
+    end_ms = int(time.time() * 1000) // 60_000 * 60_000
+    start_ms = end_ms - days * 86_400_000
+
+    print("=" * 50)
+    print(f"  EXCHANGE FETCHER - {days} gün 1m (mock borsa)")
+    print("=" * 50)
+
+    timings = {}
+    for label, workers in (("Sıralı", 1), ("Eşzamanlı", DEFAULT_WORKERS)):
+        # Gerçekçi gecikme: istek başına ~200 ms, rateLimit 50 ms (Binance)
+        exchange = MockExchange(latency=0.2, rate_limit_ms=50)
+        exchange.load_markets()
+        started = time.perf_counter()
+        result = fetch_ohlcv_range(exchange, "BTC/USDT", "1m", start_ms, end_ms, workers=workers)
+        timings[label] = time.perf_counter() - started
+        print(f"  {label:10s}: {len(result['rows'])} mum, {result['pages']} sayfa, "
+              f"{result['requests']} istek, eşzamanlılık {exchange.peak_concurrency}, {timings[label]:.2f} sn")
+
+    print(f"  Hızlanma: {timings['Sıralı'] / timings['Eşzamanlı']:.1f}x")
+
+    # Borsa saniyede 10 istekten fazlasını reddederse: hatalar sınırlayıcıyı yavaşlatır
+    strict = MockExchange(latency=0.02, rate_limit_ms=50, max_requests_per_second=10)
+    strict.load_markets()
+    result = fetch_ohlcv_range(strict, "ETH/USDT", "1m", end_ms - 7 * 86_400_000, end_ms)
+    candles = candles_from_rows(result["rows"])
+    print(f"  Sıkı sınır: {len(candles)} mum, {strict.rejected} red, {result['retries']} tekrar deneme")
+    print(f"  Son mum: {candles[-1]['timestamp']} {candles[-1]['close']}")
+
+    _exchanges["mock"] = MockExchange(latency=0.01)
+    _exchanges["mock"].load_markets()
+    data = get_exchange_candles("SOL", hours=48, interval="1h", exchange_id="mock")
+    print(f"  get_exchange_candles: {len(data['candles'])} mum, kalite %{data['quality']['coverage_percent']}")
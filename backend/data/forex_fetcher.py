@@ -0,0 +1,103 @@
+# ============================================
+# FOREX FETCHER - Forex Mum Verisi Çekme
+# ============================================
+# Yerel indikatör motoru (analysis/indicators.py) için forex ve emtia
+# paritelerinin mum verisini yfinance'ten çeker. Mumlar kısa süre
+# host genelinde saklanır (shared_cache); aynı parite için tekrar
+# tekrar istek atılmaz.
+
+from datetime import datetime
+from typing import Dict
+
+import yfinance as yf
+
+from .crypto_fetcher import _checked_candles, _summarize_candles
+from .shared_cache import shared, CANDLE_TTL_SECONDS
+
+# Parite → yfinance sembolü
+FOREX_SYMBOLS = {
+    "EURUSD": "EURUSD=X",
+    "GBPUSD": "GBPUSD=X",
+    "USDJPY": "USDJPY=X",
+    "USDCHF": "USDCHF=X",
+    "AUDUSD": "AUDUSD=X",
+    "USDCAD": "USDCAD=X",
+    "NZDUSD": "NZDUSD=X",
+    "XAUUSD": "GC=F",     # Altın vadeli
+    "XAGUSD": "SI=F",     # Gümüş vadeli
+}
+
+# EMA200 ısınması için yeterli geçmiş (interval → gün)
+DEFAULT_DAYS = {"15m": 10, "30m": 20, "1h": 30, "1d": 365}
+
+
+@shared("forex_candles", CANDLE_TTL_SECONDS)
+def get_forex_candles(pair: str = "EURUSD", interval: str = "1h", days: int = None) -> Dict:
+    """
+    Forex paritesi için mum verisi çeker.
+
+    Parameters:
+    -----------
+    pair : str
+        Parite: EURUSD, GBPUSD, USDJPY, USDCHF, AUDUSD, USDCAD, NZDUSD, XAUUSD, XAGUSD
+    interval : str
+        Mum zaman dilimi: 15m, 30m, 1h, 1d
+    days : int
+        Kaç günlük veri (varsayılan: interval'e göre EMA200 için yeterli)
+
+    Returns:
+    --------
+    Dict : get_crypto_candles ile aynı yapı
+    """
+    pair = pair.upper()
+
+    if pair not in FOREX_SYMBOLS:
+        return {
+            "success": False,
+            "error": f"Desteklenmeyen parite: {pair}",
+            "supported": list(FOREX_SYMBOLS.keys())
+        }
+
+    days = days or DEFAULT_DAYS.get(interval, 30)
+    symbol = FOREX_SYMBOLS[pair]
+
+    try:
+        df = yf.Ticker(symbol).history(period=f"{days}d", interval=interval)
+
+        if df.empty:
+            return {"success": False, "error": "Veri alınamadı"}
+
+        # Hafta sonu kapanışı boşluk sayılmaz; diğer boşluklar raporlanır
+        candles, quality = _checked_candles(df, symbol, interval, market="forex")
+
+        result = {
+            "success": True,
+            "pair": pair,
+            "symbol": symbol,
+            "interval": interval,
+            "period_days": days,
+            "generated_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "summary": _summarize_candles(candles),
+            "quality": quality,
+            "candles": candles
+        }
+
+    except Exception as e:
+        return {
+            "success": False,
+            "error": str(e),
+            "pair": pair
+        }
+
+    return result
+
+
+# Test
+if __name__ == "__main__":
+    data = get_forex_candles("EURUSD", "1h")
+
+    if data["success"]:
+        print(f"✅ {data['pair']}: {len(data['candles'])} mum")
+        print(f"Son kapanış: {data['summary']['current_price']}")
+    else:
+        print(f"❌ Hata: {data['error']}")
@@ -7,6 +7,8 @@ import requests
 from datetime import datetime, timedelta
 from typing import Dict, List
 
+from .shared_cache import shared, NEWS_TTL_SECONDS
+
 # ============================================
 # ECONOMIC CALENDAR - Ekonomik Takvim
 # ============================================
@@ -92,6 +94,8 @@ IMPORTANT_EVENTS = {
 }
 
 
+# Boş liste / varsayılan değer = hata, cache'lenmez
+@shared("political_news", NEWS_TTL_SECONDS, cacheable=bool)
 def get_trump_crypto_news() -> List[Dict]:
     """
     Trump ve kripto ile ilgili haberleri çeker.
@@ -128,6 +132,7 @@ def get_trump_crypto_news() -> List[Dict]:
     return formatted_news
 
 
+@shared("crypto_news", NEWS_TTL_SECONDS, cacheable=bool)
 def get_crypto_news() -> List[Dict]:
     """
     CryptoCompare'den kripto haberlerini çeker.
@@ -182,6 +187,7 @@ def get_crypto_news() -> List[Dict]:
     return []
 
 
+@shared("fear_greed", NEWS_TTL_SECONDS, cacheable=lambda value: "last_updated" in value)
 def get_fear_greed_index() -> Dict:
     """
     Crypto Fear & Greed Index'i çeker.
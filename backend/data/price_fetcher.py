@@ -3,7 +3,39 @@
 # ============================================
 # Bu dosya TradingView'dan fiyat ve indikatör verisi çeker.
 
+import threading
+import time
+from typing import Dict, List
+
 from tradingview_ta import TA_Handler, Interval
+from tradingview_ta import get_multiple_analysis as _tv_multiple_analysis
+
+from analysis.indicators import compute_indicators, latest_values, indicator_summary
+from .forex_fetcher import get_forex_candles, FOREX_SYMBOLS
+from .crypto_fetcher import get_crypto_history, SUPPORTED_CRYPTOS
+from .shared_cache import shared
+
+# Interval mapping - string'i TradingView formatına çevir
+INTERVAL_MAP = {
+    "1m": Interval.INTERVAL_1_MINUTE,
+    "5m": Interval.INTERVAL_5_MINUTES,
+    "15m": Interval.INTERVAL_15_MINUTES,
+    "30m": Interval.INTERVAL_30_MINUTES,
+    "1h": Interval.INTERVAL_1_HOUR,
+    "2h": Interval.INTERVAL_2_HOURS,
+    "4h": Interval.INTERVAL_4_HOURS,
+    "1d": Interval.INTERVAL_1_DAY,
+    "1w": Interval.INTERVAL_1_WEEK,
+    "1M": Interval.INTERVAL_1_MONTH,
+}
+
+# Toplu analiz cache süresi (saniye) - interval başına
+BATCH_TTL_SECONDS = 60
+
+_batch_cache: Dict[tuple, tuple] = {}
+_batch_lock = threading.Lock()
+_batch_stats = {"upstream_calls": 0, "hits": 0}
+
 
 def get_analysis(symbol: str, exchange: str = "FX_IDC", interval: str = "1h"):
     """
@@ -31,86 +63,19 @@ def get_analysis(symbol: str, exchange: str = "FX_IDC", interval: str = "1h"):
     dict : Analiz sonuçları (fiyat, indikatörler, özet)
     """
     
-    # Interval mapping - string'i TradingView formatına çevir
-    interval_map = {
-        "1m": Interval.INTERVAL_1_MINUTE,
-        "5m": Interval.INTERVAL_5_MINUTES,
-        "15m": Interval.INTERVAL_15_MINUTES,
-        "30m": Interval.INTERVAL_30_MINUTES,
-        "1h": Interval.INTERVAL_1_HOUR,
-        "2h": Interval.INTERVAL_2_HOURS,
-        "4h": Interval.INTERVAL_4_HOURS,
-        "1d": Interval.INTERVAL_1_DAY,
-        "1w": Interval.INTERVAL_1_WEEK,
-        "1M": Interval.INTERVAL_1_MONTH,
-    }
-    
     try:
         # TradingView Handler oluştur
         handler = TA_Handler(
             symbol=symbol,
             exchange=exchange,
             screener="forex",
-            interval=interval_map.get(interval, Interval.INTERVAL_1_HOUR)
+            interval=INTERVAL_MAP.get(interval, Interval.INTERVAL_1_HOUR)
         )
         
         # Analiz al
         analysis = handler.get_analysis()
         
-        # Sonuçları düzenle
-        result = {
-            "success": True,
-            "symbol": symbol,
-            "interval": interval,
-            
-            # Fiyat bilgileri (get() ile güvenli erişim)
-            "price": {
-                "close": analysis.indicators.get("close"),
-                "open": analysis.indicators.get("open"),
-                "high": analysis.indicators.get("high"),
-                "low": analysis.indicators.get("low"),
-                "change": analysis.indicators.get("change"),
-                "change_percent": (analysis.indicators.get("change", 0) / analysis.indicators.get("open", 1)) * 100 if analysis.indicators.get("open") else 0
-            },
-            
-            # TradingView'ın kendi özeti
-            "summary": {
-                "recommendation": analysis.summary.get("RECOMMENDATION", "NEUTRAL"),
-                "buy": analysis.summary.get("BUY", 0),
-                "sell": analysis.summary.get("SELL", 0),
-                "neutral": analysis.summary.get("NEUTRAL", 0)
-            },
-            
-            # İndikatörler (get() ile güvenli erişim)
-            "indicators": {
-                "RSI": analysis.indicators.get("RSI"),
-                "MACD": {
-                    "macd": analysis.indicators.get("MACD.macd"),
-                    "signal": analysis.indicators.get("MACD.signal")
-                },
-                "EMA_20": analysis.indicators.get("EMA20"),
-                "EMA_50": analysis.indicators.get("EMA50"),
-                "EMA_200": analysis.indicators.get("EMA200"),
-                "SMA_20": analysis.indicators.get("SMA20"),
-                "SMA_50": analysis.indicators.get("SMA50"),
-                "SMA_200": analysis.indicators.get("SMA200"),
-                "Bollinger": {
-                    "upper": analysis.indicators.get("BB.upper"),
-                    "lower": analysis.indicators.get("BB.lower")
-                },
-                "Stochastic": {
-                    "k": analysis.indicators.get("Stoch.K"),
-                    "d": analysis.indicators.get("Stoch.D")
-                },
-                "ATR": analysis.indicators.get("ATR"),
-                "ADX": analysis.indicators.get("ADX")
-            },
-            
-            # Ham veri (tüm indikatörler)
-            "raw_indicators": analysis.indicators
-        }
-        
-        return result
+        return _format_analysis(analysis.indicators, analysis.summary, symbol, interval)
         
     except Exception as e:
         return {
@@ -120,6 +85,190 @@ def get_analysis(symbol: str, exchange: str = "FX_IDC", interval: str = "1h"):
         }
 
 
+def _format_analysis(indicators: Dict, summary: Dict, symbol: str, interval: str) -> Dict:
+    """
+    İndikatör değerlerini (TradingView anahtar adlarıyla) API formatına çevirir.
+    
+    TradingView analizi ve yerel indikatör motoru aynı formatı üretir.
+    """
+    # Sonuçları düzenle
+    result = {
+        "success": True,
+        "symbol": symbol,
+        "interval": interval,
+        
+        # Fiyat bilgileri (get() ile güvenli erişim)
+        "price": {
+            "close": indicators.get("close"),
+            "open": indicators.get("open"),
+            "high": indicators.get("high"),
+            "low": indicators.get("low"),
+            "change": indicators.get("change"),
+            "change_percent": (indicators.get("change", 0) / indicators.get("open", 1)) * 100 if indicators.get("open") else 0
+        },
+        
+        # TradingView'ın kendi özeti
+        "summary": {
+            "recommendation": summary.get("RECOMMENDATION", "NEUTRAL"),
+            "buy": summary.get("BUY", 0),
+            "sell": summary.get("SELL", 0),
+            "neutral": summary.get("NEUTRAL", 0)
+        },
+        
+        # İndikatörler (get() ile güvenli erişim)
+        "indicators": {
+            "RSI": indicators.get("RSI"),
+            "MACD": {
+                "macd": indicators.get("MACD.macd"),
+                "signal": indicators.get("MACD.signal")
+            },
+            "EMA_20": indicators.get("EMA20"),
+            "EMA_50": indicators.get("EMA50"),
+            "EMA_200": indicators.get("EMA200"),
+            "SMA_20": indicators.get("SMA20"),
+            "SMA_50": indicators.get("SMA50"),
+            "SMA_200": indicators.get("SMA200"),
+            "Bollinger": {
+                "upper": indicators.get("BB.upper"),
+                "lower": indicators.get("BB.lower")
+            },
+            "Stochastic": {
+                "k": indicators.get("Stoch.K"),
+                "d": indicators.get("Stoch.D")
+            },
+            "ATR": indicators.get("ATR"),
+            "ADX": indicators.get("ADX")
+        },
+        
+        # Ham veri (tüm indikatörler)
+        "raw_indicators": indicators
+    }
+    
+    return result
+
+
+def get_batch_analysis(symbols: List[str], exchange: str = "FX_IDC", interval: str = "1h") -> Dict[str, Dict]:
+    """
+    Birden fazla paritenin analizini TEK istekle çeker.
+    
+    Sonuçlar interval başına BATCH_TTL_SECONDS boyunca saklanır; bu sürede
+    aynı interval için yapılan tüm çağrılar (ör. 9 parite × /analyze)
+    TradingView'a gitmez. Cache host geneldir: N uvicorn worker'ı da
+    tek istek atar.
+    
+    Parametreler:
+    -------------
+    symbols : List[str]
+        Parite adları. Örnek: ["EURUSD", "GBPUSD"]
+    exchange : str
+        Borsa adı (forex için "FX_IDC")
+    interval : str
+        Zaman dilimi (get_analysis ile aynı seçenekler)
+    
+    Döndürür:
+    ---------
+    Dict[str, dict] : sembol → get_analysis ile aynı formatta sonuç
+    """
+    key = (exchange, interval, tuple(sorted(s.upper() for s in symbols)))
+    now = time.monotonic()
+    
+    with _batch_lock:
+        cached = _batch_cache.get(key)
+        if cached and now - cached[0] < BATCH_TTL_SECONDS:
+            _batch_stats["hits"] += 1
+            return dict(cached[1])
+    
+    try:
+        results = _fetch_batch(*key)
+    except Exception as e:
+        # Hata cache'lenmez, bir sonraki çağrı tekrar dener
+        return {symbol: {"success": False, "error": str(e), "symbol": symbol} for symbol in key[2]}
+    
+    with _batch_lock:
+        _batch_cache[key] = (now, results)
+    
+    return dict(results)
+
+
+@shared("tv_batch", BATCH_TTL_SECONDS)
+def _fetch_batch(exchange: str, interval: str, symbols: tuple) -> Dict[str, Dict]:
+    """
+    TradingView toplu isteği. Host'taki tüm worker'lar aynı sonucu paylaşır
+    (shared_cache); istisna fırlatırsa hiçbir katmanda cache'lenmez.
+    """
+    with _batch_lock:
+        _batch_stats["upstream_calls"] += 1
+    
+    analyses = _tv_multiple_analysis(
+        screener="forex",
+        interval=INTERVAL_MAP.get(interval, Interval.INTERVAL_1_HOUR),
+        symbols=[f"{exchange}:{symbol}" for symbol in symbols]
+    )
+    
+    results = {}
+    for symbol in symbols:
+        analysis = analyses.get(f"{exchange}:{symbol}")
+        if analysis is None:
+            results[symbol] = {"success": False, "error": "Veri bulunamadı", "symbol": symbol}
+            continue
+        try:
+            results[symbol] = _format_analysis(analysis.indicators, analysis.summary, symbol, interval)
+        except Exception as e:
+            results[symbol] = {"success": False, "error": str(e), "symbol": symbol}
+    
+    return results
+
+
+def get_local_analysis(symbol: str, interval: str = "1h", candles: List[Dict] = None) -> Dict:
+    """
+    get_analysis ile aynı formatı TradingView'a gitmeden, mumlardan
+    yerel indikatör motoruyla üretir.
+    
+    Parametreler:
+    -------------
+    symbol : str
+        Forex paritesi (EURUSD, XAUUSD...) veya kripto (BTC, ETH...)
+    interval : str
+        Zaman dilimi
+    candles : List[Dict]
+        Hazır mumlar (verilmezse forex/kripto fetcher'dan çekilir)
+    
+    Döndürür:
+    ---------
+    dict : get_analysis ile aynı yapı + "source": "local"
+    """
+    symbol = symbol.upper()
+    
+    if candles is None:
+        if symbol in FOREX_SYMBOLS:
+            data = get_forex_candles(symbol, interval=interval)
+        elif symbol in SUPPORTED_CRYPTOS:
+            data = get_crypto_history(symbol, days=30, interval=interval)
+        else:
+            return {"success": False, "error": f"Desteklenmeyen sembol: {symbol}", "symbol": symbol}
+        
+        if not data.get("success"):
+            return {"success": False, "error": data.get("error", "Veri alınamadı"), "symbol": symbol}
+        candles = data.get("candles", [])
+    
+    if len(candles) < 2:
+        return {"success": False, "error": "Yetersiz veri", "symbol": symbol}
+    
+    values = latest_values(compute_indicators(candles))
+    result = _format_analysis(values, indicator_summary(values), symbol, interval)
+    result["source"] = "local"
+    result["bars"] = len(candles)
+    result["timestamp"] = candles[-1].get("timestamp")
+    
+    return result
+
+
+def get_batch_stats() -> Dict:
+    """Toplu analiz cache metrikleri."""
+    with _batch_lock:
+        return {"ttl_seconds": BATCH_TTL_SECONDS, "entries": len(_batch_cache), **_batch_stats}
+
+
 # Test kodu - Bu dosya direkt çalıştırılırsa test eder
 if __name__ == "__main__":
     print("EURUSD test ediliyor...")
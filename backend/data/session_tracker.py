@@ -6,33 +6,35 @@
 from datetime import datetime, timezone, timedelta
 from typing import Dict, List
 
+from common.session_calendar import SCHEDULE, SESSION_HOURS, SESSION_KILL_ZONE_HOURS
+
 # Türkiye saat dilimi (UTC+3)
 TURKEY_OFFSET = timedelta(hours=3)
 
-# Session tanımlamaları (UTC saatleri)
+# Session tanımlamaları (UTC saatleri, common/session_calendar'dan)
 SESSIONS = {
     "ASIA": {
         "name": "Asya/Tokyo",
-        "start_utc": 0,   # 00:00 UTC = 03:00 Türkiye
-        "end_utc": 9,     # 09:00 UTC = 12:00 Türkiye
-        "kill_zone_start": 0,
-        "kill_zone_end": 2,
+        "start_utc": SESSION_HOURS["ASIA"][0],   # 00:00 UTC = 03:00 Türkiye
+        "end_utc": SESSION_HOURS["ASIA"][1],     # 09:00 UTC = 12:00 Türkiye
+        "kill_zone_start": SESSION_KILL_ZONE_HOURS["ASIA"][0],
+        "kill_zone_end": SESSION_KILL_ZONE_HOURS["ASIA"][1],
         "emoji": "🌏"
     },
     "LONDON": {
         "name": "Londra",
-        "start_utc": 7,   # 07:00 UTC = 10:00 Türkiye
-        "end_utc": 16,    # 16:00 UTC = 19:00 Türkiye
-        "kill_zone_start": 7,
-        "kill_zone_end": 9,
+        "start_utc": SESSION_HOURS["LONDON"][0],   # 07:00 UTC = 10:00 Türkiye
+        "end_utc": SESSION_HOURS["LONDON"][1],    # 16:00 UTC = 19:00 Türkiye
+        "kill_zone_start": SESSION_KILL_ZONE_HOURS["LONDON"][0],
+        "kill_zone_end": SESSION_KILL_ZONE_HOURS["LONDON"][1],
         "emoji": "🇬🇧"
     },
     "NEW_YORK": {
         "name": "New York",
-        "start_utc": 12,  # 12:00 UTC = 15:00 Türkiye
-        "end_utc": 21,    # 21:00 UTC = 00:00 Türkiye
-        "kill_zone_start": 12,
-        "kill_zone_end": 14,
+        "start_utc": SESSION_HOURS["NEW_YORK"][0],  # 12:00 UTC = 15:00 Türkiye
+        "end_utc": SESSION_HOURS["NEW_YORK"][1],    # 21:00 UTC = 00:00 Türkiye
+        "kill_zone_start": SESSION_KILL_ZONE_HOURS["NEW_YORK"][0],
+        "kill_zone_end": SESSION_KILL_ZONE_HOURS["NEW_YORK"][1],
         "emoji": "🇺🇸"
     }
 }
@@ -49,6 +51,12 @@ def get_current_time_turkey() -> datetime:
     return utc_now + TURKEY_OFFSET
 
 
+def _current_minute() -> int:
+    """Şu anki UTC zamanın gün içi dakikası (günlük program indeksi)."""
+    utc_now = get_current_time_utc()
+    return utc_now.hour * 60 + utc_now.minute
+
+
 def is_session_active(session_name: str) -> bool:
     """
     Belirtilen session'ın aktif olup olmadığını kontrol eder.
@@ -65,14 +73,8 @@ def is_session_active(session_name: str) -> bool:
     if session_name not in SESSIONS:
         return False
     
-    session = SESSIONS[session_name]
-    current_hour = get_current_time_utc().hour
-    
-    # Gece yarısını geçen session'lar için özel kontrol
-    if session["end_utc"] < session["start_utc"]:
-        return current_hour >= session["start_utc"] or current_hour < session["end_utc"]
-    
-    return session["start_utc"] <= current_hour < session["end_utc"]
+    # Gece yarısını geçen session'lar programda zaten işaretli
+    return bool(SCHEDULE.session_active[session_name][_current_minute()])
 
 
 def is_kill_zone_active(session_name: str) -> bool:
@@ -92,10 +94,7 @@ def is_kill_zone_active(session_name: str) -> bool:
     if session_name not in SESSIONS:
         return False
     
-    session = SESSIONS[session_name]
-    current_hour = get_current_time_utc().hour
-    
-    return session["kill_zone_start"] <= current_hour < session["kill_zone_end"]
+    return bool(SCHEDULE.session_kill_zone[session_name][_current_minute()])
 
 
 def get_active_sessions() -> List[Dict]:
@@ -130,6 +129,7 @@ def get_session_status() -> Dict:
     """
     utc_now = get_current_time_utc()
     turkey_now = get_current_time_turkey()
+    minute = utc_now.hour * 60 + utc_now.minute
     
     sessions_status = {}
     
@@ -137,22 +137,15 @@ def get_session_status() -> Dict:
         is_active = is_session_active(session_name)
         is_kill_zone = is_kill_zone_active(session_name)
         
-        # Kalan süre hesapla
+        # Kalan süre (günlük programdan)
         remaining_minutes = None
         if is_active:
             if is_kill_zone:
                 # Kill zone bitimine kalan süre
-                end_hour = session_info["kill_zone_end"]
-                remaining = (end_hour - utc_now.hour - 1) * 60 + (60 - utc_now.minute)
-                remaining_minutes = max(0, remaining)
+                remaining_minutes = int(SCHEDULE.minutes_until_session_kill_zone_end[session_name][minute])
             else:
-                # Session bitimine kalan süre
-                end_hour = session_info["end_utc"]
-                if end_hour < session_info["start_utc"]:  # Gece yarısını geçiyorsa
-                    end_hour += 24
-                current = utc_now.hour if utc_now.hour >= session_info["start_utc"] else utc_now.hour + 24
-                remaining = (end_hour - current - 1) * 60 + (60 - utc_now.minute)
-                remaining_minutes = max(0, remaining)
+                # Session bitimine kalan süre (gece yarısını geçenler dahil)
+                remaining_minutes = int(SCHEDULE.minutes_until_session_end[session_name][minute])
         
         sessions_status[session_name] = {
             "name": session_info["name"],
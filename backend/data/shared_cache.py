@@ -0,0 +1,476 @@
+# ============================================
+# SHARED CACHE - Host Genelinde İki Katmanlı Cache
+# ============================================
+# `uvicorn main:app --workers N` ile her worker mumları, haberleri ve
+# analizleri ayrı ayrı çeker; upstream yükü N katına çıkar. Bu modül:
+#
+# - L1: process içi LRU (en hızlı, sadece o worker; L1_MAX_ENTRIES ile sınırlı)
+# - L2: yerel disk üzerinde SQLite (WAL) - aynı host'taki tüm worker'lar okur
+#
+# Yayınlama atomiktir: değer ve kilit silme tek transaction'da yazılır,
+# okuyan hiçbir zaman yarım değer görmez. Miss durumunda process'ler
+# arası single-flight: ilk gelen "flights" tablosuna kilit satırı yazar ve
+# hesaplar, diğerleri L2'de değerin çıkmasını bekler. Kilidin süresi
+# dolarsa (çöken worker) bekleyen biri devralır.
+#
+# Başarısız fetch sonuçları ({"success": False}) cache'lenmez.
+# SQLite açılamazsa (salt okunur disk vb.) sadece L1 ile çalışır.
+
+import asyncio
+import functools
+import hashlib
+import inspect
+import os
+import pickle
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+CACHE_FILE = os.environ.get(
+    "SHARED_CACHE_PATH",
+    os.path.join(os.path.dirname(__file__), 'shared_cache.sqlite3')
+)
+
+# Hesaplayan worker'ın kilidi bu süre sonra devralınabilir (saniye)
+FLIGHT_TIMEOUT_SECONDS = 30
+# Bekleyenlerin L2'yi yoklama aralığı (saniye)
+POLL_SECONDS = 0.05
+# Süresi dolmuş kayıtlar her N yayında bir silinir
+PURGE_EVERY = 200
+# L1 bellek sınırı (LRU, analysis_cache ile aynı)
+L1_MAX_ENTRIES = 256
+
+# Varsayılan geçerlilik süreleri (saniye)
+CANDLE_TTL_SECONDS = 60       # Son mum hâlâ oluşuyor
+HISTORY_TTL_SECONDS = 300     # Uzun geçmiş (backtest)
+NEWS_TTL_SECONDS = 300
+ANALYSIS_TTL_SECONDS = 60     # Kill zone durumu gibi saate bağlı alanlar içerir
+
+HIT, CLAIMED, BUSY = "hit", "claimed", "busy"
+
+
+def _succeeded(value: Any) -> bool:
+    """Varsayılan cache kuralı: {"success": False} sonuçları saklanmaz."""
+    return not (isinstance(value, dict) and value.get("success") is False)
+
+
+def _new_owner() -> str:
+    """Hesaplama kilidinin sahibi: her get_or_compute çağrısına özel token."""
+    return f"{os.getpid()}:{uuid.uuid4().hex}"
+
+
+def _copy(value: Any) -> Any:
+    """L1'den dönen dict'lerin üst seviyesi kopyalanır (memoize ile aynı)."""
+    return dict(value) if isinstance(value, dict) else value
+
+
+class SharedCache:
+    """
+    L1 (process) + L2 (SQLite, host) cache.
+
+    Kullanım:
+        value = shared_cache.get_or_compute("news:full", 300, get_full_news_report)
+    """
+
+    def __init__(self, path: str = CACHE_FILE):
+        self.path = path
+        self._l1: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._disabled = not path
+        self._publishes = 0
+        self._stats = {"l1_hits": 0, "l1_evictions": 0, "l2_hits": 0, "computes": 0, "waits": 0, "takeovers": 0, "errors": 0}
+
+    # ----------------------------------------
+    # SQLite bağlantısı (thread + process başına)
+    # ----------------------------------------
+
+    def _connection(self) -> Optional[sqlite3.Connection]:
+        if self._disabled:
+            return None
+
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and self._local.pid == os.getpid():
+            return conn
+
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL NOT NULL)")
+            conn.execute("CREATE TABLE IF NOT EXISTS flights (key TEXT PRIMARY KEY, owner TEXT NOT NULL, expires_at REAL NOT NULL)")
+        except sqlite3.Error as e:
+            print(f"Shared cache açılamadı, sadece L1 kullanılacak: {e}")
+            self._disabled = True
+            return None
+
+        self._local.conn = conn
+        self._local.pid = os.getpid()
+        return conn
+
+    # ----------------------------------------
+    # L1
+    # ----------------------------------------
+
+    def _l1_get(self, key: str):
+        with self._lock:
+            entry = self._l1.get(key)
+            if entry and entry[0] > time.time():
+                self._l1.move_to_end(key)
+                self._stats["l1_hits"] += 1
+                return True, entry[1]
+            if entry:
+                del self._l1[key]
+        return False, None
+
+    def _l1_set(self, key: str, value: Any, expires_at: float):
+        now = time.time()
+        with self._lock:
+            # Süresi dolmuşlar her eklemede silinir (en fazla L1_MAX_ENTRIES tarama)
+            for stale in [k for k, (expires, _) in self._l1.items() if expires <= now]:
+                del self._l1[stale]
+
+            self._l1[key] = (expires_at, value)
+            self._l1.move_to_end(key)
+            while len(self._l1) > L1_MAX_ENTRIES:
+                self._l1.popitem(last=False)
+                self._stats["l1_evictions"] += 1
+
+    # ----------------------------------------
+    # L2
+    # ----------------------------------------
+
+    def _read(self, key: str):
+        """L2'den taze değer: (bulundu, değer, bitiş zamanı)."""
+        conn = self._connection()
+        if conn is None:
+            return False, None, 0
+        try:
+            row = conn.execute("SELECT value, expires_at FROM entries WHERE key = ?", (key,)).fetchone()
+        except sqlite3.Error:
+            with self._lock:
+                self._stats["errors"] += 1
+            return False, None, 0
+        if row and row[1] > time.time():
+            return True, pickle.loads(row[0]), row[1]
+        return False, None, 0
+
+    def _claim(self, key: str, owner: str):
+        """
+        L2'de değer yoksa hesaplama kilidini owner adına almaya çalışır.
+
+        owner çağrı başına üretilir (_new_owner); async yolda _claim ve
+        _release farklı thread'lerde çalışabildiği için thread kimliği kullanılmaz.
+
+        Returns: (HIT | CLAIMED | BUSY, değer, bitiş zamanı)
+        """
+        found, value, expires_at = self._read(key)
+        if found:
+            return HIT, value, expires_at
+
+        conn = self._connection()
+        if conn is None:
+            return CLAIMED, None, 0
+
+        now = time.time()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                # Kilit bekleyen sırada değer yayınlanmış olabilir
+                row = conn.execute("SELECT value, expires_at FROM entries WHERE key = ?", (key,)).fetchone()
+                if row and row[1] > now:
+                    conn.execute("COMMIT")
+                    return HIT, pickle.loads(row[0]), row[1]
+
+                claimed = conn.execute(
+                    "INSERT INTO flights (key, owner, expires_at) VALUES (?, ?, ?) "
+                    "ON CONFLICT(key) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at "
+                    "WHERE flights.expires_at <= ?",
+                    (key, owner, now + FLIGHT_TIMEOUT_SECONDS, now)
+                ).rowcount
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        except sqlite3.Error:
+            # L2 meşgul/bozuk: yerelde hesapla
+            with self._lock:
+                self._stats["errors"] += 1
+            return CLAIMED, None, 0
+
+        return (CLAIMED if claimed else BUSY), None, 0
+
+    def _publish(self, key: str, value: Any, expires_at: float, owner: str):
+        """Değeri yazar ve kilidi bırakır (tek transaction = atomik)."""
+        conn = self._connection()
+        if conn is None:
+            return
+
+        try:
+            blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute("INSERT OR REPLACE INTO entries (key, value, expires_at) VALUES (?, ?, ?)", (key, blob, expires_at))
+                conn.execute("DELETE FROM flights WHERE key = ?", (key,))
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+            self._publishes += 1
+            if self._publishes % PURGE_EVERY == 0:
+                conn.execute("DELETE FROM entries WHERE expires_at < ?", (time.time(),))
+        except (sqlite3.Error, pickle.PicklingError, TypeError) as e:
+            print(f"Shared cache yazma hatası: {e}")
+            with self._lock:
+                self._stats["errors"] += 1
+            self._release(key, owner)
+
+    def _release(self, key: str, owner: str):
+        """Hesaplama başarısız/cache'lenmez: kilidi bırak, bekleyenler devralsın."""
+        conn = self._connection()
+        if conn is None:
+            return
+        try:
+            conn.execute("DELETE FROM flights WHERE key = ? AND owner = ?", (key, owner))
+        except sqlite3.Error:
+            pass
+
+    def _flight_alive(self, key: str) -> bool:
+        conn = self._connection()
+        if conn is None:
+            return False
+        try:
+            row = conn.execute("SELECT expires_at FROM flights WHERE key = ?", (key,)).fetchone()
+        except sqlite3.Error:
+            return False
+        return bool(row) and row[0] > time.time()
+
+    def _store(self, key: str, value: Any, ttl: float, cacheable: Callable[[Any], bool], owner: str):
+        if cacheable(value):
+            expires_at = time.time() + ttl
+            self._l1_set(key, value, expires_at)
+            self._publish(key, value, expires_at, owner)
+        else:
+            self._release(key, owner)
+
+    # ----------------------------------------
+    # Public API
+    # ----------------------------------------
+
+    def get_or_compute(self, key: str, ttl: float, compute: Callable[[], Any],
+                       cacheable: Callable[[Any], bool] = _succeeded) -> Any:
+        """
+        key için değeri döndürür; host'ta kimse hesaplamamışsa compute() çalışır.
+
+        Parameters:
+        -----------
+        key : str
+            Cache anahtarı
+        ttl : float
+            Geçerlilik süresi (saniye)
+        compute : Callable
+            Miss durumunda çağrılır (host genelinde tek seferde)
+        cacheable : Callable
+            Sonuç saklanmalı mı (varsayılan: success=False değilse)
+        """
+        found, value = self._l1_get(key)
+        if found:
+            return _copy(value)
+
+        owner = _new_owner()
+        waited = False
+        while True:
+            state, value, expires_at = self._claim(key, owner)
+
+            if state == HIT:
+                with self._lock:
+                    self._stats["l2_hits"] += 1
+                self._l1_set(key, value, expires_at)
+                return _copy(value)
+
+            if state == CLAIMED:
+                with self._lock:
+                    self._stats["computes"] += 1
+                    if waited:
+                        self._stats["takeovers"] += 1
+                try:
+                    value = compute()
+                except BaseException:
+                    self._release(key, owner)
+                    raise
+                self._store(key, value, ttl, cacheable, owner)
+                return _copy(value)
+
+            # BUSY: başka bir worker hesaplıyor
+            if not waited:
+                waited = True
+                with self._lock:
+                    self._stats["waits"] += 1
+            while self._flight_alive(key):
+                found, value, expires_at = self._read(key)
+                if found:
+                    break
+                time.sleep(POLL_SECONDS)
+
+    async def get_or_compute_async(self, key: str, ttl: float, compute: Callable[[], Awaitable[Any]],
+                                   cacheable: Callable[[Any], bool] = _succeeded) -> Any:
+        """
+        get_or_compute'un async hali: compute bir coroutine döndürür,
+        SQLite işlemleri thread'de, bekleme asyncio.sleep ile yapılır.
+        """
+        found, value = self._l1_get(key)
+        if found:
+            return _copy(value)
+
+        owner = _new_owner()
+        waited = False
+        while True:
+            state, value, expires_at = await asyncio.to_thread(self._claim, key, owner)
+
+            if state == HIT:
+                with self._lock:
+                    self._stats["l2_hits"] += 1
+                self._l1_set(key, value, expires_at)
+                return _copy(value)
+
+            if state == CLAIMED:
+                with self._lock:
+                    self._stats["computes"] += 1
+                    if waited:
+                        self._stats["takeovers"] += 1
+                try:
+                    value = await compute()
+                except BaseException:
+                    await asyncio.to_thread(self._release, key, owner)
+                    raise
+                await asyncio.to_thread(self._store, key, value, ttl, cacheable, owner)
+                return _copy(value)
+
+            if not waited:
+                waited = True
+                with self._lock:
+                    self._stats["waits"] += 1
+            while await asyncio.to_thread(self._flight_alive, key):
+                found, value, expires_at = await asyncio.to_thread(self._read, key)
+                if found:
+                    break
+                await asyncio.sleep(POLL_SECONDS)
+
+    def clear(self) -> Dict:
+        """L1 ve L2'yi temizler."""
+        with self._lock:
+            self._l1.clear()
+        conn = self._connection()
+        if conn is not None:
+            conn.execute("DELETE FROM entries")
+            conn.execute("DELETE FROM flights")
+        return {"message": "Shared cache temizlendi"}
+
+    def stats(self) -> Dict:
+        """Bu process'in cache metrikleri + L2 kayıt sayısı."""
+        l2_entries = None
+        conn = self._connection()
+        if conn is not None:
+            try:
+                l2_entries = conn.execute("SELECT COUNT(*) FROM entries WHERE expires_at > ?", (time.time(),)).fetchone()[0]
+            except sqlite3.Error:
+                pass
+        with self._lock:
+            return {
+                "l2_path": None if self._disabled else os.path.abspath(self.path),
+                "l1_entries": len(self._l1),
+                "l2_entries": l2_entries,
+                **self._stats
+            }
+
+
+def cache_key(namespace: str, *parts) -> str:
+    """Okunabilir önek + parametrelerin hash'i."""
+    digest = hashlib.blake2b(repr(parts).encode(), digest_size=16).hexdigest()
+    return f"{namespace}:{digest}"
+
+
+# Uygulama genelinde paylaşılan cache
+shared_cache = SharedCache()
+
+
+def shared(namespace: str, ttl: float, cacheable: Callable[[Any], bool] = _succeeded):
+    """
+    Fonksiyon sonucunu host genelinde cache'leyen decorator.
+
+    Anahtar, varsayılanlar uygulanmış argümanlardan üretilir
+    (get_crypto_candles("BTC") ile get_crypto_candles(crypto="BTC") aynı).
+    Cache'siz versiyon `fn.uncached` ile erişilebilir.
+    """
+    def decorator(fn: Callable) -> Callable:
+        signature = inspect.signature(fn)
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key = cache_key(namespace, tuple(sorted(bound.arguments.items())))
+            return shared_cache.get_or_compute(key, ttl, lambda: fn(*args, **kwargs), cacheable)
+
+        wrapper.uncached = fn
+        return wrapper
+
+    return decorator
+
+
+# Test
+if __name__ == "__main__":
+    from concurrent.futures import ProcessPoolExecutor
+
+    def slow_fetch(symbol: str) -> Dict:
+        time.sleep(0.5)
+        return {"success": True, "symbol": symbol, "pid": os.getpid()}
+
+    def worker(_):
+        cache = SharedCache()
+        started = time.perf_counter()
+        value = cache.get_or_compute(cache_key("test", "BTC", time.time() // 3600), 60, lambda: slow_fetch("BTC"))
+        return value["pid"], cache.stats()["computes"], round(time.perf_counter() - started, 2)
+
+    shared_cache.clear()
+    with ProcessPoolExecutor(max_workers=4) as pool:
+        results = list(pool.map(worker, range(4)))
+
+    print("=" * 50)
+    print("  SHARED CACHE (4 process, aynı anahtar)")
+    print("=" * 50)
+    for pid, computes, seconds in results:
+        print(f"  değer pid={pid} | bu process hesapladı: {bool(computes)} | {seconds} sn")
+    print(f"  Toplam hesaplama: {sum(r[1] for r in results)}")
+
+    # Async yol: hata fırlatan ve cache'lenmeyen hesaplama kilidi bırakmalı
+    async def failing():
+        raise RuntimeError("upstream hatası")
+
+    async def uncacheable():
+        return {"success": False, "error": "Veri alınamadı"}
+
+    async def async_checks():
+        key = cache_key("test", "async-raise", time.time())
+        try:
+            await shared_cache.get_or_compute_async(key, 60, failing)
+        except RuntimeError:
+            pass
+        assert not shared_cache._flight_alive(key), "hata sonrası kilit kaldı"
+
+        key = cache_key("test", "async-uncacheable", time.time())
+        await shared_cache.get_or_compute_async(key, 60, uncacheable)
+        assert not shared_cache._flight_alive(key), "cache'lenmeyen sonuç sonrası kilit kaldı"
+
+        # Sonraki çağıran beklemeden yeniden hesaplar
+        started = time.perf_counter()
+        await shared_cache.get_or_compute_async(key, 60, uncacheable)
+        assert time.perf_counter() - started < 1, "ölü kilit beklendi"
+
+    asyncio.run(async_checks())
+    print("  Async hata/cache'lenmeyen yol: kilit bırakıldı ✓")
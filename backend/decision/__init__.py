@@ -1,3 +1,4 @@
 # Decision modülü
 from .probability import calculate_probability
 
+from .probability_series import probability_series, backtest_probability_series, backtest_probability_bars
@@ -0,0 +1,304 @@
+# ============================================
+# PROBABILITY SERIES - Her Mum İçin Olasılık
+# ============================================
+# probability.py sadece anlık değeri puanlar. Bu dosya aynı kuralları
+# indikatör dizilerine uygular: if/elif zincirleri np.select olur ve
+# geçmişin her mumu için Long/Short olasılığı tek seferde hesaplanır.
+#
+# Sonuç, calculate_probability'nin her mum için tek tek çağrılmasıyla
+# birebir aynıdır (eksik veri = None → 0 puan kuralı dahil).
+# backtest_probability_series bu seriyi geçmişte test eder.
+
+from typing import Dict, List
+
+import numpy as np
+
+from analysis.indicators import candle_arrays, indicator_series
+from common.session_calendar import label_timestamps, parse_timestamps
+from analysis.portfolio_backtester import vector_exits, LONG, SHORT, WAIT
+from analysis.trade_stats import TradeStatsAccumulator
+
+# Öneri kodları (calculate_probability ile aynı eşikler)
+RECOMMENDATIONS = ("NEUTRAL", "LONG", "STRONG_LONG", "SHORT", "STRONG_SHORT")
+
+# Olasılık kalibrasyonu aralıkları (işlem yönünün olasılığı, %)
+PROBABILITY_BUCKETS = ((50, 55), (55, 65), (65, 75), (75, 100.1))
+
+
+def rsi_scores(rsi: np.ndarray) -> np.ndarray:
+    """calculate_rsi_signal puanları."""
+    return np.select(
+        [np.isnan(rsi), rsi < 30, rsi < 40, rsi < 50, rsi < 60, rsi < 70],
+        [0, 25, 15, 5, -5, -15],
+        -25
+    ).astype(np.float64)
+
+
+def macd_scores(macd: np.ndarray, signal: np.ndarray) -> np.ndarray:
+    """calculate_macd_signal puanları."""
+    diff = macd - signal
+    with np.errstate(invalid='ignore'):
+        score = np.where(diff > 0, np.minimum(20, diff * 1000), np.maximum(-20, diff * 1000))
+    return np.where(np.isnan(diff), 0.0, score)
+
+
+def ema_scores(price: np.ndarray, ema_20: np.ndarray, ema_50: np.ndarray, ema_200: np.ndarray) -> np.ndarray:
+    """calculate_ema_signal puanları."""
+    missing = np.isnan(price) | np.isnan(ema_20) | np.isnan(ema_50) | np.isnan(ema_200)
+    with np.errstate(invalid='ignore'):
+        score = (
+            np.where(price > ema_20, 5, -5)
+            + np.where(price > ema_50, 5, -5)
+            + np.where(price > ema_200, 5, -5)
+            + np.select([(ema_20 > ema_50) & (ema_50 > ema_200), (ema_20 < ema_50) & (ema_50 < ema_200)], [10, -10], 0)
+        )
+    return np.where(missing, 0, score).astype(np.float64)
+
+
+def stochastic_scores(k: np.ndarray, d: np.ndarray) -> np.ndarray:
+    """calculate_stochastic_signal puanları."""
+    with np.errstate(invalid='ignore'):
+        return np.select(
+            [np.isnan(k) | np.isnan(d), k < 20, k > 80, k > d],
+            [0, 15, -15, 5],
+            -5
+        ).astype(np.float64)
+
+
+def bollinger_scores(price: np.ndarray, upper: np.ndarray, lower: np.ndarray) -> np.ndarray:
+    """calculate_bollinger_signal puanları."""
+    band_width = upper - lower
+    with np.errstate(divide='ignore', invalid='ignore'):
+        position = np.where(band_width > 0, (price - lower) / band_width, 0.5)
+        return np.select(
+            [np.isnan(price) | np.isnan(upper) | np.isnan(lower), position < 0.2, position > 0.8],
+            [0, 15, -15],
+            0
+        ).astype(np.float64)
+
+
+def probability_series(series: Dict[str, np.ndarray], kill_zone: np.ndarray = None) -> Dict[str, np.ndarray]:
+    """
+    calculate_probability'nin dizi versiyonu.
+
+    Parameters:
+    -----------
+    series : Dict[str, np.ndarray]
+        compute_indicators çıktısı (TradingView anahtar adları)
+    kill_zone : np.ndarray (bool)
+        Her mumda bir seans kill zone'u aktif mi (session bonusu için, opsiyonel)
+
+    Returns:
+    --------
+    Dict[str, np.ndarray] :
+        scores (indikatör → puan dizisi), technical, session_bonus, final,
+        long, short (olasılık %), recommendation (RECOMMENDATIONS indeksi)
+    """
+    close = series["close"]
+    scores = {
+        "RSI": rsi_scores(series["RSI"]),
+        "MACD": macd_scores(series["MACD.macd"], series["MACD.signal"]),
+        "EMA": ema_scores(close, series["EMA20"], series["EMA50"], series["EMA200"]),
+        "Stochastic": stochastic_scores(series["Stoch.K"], series["Stoch.D"]),
+        "Bollinger": bollinger_scores(close, series["BB.upper"], series["BB.lower"]),
+    }
+
+    # sum() ile aynı sırada topla (0 + RSI + MACD + ...)
+    technical = np.zeros(close.shape)
+    for values in scores.values():
+        technical = technical + values
+
+    if kill_zone is None:
+        session_bonus = np.zeros(close.shape)
+    else:
+        session_bonus = np.where(kill_zone, np.where(technical > 0, 10.0, -10.0), 0.0)
+
+    final = technical + session_bonus
+    long = np.minimum(100, np.maximum(0, (final + 100) / 2))
+    short = 100 - long
+
+    recommendation = np.select(
+        [long >= 65, long >= 55, short >= 65, short >= 55],
+        [2, 1, 4, 3],
+        0
+    ).astype(np.int8)
+
+    return {
+        "scores": scores,
+        "technical": technical,
+        "session_bonus": session_bonus,
+        "final": final,
+        "long": long,
+        "short": short,
+        "recommendation": recommendation
+    }
+
+
+def _bars(candles: List[Dict], use_session: bool = True) -> Dict[str, np.ndarray]:
+    """Mum listesi → kolon dizileri (+ seans etiketi için epoch dakika)."""
+    bars = candle_arrays(candles)
+    if use_session:
+        bars["minutes"] = parse_timestamps([c['timestamp'] for c in candles])
+    return bars
+
+
+def bar_probability_series(bars: Dict[str, np.ndarray], use_session: bool = True) -> Dict[str, np.ndarray]:
+    """
+    Kolon dizilerinden (minutes + OHLCV, örn. CandleArchive.range())
+    indikatörleri ve olasılık serisini hesaplar.
+    """
+    series = indicator_series(bars)
+    kill_zone = None
+    if use_session:
+        labels = label_timestamps(bars["minutes"])
+        kill_zone = labels["session_kill_zone_mask"] != 0
+    return probability_series(series, kill_zone)
+
+
+def candle_probability_series(candles: List[Dict], use_session: bool = True) -> Dict[str, np.ndarray]:
+    """
+    Mumlardan indikatörleri ve olasılık serisini hesaplar.
+    """
+    return bar_probability_series(_bars(candles, use_session), use_session=use_session)
+
+
+def _calibration(long: np.ndarray, direction: np.ndarray, wins: np.ndarray) -> List[Dict]:
+    """İşlem yönüne verilen olasılık ile gerçekleşen win rate karşılaştırması."""
+    buckets = []
+    traded = direction != WAIT
+    probability = np.where(direction == SHORT, 100 - long, long)
+    for low, high in PROBABILITY_BUCKETS:
+        mask = traded & (probability >= low) & (probability < high)
+        count = int(mask.sum())
+        if not count:
+            continue
+        buckets.append({
+            "probability": f"%{low}-{min(high, 100):g}",
+            "trades": count,
+            "actual_win_rate": round(float(wins[mask].sum()) / count * 100, 1)
+        })
+    return buckets
+
+
+def _invalid_params(stop_percent: float, target_percent: float, horizon: int) -> Dict:
+    """Çıkış parametrelerini doğrular; geçersizse {"error"}, değilse None."""
+    if not isinstance(horizon, (int, np.integer)) or horizon < 1:
+        return {"error": f"Geçersiz horizon: {horizon}", "min_horizon": 1}
+    if not stop_percent > 0 or not target_percent > 0:
+        return {"error": f"Geçersiz stop/hedef yüzdesi: {stop_percent}/{target_percent}",
+                "detail": "stop_percent ve target_percent pozitif olmalı"}
+    return None
+
+
+def backtest_probability_series(candles: List[Dict], min_probability: float = 55,
+                                stop_percent: float = 1.0, target_percent: float = 1.5,
+                                horizon: int = 3, use_session: bool = True) -> Dict:
+    """
+    Olasılık modelini geçmişte test eder.
+
+    LONG olasılığı >= min_probability ise LONG, SHORT olasılığı >= min_probability
+    ise SHORT açılır; çıkış backtester ile aynı kuralla (stop / hedef / horizon mum).
+
+    Parameters:
+    -----------
+    candles : List[Dict]
+        Zaman sıralı mumlar
+    min_probability : float
+        İşleme girmek için gereken olasılık (55 = LONG/SHORT önerisi)
+    stop_percent, target_percent : float
+        Stop ve hedef yüzdeleri (forex için daha küçük değerler kullanın)
+    horizon : int
+        Çıkış penceresi (mum)
+
+    Returns:
+    --------
+    Dict : backtest_strategy alanları + sinyal sayıları + kalibrasyon
+    """
+    invalid = _invalid_params(stop_percent, target_percent, horizon)
+    if invalid:
+        return invalid
+    if len(candles) < horizon + 2:
+        return {"error": "Yetersiz veri", "min_required": horizon + 2}
+
+    return backtest_probability_bars(
+        _bars(candles, use_session), min_probability=min_probability, stop_percent=stop_percent,
+        target_percent=target_percent, horizon=horizon, use_session=use_session
+    )
+
+
+def backtest_probability_bars(bars: Dict[str, np.ndarray], min_probability: float = 55,
+                              stop_percent: float = 1.0, target_percent: float = 1.5,
+                              horizon: int = 3, use_session: bool = True) -> Dict:
+    """
+    backtest_probability_series'in kolon dizileriyle çalışan hali.
+
+    bars: minutes + OHLCV dizileri; arşivden gelen memmap view'ları
+    kopyalanmadan kullanılır (yıllarca 5m mum).
+    """
+    invalid = _invalid_params(stop_percent, target_percent, horizon)
+    if invalid:
+        return invalid
+    n = bars["close"].size
+    if n < horizon + 2:
+        return {"error": "Yetersiz veri", "min_required": horizon + 2}
+
+    probability = bar_probability_series(bars, use_session=use_session)
+    long, short = probability["long"], probability["short"]
+
+    direction = np.select([long >= min_probability, short >= min_probability], [LONG, SHORT], WAIT).astype(np.int8)
+    direction[-horizon:] = WAIT   # Çıkış penceresi tamamlanmayan mumlar
+
+    pnl, wins = vector_exits(direction, bars["high"], bars["low"], bars["close"], stop_percent, target_percent, horizon)
+
+    traded = np.flatnonzero(direction != WAIT)
+    accumulator = TradeStatsAccumulator(keep_records=False)
+    accumulator.extend(direction[traded], wins[traded], np.round(pnl[traded], 2))
+    result = accumulator.statistics()
+
+    result["signals"] = {name: int((probability["recommendation"] == code).sum()) for code, name in enumerate(RECOMMENDATIONS)}
+    result["calibration"] = _calibration(long, direction, wins)
+    result["parameters"] = {
+        "min_probability": min_probability,
+        "stop_percent": stop_percent,
+        "target_percent": target_percent,
+        "horizon": horizon,
+        "use_session": use_session
+    }
+    result["bars"] = n
+
+    return result
+
+
+# Test
+if __name__ == "__main__":
+    import random
+    import time
+    from datetime import datetime, timedelta
+
+    start = datetime(2024, 1, 1)
+    test_candles = []
+    price = 1.08
+    for i in range(100_000):
+        change = random.uniform(-0.002, 0.002)
+        test_candles.append({
+            'timestamp': (start + timedelta(hours=i)).strftime("%Y-%m-%d %H:%M"),
+            'open': round(price, 5),
+            'high': round(max(price, price + change) + random.uniform(0, 0.001), 5),
+            'low': round(min(price, price + change) - random.uniform(0, 0.001), 5),
+            'close': round(price + change, 5),
+            'volume': 0
+        })
+        price = max(0.5, price + change)
+
+    started = time.perf_counter()
+    result = backtest_probability_series(test_candles, stop_percent=0.2, target_percent=0.3)
+    elapsed = time.perf_counter() - started
+
+    print("=" * 50)
+    print("  PROBABILITY SERIES BACKTEST")
+    print("=" * 50)
+    print(f"  {result['bars']} mum: {elapsed:.2f} sn")
+    print(f"  Trade: {result['total_trades']}, Win rate: %{result['win_rate']}")
+    print(f"  Sinyaller: {result['signals']}")
+    for bucket in result['calibration']:
+        print(f"  Olasılık {bucket['probability']}: gerçek %{bucket['actual_win_rate']} ({bucket['trades']} trade)")
@@ -4,26 +4,45 @@
 # Bu dosya tüm modülleri birleştirip API endpoint'leri sunar.
 # Flutter uygulaması bu API'ye bağlanacak.
 
-from fastapi import FastAPI
+import asyncio
+
+from fastapi import FastAPI, Request, Response
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import Optional, List
-from datetime import datetime
+from typing import Optional, List, Dict
+from datetime import datetime, timezone
 
 # Kendi modüllerimiz
-from data.price_fetcher import get_analysis
+from data.price_fetcher import get_analysis, get_batch_analysis, get_local_analysis
+from data.forex_fetcher import get_forex_candles, FOREX_SYMBOLS
 from data.session_tracker import get_session_status
 from data.btc_reporter import get_btc_candles
 from decision.probability import calculate_probability
-from analysis.ict_concepts import get_all_kill_zones_status, get_ict_analysis
-from analysis.strategy_analyzer import generate_trade_signal
-from analysis.backtester import backtest_strategy, get_real_confidence
-from analysis.supply_demand import find_all_zones
-from analysis.killzone_strategy import get_full_killzone_analysis, get_active_killzone_strategy, KILLZONE_BEHAVIORS
+from analysis.ict_concepts import get_all_kill_zones_status
+from analysis.killzone_strategy import get_active_killzone_strategy, KILLZONE_BEHAVIORS
 from analysis.trade_journal import record_signal, verify_past_signals, get_journal_stats, get_signal_history, clear_journal
-from data.crypto_fetcher import get_crypto_candles, get_multi_crypto_summary, SUPPORTED_CRYPTOS
+from analysis.walk_forward import walk_forward_backtest
+from analysis.portfolio_backtester import portfolio_backtest
+from analysis.replay import replay_backtest
+from analysis.session_ranges import killzone_analytics
+from analysis.playbook_backtester import attach_to_behaviors
+from analysis.optimizer import successive_halving
+from analysis.indicators import compute_indicators
+from decision.probability_series import backtest_probability_series
+from analysis.analysis_cache import cached_ict_structure, cached_zones, cached_asian_range, cached_playbook_backtest, get_cache_stats
+from data.crypto_fetcher import get_crypto_candles, get_crypto_history, get_multi_crypto_summary, SUPPORTED_CRYPTOS, CANDLE_PROVIDER
 from data.news_fetcher import get_full_news_report, get_crypto_news, get_fear_greed_index, get_market_sentiment
 from data.market_data import get_top_coins, get_trending_coins, get_global_market_data, get_economic_calendar, get_full_market_data
+from data.shared_cache import shared_cache, cache_key
+from data.candle_archive import candle_archive
+from api.http_cache import make_etag, not_modified, seconds_until_next_bar
+from api.executor import (
+    analysis_executor, signal_task, report_task, backtest_task, archive_backtest_task,
+    active_zone_id, live_killzone, with_live_fields
+)
+from api.jobs import job_manager, job_events, JOB_KINDS
 
 # ============================================
 # FastAPI Uygulaması Oluştur
@@ -44,6 +63,18 @@ app.add_middleware(
 )
 
 
+# Analiz process havuzu (sembol affinity, bkz. api/executor.py)
+@app.on_event("startup")
+def start_analysis_executor():
+    analysis_executor.start()
+
+
+@app.on_event("shutdown")
+def stop_analysis_executor():
+    analysis_executor.shutdown()
+    job_manager.shutdown()
+
+
 # ============================================
 # API Modelleri (Request/Response şablonları)
 # ============================================
@@ -51,6 +82,13 @@ class AnalyzeRequest(BaseModel):
     """Analiz isteği için model"""
     symbol: str = "EURUSD"
     interval: str = "1h"
+    source: str = "tradingview"   # "local" = yerel indikatör motoru
+
+
+class JobRequest(BaseModel):
+    """Arka plan iş isteği (bkz. api/jobs.py JOB_KINDS)"""
+    kind: str = "backtest"   # backtest, walk_forward, optimize, replay, backfill
+    params: Dict = {}
 
 
 class PairInfo(BaseModel):
@@ -92,6 +130,7 @@ def root():
         "message": "Forex Analyzer API çalışıyor! 🚀",
         "endpoints": {
             "/analyze": "Parite analizi yap",
+            "/analyze-all": "Tüm pariteler, tüm interval'ler (toplu)",
             "/sessions": "Session durumlarını gör",
             "/pairs": "Desteklenen pariteleri listele"
         }
@@ -143,8 +182,8 @@ def analyze(request: AnalyzeRequest):
     - İndikatör sinyalleri
     - Session bilgisi
     """
-    # 1. TradingView'dan veri çek
-    analysis = get_analysis(request.symbol, interval=request.interval)
+    # 1. TradingView'dan veri çek (desteklenen pariteler toplu cache'ten)
+    analysis = _pair_analysis(request.symbol, request.interval, request.source)
     
     # 2. Session bilgisini al
     session = get_session_status()
@@ -156,38 +195,261 @@ def analyze(request: AnalyzeRequest):
 
 
 @app.get("/analyze/{symbol}")
-def analyze_quick(symbol: str, interval: str = "1h"):
+def analyze_quick(symbol: str, interval: str = "1h", source: str = "tradingview"):
     """
     Hızlı analiz - GET methodu ile.
+    source=local ise indikatörler mumlardan yerel olarak hesaplanır
+    (TradingView'a gidilmez, kripto semboller de desteklenir).
     
-    Kullanım: GET http://localhost:8000/analyze/EURUSD?interval=1h
+    Kullanım: GET http://localhost:8000/analyze/EURUSD?interval=1h&source=local
     """
-    analysis = get_analysis(symbol.upper(), interval=interval)
+    analysis = _pair_analysis(symbol.upper(), interval, source)
     session = get_session_status()
     result = calculate_probability(analysis, session)
     return result
 
 
+def _pair_analysis(symbol: str, interval: str, source: str = "tradingview") -> dict:
+    """
+    Desteklenen pariteler interval başına tek toplu istekten (TTL cache'li)
+    okunur; diğerleri tek tek çekilir. source=local ise yerel motor.
+    """
+    if source == "local":
+        return get_local_analysis(symbol, interval=interval)
+    
+    symbols = [pair["symbol"] for pair in SUPPORTED_PAIRS]
+    if symbol in symbols:
+        return get_batch_analysis(symbols, interval=interval)[symbol]
+    return get_analysis(symbol, interval=interval)
+
+
+@app.get("/analyze-all")
+def analyze_all(intervals: str = "15m,1h,4h"):
+    """
+    Tüm desteklenen pariteleri tüm interval'lerde tek istekte analiz eder.
+    Interval başına TradingView'a tek toplu istek gider (9×N yerine N).
+    
+    Kullanım: GET http://localhost:8000/analyze-all?intervals=15m,1h,4h
+    """
+    selected = [i.strip() for i in intervals.split(",") if i.strip()]
+    symbols = [pair["symbol"] for pair in SUPPORTED_PAIRS]
+    session = get_session_status()
+    
+    results = {}
+    for interval in selected:
+        batch = get_batch_analysis(symbols, interval=interval)
+        results[interval] = {
+            symbol: calculate_probability(batch[symbol], session)
+            for symbol in symbols
+        }
+    
+    return {
+        "success": True,
+        "intervals": selected,
+        "pairs": symbols,
+        "results": results,
+        "session": session,
+        "generated_at": datetime.now().isoformat()
+    }
+
+
+@app.get("/indicators/{symbol}")
+def get_indicator_series(symbol: str, interval: str = "1h", limit: int = 100):
+    """
+    Yerel indikatör motorunun tam serileri (son `limit` mum).
+    Forex pariteleri ve kriptolar için.
+    
+    Kullanım: GET http://localhost:8000/indicators/EURUSD?interval=1h&limit=100
+    """
+    symbol = symbol.upper()
+    if symbol in FOREX_SYMBOLS:
+        data = get_forex_candles(symbol, interval=interval)
+    else:
+        data = get_crypto_history(symbol, days=30, interval=interval)
+    
+    if not data.get('success'):
+        return {"error": data.get('error', 'Veri alınamadı')}
+    
+    candles = data.get('candles', [])
+    series = compute_indicators(candles)
+    limit = max(1, min(limit, len(candles)))
+    
+    return {
+        "success": True,
+        "symbol": symbol,
+        "interval": interval,
+        "timestamps": [c['timestamp'] for c in candles[-limit:]],
+        "series": {
+            key: [None if v != v else round(float(v), 6) for v in values[-limit:]]
+            for key, values in series.items()
+        }
+    }
+
+
+@app.get("/probability-backtest/{symbol}")
+async def probability_backtest(symbol: str, interval: str = "1h", days: int = None, min_probability: float = 55,
+                         stop_percent: float = 1.0, target_percent: float = 1.5, horizon: int = 3):
+    """
+    calculate_probability modelini geçmişin her mumunda çalıştırıp test eder.
+    Forex için küçük stop/hedef kullanın (örn. stop_percent=0.2&target_percent=0.3).
+    
+    Kullanım: GET http://localhost:8000/probability-backtest/EURUSD?interval=1h&days=365
+    """
+    symbol = symbol.upper()
+    if symbol in FOREX_SYMBOLS:
+        data = await run_in_threadpool(get_forex_candles, symbol, interval=interval, days=days)
+    else:
+        data = await run_in_threadpool(get_crypto_history, symbol, days=days or 90, interval=interval)
+    
+    if not data.get('success'):
+        return {"error": data.get('error', 'Veri alınamadı')}
+    
+    result = await analysis_executor.snapshot(
+        symbol, backtest_probability_series,
+        data.get('candles', []),
+        min_probability=min_probability,
+        stop_percent=stop_percent,
+        target_percent=target_percent,
+        horizon=horizon
+    )
+    
+    return {
+        "success": "error" not in result,
+        "symbol": symbol,
+        "interval": interval,
+        "backtest": result
+    }
+
+
+@app.get("/data-quality")
+def data_quality_all(interval: str = "1h", days: int = 30):
+    """
+    Tüm kriptolar için mum serisi kalite özeti (boşluk, tekrar, sıra dışı mum, onarım).
+    
+    Kullanım: GET http://localhost:8000/data-quality?interval=1h&days=30
+    """
+    symbols = {}
+    for symbol in SUPPORTED_CRYPTOS:
+        data = get_crypto_history(symbol, days=days, interval=interval)
+        if not data.get('success'):
+            symbols[symbol] = {"error": data.get('error', 'Veri alınamadı')}
+            continue
+        quality = dict(data.get('quality') or {})
+        quality.pop('gap_ranges', None)
+        symbols[symbol] = quality
+    
+    return {"success": True, "interval": interval, "days": days, "symbols": symbols}
+
+
+@app.get("/data-quality/{symbol}")
+def data_quality(symbol: str, interval: str = "1h", days: int = 30):
+    """
+    Sembolün mum serisi kalite raporu: eksik mum aralıkları, tekrarlar,
+    sıra dışı mumlar ve sadece eksik aralıkların tekrar çekilmesiyle yapılan onarım.
+    
+    Kullanım: GET http://localhost:8000/data-quality/BTC?interval=1h&days=30
+    """
+    symbol = symbol.upper()
+    if symbol in FOREX_SYMBOLS:
+        data = get_forex_candles(symbol, interval=interval, days=days)
+    else:
+        data = get_crypto_history(symbol, days=days, interval=interval)
+    
+    if not data.get('success'):
+        return {"success": False, "symbol": symbol, "error": data.get('error', 'Veri alınamadı')}
+    
+    return {
+        "success": True,
+        "symbol": symbol,
+        "interval": interval,
+        "days": days,
+        "quality": data.get('quality')
+    }
+
+
+@app.get("/archive")
+def archive_series():
+    """
+    Yerel mum arşivindeki seriler (sembol, interval, mum sayısı, tarih aralığı).
+    
+    Kullanım: GET http://localhost:8000/archive
+    """
+    return {"success": True, "series": candle_archive.series()}
+
+
+@app.get("/archive-backtest/{symbol}")
+async def archive_backtest(symbol: str, interval: str = "5m", start: str = None, end: str = None,
+                           min_probability: float = 55, stop_percent: float = 1.0,
+                           target_percent: float = 1.5, horizon: int = 3):
+    """
+    Olasılık modelini mum arşivindeki uzun geçmişte (yıllarca 1m/5m) test eder.
+    start/end: "YYYY-MM-DD[ HH:MM]" (UTC), [start, end) aralığı.
+    
+    Kullanım: GET http://localhost:8000/archive-backtest/BTC?interval=5m&start=2023-01-01&end=2024-01-01
+    """
+    symbol = symbol.upper()
+    try:
+        result = await analysis_executor.run(
+            symbol, archive_backtest_task, symbol, interval, start, end,
+            min_probability=min_probability,
+            stop_percent=stop_percent,
+            target_percent=target_percent,
+            horizon=horizon
+        )
+    except ValueError as e:
+        return {"success": False, "error": f"Geçersiz tarih: {e}"}
+    
+    return {
+        "success": "error" not in result,
+        "symbol": symbol,
+        "interval": interval,
+        "start": start,
+        "end": end,
+        "backtest": result
+    }
+
+
 @app.get("/btc-report")
-def btc_report(hours: int = 10):
+def btc_report(request: Request, response: Response, hours: int = 10, provider: str = None):
     """
     BTC mum raporu döndürür.
+    provider: yfinance veya ccxt (varsayılan CANDLE_PROVIDER)
     
     Kullanım: GET http://localhost:8000/btc-report?hours=10
+              GET http://localhost:8000/btc-report?hours=10&provider=ccxt
     """
-    return get_btc_candles(hours=hours)
+    btc_data = get_btc_candles(hours=hours, provider=provider)
+    
+    if btc_data.get('success'):
+        etag = make_etag("BTC", "1h", btc_data.get('candles', []), endpoint="btc-report", provider=btc_data.get('provider'))
+        cached = not_modified(request, response, etag, "1h")
+        if cached:
+            return cached
+    
+    return btc_data
 
 
 @app.get("/ict-analysis")
-def ict_analysis():
+async def ict_analysis(request: Request, response: Response, provider: str = None):
     """
     ICT Concepts analizi döndürür.
+    provider: yfinance veya ccxt (varsayılan CANDLE_PROVIDER)
     """
-    btc_data = get_btc_candles(hours=24)
+    btc_data = await run_in_threadpool(get_btc_candles, hours=24, provider=provider)
     
     if btc_data.get('success'):
         candles = btc_data.get('candles', [])
-        return get_ict_analysis(candles)
+        
+        # Aynı mumlar → 304, analiz çalışmaz
+        etag = make_etag("BTC", "1h", candles, endpoint="ict-analysis", provider=btc_data.get('provider'))
+        cached = not_modified(request, response, etag, "1h", live=True)
+        if cached:
+            return cached
+        
+        # Sadece mumlara bağlı yapı paylaşılır; kill zone durumu her istekte taze
+        kill_zones = get_all_kill_zones_status()
+        structure = await analysis_executor.snapshot("BTC", cached_ict_structure, candles)
+        return {"kill_zones": kill_zones, **structure}
     else:
         return {
             "kill_zones": get_all_kill_zones_status(),
@@ -199,28 +461,33 @@ def ict_analysis():
 
 
 @app.get("/trade-signal")
-def trade_signal():
+async def trade_signal(request: Request, response: Response, provider: str = None):
     """
     Net trade sinyali döndürür.
     - LONG / SHORT / WAIT
     - Güven skoru
     - Giriş, Stop Loss, Take Profit seviyeleri
+    provider: yfinance veya ccxt (varsayılan CANDLE_PROVIDER)
     
     Kullanım: GET http://localhost:8000/trade-signal
+              GET http://localhost:8000/trade-signal?provider=ccxt
     """
     # 24 saatlik BTC verisi
-    btc_data = get_btc_candles(hours=24)
+    btc_data = await run_in_threadpool(get_btc_candles, hours=24, provider=provider)
     
     if not btc_data.get('success'):
         return {"error": "Veri alınamadı"}
     
     candles = btc_data.get('candles', [])
     
-    # ICT analizi
-    ict = get_ict_analysis(candles)
+    etag = make_etag("BTC", "1h", candles, endpoint="trade-signal", provider=btc_data.get('provider'))
+    cached = not_modified(request, response, etag, "1h", live=True)
+    if cached:
+        return cached
     
-    # Trade sinyali üret
-    signal = generate_trade_signal(candles, ict)
+    # ICT analizi + trade sinyali (analiz worker'ında)
+    zone_id = active_zone_id(get_all_kill_zones_status())
+    signal = dict((await analysis_executor.snapshot("BTC", signal_task, candles, "BTC", zone_id=zone_id))["signal"])
     
     # BTC özet bilgisi ekle
     signal['btc_summary'] = btc_data.get('summary', {})
@@ -230,86 +497,287 @@ def trade_signal():
 
 
 @app.get("/full-report")
-def full_report():
+async def full_report(provider: str = None):
     """
     Tam rapor - Tüm analizler tek endpoint'te.
     Artık GERÇEK backtest istatistikleri içeriyor!
+    provider: yfinance veya ccxt (varsayılan CANDLE_PROVIDER)
     """
     # 24 saatlik veri
-    btc_data = get_btc_candles(hours=24)
+    btc_data = await run_in_threadpool(get_btc_candles, hours=24, provider=provider)
     
     if not btc_data.get('success'):
         return {"error": "Veri alınamadı", "details": btc_data.get('error')}
     
     candles = btc_data.get('candles', [])
     
-    # ICT analizi
-    ict = get_ict_analysis(candles)
-    
-    # Trade sinyali
-    signal = generate_trade_signal(candles, ict)
-    
-    # BACKTEST - Gerçek istatistikler
-    backtest = backtest_strategy(candles)
-    
-    # Gerçek güven oranını al
-    if backtest.get('success'):
-        real_confidence = get_real_confidence(backtest, signal.get('direction', 'WAIT'))
-        signal['confidence'] = real_confidence
-        signal['confidence_source'] = 'BACKTEST'
-        signal['backtest_trades'] = backtest.get('total_trades', 0)
-    else:
-        signal['confidence_source'] = 'ESTIMATED'
-    
-    # News ve Sentiment
-    news_report = get_full_news_report()
-    
-    # Kill Zone Stratejileri
-    killzone_data = get_full_killzone_analysis(candles)
+    # ICT + sinyal + BACKTEST (bootstrap güven aralıkları) + Kill Zone
+    # Canlı backtest sadece yeni/değişen mumları işler (BTC worker'ında)
+    # News ve Sentiment aynı anda çekilir
+    kill_zones = get_all_kill_zones_status()
+    report, news_report = await asyncio.gather(
+        analysis_executor.snapshot("BTC", report_task, candles, "BTC", bootstrap=True,
+                                   provider=btc_data.get('provider'), zone_id=active_zone_id(kill_zones)),
+        run_in_threadpool(get_full_news_report)
+    )
+    report = with_live_fields(report, kill_zones)
+    signal = report["signal"]
     
     # Journal istatistiklerini al (kaydetme işlemi ayrı endpoint'te)
-    journal_stats = get_journal_stats()
+    journal_stats = await run_in_threadpool(get_journal_stats)
     
     return {
         "generated_at": signal.get('generated_at'),
         "btc_report": btc_data,
-        "ict_analysis": ict,
+        "ict_analysis": report["ict"],
         "trade_signal": signal,
-        "backtest": backtest,
+        "backtest": report["backtest"],
         "news": news_report,
-        "killzone_strategy": killzone_data,
+        "killzone_strategy": report["killzone"],
         "journal": journal_stats
     }
 
 
 @app.get("/backtest")
-def get_backtest(hours: int = 72):
+async def get_backtest(request: Request, response: Response, hours: int = 72, intrabar: bool = False, provider: str = None):
     """
     Sadece backtest sonuçlarını döndürür.
     GERÇEK win rate ve istatistikler.
     En az 50 trade için 72 saat veri kullanır.
     
-    Kullanım: GET http://localhost:8000/backtest?hours=72
+    intrabar=true: Aynı mumda hem stop hem hedef görülen trade'ler
+    5m mumlarla çözülür (5m veri sadece gerekirse çekilir).
+    provider: yfinance veya ccxt (varsayılan CANDLE_PROVIDER)
+    
+    Kullanım: GET http://localhost:8000/backtest?hours=72&intrabar=true
+              GET http://localhost:8000/backtest?hours=72&provider=ccxt
     """
-    btc_data = get_btc_candles(hours=hours)
+    btc_data = await run_in_threadpool(get_btc_candles, hours=hours, provider=provider)
     
     if not btc_data.get('success'):
         return {"error": "Veri alınamadı"}
     
     candles = btc_data.get('candles', [])
-    return backtest_strategy(candles, min_trades=50)
+    
+    etag = make_etag("BTC", "1h", candles, endpoint="backtest", intrabar=intrabar, provider=btc_data.get('provider'))
+    cached = not_modified(request, response, etag, "1h")
+    if cached:
+        return cached
+    
+    return await analysis_executor.snapshot("BTC", backtest_task, candles, "BTC", hours=hours, intrabar=intrabar)
+
+
+@app.get("/walk-forward/{symbol}")
+async def walk_forward(symbol: str, days: int = 90, train_hours: int = 336, test_hours: int = 72, workers: Optional[int] = None):
+    """
+    Walk-forward backtest - Aylarca veride kayan train/test fold'ları.
+    Fold'lar paralel process'lerde çalışır.
+    
+    Kullanım: GET http://localhost:8000/walk-forward/BTC?days=90&train_hours=336&test_hours=72
+    """
+    history = await run_in_threadpool(get_crypto_history, symbol.upper(), days=days)
+    
+    if not history.get('success'):
+        return {"error": history.get('error', 'Veri alınamadı')}
+    
+    # Fold'lar kendi process havuzunda çalışır, burada sadece beklenir
+    result = await run_in_threadpool(
+        walk_forward_backtest,
+        history.get('candles', []),
+        train_size=train_hours,
+        test_size=test_hours,
+        workers=workers
+    )
+    result['crypto'] = symbol.upper()
+    
+    return result
+
+
+@app.get("/optimize/{symbol}")
+async def optimize(symbol: str, days: int = 90, budget: int = 5_000_000, objective: str = "expectancy", workers: Optional[int] = None):
+    """
+    Successive halving ile strateji parametre optimizasyonu
+    (stop, hedef, horizon, lookback, skor eşikleri).
+    Arama izi data/optimizer_runs/ altına kaydedilir.
+    
+    Kullanım: GET http://localhost:8000/optimize/BTC?days=90&budget=5000000&objective=expectancy
+    """
+    history = await run_in_threadpool(get_crypto_history, symbol.upper(), days=days)
+    
+    if not history.get('success'):
+        return {"error": history.get('error', 'Veri alınamadı')}
+    
+    return await run_in_threadpool(
+        successive_halving,
+        history.get('candles', []),
+        budget=budget,
+        objective=objective,
+        workers=workers,
+        symbol=symbol.upper()
+    )
+
+
+@app.get("/replay-backtest/{symbol}")
+async def replay(symbol: str, days: int = 30):
+    """
+    Canlıda sunulan sinyalin (generate_trade_signal + ICT) geçmişte
+    mum mum yeniden oynatılmış backtest'i.
+    /backtest basitleştirilmiş sinyali ölçer, bu endpoint gerçek sinyali.
+    
+    Kullanım: GET http://localhost:8000/replay-backtest/BTC?days=30
+    """
+    history = await run_in_threadpool(get_crypto_history, symbol.upper(), days=days)
+    
+    if not history.get('success'):
+        return {"error": history.get('error', 'Veri alınamadı')}
+    
+    result = await analysis_executor.snapshot(symbol, replay_backtest, history.get('candles', []), bootstrap=True)
+    result['crypto'] = symbol.upper()
+    
+    return result
+
+
+@app.get("/portfolio-backtest")
+async def get_portfolio_backtest(hours: int = 72, symbols: Optional[str] = None):
+    """
+    Tüm desteklenen kriptolar için tek vektörel portföy backtest'i.
+    Sembol bazında + birleşik equity, drawdown, eşzamanlı pozisyon
+    ve getiri korelasyonu.
+    
+    Kullanım: GET http://localhost:8000/portfolio-backtest?hours=72&symbols=BTC,ETH,SOL
+    """
+    selected = [s.strip().upper() for s in symbols.split(",")] if symbols else list(SUPPORTED_CRYPTOS.keys())
+    
+    fetched = await asyncio.gather(*(run_in_threadpool(get_crypto_candles, symbol, hours=hours) for symbol in selected))
+    
+    candle_sets = {}
+    failed = []
+    for symbol, data in zip(selected, fetched):
+        if data.get('success'):
+            candle_sets[symbol] = data.get('candles', [])
+        else:
+            failed.append(symbol)
+    
+    if not candle_sets:
+        return {"error": "Veri alınamadı", "failed": failed}
+    
+    result = await analysis_executor.run("PORTFOLIO", portfolio_backtest, candle_sets)
+    result['failed'] = failed
+    
+    return result
+
+
+# ============================================
+# Arka Plan İşleri (uzun backtest / walk-forward / optimizasyon)
+# ============================================
+
+@app.post("/jobs/backtest")
+def submit_job(request: JobRequest, response: Response):
+    """
+    Uzun backtest işini arka planda başlatır, hemen job id döner.
+    Aynı tür + parametrelerle çalışan/biten iş varsa o döner.
+    
+    Kullanım: POST http://localhost:8000/jobs/backtest
+    Body: {"kind": "walk_forward", "params": {"symbol": "BTC", "days": 180}}
+    """
+    return _job_response(job_manager.submit(request.kind, request.params), response)
+
+
+@app.post("/backfill/{symbol}")
+def submit_backfill(symbol: str, response: Response, start: str, end: str = None,
+                    interval: str = "1h", workers: int = 4, rate: float = 2.0, provider: str = "yfinance",
+                    compress: bool = False):
+    """
+    Mum arşivine geçmiş veri doldurma işini başlatır (parçalı, paralel,
+    kaldığı yerden devam eden). İlerleme /jobs/{id}/events ile izlenir.
+    
+    Kullanım: POST http://localhost:8000/backfill/BTC?interval=1h&start=2024-01-01
+             POST http://localhost:8000/backfill/BTC?interval=1m&start=2022-01-01&provider=ccxt&compress=true
+    
+    compress=true: arşive yazdıktan sonra sıkıştırılmış kopya (candle_codec) güncellenir.
+    """
+    params = {"symbol": symbol, "interval": interval, "start": start, "end": end,
+              "workers": workers, "rate": rate, "provider": provider, "compress": compress}
+    return _job_response(job_manager.submit("backfill", params), response)
+
+
+def _job_response(result: Dict, response: Response) -> Dict:
+    """İş gönderim sonucu → HTTP durum kodu + bağlantılar."""
+    if not result.get('success'):
+        response.status_code = 429 if "max_pending" in result else 400
+        return result
+    
+    job_id = result['job']['id']
+    response.status_code = 200 if result['deduplicated'] else 202
+    result['links'] = {"status": f"/jobs/{job_id}", "events": f"/jobs/{job_id}/events"}
+    return result
+
+
+@app.get("/jobs")
+def list_jobs():
+    """
+    Saklanan işler ve iş havuzu metrikleri.
+    
+    Kullanım: GET http://localhost:8000/jobs
+    """
+    return {
+        "jobs": job_manager.list(),
+        "kinds": JOB_KINDS,
+        "stats": job_manager.stats()
+    }
+
+
+@app.get("/jobs/{job_id}")
+def get_job(job_id: str, response: Response):
+    """
+    İşin durumu, ilerlemesi ve (bittiyse) sonucu.
+    
+    Kullanım: GET http://localhost:8000/jobs/3f2a9c1b7d4e
+    """
+    job = job_manager.get(job_id)
+    
+    if job is None:
+        response.status_code = 404
+        return {"error": "İş bulunamadı (süresi dolmuş olabilir)", "id": job_id}
+    
+    return job
+
+
+@app.get("/jobs/{job_id}/events")
+def job_event_stream(job_id: str):
+    """
+    İşin ilerlemesini Server-Sent Events olarak yayınlar
+    (progress → done/failed, sonra akış kapanır).
+    
+    Kullanım: GET http://localhost:8000/jobs/3f2a9c1b7d4e/events
+    """
+    return StreamingResponse(
+        job_events(job_manager, job_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 
 @app.get("/crypto/{symbol}")
-def get_crypto(symbol: str, hours: int = 24):
+def get_crypto(request: Request, response: Response, symbol: str, hours: int = 24, provider: str = None):
     """
     Kripto para verisi döndürür.
     
     Desteklenen: BTC, SOL, ETH, XRP, BNB, ADA, DOGE, AVAX
+    provider: yfinance veya ccxt (varsayılan CANDLE_PROVIDER)
     
     Kullanım: GET http://localhost:8000/crypto/SOL?hours=24
+              GET http://localhost:8000/crypto/SOL?hours=24&provider=ccxt
     """
-    return get_crypto_candles(symbol.upper(), hours=hours)
+    data = get_crypto_candles(symbol.upper(), hours=hours, provider=provider)
+    
+    if data.get('success'):
+        etag = make_etag(symbol.upper(), "1h", data.get('candles', []), endpoint="crypto" if 'provider' not in data else f"crypto-{data['provider']}")
+        cached = not_modified(request, response, etag, "1h")
+        if cached:
+            return cached
+    
+    return data
 
 
 @app.get("/crypto-list")
@@ -332,19 +800,25 @@ def multi_crypto():
 
 
 @app.get("/supply-demand/{symbol}")
-def supply_demand(symbol: str, hours: int = 48):
+async def supply_demand(request: Request, response: Response, symbol: str, hours: int = 48):
     """
     Supply ve Demand zone'ları döndürür.
     
     Kullanım: GET http://localhost:8000/supply-demand/SOL?hours=48
     """
-    data = get_crypto_candles(symbol.upper(), hours=hours)
+    data = await run_in_threadpool(get_crypto_candles, symbol.upper(), hours=hours)
     
     if not data.get('success'):
         return {"error": data.get('error', 'Veri alınamadı')}
     
     candles = data.get('candles', [])
-    zones = find_all_zones(candles)
+    
+    etag = make_etag(symbol.upper(), "1h", candles, endpoint="supply-demand")
+    cached = not_modified(request, response, etag, "1h")
+    if cached:
+        return cached
+    
+    zones = await analysis_executor.snapshot(symbol, cached_zones, candles, symbol.upper())
     
     return {
         "crypto": symbol.upper(),
@@ -462,24 +936,77 @@ def economic_calendar():
     }
 
 
+async def _killzone_playbook(days: int, provider: str = None) -> Dict:
+    """
+    Playbook backtest'i UTC gün başına bir kez hesaplanır (host genelinde).
+    Uzun geçmiş her istekte çekilmez; anahtar gün değişince yenilenir.
+    """
+    today = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+    
+    async def compute():
+        history = await run_in_threadpool(get_crypto_history, "BTC", days=days, provider=provider)
+        if not history.get('success'):
+            return {"success": False, "error": history.get('error', 'Veri alınamadı')}
+        return await analysis_executor.snapshot("BTC", cached_playbook_backtest, history.get('candles', []))
+    
+    return await shared_cache.get_or_compute_async(
+        cache_key("killzone_playbook", days, provider or CANDLE_PROVIDER, today), seconds_until_next_bar("1d"), compute
+    )
+
+
 @app.get("/killzone-strategy")
-def killzone_strategy():
+async def killzone_strategy(request: Request, response: Response, days: int = 90, provider: str = None):
     """
     Kill Zone stratejileri döndürür.
     - Asian Range
     - London Manipulation
     - NY Reversal
     - Aktif Zone bilgisi
+    - Her stratejinin son `days` gündeki backtest sonucu
+    provider: yfinance veya ccxt (varsayılan CANDLE_PROVIDER)
     
-    Kullanım: GET http://localhost:8000/killzone-strategy
+    Kullanım: GET http://localhost:8000/killzone-strategy?days=90
+              GET http://localhost:8000/killzone-strategy?days=90&provider=ccxt
     """
-    btc_data = get_btc_candles(hours=24)
+    btc_data = await run_in_threadpool(get_btc_candles, hours=24, provider=provider)
     
     if not btc_data.get('success'):
         return {"error": "Veri alınamadı"}
     
     candles = btc_data.get('candles', [])
-    return get_full_killzone_analysis(candles)
+    
+    etag = make_etag("BTC", "1h", candles, endpoint="killzone-strategy", days=days, provider=btc_data.get('provider'))
+    cached = not_modified(request, response, etag, "1h", live=True)
+    if cached:
+        return cached
+    
+    result = live_killzone(await analysis_executor.snapshot("BTC", cached_asian_range, candles))
+    
+    playbook = await _killzone_playbook(days, provider)
+    if playbook.get('success') is not False:
+        result['playbook_backtest'] = playbook
+        result['all_behaviors'] = attach_to_behaviors(KILLZONE_BEHAVIORS, playbook)
+    
+    return result
+
+
+@app.get("/killzone-analytics/{symbol}")
+async def get_killzone_analytics(symbol: str, days: int = 90, dst: bool = False):
+    """
+    Günlük seans range tablosundan seans bazında geçmiş sweep ve
+    breakout oranları. KILLZONE_BEHAVIORS iddialarının sayısal karşılığı.
+    
+    Kullanım: GET http://localhost:8000/killzone-analytics/BTC?days=180
+    """
+    history = await run_in_threadpool(get_crypto_history, symbol.upper(), days=days)
+    
+    if not history.get('success'):
+        return {"error": history.get('error', 'Veri alınamadı')}
+    
+    result = await analysis_executor.snapshot(symbol, killzone_analytics, history.get('candles', []), dst=dst)
+    result['crypto'] = symbol.upper()
+    
+    return result
 
 
 @app.get("/killzone-behaviors")
@@ -495,6 +1022,23 @@ def killzone_behaviors():
     }
 
 
+@app.get("/cache-stats")
+async def cache_stats():
+    """
+    Analiz cache'inin hit/miss metriklerini döndürür.
+    Analizler worker process'lerde çalıştığı için her worker'ın cache'i ayrı.
+    "shared": host genelindeki L1/L2 cache (mumlar, haberler, analiz snapshot'ları).
+    
+    Kullanım: GET http://localhost:8000/cache-stats
+    """
+    return {
+        **get_cache_stats(),
+        "shared": shared_cache.stats(),
+        "executor": analysis_executor.stats(),
+        "workers": await analysis_executor.worker_cache_stats()
+    }
+
+
 @app.get("/journal")
 def journal():
     """
@@ -529,7 +1073,7 @@ def journal_clear():
 
 
 @app.get("/full-analysis/{symbol}")
-def full_analysis(symbol: str, hours: int = 24):
+async def full_analysis(symbol: str, hours: int = 24):
     """
     Tek bir kripto için TÜM analizler.
     - Mum verileri
@@ -538,42 +1082,36 @@ def full_analysis(symbol: str, hours: int = 24):
     - Trade sinyali
     - Backtest
     """
+    symbol = symbol.upper()
+    
     # Kripto verisini çek
-    crypto_data = get_crypto_candles(symbol.upper(), hours=hours)
+    crypto_data = await run_in_threadpool(get_crypto_candles, symbol, hours=hours)
     
     if not crypto_data.get('success'):
         return {"error": crypto_data.get('error', 'Veri alınamadı')}
     
     candles = crypto_data.get('candles', [])
     
-    # Analizler
-    ict = get_ict_analysis(candles)
-    zones = find_all_zones(candles)
-    signal = generate_trade_signal(candles, ict)
-    backtest = backtest_strategy(candles)
-    
-    # Gerçek güven oranı
-    if backtest.get('success'):
-        signal['confidence'] = get_real_confidence(backtest, signal.get('direction', 'WAIT'))
-        signal['confidence_source'] = 'BACKTEST'
-    
-    # Kill Zone Stratejileri
-    killzone_data = get_full_killzone_analysis(candles)
+    # Analizler (ICT, zones, sinyal, canlı backtest güveni, Kill Zone)
+    kill_zones = get_all_kill_zones_status()
+    report = await analysis_executor.snapshot(symbol, report_task, candles, symbol, zones=True,
+                                              provider=crypto_data.get('provider'), zone_id=active_zone_id(kill_zones))
+    report = with_live_fields(report, kill_zones)
     
     # Journal istatistiklerini al (hızlı)
-    journal_stats = get_journal_stats()
+    journal_stats = await run_in_threadpool(get_journal_stats)
     
     return {
-        "crypto": symbol.upper(),
+        "crypto": symbol,
         "name": crypto_data.get('name'),
         "emoji": crypto_data.get('emoji'),
         "generated_at": crypto_data.get('generated_at'),
         "report": crypto_data,
-        "ict_analysis": ict,
-        "supply_demand": zones,
-        "trade_signal": signal,
-        "backtest": backtest,
-        "killzone_strategy": killzone_data,
+        "ict_analysis": report["ict"],
+        "supply_demand": report["zones"],
+        "trade_signal": report["signal"],
+        "backtest": report["backtest"],
+        "killzone_strategy": report["killzone"],
         "journal": journal_stats
     }
 